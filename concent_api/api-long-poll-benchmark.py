@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Compares polling `receive` endpoint in a loop with long polling, in terms of the number of requests sent
+and the time between sending a message to Concent and receiving it by the other party.
+Requires a Concent instance with LONG_POLL_MAX_TIMEOUT greater than 0.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+import requests
+
+from golem_messages.factories.tasks import ReportComputedTaskFactory
+from golem_messages.message         import ForceReportComputedTask
+from golem_messages.shortcuts       import dump
+from golem_messages.shortcuts       import load
+
+from utils.helpers import get_current_utc_timestamp
+from utils.helpers import sign_message
+
+from api_testing_common import create_client_auth_message
+from api_testing_common import create_signed_task_to_compute
+from api_testing_common import PROVIDER_PRIVATE_KEY
+from api_testing_common import REQUESTOR_PRIVATE_KEY
+from api_testing_common import REQUESTOR_PUBLIC_KEY
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "concent_api.settings")
+
+
+class Receiver(threading.Thread):
+    """ Calls `receive` as the requestor until it gets ForceReportComputedTask. """
+
+    def __init__(self, cluster_url, concent_public_key, long_poll_timeout, poll_interval):
+        super().__init__(daemon=True)
+        self.cluster_url        = cluster_url
+        self.concent_public_key = concent_public_key
+        self.long_poll_timeout  = long_poll_timeout
+        self.poll_interval      = poll_interval
+        self.request_count      = 0
+        self.received_at        = None
+        self.stopped            = threading.Event()
+
+    def run(self):
+        headers = {'Content-Type': 'application/octet-stream'}
+        if self.long_poll_timeout > 0:
+            headers['Concent-Long-Poll-Timeout'] = str(self.long_poll_timeout)
+
+        while not self.stopped.is_set():
+            response = requests.post(
+                f'{self.cluster_url}/api/v1/receive/',
+                headers=headers,
+                data=create_client_auth_message(REQUESTOR_PRIVATE_KEY, REQUESTOR_PUBLIC_KEY, self.concent_public_key),
+                verify=False,
+            )
+            self.request_count += 1
+            if response.status_code == 200:
+                received_message = load(response.content, REQUESTOR_PRIVATE_KEY, self.concent_public_key, check_time=False)
+                if isinstance(received_message, ForceReportComputedTask):
+                    self.received_at = time.monotonic()
+                    return
+            elif response.status_code != 204:
+                sys.exit(f'Unexpected response from receive: HTTP {response.status_code}')
+
+            if self.long_poll_timeout == 0:
+                self.stopped.wait(self.poll_interval)
+
+
+def send_force_report_computed_task(cluster_url, concent_public_key, task_id, subtask_id):
+    report_computed_task = ReportComputedTaskFactory()
+    report_computed_task.task_to_compute = create_signed_task_to_compute(
+        task_id=task_id,
+        subtask_id=subtask_id,
+        deadline=get_current_utc_timestamp() + 3600,
+    )
+    sign_message(report_computed_task, PROVIDER_PRIVATE_KEY)
+    force_report_computed_task = ForceReportComputedTask(report_computed_task=report_computed_task)
+
+    response = requests.post(
+        f'{cluster_url}/api/v1/send/',
+        headers={'Content-Type': 'application/octet-stream'},
+        data=dump(force_report_computed_task, PROVIDER_PRIVATE_KEY, concent_public_key),
+        verify=False,
+    )
+    if response.status_code != 202:
+        sys.exit(f'Unexpected response from send: HTTP {response.status_code}')
+
+
+def run_benchmark(cluster_url, concent_public_key, mode, rounds, max_delay, long_poll_timeout, poll_interval):
+    request_counts = []
+    latencies      = []
+    run_id         = random.randrange(1, 100000)
+
+    for round_number in range(rounds):
+        receiver = Receiver(cluster_url, concent_public_key, long_poll_timeout, poll_interval)
+        receiver.start()
+
+        # The message arrives at a random moment, like in the real world.
+        time.sleep(random.uniform(0, max_delay))
+        task_id = f'task_benchmark_{mode.replace(" ", "_")}_{run_id}_{round_number}'
+        sent_at = time.monotonic()
+        send_force_report_computed_task(cluster_url, concent_public_key, task_id, 'sub_' + task_id)
+
+        receiver.join(timeout=max_delay + long_poll_timeout + poll_interval + 60)
+        receiver.stopped.set()
+        if receiver.received_at is None:
+            sys.exit(f'{mode}: message sent in round {round_number} has not been received')
+
+        request_counts.append(receiver.request_count)
+        latencies.append(receiver.received_at - sent_at)
+
+    print(f'{mode}:')
+    print(f'    receive requests per message: {statistics.mean(request_counts):.1f} (total: {sum(request_counts)})')
+    print(f'    delivery latency:             mean {statistics.mean(latencies):.3f} s, median {statistics.median(latencies):.3f} s, max {max(latencies):.3f} s')
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("cluster_url")
+    parser.add_argument("--rounds",            type=int,   default=20,  help="Number of messages sent in each mode.")
+    parser.add_argument("--max-delay",         type=float, default=10,  help="Maximum time (in seconds) before a message is sent.")
+    parser.add_argument("--poll-interval",     type=float, default=1,   help="Time (in seconds) between two requests when polling.")
+    parser.add_argument("--long-poll-timeout", type=int,   default=30,  help="Value of Concent-Long-Poll-Timeout header.")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    try:
+        from concent_api.settings import CONCENT_PUBLIC_KEY
+        arguments = parse_arguments()
+        for (mode, long_poll_timeout) in [('polling', 0), ('long polling', arguments.long_poll_timeout)]:
+            run_benchmark(
+                cluster_url         = arguments.cluster_url,
+                concent_public_key  = CONCENT_PUBLIC_KEY,
+                mode                = mode,
+                rounds              = arguments.rounds,
+                max_delay           = arguments.max_delay,
+                long_poll_timeout   = long_poll_timeout,
+                poll_interval       = arguments.poll_interval,
+            )
+    except requests.exceptions.ConnectionError as exception:
+        print("\nERROR: Failed connect to the server.\n", file = sys.stderr)
+        sys.exit(str(exception))
@@ -17,8 +17,49 @@ app.conf.task_create_missing_queues = True
 app.conf.task_routes = ([
     ('core.tasks.verification_result', {'queue': 'concent'}),
     ('core.tasks.upload_finished', {'queue': 'concent'}),
+    ('core.tasks.result_upload_finished', {'queue': 'concent'}),
+    ('core.tasks.sweep_timed_out_subtasks', {'queue': 'concent'}),
+    ('core.tasks.index_payment_events', {'queue': 'concent'}),
+    ('core.tasks.index_block_timestamps', {'queue': 'concent'}),
+    ('core.tasks.relay_outbox', {'queue': 'concent'}),
+    ('core.tasks.archive_finished_subtasks', {'queue': 'concent'}),
     ('conductor.tasks.blender_verification_request', {'queue': 'conductor'}),
     ('conductor.tasks.upload_acknowledged', {'queue': 'conductor'}),
     ('verifier.tasks.blender_verification_order', {'queue': 'verifier'}),
 ],)
 app.conf.task_default_queue = 'non_existing'
+
+
+@app.on_after_configure.connect
+def setup_periodic_tasks(sender, **_kwargs):
+    # Imported here because the settings are not necessarily configured when this module is loaded.
+    from django.conf import settings
+
+    # Scheduled tasks are sent only by `celery beat`. Workers just execute them.
+    sender.add_periodic_task(
+        settings.TIMED_OUT_SUBTASKS_SWEEP_INTERVAL,
+        sender.signature('core.tasks.sweep_timed_out_subtasks'),
+        name = 'sweep timed out subtasks',
+    )
+    sender.add_periodic_task(
+        settings.OUTBOX_RELAY_INTERVAL,
+        sender.signature('core.tasks.relay_outbox'),
+        name = 'relay outbox',
+    )
+    sender.add_periodic_task(
+        settings.ARCHIVE_INTERVAL,
+        sender.signature('core.tasks.archive_finished_subtasks'),
+        name = 'archive finished subtasks',
+    )
+    if settings.PAYMENT_EVENT_INDEXER_ENABLED:
+        sender.add_periodic_task(
+            settings.PAYMENT_EVENT_INDEXER_INTERVAL,
+            sender.signature('core.tasks.index_payment_events'),
+            name = 'index payment events',
+        )
+    if settings.PAYMENT_BACKEND == 'core.payments.sci_backend.SCIPaymentBackend':
+        sender.add_periodic_task(
+            settings.BLOCK_TIMESTAMP_INDEX_INTERVAL,
+            sender.signature('core.tasks.index_block_timestamps'),
+            name = 'index block timestamps',
+        )
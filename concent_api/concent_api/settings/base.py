@@ -98,6 +98,20 @@ DATABASES = {
 
 DATABASE_ROUTERS = ['concent_api.database_router.DatabaseRouter']
 
+# Cache
+# https://docs.djangoproject.com/en/1.11/topics/cache/
+
+# The cache is local to each process. Deposit values, the most recent block number and negative upload statuses
+# cached by one process are not seen by others and removing a value (e.g. when a worker transfers funds from
+# a deposit) does not affect the copies kept by other processes. Each of these values expires after a few seconds
+# so other processes can use an out of date value at most for that long. To share the cache between processes,
+# point CACHES at memcached in local_settings.py.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Defines database used by Constance app.
 CONSTANCE_DBS = ['control']
 
@@ -237,6 +251,11 @@ CONSTANCE_CONFIG_FIELDSETS = {
     'Concent Options': ('SOFT_SHUTDOWN_MODE',),
 }
 
+# A global constant defining how long (in seconds) each process reuses values of Constance settings read from
+# the database. A process sees its own changes right away and changes made by other processes after at most
+# this time. 0 disables caching.
+CONSTANCE_LOCAL_CACHE_TIME = 5
+
 # Private and public keys to be used by Concent to sign and encrypt its own messages.
 # Stored in a 'bytes' array, e.g. b'\xf3\x97\x19\xcdX\xda...'
 #CONCENT_PRIVATE_KEY =
@@ -262,12 +281,174 @@ ADDITIONAL_VERIFICATION_CALL_TIME = 4 * 3600  # 4 hours
 # A global constant defining the lenght of the time window within which a requestor must pay
 PAYMENT_DUE_TIME = int(constants.PDT.total_seconds())
 
-# A global constant defining currently used payment backend.
-PAYMENT_BACKEND = 'core.payments.mock'
+# A global constant defining whether timeouts of client's subtasks are processed when the client contacts Concent.
+# When disabled, timeouts are processed only by the `sweep_timed_out_subtasks` periodic task.
+UPDATE_TIMED_OUT_SUBTASKS_IN_REQUESTS = True
+
+# A global constant defining how many timed out subtasks the `sweep_timed_out_subtasks` task processes in one transaction.
+TIMED_OUT_SUBTASKS_SWEEP_BATCH_SIZE = 100
+
+# A global constant defining how often (in seconds) `celery beat` schedules the `sweep_timed_out_subtasks` task.
+TIMED_OUT_SUBTASKS_SWEEP_INTERVAL = 10
+
+# A global constant defining whether Concent asks the storage cluster whether results have been uploaded when
+# a requestor with subtasks in FORCING_RESULT_TRANSFER state contacts it. Can be disabled if the storage cluster
+# reports uploads to the conductor. Timeouts of such subtasks are then processed only by `sweep_timed_out_subtasks`.
+CHECK_RESULT_UPLOAD_STATUS_IN_REQUESTS = True
+
+# A global constant defining whether messages returned from `receive` and `receive-out-of-band` endpoints are built
+# and serialized when they're added to the queue rather than when they're delivered.
+BUILD_RESPONSES_WHEN_ENQUEUED = False
+
+# A global constant defining how serialized messages stored in the database are compressed. Each distinct message
+# is stored once and is left uncompressed if compression would not make it smaller. Either 'ZLIB' or 'NONE'.
+STORED_MESSAGE_COMPRESSION = 'ZLIB'
+
+# A global constant defining the maximum time (in seconds) a request to `receive` or `receive-out-of-band` can wait
+# for a message if the queue is empty and the client asked for it in the Concent-Long-Poll-Timeout header.
+# 0 disables long polling.
+LONG_POLL_MAX_TIMEOUT = 0
+
+# A global constant defining the maximum number of requests waiting for messages at the same time in a single process.
+# Each of them holds its own database connection. Requests over the limit get an empty response right away.
+LONG_POLL_MAX_WAITERS = 10
+
+# A global constant defining the maximum number of messages returned by `receive-batch` or `receive-out-of-band-batch`
+# in a single response. Clients can ask for fewer in the Concent-Batch-Size header.
+RECEIVE_BATCH_MAX_SIZE = 50
+
+# A global constant defining the maximum number of validated messages and signatures remembered by each process
+# so that the same message is not validated again. 0 disables the cache.
+VERIFIED_MESSAGES_CACHE_SIZE = 10000
+
+# A global constant defining the number of processes verifying signatures of messages in long lists,
+# e.g. TaskToCompute messages in ForcePayment. 0 means that signatures are always verified in the request handler.
+SIGNATURE_VERIFICATION_PROCESSES = 2
+
+# A global constant defining the minimum number of signatures that have to be verified at once
+# for the verification to be spread across SIGNATURE_VERIFICATION_PROCESSES.
+SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH = 100
+
+# A global constant defining currently used payment backend. It is the path of a subclass of
+# core.payments.base.PaymentBackend, e.g. 'core.payments.sci_backend.SCIPaymentBackend' which uses the Ethereum node,
+# 'core.payments.mock.MockPaymentBackend' or 'core.payments.simulated_chain.SimulatedChainPaymentBackend' which keeps
+# the blockchain in memory and is meant for load tests.
+PAYMENT_BACKEND = 'core.payments.mock.MockPaymentBackend'
+
+# A global constant defining how long (in seconds) every call to the Ethereum node takes in the simulated chain
+# payment backend.
+SIMULATED_CHAIN_LATENCY = 0
+
+# A global constant defining the deposit every client starts with in the simulated chain payment backend.
+SIMULATED_CHAIN_INITIAL_DEPOSIT_VALUE = 10 ** 18
+
+# A global constant defining the maximum time (in seconds) Concent waits for results of queries sent to
+# the payment backend at once, e.g. for lists of payments when handling ForcePayment.
+PAYMENT_BACKEND_QUERY_TIMEOUT = 10
+
+# A global constant defining whether ForcedPayment and BatchTransfer events are copied from the blockchain
+# to the database by the `index_payment_events` periodic task. When the index is up to date, the SCI payment backend
+# looks payments up in the database instead of querying the blockchain.
+PAYMENT_EVENT_INDEXER_ENABLED = False
+
+# A global constant defining the first block searched for payment events by the indexer,
+# e.g. the block in which the payment contracts were deployed.
+PAYMENT_EVENT_INDEXER_START_BLOCK = 0
+
+# A global constant defining the number of most recent blocks whose events can still disappear in a chain
+# reorganization. The indexer fetches events from these blocks again on every run.
+PAYMENT_EVENT_INDEXER_CONFIRMATIONS = 12
+
+# A global constant defining the maximum number of blocks searched for events in a single query to the blockchain.
+PAYMENT_EVENT_INDEXER_MAX_BLOCK_RANGE = 10000
+
+# A global constant defining how old (in seconds) the index can be before the SCI payment backend stops using it
+# and queries the blockchain again.
+PAYMENT_EVENT_INDEXER_MAX_AGE = 60
+
+# A global constant defining how often (in seconds) `celery beat` schedules the `index_payment_events` task.
+PAYMENT_EVENT_INDEXER_INTERVAL = 10
+
+# A global constant defining how many side effects, e.g. payments, the `relay_outbox` task carries out in a single run.
+OUTBOX_RELAY_BATCH_SIZE = 100
+
+# A global constant defining how often (in seconds) `celery beat` schedules the `relay_outbox` task.
+OUTBOX_RELAY_INTERVAL = 5
+
+# A global constant defining how long (in seconds) a subtask has to stay in a passive state, or a pending response
+# has to stay undelivered, before the `archive_finished_subtasks` task moves it to the archive. Archived subtasks
+# are no longer known to the protocol so it must be much longer than any protocol deadline.
+ARCHIVE_RETENTION_TIME = 60 * 60 * 24 * 30
+
+# A global constant defining how many subtasks and pending responses the `archive_finished_subtasks` task moves
+# in one transaction.
+ARCHIVE_BATCH_SIZE = 100
+
+# A global constant defining how often (in seconds) `celery beat` schedules the `archive_finished_subtasks` task.
+ARCHIVE_INTERVAL = 60 * 60
+
+# A global constant defining the maximum time (in seconds) between two attempts to carry out a failing side effect.
+# The time doubles after every attempt until it reaches this value.
+OUTBOX_RELAY_MAX_RETRY_DELAY = 600
+
+# A global constant defining how long (in seconds) the `relay_outbox` task looks for an attempted forced payment
+# on the blockchain. If the payment does not show up in that time, e.g. because the transaction was dropped,
+# the relay gives up and the payment has to be resolved manually.
+OUTBOX_FORCE_PAYMENT_CONFIRMATION_TIMEOUT = 60 * 60 * 24
+
+# A global constant defining how long (in seconds) Concent collects payments for subtasks between the same requestor
+# and provider before paying for all of them in a single transaction. 0 means that each run of `relay_outbox`
+# pays for all collected subtasks.
+FORCE_PAYMENT_AGGREGATION_WINDOW = 60
+
+# A global constant defining the number of connections to the Ethereum node used for reading from the blockchain
+# by each process. Transactions are always sent through a single additional connection.
+CONCENT_RPC_POOL_SIZE = 4
+
+# A global constant defining how long (in seconds) Concent waits for a response from the Ethereum node before
+# giving up on a call and responding with HTTP 503.
+CONCENT_RPC_CALL_TIMEOUT = 10
+
+# A global constant defining the number of consecutive calls to the Ethereum node that have to time out or fail
+# to connect before Concent stops sending calls and responds with HTTP 503 right away.
+CONCENT_RPC_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+
+# A global constant defining how long (in seconds) Concent waits before trying to call an unhealthy Ethereum node again.
+CONCENT_RPC_CIRCUIT_BREAKER_RESET_TIMEOUT = 30
+
+# A global constant defining how long (in seconds) the number of the most recent block read from the blockchain
+# is reused by the SCI payment backend. 0 disables caching.
+BLOCK_NUMBER_CACHE_TIME = 5
+
+# A global constant defining how long (in seconds) deposits read from the blockchain are reused by the SCI payment
+# backend to check whether a client can afford a service. Deposits are always read again before making a payment.
+# With a process-local cache backend a deposit emptied by a payment made in another process stays cached for this long,
+# so it must not exceed MAX_LOCAL_DEPOSIT_VALUE_CACHE_TIME. 0 disables caching.
+DEPOSIT_VALUE_CACHE_TIME = 5
+
+# A global constant defining the number of the most recent confirmed blocks whose timestamps are kept stored
+# by the `index_block_timestamps` periodic task. Must be greater than the number of blocks mined between its runs.
+BLOCK_TIMESTAMP_INDEX_DEPTH = 100
+
+# A global constant defining how often (in seconds) `celery beat` schedules the `index_block_timestamps` task
+# when the SCI payment backend is used.
+BLOCK_TIMESTAMP_INDEX_INTERVAL = 60
 
 # A global constant defining the path to self-signed SSL certificate to storage cluster
 STORAGE_CLUSTER_SSL_CERTIFICATE_PATH = ''
 
+# A global constant defining how long (in seconds) Concent waits for the storage cluster to accept a connection
+# or to send data before giving up on a request.
+STORAGE_CLUSTER_REQUEST_TIMEOUT = 10
+
+# A global constant defining the maximum number of concurrent requests a single process sends to the storage cluster
+# when checking upload status of results. Also the number of kept-alive connections to the storage cluster.
+STORAGE_CLUSTER_MAX_CONCURRENT_REQUESTS = 10
+
+# A global constant defining how long (in seconds) Concent remembers that a result has not been uploaded yet
+# and does not ask the storage cluster about it again. 0 disables caching.
+UPLOAD_STATUS_NEGATIVE_CACHE_TIME = 5
+
 # A global constant defining address to geth client
 # GETH_ADDRESS = 'http://localhost:8545'
 
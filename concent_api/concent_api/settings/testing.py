@@ -60,6 +60,14 @@ CONCENT_FEATURES = [
 
 STORAGE_CLUSTER_ADDRESS = 'http://localhost/'
 
+UPLOAD_STATUS_NEGATIVE_CACHE_TIME = 0
+
+BLOCK_NUMBER_CACHE_TIME = 0
+
+DEPOSIT_VALUE_CACHE_TIME = 0
+
+CONSTANCE_LOCAL_CACHE_TIME = 0
+
 CONCENT_MESSAGING_TIME    = 2
 
 STORAGE_SERVER_INTERNAL_ADDRESS = 'http://localhost/'
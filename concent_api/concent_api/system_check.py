@@ -1,4 +1,3 @@
-import importlib
 import os
 
 from django.core.checks     import Error
@@ -6,11 +5,29 @@ from django.core.checks     import Warning  # pylint: disable=redefined-builtin
 from django.core.checks     import register
 from django.conf            import settings
 from django.core.validators import URLValidator
+from django.utils.module_loading import import_string
+from django.core.exceptions import ImproperlyConfigured
 from django.core.exceptions import ValidationError
 
 from golem_messages import constants
 
 from concent_api.constants  import AVAILABLE_CONCENT_FEATURES
+from core.constants         import MAX_LOCAL_DEPOSIT_VALUE_CACHE_TIME
+from core.models            import MessagePayload
+from core.payments.base     import load_backend
+
+
+# Module paths that PAYMENT_BACKEND used to be set to and paths of the classes that replaced them.
+LEGACY_PAYMENT_BACKEND_MODULES = {
+    'core.payments.mock':               'core.payments.mock.MockPaymentBackend',
+    'core.payments.sci_backend':        'core.payments.sci_backend.SCIPaymentBackend',
+    'core.payments.simulated_chain':    'core.payments.simulated_chain.SimulatedChainPaymentBackend',
+}
+
+# Cache backends that do not share values between processes running on different machines or in different containers.
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
 
 
 def create_error_13_ssl_cert_path_is_none():
@@ -176,6 +193,258 @@ def create_error_33_custom_protocol_times_is_false_and_settings_does_not_match_g
     )
 
 
+def create_error_34_update_timed_out_subtasks_in_requests_has_wrong_value():
+    return Error(
+        'UPDATE_TIMED_OUT_SUBTASKS_IN_REQUESTS setting has wrong value',
+        hint='Set UPDATE_TIMED_OUT_SUBTASKS_IN_REQUESTS in your local_settings.py to the boolean value.',
+        id='concent.E034',
+    )
+
+
+def create_error_35_timed_out_subtasks_sweep_setting_has_wrong_value(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a positive integer.',
+        id='concent.E035',
+    )
+
+
+def create_error_36_build_responses_when_enqueued_has_wrong_value():
+    return Error(
+        'BUILD_RESPONSES_WHEN_ENQUEUED setting has wrong value',
+        hint='Set BUILD_RESPONSES_WHEN_ENQUEUED in your local_settings.py to the boolean value.',
+        id='concent.E036',
+    )
+
+
+def create_error_37_storage_cluster_request_setting_has_wrong_value(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a positive integer.',
+        id='concent.E037',
+    )
+
+
+def create_error_38_upload_status_negative_cache_time_has_wrong_value():
+    return Error(
+        'UPLOAD_STATUS_NEGATIVE_CACHE_TIME setting has wrong value',
+        hint='Set UPLOAD_STATUS_NEGATIVE_CACHE_TIME in your local_settings.py to a non-negative integer.',
+        id='concent.E038',
+    )
+
+
+def create_error_39_check_result_upload_status_in_requests_has_wrong_value():
+    return Error(
+        'CHECK_RESULT_UPLOAD_STATUS_IN_REQUESTS setting has wrong value',
+        hint='Set CHECK_RESULT_UPLOAD_STATUS_IN_REQUESTS in your local_settings.py to the boolean value.',
+        id='concent.E039',
+    )
+
+
+def create_error_40_long_poll_max_timeout_has_wrong_value():
+    return Error(
+        'LONG_POLL_MAX_TIMEOUT setting has wrong value',
+        hint='Set LONG_POLL_MAX_TIMEOUT in your local_settings.py to a non-negative integer.',
+        id='concent.E040',
+    )
+
+
+def create_error_41_long_poll_max_waiters_has_wrong_value():
+    return Error(
+        'LONG_POLL_MAX_WAITERS setting has wrong value',
+        hint='Set LONG_POLL_MAX_WAITERS in your local_settings.py to a positive integer.',
+        id='concent.E041',
+    )
+
+
+def create_error_42_receive_batch_max_size_has_wrong_value():
+    return Error(
+        'RECEIVE_BATCH_MAX_SIZE setting has wrong value',
+        hint='Set RECEIVE_BATCH_MAX_SIZE in your local_settings.py to a positive integer.',
+        id='concent.E042',
+    )
+
+
+def create_error_43_verified_messages_cache_size_has_wrong_value():
+    return Error(
+        'VERIFIED_MESSAGES_CACHE_SIZE setting has wrong value',
+        hint='Set VERIFIED_MESSAGES_CACHE_SIZE in your local_settings.py to a non-negative integer.',
+        id='concent.E043',
+    )
+
+
+def create_error_44_signature_verification_processes_has_wrong_value():
+    return Error(
+        'SIGNATURE_VERIFICATION_PROCESSES setting has wrong value',
+        hint='Set SIGNATURE_VERIFICATION_PROCESSES in your local_settings.py to a non-negative integer.',
+        id='concent.E044',
+    )
+
+
+def create_error_45_signature_verification_process_pool_min_batch_has_wrong_value():
+    return Error(
+        'SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH setting has wrong value',
+        hint='Set SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH in your local_settings.py to a positive integer.',
+        id='concent.E045',
+    )
+
+
+def create_error_46_payment_backend_query_timeout_has_wrong_value():
+    return Error(
+        'PAYMENT_BACKEND_QUERY_TIMEOUT setting has wrong value',
+        hint='Set PAYMENT_BACKEND_QUERY_TIMEOUT in your local_settings.py to a positive number.',
+        id='concent.E046',
+    )
+
+
+def create_error_47_payment_event_indexer_enabled_has_wrong_value():
+    return Error(
+        'PAYMENT_EVENT_INDEXER_ENABLED setting has wrong value',
+        hint='Set PAYMENT_EVENT_INDEXER_ENABLED in your local_settings.py to the boolean value.',
+        id='concent.E047',
+    )
+
+
+def create_error_48_payment_event_indexer_setting_is_not_positive(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a positive integer.',
+        id='concent.E048',
+    )
+
+
+def create_error_49_payment_event_indexer_setting_is_negative(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a non-negative integer.',
+        id='concent.E049',
+    )
+
+
+def create_error_50_block_number_cache_time_has_wrong_value():
+    return Error(
+        'BLOCK_NUMBER_CACHE_TIME setting has wrong value',
+        hint='Set BLOCK_NUMBER_CACHE_TIME in your local_settings.py to a non-negative integer.',
+        id='concent.E050',
+    )
+
+
+def create_error_51_block_timestamp_index_setting_has_wrong_value(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a positive integer.',
+        id='concent.E051',
+    )
+
+
+def create_error_52_concent_rpc_setting_is_not_positive_integer(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a positive integer.',
+        id='concent.E052',
+    )
+
+
+def create_error_53_concent_rpc_setting_is_not_positive_number(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a positive number.',
+        id='concent.E053',
+    )
+
+
+def create_error_54_outbox_relay_setting_has_wrong_value(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a positive integer.',
+        id='concent.E054',
+    )
+
+
+def create_error_55_force_payment_aggregation_window_has_wrong_value():
+    return Error(
+        'FORCE_PAYMENT_AGGREGATION_WINDOW setting has wrong value',
+        hint='Set FORCE_PAYMENT_AGGREGATION_WINDOW in your local_settings.py to a non-negative integer.',
+        id='concent.E055',
+    )
+
+
+def create_error_56_payment_backend_cannot_be_loaded(error):
+    return Error(
+        'PAYMENT_BACKEND cannot be loaded',
+        hint=f'{error} Set PAYMENT_BACKEND to the path of a class implementing core.payments.base.PaymentBackend.',
+        id='concent.E056',
+    )
+
+
+def create_error_64_payment_backend_is_module_path(backend_class_path):
+    return Error(
+        'PAYMENT_BACKEND is set to a module path, which is no longer supported',
+        hint=f"Set PAYMENT_BACKEND in your local_settings.py to '{backend_class_path}'. See the README for details.",
+        id='concent.E064',
+    )
+
+
+def create_error_57_simulated_chain_setting_has_wrong_value(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a non-negative number. The deposit must be an integer.',
+        id='concent.E057',
+    )
+
+
+def create_error_58_deposit_value_cache_time_has_wrong_value():
+    return Error(
+        'DEPOSIT_VALUE_CACHE_TIME setting has wrong value',
+        hint='Set DEPOSIT_VALUE_CACHE_TIME in your local_settings.py to a non-negative integer.',
+        id='concent.E058',
+    )
+
+
+def create_error_59_constance_local_cache_time_has_wrong_value():
+    return Error(
+        'CONSTANCE_LOCAL_CACHE_TIME setting has wrong value',
+        hint='Set CONSTANCE_LOCAL_CACHE_TIME in your local_settings.py to a non-negative number.',
+        id='concent.E059',
+    )
+
+
+def create_error_60_stored_message_compression_has_wrong_value():
+    return Error(
+        'STORED_MESSAGE_COMPRESSION setting has wrong value',
+        hint=f'Set STORED_MESSAGE_COMPRESSION in your local_settings.py to one of: {", ".join(MessagePayload.Compression.__members__)}.',
+        id='concent.E060',
+    )
+
+
+def create_error_61_archive_setting_has_wrong_value(setting_name):
+    return Error(
+        f'{setting_name} setting has wrong value',
+        hint=f'Set {setting_name} in your local_settings.py to a positive integer.',
+        id='concent.E061',
+    )
+
+
+def create_error_62_archive_retention_time_is_too_short(protocol_setting_name):
+    return Error(
+        f'ARCHIVE_RETENTION_TIME setting is not longer than {protocol_setting_name}',
+        hint='Subtasks would be archived while clients can still send messages about them. '
+             f'Set ARCHIVE_RETENTION_TIME in your local_settings.py to a value much longer than {protocol_setting_name}.',
+        id='concent.E062',
+    )
+
+
+def create_error_63_deposit_value_cache_time_is_too_long_for_local_cache():
+    return Error(
+        f'DEPOSIT_VALUE_CACHE_TIME must not exceed {MAX_LOCAL_DEPOSIT_VALUE_CACHE_TIME} seconds when the cache is local to each process',
+        hint=(
+            'Deposits invalidated by one process stay cached in the others until they expire. Lower DEPOSIT_VALUE_CACHE_TIME '
+            'or configure a cache backend shared by all processes in CACHES in your local_settings.py.'
+        ),
+        id='concent.E063',
+    )
+
+
 def create_error_19_max_rendering_time_is_not_defined():
     return Error(
         'BLENDER_MAX_RENDERING_TIME setting is not defined',
@@ -303,19 +572,27 @@ def check_payment_backend(app_configs, **kwargs):  # pylint: disable=unused-argu
     ):
         return [Error(
             'PAYMENT_BACKEND setting is not defined',
-            hint = 'Set PAYMENT_BACKEND in your local_settings.py to the python module realizing payment API.',
+            hint = 'Set PAYMENT_BACKEND in your local_settings.py to the python class realizing payment API.',
             id   = 'concent.E019',
         )]
 
+    if settings.PAYMENT_BACKEND in LEGACY_PAYMENT_BACKEND_MODULES:
+        return [create_error_64_payment_backend_is_module_path(LEGACY_PAYMENT_BACKEND_MODULES[settings.PAYMENT_BACKEND])]
+
     try:
-        importlib.import_module(settings.PAYMENT_BACKEND)
+        import_string(settings.PAYMENT_BACKEND)
     except ImportError as error:
         return [Error(
-            'PAYMENT_BACKEND settings is not a valid python module',
+            'PAYMENT_BACKEND settings is not a valid python class',
             hint = '{}'.format(error),
             id   = 'concent.E020',
         )]
 
+    try:
+        load_backend(settings.PAYMENT_BACKEND)
+    except ImproperlyConfigured as error:
+        return [create_error_56_payment_backend_cannot_be_loaded(error)]
+
     return []
 
 
@@ -337,7 +614,7 @@ def storage_cluster_certificate_path_check(app_configs = None, **kwargs):  # pyl
 def geth_container_address_check(app_configs, **kwargs):  # pylint: disable=unused-argument
     if (
         hasattr(settings, 'PAYMENT_BACKEND') and
-        settings.PAYMENT_BACKEND == 'core.payments.sci_backend'
+        settings.PAYMENT_BACKEND == 'core.payments.sci_backend.SCIPaymentBackend'
     ):
         if hasattr(settings, 'GETH_ADDRESS'):
             url_validator = URLValidator(schemes = ['http', 'https'])
@@ -430,3 +707,243 @@ def check_custom_protocol_times(app_configs=None, **kwargs):  # pylint: disable=
                     )
                 )
     return errors
+
+
+@register()
+def check_timed_out_subtasks_sweep_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    if not isinstance(settings.UPDATE_TIMED_OUT_SUBTASKS_IN_REQUESTS, bool):
+        errors.append(create_error_34_update_timed_out_subtasks_in_requests_has_wrong_value())
+    for setting_name in [
+        'TIMED_OUT_SUBTASKS_SWEEP_BATCH_SIZE',
+        'TIMED_OUT_SUBTASKS_SWEEP_INTERVAL',
+    ]:
+        value = getattr(settings, setting_name)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            errors.append(create_error_35_timed_out_subtasks_sweep_setting_has_wrong_value(setting_name))
+    return errors
+
+
+@register()
+def check_build_responses_when_enqueued(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    if not isinstance(settings.BUILD_RESPONSES_WHEN_ENQUEUED, bool):
+        return [create_error_36_build_responses_when_enqueued_has_wrong_value()]
+    return []
+
+
+@register()
+def check_storage_cluster_request_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    for setting_name in [
+        'STORAGE_CLUSTER_REQUEST_TIMEOUT',
+        'STORAGE_CLUSTER_MAX_CONCURRENT_REQUESTS',
+    ]:
+        value = getattr(settings, setting_name)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            errors.append(create_error_37_storage_cluster_request_setting_has_wrong_value(setting_name))
+    value = settings.UPLOAD_STATUS_NEGATIVE_CACHE_TIME
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        errors.append(create_error_38_upload_status_negative_cache_time_has_wrong_value())
+    return errors
+
+
+@register()
+def check_result_upload_status_in_requests_setting(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    if not isinstance(settings.CHECK_RESULT_UPLOAD_STATUS_IN_REQUESTS, bool):
+        return [create_error_39_check_result_upload_status_in_requests_has_wrong_value()]
+    return []
+
+
+@register()
+def check_long_poll_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    value = settings.LONG_POLL_MAX_TIMEOUT
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        errors.append(create_error_40_long_poll_max_timeout_has_wrong_value())
+    value = settings.LONG_POLL_MAX_WAITERS
+    if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+        errors.append(create_error_41_long_poll_max_waiters_has_wrong_value())
+    return errors
+
+
+@register()
+def check_receive_batch_max_size_setting(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    value = settings.RECEIVE_BATCH_MAX_SIZE
+    if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+        return [create_error_42_receive_batch_max_size_has_wrong_value()]
+    return []
+
+
+@register()
+def check_verified_messages_cache_size_setting(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    value = settings.VERIFIED_MESSAGES_CACHE_SIZE
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        return [create_error_43_verified_messages_cache_size_has_wrong_value()]
+    return []
+
+
+@register()
+def check_signature_verification_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    value = settings.SIGNATURE_VERIFICATION_PROCESSES
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        errors.append(create_error_44_signature_verification_processes_has_wrong_value())
+    value = settings.SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH
+    if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+        errors.append(create_error_45_signature_verification_process_pool_min_batch_has_wrong_value())
+    return errors
+
+
+@register()
+def check_payment_backend_query_timeout_setting(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    value = settings.PAYMENT_BACKEND_QUERY_TIMEOUT
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+        return [create_error_46_payment_backend_query_timeout_has_wrong_value()]
+    return []
+
+
+@register()
+def check_payment_event_indexer_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    if not isinstance(settings.PAYMENT_EVENT_INDEXER_ENABLED, bool):
+        errors.append(create_error_47_payment_event_indexer_enabled_has_wrong_value())
+    for setting_name in [
+        'PAYMENT_EVENT_INDEXER_MAX_BLOCK_RANGE',
+        'PAYMENT_EVENT_INDEXER_MAX_AGE',
+        'PAYMENT_EVENT_INDEXER_INTERVAL',
+    ]:
+        value = getattr(settings, setting_name)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            errors.append(create_error_48_payment_event_indexer_setting_is_not_positive(setting_name))
+    for setting_name in [
+        'PAYMENT_EVENT_INDEXER_START_BLOCK',
+        'PAYMENT_EVENT_INDEXER_CONFIRMATIONS',
+    ]:
+        value = getattr(settings, setting_name)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            errors.append(create_error_49_payment_event_indexer_setting_is_negative(setting_name))
+    return errors
+
+
+@register()
+def check_block_lookup_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    value = settings.BLOCK_NUMBER_CACHE_TIME
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        errors.append(create_error_50_block_number_cache_time_has_wrong_value())
+    for setting_name in [
+        'BLOCK_TIMESTAMP_INDEX_DEPTH',
+        'BLOCK_TIMESTAMP_INDEX_INTERVAL',
+    ]:
+        value = getattr(settings, setting_name)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            errors.append(create_error_51_block_timestamp_index_setting_has_wrong_value(setting_name))
+    return errors
+
+
+@register()
+def check_concent_rpc_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    for setting_name in [
+        'CONCENT_RPC_POOL_SIZE',
+        'CONCENT_RPC_CIRCUIT_BREAKER_FAILURE_THRESHOLD',
+    ]:
+        value = getattr(settings, setting_name)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            errors.append(create_error_52_concent_rpc_setting_is_not_positive_integer(setting_name))
+    for setting_name in [
+        'CONCENT_RPC_CALL_TIMEOUT',
+        'CONCENT_RPC_CIRCUIT_BREAKER_RESET_TIMEOUT',
+    ]:
+        value = getattr(settings, setting_name)
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+            errors.append(create_error_53_concent_rpc_setting_is_not_positive_number(setting_name))
+    return errors
+
+
+@register()
+def check_outbox_relay_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    for setting_name in [
+        'OUTBOX_RELAY_BATCH_SIZE',
+        'OUTBOX_RELAY_INTERVAL',
+        'OUTBOX_RELAY_MAX_RETRY_DELAY',
+        'OUTBOX_FORCE_PAYMENT_CONFIRMATION_TIMEOUT',
+    ]:
+        value = getattr(settings, setting_name)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            errors.append(create_error_54_outbox_relay_setting_has_wrong_value(setting_name))
+    return errors
+
+
+@register()
+def check_force_payment_aggregation_window(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    value = settings.FORCE_PAYMENT_AGGREGATION_WINDOW
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        return [create_error_55_force_payment_aggregation_window_has_wrong_value()]
+    return []
+
+
+@register()
+def check_simulated_chain_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    if settings.PAYMENT_BACKEND == 'core.payments.simulated_chain.SimulatedChainPaymentBackend':
+        for (setting_name, allowed_types) in [
+            ('SIMULATED_CHAIN_LATENCY',                 (int, float)),
+            ('SIMULATED_CHAIN_INITIAL_DEPOSIT_VALUE',   int),
+        ]:
+            value = getattr(settings, setting_name)
+            if not isinstance(value, allowed_types) or isinstance(value, bool) or value < 0:
+                errors.append(create_error_57_simulated_chain_setting_has_wrong_value(setting_name))
+    return errors
+
+
+@register()
+def check_deposit_value_cache_time(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    value = settings.DEPOSIT_VALUE_CACHE_TIME
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        return [create_error_58_deposit_value_cache_time_has_wrong_value()]
+    if settings.CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHE_BACKENDS and value > MAX_LOCAL_DEPOSIT_VALUE_CACHE_TIME:
+        return [create_error_63_deposit_value_cache_time_is_too_long_for_local_cache()]
+    return []
+
+
+@register()
+def check_constance_local_cache_time(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    value = settings.CONSTANCE_LOCAL_CACHE_TIME
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+        return [create_error_59_constance_local_cache_time_has_wrong_value()]
+    return []
+
+
+@register()
+def check_stored_message_compression(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    value = settings.STORED_MESSAGE_COMPRESSION
+    if not isinstance(value, str) or value not in MessagePayload.Compression.__members__:
+        return [create_error_60_stored_message_compression_has_wrong_value()]
+    return []
+
+
+@register()
+def check_archive_settings(app_configs=None, **kwargs):  # pylint: disable=unused-argument
+    errors = []
+    for setting_name in [
+        'ARCHIVE_RETENTION_TIME',
+        'ARCHIVE_BATCH_SIZE',
+        'ARCHIVE_INTERVAL',
+    ]:
+        value = getattr(settings, setting_name)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            errors.append(create_error_61_archive_setting_has_wrong_value(setting_name))
+    if len(errors) > 0:
+        return errors
+
+    for protocol_setting_name in [
+        'CONCENT_MESSAGING_TIME',
+        'FORCE_ACCEPTANCE_TIME',
+        'PAYMENT_DUE_TIME',
+        'ADDITIONAL_VERIFICATION_CALL_TIME',
+    ]:
+        if settings.ARCHIVE_RETENTION_TIME <= getattr(settings, protocol_setting_name):
+            errors.append(create_error_62_archive_retention_time_is_too_short(protocol_setting_name))
+    return errors
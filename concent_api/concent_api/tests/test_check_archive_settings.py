@@ -0,0 +1,47 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_archive_settings
+from concent_api.system_check import create_error_61_archive_setting_has_wrong_value
+from concent_api.system_check import create_error_62_archive_retention_time_is_too_short
+
+
+@override_settings(
+    CONCENT_MESSAGING_TIME=10,
+    FORCE_ACCEPTANCE_TIME=10,
+    PAYMENT_DUE_TIME=10,
+    ADDITIONAL_VERIFICATION_CALL_TIME=10,
+)
+class TestArchiveSettingsCheck(TestCase):
+
+    def test_that_positive_archive_settings_should_not_produce_any_errors(self):
+        for value in [11, 1000]:
+            with override_settings(
+                ARCHIVE_RETENTION_TIME=value,
+                ARCHIVE_BATCH_SIZE=value,
+                ARCHIVE_INTERVAL=value,
+            ):
+                errors = check_archive_settings()
+
+            self.assertEqual(errors, [])
+
+    def test_non_positive_or_non_integer_archive_setting_should_produce_error(self):
+        for setting_name in [
+            'ARCHIVE_RETENTION_TIME',
+            'ARCHIVE_BATCH_SIZE',
+            'ARCHIVE_INTERVAL',
+        ]:
+            for value in [0, -1, 0.5, '10', True, None]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_archive_settings()
+
+                self.assertEqual(errors, [create_error_61_archive_setting_has_wrong_value(setting_name)])
+
+    def test_archive_retention_time_not_longer_than_protocol_time_should_produce_error(self):
+        with override_settings(
+            ARCHIVE_RETENTION_TIME=20,
+            PAYMENT_DUE_TIME=20,
+        ):
+            errors = check_archive_settings()
+
+        self.assertEqual(errors, [create_error_62_archive_retention_time_is_too_short('PAYMENT_DUE_TIME')])
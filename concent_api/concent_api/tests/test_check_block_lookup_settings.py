@@ -0,0 +1,38 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_block_lookup_settings
+from concent_api.system_check import create_error_50_block_number_cache_time_has_wrong_value
+from concent_api.system_check import create_error_51_block_timestamp_index_setting_has_wrong_value
+
+
+class TestBlockLookupSettingsCheck(TestCase):
+
+    def test_that_correct_block_lookup_settings_should_not_produce_any_errors(self):
+        for cache_time in [0, 1, 10]:
+            with override_settings(
+                BLOCK_NUMBER_CACHE_TIME=cache_time,
+                BLOCK_TIMESTAMP_INDEX_DEPTH=1,
+                BLOCK_TIMESTAMP_INDEX_INTERVAL=1,
+            ):
+                errors = check_block_lookup_settings()
+
+            self.assertEqual(errors, [])
+
+    def test_negative_or_non_integer_block_number_cache_time_should_produce_error(self):
+        for value in [-1, 0.5, '10', True, None]:
+            with override_settings(BLOCK_NUMBER_CACHE_TIME=value):
+                errors = check_block_lookup_settings()
+
+            self.assertEqual(errors, [create_error_50_block_number_cache_time_has_wrong_value()])
+
+    def test_non_positive_block_timestamp_index_setting_should_produce_error(self):
+        for setting_name in [
+            'BLOCK_TIMESTAMP_INDEX_DEPTH',
+            'BLOCK_TIMESTAMP_INDEX_INTERVAL',
+        ]:
+            for value in [0, -1, '10', True, None]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_block_lookup_settings()
+
+                self.assertEqual(errors, [create_error_51_block_timestamp_index_setting_has_wrong_value(setting_name)])
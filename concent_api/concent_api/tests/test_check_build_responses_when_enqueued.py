@@ -0,0 +1,24 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_build_responses_when_enqueued
+from concent_api.system_check import create_error_36_build_responses_when_enqueued_has_wrong_value
+
+
+class TestBuildResponsesWhenEnqueuedCheck(TestCase):
+
+    @override_settings(
+        BUILD_RESPONSES_WHEN_ENQUEUED=True,
+    )
+    def test_that_bool_build_responses_when_enqueued_setting_should_not_produce_any_errors(self):
+        errors = check_build_responses_when_enqueued()
+
+        self.assertEqual(errors, [])
+
+    @override_settings(
+        BUILD_RESPONSES_WHEN_ENQUEUED=1,
+    )
+    def test_non_bool_build_responses_when_enqueued_setting_should_produce_error(self):
+        errors = check_build_responses_when_enqueued()
+
+        self.assertEqual(errors, [create_error_36_build_responses_when_enqueued_has_wrong_value()])
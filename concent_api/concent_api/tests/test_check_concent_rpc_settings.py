@@ -0,0 +1,43 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_concent_rpc_settings
+from concent_api.system_check import create_error_52_concent_rpc_setting_is_not_positive_integer
+from concent_api.system_check import create_error_53_concent_rpc_setting_is_not_positive_number
+
+
+class TestConcentRPCSettingsCheck(TestCase):
+
+    def test_that_positive_concent_rpc_settings_should_not_produce_any_errors(self):
+        for timeout in [1, 0.5, 10]:
+            with override_settings(
+                CONCENT_RPC_POOL_SIZE=1,
+                CONCENT_RPC_CALL_TIMEOUT=timeout,
+                CONCENT_RPC_CIRCUIT_BREAKER_FAILURE_THRESHOLD=1,
+                CONCENT_RPC_CIRCUIT_BREAKER_RESET_TIMEOUT=timeout,
+            ):
+                errors = check_concent_rpc_settings()
+
+            self.assertEqual(errors, [])
+
+    def test_non_positive_or_non_integer_concent_rpc_setting_should_produce_error(self):
+        for setting_name in [
+            'CONCENT_RPC_POOL_SIZE',
+            'CONCENT_RPC_CIRCUIT_BREAKER_FAILURE_THRESHOLD',
+        ]:
+            for value in [0, -1, 0.5, '10', True, None]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_concent_rpc_settings()
+
+                self.assertEqual(errors, [create_error_52_concent_rpc_setting_is_not_positive_integer(setting_name)])
+
+    def test_non_positive_or_non_number_concent_rpc_setting_should_produce_error(self):
+        for setting_name in [
+            'CONCENT_RPC_CALL_TIMEOUT',
+            'CONCENT_RPC_CIRCUIT_BREAKER_RESET_TIMEOUT',
+        ]:
+            for value in [0, -1, '10', True, None]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_concent_rpc_settings()
+
+                self.assertEqual(errors, [create_error_53_concent_rpc_setting_is_not_positive_number(setting_name)])
@@ -0,0 +1,22 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_constance_local_cache_time
+from concent_api.system_check import create_error_59_constance_local_cache_time_has_wrong_value
+
+
+class TestConstanceLocalCacheTimeCheck(TestCase):
+
+    def test_that_non_negative_constance_local_cache_time_should_not_produce_any_errors(self):
+        for value in [0, 0.5, 5]:
+            with override_settings(CONSTANCE_LOCAL_CACHE_TIME=value):
+                errors = check_constance_local_cache_time()
+
+            self.assertEqual(errors, [])
+
+    def test_negative_or_non_numeric_constance_local_cache_time_should_produce_error(self):
+        for value in [-1, '5', True, None]:
+            with override_settings(CONSTANCE_LOCAL_CACHE_TIME=value):
+                errors = check_constance_local_cache_time()
+
+            self.assertEqual(errors, [create_error_59_constance_local_cache_time_has_wrong_value()])
@@ -0,0 +1,42 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_deposit_value_cache_time
+from concent_api.system_check import create_error_58_deposit_value_cache_time_has_wrong_value
+from concent_api.system_check import create_error_63_deposit_value_cache_time_is_too_long_for_local_cache
+from core.constants import MAX_LOCAL_DEPOSIT_VALUE_CACHE_TIME
+
+
+class TestDepositValueCacheTimeCheck(TestCase):
+
+    def test_that_non_negative_integer_deposit_value_cache_time_should_not_produce_any_errors(self):
+        for value in [0, 1, 5]:
+            with override_settings(DEPOSIT_VALUE_CACHE_TIME=value):
+                errors = check_deposit_value_cache_time()
+
+            self.assertEqual(errors, [])
+
+    def test_negative_or_non_integer_deposit_value_cache_time_should_produce_error(self):
+        for value in [-1, 0.5, '5', True, None]:
+            with override_settings(DEPOSIT_VALUE_CACHE_TIME=value):
+                errors = check_deposit_value_cache_time()
+
+            self.assertEqual(errors, [create_error_58_deposit_value_cache_time_has_wrong_value()])
+
+    def test_deposit_value_cache_time_longer_than_allowed_for_local_cache_should_produce_error(self):
+        with override_settings(
+            DEPOSIT_VALUE_CACHE_TIME=MAX_LOCAL_DEPOSIT_VALUE_CACHE_TIME + 1,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        ):
+            errors = check_deposit_value_cache_time()
+
+        self.assertEqual(errors, [create_error_63_deposit_value_cache_time_is_too_long_for_local_cache()])
+
+    def test_long_deposit_value_cache_time_with_shared_cache_should_not_produce_any_errors(self):
+        with override_settings(
+            DEPOSIT_VALUE_CACHE_TIME=MAX_LOCAL_DEPOSIT_VALUE_CACHE_TIME + 1,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache'}},
+        ):
+            errors = check_deposit_value_cache_time()
+
+        self.assertEqual(errors, [])
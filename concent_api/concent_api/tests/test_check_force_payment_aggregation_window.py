@@ -0,0 +1,22 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_force_payment_aggregation_window
+from concent_api.system_check import create_error_55_force_payment_aggregation_window_has_wrong_value
+
+
+class TestForcePaymentAggregationWindowCheck(TestCase):
+
+    def test_that_non_negative_integer_force_payment_aggregation_window_should_not_produce_any_errors(self):
+        for value in [0, 1, 60]:
+            with override_settings(FORCE_PAYMENT_AGGREGATION_WINDOW=value):
+                errors = check_force_payment_aggregation_window()
+
+            self.assertEqual(errors, [])
+
+    def test_negative_or_non_integer_force_payment_aggregation_window_should_produce_error(self):
+        for value in [-1, 0.5, '60', True, None]:
+            with override_settings(FORCE_PAYMENT_AGGREGATION_WINDOW=value):
+                errors = check_force_payment_aggregation_window()
+
+            self.assertEqual(errors, [create_error_55_force_payment_aggregation_window_has_wrong_value()])
@@ -0,0 +1,32 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_long_poll_settings
+from concent_api.system_check import create_error_40_long_poll_max_timeout_has_wrong_value
+from concent_api.system_check import create_error_41_long_poll_max_waiters_has_wrong_value
+
+
+class TestLongPollSettingsCheck(TestCase):
+
+    @override_settings(
+        LONG_POLL_MAX_TIMEOUT=0,
+        LONG_POLL_MAX_WAITERS=1,
+    )
+    def test_that_proper_configuration_of_long_poll_settings_should_not_produce_any_errors(self):
+        errors = check_long_poll_settings()
+
+        self.assertEqual(errors, [])
+
+    def test_negative_or_non_int_long_poll_max_timeout_should_produce_error(self):
+        for value in [-1, '10', 1.5, True]:
+            with override_settings(LONG_POLL_MAX_TIMEOUT=value):
+                errors = check_long_poll_settings()
+
+            self.assertEqual(errors, [create_error_40_long_poll_max_timeout_has_wrong_value()])
+
+    def test_non_positive_or_non_int_long_poll_max_waiters_should_produce_error(self):
+        for value in [0, -1, '10', 1.5, True]:
+            with override_settings(LONG_POLL_MAX_WAITERS=value):
+                errors = check_long_poll_settings()
+
+            self.assertEqual(errors, [create_error_41_long_poll_max_waiters_has_wrong_value()])
@@ -0,0 +1,33 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_outbox_relay_settings
+from concent_api.system_check import create_error_54_outbox_relay_setting_has_wrong_value
+
+
+class TestOutboxRelaySettingsCheck(TestCase):
+
+    def test_that_positive_outbox_relay_settings_should_not_produce_any_errors(self):
+        for value in [1, 10]:
+            with override_settings(
+                OUTBOX_RELAY_BATCH_SIZE=value,
+                OUTBOX_RELAY_INTERVAL=value,
+                OUTBOX_RELAY_MAX_RETRY_DELAY=value,
+                OUTBOX_FORCE_PAYMENT_CONFIRMATION_TIMEOUT=value,
+            ):
+                errors = check_outbox_relay_settings()
+
+            self.assertEqual(errors, [])
+
+    def test_non_positive_or_non_integer_outbox_relay_setting_should_produce_error(self):
+        for setting_name in [
+            'OUTBOX_RELAY_BATCH_SIZE',
+            'OUTBOX_RELAY_INTERVAL',
+            'OUTBOX_RELAY_MAX_RETRY_DELAY',
+            'OUTBOX_FORCE_PAYMENT_CONFIRMATION_TIMEOUT',
+        ]:
+            for value in [0, -1, 0.5, '10', True, None]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_outbox_relay_settings()
+
+                self.assertEqual(errors, [create_error_54_outbox_relay_setting_has_wrong_value(setting_name)])
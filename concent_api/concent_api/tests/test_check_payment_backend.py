@@ -0,0 +1,49 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_payment_backend
+from concent_api.system_check import create_error_56_payment_backend_cannot_be_loaded
+from concent_api.system_check import create_error_64_payment_backend_is_module_path
+
+
+class TestPaymentBackendCheck(TestCase):
+
+    def test_that_payment_backend_classes_should_not_produce_any_errors(self):
+        for payment_backend in [
+            'core.payments.mock.MockPaymentBackend',
+            'core.payments.simulated_chain.SimulatedChainPaymentBackend',
+            'core.payments.sci_backend.SCIPaymentBackend',
+        ]:
+            with override_settings(PAYMENT_BACKEND=payment_backend):
+                errors = check_payment_backend(None)
+
+            self.assertEqual(errors, [])
+
+    @override_settings(PAYMENT_BACKEND='core.payments.blocks.get_block_number')
+    def test_that_backend_not_being_payment_backend_subclass_should_produce_error(self):
+        errors = check_payment_backend(None)
+
+        self.assertEqual(errors, [
+            create_error_56_payment_backend_cannot_be_loaded(ImproperlyConfigured(
+                'Payment backend core.payments.blocks.get_block_number is not a subclass of PaymentBackend'
+            ))
+        ])
+
+    @override_settings(PAYMENT_BACKEND='core.payments.mock.NonExistentPaymentBackend')
+    def test_that_backend_that_cannot_be_imported_should_produce_error(self):
+        errors = check_payment_backend(None)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].id, 'concent.E020')
+
+    def test_that_legacy_payment_backend_module_paths_should_produce_error_naming_new_class_path(self):
+        for (module_path, class_path) in [
+            ('core.payments.mock',            'core.payments.mock.MockPaymentBackend'),
+            ('core.payments.simulated_chain', 'core.payments.simulated_chain.SimulatedChainPaymentBackend'),
+            ('core.payments.sci_backend',     'core.payments.sci_backend.SCIPaymentBackend'),
+        ]:
+            with override_settings(PAYMENT_BACKEND=module_path):
+                errors = check_payment_backend(None)
+
+            self.assertEqual(errors, [create_error_64_payment_backend_is_module_path(class_path)])
@@ -0,0 +1,22 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_payment_backend_query_timeout_setting
+from concent_api.system_check import create_error_46_payment_backend_query_timeout_has_wrong_value
+
+
+class TestPaymentBackendQueryTimeoutSettingCheck(TestCase):
+
+    def test_that_positive_payment_backend_query_timeout_should_not_produce_any_errors(self):
+        for value in [1, 0.5, 10]:
+            with override_settings(PAYMENT_BACKEND_QUERY_TIMEOUT=value):
+                errors = check_payment_backend_query_timeout_setting()
+
+            self.assertEqual(errors, [])
+
+    def test_non_positive_or_non_number_payment_backend_query_timeout_should_produce_error(self):
+        for value in [0, -1, '10', True, None]:
+            with override_settings(PAYMENT_BACKEND_QUERY_TIMEOUT=value):
+                errors = check_payment_backend_query_timeout_setting()
+
+            self.assertEqual(errors, [create_error_46_payment_backend_query_timeout_has_wrong_value()])
@@ -0,0 +1,54 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_payment_event_indexer_settings
+from concent_api.system_check import create_error_47_payment_event_indexer_enabled_has_wrong_value
+from concent_api.system_check import create_error_48_payment_event_indexer_setting_is_not_positive
+from concent_api.system_check import create_error_49_payment_event_indexer_setting_is_negative
+
+
+class TestPaymentEventIndexerSettingsCheck(TestCase):
+
+    def test_that_correct_payment_event_indexer_settings_should_not_produce_any_errors(self):
+        for enabled in [True, False]:
+            with override_settings(
+                PAYMENT_EVENT_INDEXER_ENABLED=enabled,
+                PAYMENT_EVENT_INDEXER_START_BLOCK=0,
+                PAYMENT_EVENT_INDEXER_CONFIRMATIONS=0,
+                PAYMENT_EVENT_INDEXER_MAX_BLOCK_RANGE=1,
+                PAYMENT_EVENT_INDEXER_MAX_AGE=1,
+                PAYMENT_EVENT_INDEXER_INTERVAL=1,
+            ):
+                errors = check_payment_event_indexer_settings()
+
+            self.assertEqual(errors, [])
+
+    def test_non_boolean_payment_event_indexer_enabled_should_produce_error(self):
+        for value in [1, 'True', None]:
+            with override_settings(PAYMENT_EVENT_INDEXER_ENABLED=value):
+                errors = check_payment_event_indexer_settings()
+
+            self.assertEqual(errors, [create_error_47_payment_event_indexer_enabled_has_wrong_value()])
+
+    def test_non_positive_payment_event_indexer_setting_should_produce_error(self):
+        for setting_name in [
+            'PAYMENT_EVENT_INDEXER_MAX_BLOCK_RANGE',
+            'PAYMENT_EVENT_INDEXER_MAX_AGE',
+            'PAYMENT_EVENT_INDEXER_INTERVAL',
+        ]:
+            for value in [0, -1, '10', True, None]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_payment_event_indexer_settings()
+
+                self.assertEqual(errors, [create_error_48_payment_event_indexer_setting_is_not_positive(setting_name)])
+
+    def test_negative_payment_event_indexer_setting_should_produce_error(self):
+        for setting_name in [
+            'PAYMENT_EVENT_INDEXER_START_BLOCK',
+            'PAYMENT_EVENT_INDEXER_CONFIRMATIONS',
+        ]:
+            for value in [-1, '10', True, None]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_payment_event_indexer_settings()
+
+                self.assertEqual(errors, [create_error_49_payment_event_indexer_setting_is_negative(setting_name)])
@@ -0,0 +1,23 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_receive_batch_max_size_setting
+from concent_api.system_check import create_error_42_receive_batch_max_size_has_wrong_value
+
+
+class TestReceiveBatchMaxSizeSettingCheck(TestCase):
+
+    @override_settings(
+        RECEIVE_BATCH_MAX_SIZE=1,
+    )
+    def test_that_positive_receive_batch_max_size_should_not_produce_any_errors(self):
+        errors = check_receive_batch_max_size_setting()
+
+        self.assertEqual(errors, [])
+
+    def test_non_positive_or_non_int_receive_batch_max_size_should_produce_error(self):
+        for value in [0, -1, '10', 1.5, True]:
+            with override_settings(RECEIVE_BATCH_MAX_SIZE=value):
+                errors = check_receive_batch_max_size_setting()
+
+            self.assertEqual(errors, [create_error_42_receive_batch_max_size_has_wrong_value()])
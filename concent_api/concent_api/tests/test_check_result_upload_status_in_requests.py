@@ -0,0 +1,24 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_result_upload_status_in_requests_setting
+from concent_api.system_check import create_error_39_check_result_upload_status_in_requests_has_wrong_value
+
+
+class TestCheckResultUploadStatusInRequestsCheck(TestCase):
+
+    @override_settings(
+        CHECK_RESULT_UPLOAD_STATUS_IN_REQUESTS=False,
+    )
+    def test_that_bool_check_result_upload_status_in_requests_setting_should_not_produce_any_errors(self):
+        errors = check_result_upload_status_in_requests_setting()
+
+        self.assertEqual(errors, [])
+
+    @override_settings(
+        CHECK_RESULT_UPLOAD_STATUS_IN_REQUESTS='False',
+    )
+    def test_non_bool_check_result_upload_status_in_requests_setting_should_produce_error(self):
+        errors = check_result_upload_status_in_requests_setting()
+
+        self.assertEqual(errors, [create_error_39_check_result_upload_status_in_requests_has_wrong_value()])
@@ -0,0 +1,32 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_signature_verification_settings
+from concent_api.system_check import create_error_44_signature_verification_processes_has_wrong_value
+from concent_api.system_check import create_error_45_signature_verification_process_pool_min_batch_has_wrong_value
+
+
+class TestSignatureVerificationSettingsCheck(TestCase):
+
+    @override_settings(
+        SIGNATURE_VERIFICATION_PROCESSES=0,
+        SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH=1,
+    )
+    def test_that_proper_configuration_of_signature_verification_settings_should_not_produce_any_errors(self):
+        errors = check_signature_verification_settings()
+
+        self.assertEqual(errors, [])
+
+    def test_negative_or_non_int_signature_verification_processes_should_produce_error(self):
+        for value in [-1, '2', 1.5, True]:
+            with override_settings(SIGNATURE_VERIFICATION_PROCESSES=value):
+                errors = check_signature_verification_settings()
+
+            self.assertEqual(errors, [create_error_44_signature_verification_processes_has_wrong_value()])
+
+    def test_non_positive_or_non_int_signature_verification_process_pool_min_batch_should_produce_error(self):
+        for value in [0, -1, '10', 1.5, True]:
+            with override_settings(SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH=value):
+                errors = check_signature_verification_settings()
+
+            self.assertEqual(errors, [create_error_45_signature_verification_process_pool_min_batch_has_wrong_value()])
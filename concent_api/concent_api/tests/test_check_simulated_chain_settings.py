@@ -0,0 +1,51 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_simulated_chain_settings
+from concent_api.system_check import create_error_57_simulated_chain_setting_has_wrong_value
+
+
+@override_settings(
+    PAYMENT_BACKEND='core.payments.simulated_chain.SimulatedChainPaymentBackend',
+)
+class TestSimulatedChainSettingsCheck(TestCase):
+
+    def test_that_non_negative_simulated_chain_settings_should_not_produce_any_errors(self):
+        for value in [0, 1, 10 ** 18]:
+            with override_settings(
+                SIMULATED_CHAIN_LATENCY=value,
+                SIMULATED_CHAIN_INITIAL_DEPOSIT_VALUE=value,
+            ):
+                errors = check_simulated_chain_settings()
+
+            self.assertEqual(errors, [])
+
+    def test_that_fractional_latency_should_not_produce_any_errors(self):
+        with override_settings(SIMULATED_CHAIN_LATENCY=0.05):
+            errors = check_simulated_chain_settings()
+
+        self.assertEqual(errors, [])
+
+    def test_negative_or_non_numeric_simulated_chain_setting_should_produce_error(self):
+        for setting_name in [
+            'SIMULATED_CHAIN_LATENCY',
+            'SIMULATED_CHAIN_INITIAL_DEPOSIT_VALUE',
+        ]:
+            for value in [-1, '10', True, None]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_simulated_chain_settings()
+
+                self.assertEqual(errors, [create_error_57_simulated_chain_setting_has_wrong_value(setting_name)])
+
+    def test_fractional_initial_deposit_value_should_produce_error(self):
+        with override_settings(SIMULATED_CHAIN_INITIAL_DEPOSIT_VALUE=0.5):
+            errors = check_simulated_chain_settings()
+
+        self.assertEqual(errors, [create_error_57_simulated_chain_setting_has_wrong_value('SIMULATED_CHAIN_INITIAL_DEPOSIT_VALUE')])
+
+    @override_settings(
+        PAYMENT_BACKEND='core.payments.mock.MockPaymentBackend',
+        SIMULATED_CHAIN_LATENCY=-1,
+    )
+    def test_that_simulated_chain_settings_are_not_checked_for_other_backends(self):
+        self.assertEqual(check_simulated_chain_settings(), [])
@@ -0,0 +1,34 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_storage_cluster_request_settings
+from concent_api.system_check import create_error_37_storage_cluster_request_setting_has_wrong_value
+from concent_api.system_check import create_error_38_upload_status_negative_cache_time_has_wrong_value
+
+
+class TestStorageClusterRequestSettingsCheck(TestCase):
+
+    @override_settings(
+        STORAGE_CLUSTER_REQUEST_TIMEOUT=1,
+        STORAGE_CLUSTER_MAX_CONCURRENT_REQUESTS=1,
+        UPLOAD_STATUS_NEGATIVE_CACHE_TIME=0,
+    )
+    def test_that_proper_configuration_of_storage_cluster_request_settings_should_not_produce_any_errors(self):
+        errors = check_storage_cluster_request_settings()
+
+        self.assertEqual(errors, [])
+
+    def test_non_positive_or_non_int_storage_cluster_request_settings_should_produce_error(self):
+        for setting_name in ['STORAGE_CLUSTER_REQUEST_TIMEOUT', 'STORAGE_CLUSTER_MAX_CONCURRENT_REQUESTS']:
+            for value in [0, -1, '10', 1.5, True]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_storage_cluster_request_settings()
+
+                self.assertEqual(errors, [create_error_37_storage_cluster_request_setting_has_wrong_value(setting_name)])
+
+    def test_negative_or_non_int_upload_status_negative_cache_time_should_produce_error(self):
+        for value in [-1, '10', 1.5, True]:
+            with override_settings(UPLOAD_STATUS_NEGATIVE_CACHE_TIME=value):
+                errors = check_storage_cluster_request_settings()
+
+            self.assertEqual(errors, [create_error_38_upload_status_negative_cache_time_has_wrong_value()])
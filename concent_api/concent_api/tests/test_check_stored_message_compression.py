@@ -0,0 +1,22 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_stored_message_compression
+from concent_api.system_check import create_error_60_stored_message_compression_has_wrong_value
+
+
+class TestStoredMessageCompressionCheck(TestCase):
+
+    def test_that_known_compression_should_not_produce_any_errors(self):
+        for value in ['ZLIB', 'NONE']:
+            with override_settings(STORED_MESSAGE_COMPRESSION=value):
+                errors = check_stored_message_compression()
+
+            self.assertEqual(errors, [])
+
+    def test_unknown_compression_should_produce_error(self):
+        for value in ['zlib', 'ZSTD', '', None, ['ZLIB']]:
+            with override_settings(STORED_MESSAGE_COMPRESSION=value):
+                errors = check_stored_message_compression()
+
+            self.assertEqual(errors, [create_error_60_stored_message_compression_has_wrong_value()])
@@ -0,0 +1,35 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_timed_out_subtasks_sweep_settings
+from concent_api.system_check import create_error_34_update_timed_out_subtasks_in_requests_has_wrong_value
+from concent_api.system_check import create_error_35_timed_out_subtasks_sweep_setting_has_wrong_value
+
+
+class TestTimedOutSubtasksSweepSettingsCheck(TestCase):
+
+    @override_settings(
+        UPDATE_TIMED_OUT_SUBTASKS_IN_REQUESTS=False,
+        TIMED_OUT_SUBTASKS_SWEEP_BATCH_SIZE=1,
+        TIMED_OUT_SUBTASKS_SWEEP_INTERVAL=1,
+    )
+    def test_that_proper_configuration_of_sweep_settings_should_not_produce_any_errors(self):
+        errors = check_timed_out_subtasks_sweep_settings()
+
+        self.assertEqual(errors, [])
+
+    @override_settings(
+        UPDATE_TIMED_OUT_SUBTASKS_IN_REQUESTS='True',
+    )
+    def test_non_bool_update_timed_out_subtasks_in_requests_setting_should_produce_error(self):
+        errors = check_timed_out_subtasks_sweep_settings()
+
+        self.assertEqual(errors, [create_error_34_update_timed_out_subtasks_in_requests_has_wrong_value()])
+
+    def test_non_positive_or_non_int_sweep_settings_should_produce_error(self):
+        for setting_name in ['TIMED_OUT_SUBTASKS_SWEEP_BATCH_SIZE', 'TIMED_OUT_SUBTASKS_SWEEP_INTERVAL']:
+            for value in [0, -1, '10', 1.5, True]:
+                with override_settings(**{setting_name: value}):
+                    errors = check_timed_out_subtasks_sweep_settings()
+
+                self.assertEqual(errors, [create_error_35_timed_out_subtasks_sweep_setting_has_wrong_value(setting_name)])
@@ -0,0 +1,22 @@
+from django.test import override_settings
+from django.test import TestCase
+
+from concent_api.system_check import check_verified_messages_cache_size_setting
+from concent_api.system_check import create_error_43_verified_messages_cache_size_has_wrong_value
+
+
+class TestVerifiedMessagesCacheSizeSettingCheck(TestCase):
+
+    def test_that_non_negative_verified_messages_cache_size_should_not_produce_any_errors(self):
+        for value in [0, 1, 10000]:
+            with override_settings(VERIFIED_MESSAGES_CACHE_SIZE=value):
+                errors = check_verified_messages_cache_size_setting()
+
+            self.assertEqual(errors, [])
+
+    def test_negative_or_non_int_verified_messages_cache_size_should_produce_error(self):
+        for value in [-1, '10', 1.5, True, None]:
+            with override_settings(VERIFIED_MESSAGES_CACHE_SIZE=value):
+                errors = check_verified_messages_cache_size_setting()
+
+            self.assertEqual(errors, [create_error_43_verified_messages_cache_size_has_wrong_value()])
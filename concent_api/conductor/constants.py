@@ -1,7 +1,12 @@
+import re
+
 from core.constants import MESSAGE_TASK_ID_MAX_LENGTH
 
 # Defines max length of path Conductor models.
 MESSAGE_PATH_LENGTH = 256
 
+# Regular expression matching paths of result packages on the storage cluster. See `get_storage_result_file_path()`.
+RESULT_PACKAGE_PATH_REGEX = re.compile(r'^blender/result/(?P<task_id>[a-zA-Z0-9_-]+)/(?P=task_id)\.(?P<subtask_id>[a-zA-Z0-9_-]+)\.zip$')
+
 
 assert MESSAGE_TASK_ID_MAX_LENGTH < MESSAGE_PATH_LENGTH
@@ -89,6 +89,36 @@ class ConductorVerificationIntegrationTest(ConcentIntegrationTestCase):
         self.assertEqual(upload_report.path, self.source_package_path)
         self.assertEqual(upload_report.verification_request, None)
 
+    def test_conductor_should_schedule_result_upload_finished_task_for_result_package(self):
+        with mock.patch('conductor.views.result_upload_finished.delay') as mock_task:
+            response = self.client.post(
+                reverse(
+                    'conductor:report-upload',
+                    kwargs={
+                        'file_path': self.result_package_path
+                    }
+                ),
+                content_type='application/octet-stream',
+            )
+
+        self.assertEqual(response.status_code, 200)
+        mock_task.assert_called_once_with(self.compute_task_def['subtask_id'])
+
+    def test_conductor_should_not_schedule_result_upload_finished_task_for_source_package(self):
+        with mock.patch('conductor.views.result_upload_finished.delay') as mock_task:
+            response = self.client.post(
+                reverse(
+                    'conductor:report-upload',
+                    kwargs={
+                        'file_path': self.source_package_path
+                    }
+                ),
+                content_type='application/octet-stream',
+            )
+
+        self.assertEqual(response.status_code, 200)
+        mock_task.assert_not_called()
+
     def test_conductor_should_create_upload_report_and_link_to_related_verification_request(self):
         verification_request = self._prepare_verification_request_with_blender_subtask_definition()
 
@@ -3,8 +3,10 @@ from django.http.response import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
+from core.tasks import result_upload_finished
 from core.tasks import upload_finished
 from utils.decorators import provides_concent_feature
+from .constants import RESULT_PACKAGE_PATH_REGEX
 from .models import UploadReport
 from .models import VerificationRequest
 
@@ -45,4 +47,10 @@ def report_upload(_request, file_path):
         verification_request.full_clean()
         verification_request.save()
 
+    # A requestor may be waiting for the result in the forced result transfer use case. Subtasks are stored
+    # in the control database so the app only passes subtask ID on and the rest is done by a `concent` worker.
+    result_package_path_match = RESULT_PACKAGE_PATH_REGEX.match(file_path)
+    if result_package_path_match is not None:
+        result_upload_finished.delay(result_package_path_match.group('subtask_id'))
+
     return HttpResponse()
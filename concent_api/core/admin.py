@@ -1,6 +1,12 @@
+import json
+
 from django.contrib import admin
+from django.utils.html import format_html
 
 from utils.admin    import ModelAdminReadOnlyMixin
+from .models        import ArchivedPendingResponse
+from .models        import ArchivedSubtask
+from .models        import OutboxMessage
 from .models        import PendingResponse
 from .models        import StoredMessage
 from .models        import Subtask
@@ -65,10 +71,12 @@ class PendingResponseAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
         'get_subtask_subtask_id',
         'get_client_public_key',
         'delivered',
+        'failed',
         'created_at',
     ]
     list_filter = (
         'delivered',
+        'failed',
         'queue',
         'response_type',
     )
@@ -89,6 +97,86 @@ class PendingResponseAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
     get_client_public_key.short_description = 'Client public key'  # type: ignore
 
 
+class OutboxMessageAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
+
+    list_display = [
+        'idempotency_key',
+        'kind',
+        'created_at',
+        'attempts',
+        'payment_attempted_at',
+        'sent_at',
+        'needs_manual_resolution',
+    ]
+    list_filter = (
+        'needs_manual_resolution',
+        'kind',
+    )
+    search_fields = [
+        'idempotency_key',
+    ]
+
+
+class ArchivedDocumentMixin:
+    """ Shows the decompressed document of an archived row as formatted JSON. """
+
+    exclude = ('document',)
+    readonly_fields = ('get_document',)
+
+    def get_document(self, obj):  # pylint: disable=no-self-use
+        return format_html('<pre>{}</pre>', json.dumps(obj.document_dict, indent=4, sort_keys=True))
+    get_document.short_description = 'Document'  # type: ignore
+
+
+class ArchivedSubtaskAdmin(ModelAdminReadOnlyMixin, ArchivedDocumentMixin, admin.ModelAdmin):
+
+    list_display = [
+        'subtask_id',
+        'task_id',
+        'state',
+        'provider_public_key',
+        'requestor_public_key',
+        'state_changed_at',
+        'archive_period',
+    ]
+    list_filter = (
+        'archive_period',
+        'state',
+    )
+    search_fields = [
+        'provider_public_key',
+        'requestor_public_key',
+        'subtask_id',
+        'task_id',
+    ]
+
+
+class ArchivedPendingResponseAdmin(ModelAdminReadOnlyMixin, ArchivedDocumentMixin, admin.ModelAdmin):
+
+    list_display = [
+        'response_type',
+        'queue',
+        'subtask_id',
+        'client_public_key',
+        'delivered',
+        'created_at',
+        'archive_period',
+    ]
+    list_filter = (
+        'archive_period',
+        'delivered',
+        'queue',
+        'response_type',
+    )
+    search_fields = [
+        'client_public_key',
+        'subtask_id',
+    ]
+
+
+admin.site.register(ArchivedPendingResponse, ArchivedPendingResponseAdmin)
+admin.site.register(ArchivedSubtask, ArchivedSubtaskAdmin)
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
 admin.site.register(PendingResponse, PendingResponseAdmin)
 admin.site.register(StoredMessage)
 admin.site.register(Subtask, SubtaskAdmin)
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        # Backends import models so they can be loaded only once the app registry is ready.
+        from core.payments.base import set_up_backend
+        set_up_backend()
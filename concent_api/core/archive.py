@@ -0,0 +1,203 @@
+from typing import Any
+from typing import Iterable
+from typing import List
+import base64
+import datetime
+import decimal
+import json
+import zlib
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import Model
+from django.db.models import Prefetch
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import ArchivedPendingResponse
+from core.models import ArchivedSubtask
+from core.models import MessagePayload
+from core.models import PaymentInfo
+from core.models import PendingResponse
+from core.models import StoredMessage
+from core.models import Subtask
+from core.models import SubtaskPayment
+
+
+def archive_finished_subtasks(batch_size: int) -> int:
+    """
+    Moves at most `batch_size` subtasks that have been in a passive state for ARCHIVE_RETENTION_TIME to the archive,
+    together with their stored messages, payments and pending responses. Subtasks whose payment has not been made
+    yet are left alone. Must be called in a transaction. Subtasks claimed by a concurrent call are skipped.
+    Returns the number of subtasks archived.
+    """
+    # Only Subtask rows are locked: PostgreSQL does not lock rows on the nullable side of an outer join.
+    claimed_ids = list(
+        Subtask.objects.select_for_update(skip_locked = True).filter(
+            state__in           = [state.name for state in Subtask.PASSIVE_STATES],
+            state_changed_at__lte = _get_retention_cutoff(),
+        ).exclude(
+            id__in = SubtaskPayment.objects.filter(paid_value = None).values('subtask_id'),
+        ).order_by('state_changed_at', 'id').values_list('id', flat = True)[:batch_size]
+    )
+    if len(claimed_ids) == 0:
+        return 0
+
+    subtasks = Subtask.objects.select_related(
+        'requestor',
+        'provider',
+        'payment',
+        *[field_name + '__payload' for field_name in Subtask.MESSAGE_FOR_FIELD],
+    ).filter(
+        id__in = claimed_ids,
+    ).order_by('id')
+
+    archive_period = _get_archive_period()
+    archived_subtasks = []
+    stored_message_ids = []
+    payload_digests = set()
+    for subtask in subtasks:
+        stored_messages = {
+            field_name: getattr(subtask, field_name)
+            for field_name in Subtask.MESSAGE_FOR_FIELD
+            if getattr(subtask, field_name + '_id') is not None
+        }
+        stored_message_ids += [stored_message.id for stored_message in stored_messages.values()]
+        payload_digests |= {
+            stored_message.payload_id
+            for stored_message in stored_messages.values()
+            if stored_message.payload_id is not None
+        }
+        archived_subtasks.append(ArchivedSubtask(
+            archive_period          = archive_period,
+            task_id                 = subtask.task_id,
+            subtask_id              = subtask.subtask_id,
+            requestor_public_key    = subtask.requestor.public_key,
+            provider_public_key     = subtask.provider.public_key,
+            state                   = subtask.state,
+            state_changed_at        = subtask.state_changed_at,
+            document                = _compress_document({
+                'subtask':          _get_field_values(subtask),
+                'stored_messages':  {
+                    field_name: _get_stored_message_field_values(stored_message)
+                    for field_name, stored_message in stored_messages.items()
+                },
+                'payment':          _get_field_values(subtask.payment) if hasattr(subtask, 'payment') else None,
+            }),
+        ))
+    ArchivedSubtask.objects.bulk_create(archived_subtasks)
+
+    pending_response_ids = list(
+        PendingResponse.objects.select_for_update().filter(
+            subtask_id__in = claimed_ids,
+        ).values_list('id', flat = True)
+    )
+    _archive_pending_responses(pending_response_ids, archive_period)
+
+    Subtask.objects.filter(id__in = claimed_ids).delete()
+    StoredMessage.objects.filter(id__in = stored_message_ids).delete()
+    _delete_unreferenced_payloads(payload_digests)
+    return len(claimed_ids)
+
+
+def archive_stale_pending_responses(batch_size: int) -> int:
+    """
+    Moves at most `batch_size` pending responses created more than ARCHIVE_RETENTION_TIME ago to the archive:
+    undelivered ones, which expire because it's too late for the client to act on them, and delivered ones that
+    do not belong to any subtask. Responses of subtasks are otherwise archived together with the subtask.
+    Must be called in a transaction. Responses claimed by a concurrent call are skipped.
+    Returns the number of responses archived.
+    """
+    claimed_ids = list(
+        PendingResponse.objects.select_for_update(skip_locked = True).filter(
+            Q(delivered = False) | Q(subtask = None),
+            created_at__lte = _get_retention_cutoff(),
+        ).order_by('created_at', 'id').values_list('id', flat = True)[:batch_size]
+    )
+    if len(claimed_ids) == 0:
+        return 0
+
+    _archive_pending_responses(claimed_ids, _get_archive_period())
+    return len(claimed_ids)
+
+
+def _archive_pending_responses(pending_response_ids: List[int], archive_period: datetime.date):
+    pending_responses = PendingResponse.objects.select_related(
+        'client',
+        'subtask',
+    ).prefetch_related(
+        Prefetch('payments', queryset = PaymentInfo.objects.order_by('id')),
+    ).filter(
+        id__in = pending_response_ids,
+    ).order_by('id')
+
+    ArchivedPendingResponse.objects.bulk_create([
+        ArchivedPendingResponse(
+            archive_period      = archive_period,
+            response_type       = pending_response.response_type,
+            queue               = pending_response.queue,
+            client_public_key   = pending_response.client.public_key,
+            created_at          = pending_response.created_at,
+            delivered           = pending_response.delivered,
+            subtask_id          = pending_response.subtask.subtask_id if pending_response.subtask is not None else None,
+            document            = _compress_document({
+                'pending_response': _get_field_values(pending_response),
+                'payments':         [_get_field_values(payment) for payment in pending_response.payments.all()],
+            }),
+        )
+        for pending_response in pending_responses
+    ])
+    # Payment infos are deleted along with their responses.
+    PendingResponse.objects.filter(id__in = pending_response_ids).delete()
+
+
+def _delete_unreferenced_payloads(digests: Iterable[str]):
+    try:
+        # Savepoint lets the current transaction go on if a concurrent one has just stored a message
+        # with one of the payloads.
+        with transaction.atomic(using = 'control'):
+            MessagePayload.objects.filter(
+                digest__in      = digests,
+                stored_messages = None,
+            ).delete()
+    except IntegrityError:
+        pass
+
+
+def _get_retention_cutoff() -> datetime.datetime:
+    return timezone.now() - datetime.timedelta(seconds = settings.ARCHIVE_RETENTION_TIME)
+
+
+def _get_archive_period() -> datetime.date:
+    return timezone.now().date().replace(day = 1)
+
+
+def _get_stored_message_field_values(stored_message: StoredMessage) -> dict:
+    """ Returns field values of the stored message with serialized data always included, wherever it's kept. """
+    field_values = _get_field_values(stored_message)
+    del field_values['payload_id']
+    field_values['data'] = _to_json_value(stored_message.data_bytes)
+    return field_values
+
+
+def _get_field_values(instance: Model) -> dict:
+    """ Returns values of all database columns of the model instance. Related objects are referred to by their IDs. """
+    return {
+        field.attname: _to_json_value(getattr(instance, field.attname))
+        for field in instance._meta.concrete_fields  # pylint: disable=protected-access
+    }
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(value).decode()
+    return value
+
+
+def _compress_document(document: dict) -> bytes:
+    return zlib.compress(json.dumps(document).encode())
@@ -0,0 +1,34 @@
+from typing import Any
+
+from constance import config
+from constance.signals import config_updated
+from django.conf import settings
+from django.dispatch import receiver
+
+from utils.caches import TTLCache
+
+_config_values = TTLCache()
+
+_MISSING = object()
+
+
+def get_config_value(name: str) -> Any:
+    """
+    Returns the value of a Constance setting, read from the database at most once per CONSTANCE_LOCAL_CACHE_TIME
+    seconds by each process. A value changed by this process is read again right away. Changes made by other
+    processes, e.g. in the admin panel, become visible within CONSTANCE_LOCAL_CACHE_TIME seconds.
+    """
+    value = _config_values.get(name, _MISSING)
+    if value is _MISSING:
+        value = getattr(config, name)
+        _config_values.set(name, value, settings.CONSTANCE_LOCAL_CACHE_TIME)
+    return value
+
+
+def is_soft_shutdown_mode_enabled() -> bool:
+    return get_config_value('SOFT_SHUTDOWN_MODE') is True
+
+
+@receiver(config_updated)
+def invalidate_config_value(sender, key, **kwargs):  # pylint: disable=unused-argument
+    _config_values.delete(key)
@@ -17,6 +17,28 @@ ETHEREUM_ADDRESS_LENGTH = 42
 # Defines length of Clients ids, public keys or ethereum public keys
 TASK_OWNER_KEY_LENGTH = 64
 
+# Defines max length of package hash passed in Golem Messages, including the algorithm prefix.
+PACKAGE_HASH_MAX_LENGTH = 64
+
+# Defines max number of digits of a price. Enough to store any unsigned 256-bit Ethereum integer.
+PRICE_MAX_DIGITS = 78
+
+# Defines the maximum number of seconds a deposit can be cached when the cache is local to each process.
+# Other processes do not see the cached deposit being invalidated after a payment so it must expire quickly.
+MAX_LOCAL_DEPOSIT_VALUE_CACHE_TIME = 10
+
+# Defines the maximum number of seconds returned in the Retry-After header of empty responses from receive endpoints.
+# Deadlines of a client can become earlier at any time, e.g. when the other party starts a new use case.
+MAX_RETRY_AFTER = 10
+
+# Defines the number of rows the count of active subtasks is split into. Transactions changing states of subtasks
+# in different rows do not wait for each other.
+ACTIVE_SUBTASK_COUNTER_SHARDS = 16
+
+# Defines the length of a message fingerprint: hex-encoded SHA-1 hash of the header and payload of a Golem message,
+# i.e. of the data covered by its signature.
+MESSAGE_FINGERPRINT_LENGTH = 40
+
 # Regular expresion of allowed characters in task_id and subtask_id
 VALID_ID_REGEX = re.compile(r'[a-zA-Z0-9_-]*')
 
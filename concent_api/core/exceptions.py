@@ -15,6 +15,17 @@ class ConcentFeatureIsNotAvailable(Exception):
     pass
 
 
+class PaymentBackendUnavailable(Exception):
+    pass
+
+
+class PaymentOutcomeUnknown(Exception):
+    """
+    A call sending a transaction failed after the transaction may have been sent. Unlike after
+    PaymentBackendUnavailable, the call must not be repeated before checking the blockchain.
+    """
+
+
 class ConcentBaseException(Exception):
 
     def __init__(self, error_message: Optional[str], error_code: ErrorCode) -> None:
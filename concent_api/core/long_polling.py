@@ -0,0 +1,132 @@
+import hashlib
+import select
+import threading
+import time
+
+from typing import Callable
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest
+
+from core.exceptions import Http400
+from utils.constants import ErrorCode
+
+_long_poll_waiters = None
+_long_poll_waiters_lock = threading.Lock()
+
+
+def get_pending_response_channel(client_public_key: bytes) -> str:
+    """
+    Returns the name of PostgreSQL notification channel on which client is notified about new pending responses.
+    Public keys contain characters not allowed in identifiers so a hex digest is used instead.
+    """
+    assert isinstance(client_public_key, bytes)
+    return 'pending_response_' + hashlib.sha1(client_public_key).hexdigest()
+
+
+def notify_about_pending_response(client_public_key: bytes):
+    """
+    Wakes up requests waiting for client's pending responses. PostgreSQL delivers the notification only after
+    the current transaction on the control database commits so the waiting request is sure to find the response.
+    """
+    if settings.LONG_POLL_MAX_TIMEOUT == 0:
+        return
+
+    with connections['control'].cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [get_pending_response_channel(client_public_key), ''])
+
+
+def get_long_poll_timeout(request: HttpRequest) -> int:
+    """
+    Returns the number of seconds the client is willing to wait for a pending response, as requested
+    in the Concent-Long-Poll-Timeout header and limited by LONG_POLL_MAX_TIMEOUT. 0 if the header is missing.
+    """
+    timeout = request.META.get('HTTP_CONCENT_LONG_POLL_TIMEOUT')
+    if timeout is None:
+        return 0
+
+    if not timeout.isdigit():
+        raise Http400(
+            'Concent-Long-Poll-Timeout header must be a non-negative integer.',
+            error_code=ErrorCode.HEADER_LONG_POLL_TIMEOUT_INVALID,
+        )
+    return min(int(timeout), settings.LONG_POLL_MAX_TIMEOUT)
+
+
+def get_long_poll_waiters() -> threading.BoundedSemaphore:
+    """
+    Returns the semaphore limiting the number of requests that can wait for pending responses in this process
+    at the same time. Every waiting request holds a database connection of its own.
+    """
+    global _long_poll_waiters  # pylint: disable=global-statement
+    with _long_poll_waiters_lock:
+        if _long_poll_waiters is None:
+            _long_poll_waiters = threading.BoundedSemaphore(settings.LONG_POLL_MAX_WAITERS)
+    return _long_poll_waiters
+
+
+class PendingResponseListener:
+    """
+    Listens for notifications about client's pending responses. Uses a separate connection in autocommit mode
+    because LISTEN executed inside a transaction takes effect only when the transaction commits.
+    """
+
+    def __init__(self, client_public_key: bytes) -> None:
+        self.channel = get_pending_response_channel(client_public_key)
+        self.connection = None
+
+    def __enter__(self) -> 'PendingResponseListener':
+        database = connections['control']
+        self.connection = database.get_new_connection(database.get_connection_params())
+        try:
+            self.connection.autocommit = True
+            with self.connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {self.channel}')
+        except Exception:
+            self.connection.close()
+            raise
+        return self
+
+    def __exit__(self, *_args):
+        self.connection.close()
+
+    def wait(self, timeout: float) -> bool:
+        """ Waits at most `timeout` seconds for a notification. Returns False on timeout. """
+        if select.select([self.connection], [], [], timeout) == ([], [], []):
+            return False
+
+        self.connection.poll()
+        self.connection.notifies.clear()
+        return True
+
+
+def wait_for_pending_response(
+    client_public_key:  bytes,
+    timeout:            int,
+    check:              Callable[[], Optional[object]],
+) -> Optional[object]:
+    """
+    Calls `check` until it returns something other than None, waiting for a notification about a new pending response
+    of the client between the calls. Gives up after `timeout` seconds or immediately if too many requests are
+    already waiting in this process. `check` is called once more after LISTEN so that responses enqueued
+    after the caller last checked are not missed.
+    """
+    long_poll_waiters = get_long_poll_waiters()
+    if not long_poll_waiters.acquire(blocking = False):
+        return None
+
+    try:
+        deadline = time.monotonic() + timeout
+        with PendingResponseListener(client_public_key) as listener:
+            while True:
+                result = check()
+                if result is not None:
+                    return result
+
+                remaining_time = deadline - time.monotonic()
+                if remaining_time <= 0 or not listener.wait(remaining_time):
+                    return None
+    finally:
+        long_poll_waiters.release()
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.message_storage import get_stored_message_space_report
+from core.message_storage import move_stored_messages_to_payloads
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves serialized messages stored before payloads were introduced to deduplicated, compressed payloads "
+        "and reports how much space stored messages take."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size',     type=int,               default=1000,   help="Number of messages moved in one transaction.")
+        parser.add_argument('--report-only',    action='store_true',                    help="Only report space taken by stored messages.")
+
+    def handle(self, *args, **options):
+        if not options['report_only']:
+            moved_count = 0
+            while True:
+                with transaction.atomic(using='control'):
+                    count = move_stored_messages_to_payloads(options['batch_size'])
+                moved_count += count
+                if count < options['batch_size']:
+                    break
+            self.stdout.write(f'Moved {moved_count} stored messages to payloads.')
+
+        report = get_stored_message_space_report()
+        self.stdout.write(f"Stored messages kept inline: {report['inline_messages']}")
+        self.stdout.write(f"Stored messages kept in payloads: {report['messages_in_payloads']}")
+        self.stdout.write(f"Distinct payloads: {report['payloads']}")
+        self.stdout.write(f"Size of messages stored in full: {report['full_size']} bytes")
+        self.stdout.write(f"Size actually taken: {report['stored_size']} bytes")
+        self.stdout.write(f"Space saved: {report['saved_size']} bytes")
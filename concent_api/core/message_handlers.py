@@ -3,56 +3,82 @@ import copy
 
 from base64 import b64encode
 from logging import getLogger
+from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Union
 
 from django.conf import settings
 from django.core.mail import mail_admins
+from django.db.models import Prefetch
+from django.db.models import QuerySet
 from django.http import HttpResponse
 from django.utils import timezone
 
-from constance import config
-
 from golem_sci.events import BatchTransferEvent
 from golem_sci.events import ForcedPaymentEvent
 from golem_messages import message
 from golem_messages.message import FileTransferToken
 from golem_messages.message.tasks import SubtaskResultsRejected
 
+from core.config_cache import is_soft_shutdown_mode_enabled
 from core.exceptions import ConcentInSoftShutdownMode
 from core.exceptions import Http400
+from core.models import ActiveSubtaskCounter
 from core.models import Client
+from core.models import MessagePayload
 from core.models import PaymentInfo
 from core.models import PendingResponse
 from core.models import StoredMessage
 from core.models import Subtask
 import core.payments.base
-from core.payments.sci_backend import TransactionType
+from core.payments.base import PaymentQuery
+from core.payments.base import TransactionType
 from core.queue_operations import send_blender_verification_request
-from core.subtask_helpers import verify_message_subtask_results_accepted
 from core.transfer_operations import store_pending_message
 from core.transfer_operations import create_file_transfer_token_for_golem_client
+from core.transfer_operations import create_response_to_client
 from core.utils import calculate_maximum_download_time
 from core.utils import calculate_subtask_verification_time
-from core.validation import validate_all_messages_identical
+from core.utils import get_message_fingerprint
+from core.validation import validate_message_identical_to_stored
 from core.validation import validate_ethereum_addresses
 from core.validation import validate_golem_message_signed_with_key
 from core.validation import validate_golem_message_subtask_results_rejected
 from core.validation import validate_report_computed_task_time_window
 from core.validation import validate_secure_hash_algorithm
+from core.validation import validate_subtask_results_accepted_list
 from core.validation import validate_task_to_compute
 from utils import logging
 from utils.constants import ErrorCode
-from utils.helpers import deserialize_message
+from utils.helpers import deserialize_message_with_new_header
 from utils.helpers import get_current_utc_timestamp
 from utils.helpers import parse_timestamp_to_utc_datetime
-from utils.helpers import sign_message
 from .utils import hex_to_bytes_convert
 
 logger = getLogger(__name__)
 
 
+def get_subtask_queryset(
+    messages_with_data:     Iterable[str] = (),
+    messages_without_data:  Iterable[str] = (),
+) -> QuerySet:
+    """
+    Returns a queryset of subtasks that fetches their clients and given related stored messages in the same query.
+    Serialized data is loaded only for `messages_with_data`. Messages not listed are not fetched at all and cost
+    an additional query if accessed, while checking whether they are set through their `_id` attributes is free.
+    """
+    messages_without_data = list(messages_without_data)
+    return Subtask.objects.select_related(
+        'requestor',
+        'provider',
+        *[f'{message_name}__payload' for message_name in messages_with_data],
+        *messages_without_data,
+    ).defer(
+        *[f'{message_name}__data' for message_name in messages_without_data]
+    )
+
+
 def handle_send_force_report_computed_task(client_message):
     task_to_compute = client_message.report_computed_task.task_to_compute
     provider_public_key = hex_to_bytes_convert(task_to_compute.provider_public_key)
@@ -123,7 +149,9 @@ def handle_send_ack_report_computed_task(client_message):
 
     if get_current_utc_timestamp() <= task_to_compute.compute_task_def['deadline'] + settings.CONCENT_MESSAGING_TIME:
         try:
-            subtask = Subtask.objects.get(
+            subtask = get_subtask_queryset(
+                messages_without_data   = ['task_to_compute', 'report_computed_task'],
+            ).get(
                 subtask_id = task_to_compute.compute_task_def['subtask_id'],
             )
         except Subtask.DoesNotExist:
@@ -158,16 +186,10 @@ def handle_send_ack_report_computed_task(client_message):
                 "or another AckReportComputedTask for this task has already been submitted.",
                 error_code=ErrorCode.SUBTASK_DUPLICATE_REQUEST,
             )
-        validate_all_messages_identical([
-            task_to_compute,
-            deserialize_message(subtask.task_to_compute.data.tobytes()),
-        ])
+        validate_message_identical_to_stored(task_to_compute, subtask.task_to_compute)
         new_report_computed_task = None
         try:
-            validate_all_messages_identical([
-                report_computed_task,
-                deserialize_message(subtask.report_computed_task.data.tobytes()),
-            ])
+            validate_message_identical_to_stored(report_computed_task, subtask.report_computed_task)
         except Http400:
             new_report_computed_task = report_computed_task
 
@@ -266,7 +288,9 @@ def handle_send_reject_report_computed_task(client_message):
             )
 
     try:
-        subtask = Subtask.objects.get(
+        subtask = get_subtask_queryset(
+            messages_without_data   = ['task_to_compute', 'report_computed_task'],
+        ).get(
             subtask_id = task_to_compute.compute_task_def['subtask_id'],
         )
     except Subtask.DoesNotExist:
@@ -295,12 +319,7 @@ def handle_send_reject_report_computed_task(client_message):
             error_code=ErrorCode.QUEUE_REQUESTOR_PUBLIC_KEY_MISMATCH,
         )
 
-    validate_all_messages_identical(
-        [
-            task_to_compute,
-            deserialize_message(subtask.task_to_compute.data.tobytes()),
-        ]
-    )
+    validate_message_identical_to_stored(task_to_compute, subtask.task_to_compute)
 
     if client_message.reason == message.RejectReportComputedTask.REASON.SubtaskTimeLimitExceeded:
 
@@ -330,9 +349,8 @@ def handle_send_reject_report_computed_task(client_message):
         )
         return HttpResponse("", status = 202)
 
-    deserialized_message = deserialize_message(subtask.task_to_compute.data.tobytes())
-
-    if get_current_utc_timestamp() <= deserialized_message.compute_task_def['deadline'] + settings.CONCENT_MESSAGING_TIME:
+    # TaskToCompute from the message has just been verified to be identical to the stored one.
+    if get_current_utc_timestamp() <= task_to_compute.compute_task_def['deadline'] + settings.CONCENT_MESSAGING_TIME:
         if subtask.ack_report_computed_task_id is not None or subtask.ack_report_computed_task_id is not None:
             raise Http400(
                 "Received RejectReportComputedTask but AckReportComputedTask or another RejectReportComputedTask for this task has already been submitted.",
@@ -363,7 +381,7 @@ def handle_send_reject_report_computed_task(client_message):
             logger,
             client_message,
             requestor_public_key,
-            deserialized_message.compute_task_def['deadline'] + settings.CONCENT_MESSAGING_TIME,
+            task_to_compute.compute_task_def['deadline'] + settings.CONCENT_MESSAGING_TIME,
         )
         raise Http400(
             "Time to acknowledge this task is already over.",
@@ -459,7 +477,7 @@ def handle_send_force_subtask_results(client_message: message.concents.ForceSubt
             reason=message.concents.ServiceRefused.REASON.DuplicateRequest,
         )
 
-    if not core.payments.base.is_account_status_positive(  # pylint: disable=no-value-for-parameter
+    if not core.payments.base.is_account_status_positive(
         client_eth_address=task_to_compute.requestor_ethereum_address,
         pending_value=task_to_compute.price,
     ):
@@ -467,7 +485,7 @@ def handle_send_force_subtask_results(client_message: message.concents.ForceSubt
             reason=message.concents.ServiceRefused.REASON.TooSmallRequestorDeposit,
         )
 
-    core.payments.base.make_force_payment_to_provider(  # pylint: disable=no-value-for-parameter
+    core.payments.base.make_force_payment_to_provider(
         requestor_eth_address=task_to_compute.requestor_ethereum_address,
         provider_eth_address=task_to_compute.provider_ethereum_address,
         value=task_to_compute.price,
@@ -554,7 +572,9 @@ def handle_send_force_subtask_results_response(client_message):
     )
 
     try:
-        subtask = Subtask.objects.get(
+        subtask = get_subtask_queryset(
+            messages_without_data   = ['task_to_compute'],
+        ).get(
             subtask_id = task_to_compute.compute_task_def['subtask_id'],
         )
     except Subtask.DoesNotExist:
@@ -588,10 +608,7 @@ def handle_send_force_subtask_results_response(client_message):
             error_code=ErrorCode.SUBTASK_DUPLICATE_REQUEST,
         )
 
-    validate_all_messages_identical([
-        task_to_compute,
-        deserialize_message(subtask.task_to_compute.data.tobytes()),
-    ])
+    validate_message_identical_to_stored(task_to_compute, subtask.task_to_compute)
 
     subtask = update_subtask(
         subtask                     = subtask,
@@ -657,26 +674,17 @@ def get_clients_eth_accounts(task_to_compute: message.tasks.TaskToCompute):
 def handle_send_force_payment(client_message: message.concents.ForcePayment) -> message.concents.ForcePaymentCommitted:  # pylint: disable=inconsistent-return-statements
 
     # Concent should not accept payment requests in soft shutdown mode.
-    if config.SOFT_SHUTDOWN_MODE is True:
+    if is_soft_shutdown_mode_enabled():
         raise ConcentInSoftShutdownMode
 
     current_time            = get_current_utc_timestamp()
 
-    if not verify_message_subtask_results_accepted(client_message.subtask_results_accepted_list):
-        return message.concents.ServiceRefused(
-            reason = message.concents.ServiceRefused.REASON.InvalidRequest
-        )
-
-    if not are_items_unique([subtask_results_accepted.subtask_id for subtask_results_accepted in client_message.subtask_results_accepted_list]):
+    refuse_reason = validate_subtask_results_accepted_list(client_message.subtask_results_accepted_list)
+    if refuse_reason is not None:
         return message.concents.ServiceRefused(
-            reason = message.concents.ServiceRefused.REASON.DuplicateRequest
+            reason = refuse_reason
         )
 
-    for subtask_results_accepted in client_message.subtask_results_accepted_list:
-        validate_golem_message_signed_with_key(
-            subtask_results_accepted.task_to_compute,
-            hex_to_bytes_convert(subtask_results_accepted.task_to_compute.requestor_public_key),
-        )
     task_to_compute = client_message.subtask_results_accepted_list[0].task_to_compute
     (requestor_eth_address, provider_eth_address) = get_clients_eth_accounts(task_to_compute)
     validate_ethereum_addresses(requestor_eth_address, provider_eth_address)
@@ -687,13 +695,17 @@ def handle_send_force_payment(client_message: message.concents.ForcePayment) ->
         subtask_results_accepted.payment_ts for subtask_results_accepted in client_message.subtask_results_accepted_list
     )
 
-    # Concent gets list of transactions from payment API where timestamp >= T0.
-    list_of_transactions = core.payments.base.get_list_of_payments(  # pylint: disable=no-value-for-parameter
+    # Concent gets list of transactions from payment API where timestamp >= T0
+    # and list of forced payments from payment API where T0 <= payment_ts + PAYMENT_DUE_TIME.
+    # Both queries are sent at once so that they run concurrently.
+    (list_of_transactions, list_of_forced_payments) = core.payments.base.get_lists_of_payments(
         requestor_eth_address   = requestor_eth_address,
         provider_eth_address    = provider_eth_address,
-        payment_ts              = oldest_payments_ts,
         current_time            = current_time,
-        transaction_type        = TransactionType.BATCH,
+        queries                 = [
+            PaymentQuery(payment_ts = oldest_payments_ts,                             transaction_type = TransactionType.BATCH),
+            PaymentQuery(payment_ts = oldest_payments_ts + settings.PAYMENT_DUE_TIME, transaction_type = TransactionType.FORCE),  # Im not sure, check it please
+        ],
     )
 
     # Concent defines time T1 equal to youngest timestamp from list of transactions.
@@ -713,15 +725,6 @@ def handle_send_force_payment(client_message: message.concents.ForcePayment) ->
             reason = message.concents.ForcePaymentRejected.REASON.TimestampError
         )
 
-    # Concent gets list of forced payments from payment API where T0 <= payment_ts + PAYMENT_DUE_TIME.
-    list_of_forced_payments = core.payments.base.get_list_of_payments(  # pylint: disable=no-value-for-parameter
-        requestor_eth_address   = requestor_eth_address,
-        provider_eth_address    = provider_eth_address,
-        payment_ts              = oldest_payments_ts + settings.PAYMENT_DUE_TIME,  # Im not sure, check it please
-        current_time            = current_time,
-        transaction_type        = TransactionType.FORCE,
-    )
-
     (amount_paid, amount_pending) = sum_amount_price_for_provider(
         list_of_forced_payments         = list_of_forced_payments,
         list_of_payments                = list_of_transactions,
@@ -738,7 +741,7 @@ def handle_send_force_payment(client_message: message.concents.ForcePayment) ->
             reason = message.concents.ForcePaymentRejected.REASON.NoUnsettledTasksFound
         )
     elif amount_pending > 0:
-        core.payments.base.make_force_payment_to_provider(  # pylint: disable=no-value-for-parameter
+        core.payments.base.make_force_payment_to_provider(
             requestor_eth_address   = requestor_eth_address,
             provider_eth_address    = provider_eth_address,
             value                   = amount_pending,
@@ -828,6 +831,8 @@ def store_subtask(
         task_to_compute=store_message(task_to_compute, task_id, subtask_id),
         report_computed_task=store_message(report_computed_task, task_id, subtask_id),
     )
+    set_subtask_protocol_fields(subtask, task_to_compute)
+    set_subtask_protocol_fields(subtask, report_computed_task)
 
     set_subtask_messages(
         subtask,
@@ -857,203 +862,117 @@ def handle_messages_from_database(
     client_public_key:  bytes                   = None,
     response_type:      PendingResponse.Queue   = None,
 ):
-    assert client_public_key    not in ['', None]
+    responses_to_client = handle_messages_from_database_in_batch(
+        client_public_key   = client_public_key,
+        response_type       = response_type,
+        batch_size          = 1,
+    )
+    if len(responses_to_client) == 0:
+        return None
+    return responses_to_client[0]
 
-    encoded_client_public_key = b64encode(client_public_key)
-    pending_response = PendingResponse.objects.filter(
-        client__public_key = encoded_client_public_key,
-        queue              = response_type.name,
-        delivered          = False,
-    ).order_by('created_at').first()
 
-    if pending_response is None:
-        return None
+def handle_messages_from_database_in_batch(
+    client_public_key:  bytes,
+    response_type:      PendingResponse.Queue,
+    batch_size:         int,
+) -> List[message.Message]:
+    """
+    Returns messages built from at most `batch_size` oldest pending responses from client's queue, in the order
+    in which they were enqueued. Related subtasks, their stored messages and payments are loaded in bulk
+    and all returned responses are marked as delivered with a single UPDATE.
 
-    assert pending_response.response_type_enum in set(PendingResponse.ResponseType)
+    Must be called in a transaction. Pending responses are claimed with SELECT ... FOR UPDATE SKIP LOCKED
+    so concurrent calls for the same queue neither block one another nor return the same response twice.
+    Only PendingResponse rows are locked: PostgreSQL would lock rows of every joined table too.
 
-    if pending_response.response_type == PendingResponse.ResponseType.ForceReportComputedTask.name:  # pylint: disable=no-member
-        report_computed_task = deserialize_message(pending_response.subtask.report_computed_task.data.tobytes())
-        response_to_client = message.concents.ForceReportComputedTask(
-            report_computed_task = report_computed_task
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
-
-    elif pending_response.response_type == PendingResponse.ResponseType.ForceReportComputedTaskResponse.name:  # pylint: disable=no-member
-        if pending_response.subtask.ack_report_computed_task is not None:
-            ack_report_computed_task = deserialize_message(pending_response.subtask.ack_report_computed_task.data.tobytes())
-            response_to_client = message.concents.ForceReportComputedTaskResponse(
-                ack_report_computed_task=ack_report_computed_task,
-                reason=message.concents.ForceReportComputedTaskResponse.REASON.AckFromRequestor,
-            )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
-
-        elif pending_response.subtask.reject_report_computed_task is not None:
-            reject_report_computed_task = deserialize_message(pending_response.subtask.reject_report_computed_task.data.tobytes())
-            response_to_client = message.concents.ForceReportComputedTaskResponse(
-                reject_report_computed_task=reject_report_computed_task,
-                reason=message.concents.ForceReportComputedTaskResponse.REASON.RejectFromRequestor,
-            )
-            if reject_report_computed_task.reason == message.RejectReportComputedTask.REASON.SubtaskTimeLimitExceeded:
-                ack_report_computed_task = message.AckReportComputedTask(
-                    report_computed_task=deserialize_message(pending_response.subtask.report_computed_task.data.tobytes()),
-                )
-                sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
-                response_to_client = message.concents.ForceReportComputedTaskResponse(
-                    ack_report_computed_task=ack_report_computed_task,
-                    reason=message.concents.ForceReportComputedTaskResponse.REASON.ConcentAck,
-                )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
+    Responses whose messages cannot be built are logged, marked as failed and skipped so that they do not hold up
+    the rest of the queue.
+    """
+    assert client_public_key    not in ['', None]
+    assert batch_size > 0
+
+    client_id = Client.objects.filter(
+        public_key = b64encode(client_public_key),
+    ).values_list('id', flat = True).first()
+    if client_id is None:
+        return []
+
+    claimed_ids = list(
+        PendingResponse.objects.select_for_update(skip_locked = True).filter(
+            client_id   = client_id,
+            queue       = response_type.name,
+            delivered   = False,
+        ).order_by('created_at', 'id').values_list('id', flat = True)[:batch_size]
+    )
+    if len(claimed_ids) == 0:
+        return []
+
+    pending_responses = PendingResponse.objects.select_related(
+        'client',
+        'subtask',
+        *['subtask__' + field_name + '__payload' for field_name in Subtask.MESSAGE_FOR_FIELD],
+    ).prefetch_related(
+        Prefetch('payments', queryset = PaymentInfo.objects.order_by('id')),
+    ).filter(
+        pk__in = claimed_ids,
+    ).order_by('created_at', 'id')
+
+    delivered_responses = []
+    failed_response_ids = []
+    for pending_response in pending_responses:
+        assert pending_response.response_type_enum in set(PendingResponse.ResponseType)
+
+        if pending_response.response_data is not None:
+            response_to_client = deserialize_message_with_new_header(pending_response.response_data.tobytes())
         else:
-            ack_report_computed_task = message.AckReportComputedTask(
-                report_computed_task=deserialize_message(pending_response.subtask.report_computed_task.data.tobytes()),
-            )
-            sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
-            response_to_client = message.concents.ForceReportComputedTaskResponse(
-                ack_report_computed_task=ack_report_computed_task,
-                reason=message.concents.ForceReportComputedTaskResponse.REASON.ConcentAck,
-            )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
-
-    elif pending_response.response_type == PendingResponse.ResponseType.VerdictReportComputedTask.name:  # pylint: disable=no-member
-        ack_report_computed_task = message.AckReportComputedTask(
-            report_computed_task=deserialize_message(pending_response.subtask.report_computed_task.data.tobytes()),
-        )
-        sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
-        report_computed_task     = deserialize_message(pending_response.subtask.report_computed_task.data.tobytes())
-        response_to_client = message.concents.VerdictReportComputedTask(
-            ack_report_computed_task    = ack_report_computed_task,
-            force_report_computed_task  = message.concents.ForceReportComputedTask(
-                report_computed_task = report_computed_task,
-            ),
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
-
-    elif pending_response.response_type == PendingResponse.ResponseType.ForceGetTaskResultRejected.name:  # pylint: disable=no-member
-        report_computed_task = deserialize_message(pending_response.subtask.report_computed_task.data.tobytes())
-        response_to_client = message.concents.ForceGetTaskResultRejected(
-            force_get_task_result = message.concents.ForceGetTaskResult(
-                report_computed_task = report_computed_task,
+            payments = pending_response.payments.all()
+            response_to_client = create_response_to_client(
+                response_type       = pending_response.response_type_enum,
+                subtask             = pending_response.subtask,
+                client_public_key   = client_public_key,
+                payment_info        = (
+                    payments[len(payments) - 1]
+                    if pending_response.response_type_enum == PendingResponse.ResponseType.ForcePaymentCommitted and len(payments) > 0 else
+                    None
+                ),
             )
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
-
-    elif pending_response.response_type == PendingResponse.ResponseType.ForceGetTaskResultFailed.name:  # pylint: disable=no-member
-        task_to_compute = deserialize_message(pending_response.subtask.task_to_compute.data.tobytes())
-        response_to_client = message.concents.ForceGetTaskResultFailed(
-            task_to_compute = task_to_compute,
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
-
-    elif pending_response.response_type == PendingResponse.ResponseType.ForceGetTaskResultUpload.name:  # pylint: disable=no-member
-        report_computed_task    = deserialize_message(pending_response.subtask.report_computed_task.data.tobytes())
-        file_transfer_token     = create_file_transfer_token_for_golem_client(
-            report_computed_task,
-            client_public_key,
-            FileTransferToken.Operation.upload,
-        )
 
-        response_to_client = message.concents.ForceGetTaskResultUpload(
-            file_transfer_token     = file_transfer_token,
-            force_get_task_result   = message.concents.ForceGetTaskResult(
-                report_computed_task = report_computed_task,
+        if response_to_client is None:
+            logging.log_pending_response_not_built(
+                logger,
+                pending_response.pk,
+                pending_response.response_type,
+                pending_response.queue,
+                pending_response.subtask.subtask_id if pending_response.subtask is not None else None,
+                client_public_key,
             )
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
-
-    elif pending_response.response_type == PendingResponse.ResponseType.ForceGetTaskResultDownload.name:  # pylint: disable=no-member
-        report_computed_task    = deserialize_message(pending_response.subtask.report_computed_task.data.tobytes())
-        file_transfer_token     = create_file_transfer_token_for_golem_client(
-            report_computed_task,
-            client_public_key,
-            FileTransferToken.Operation.download,
-        )
+            failed_response_ids.append(pending_response.pk)
+            continue
 
-        response_to_client = message.concents.ForceGetTaskResultDownload(
-            file_transfer_token     = file_transfer_token,
-            force_get_task_result   = message.concents.ForceGetTaskResult(
-                report_computed_task = report_computed_task,
-            )
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
+        delivered_responses.append((pending_response, response_to_client))
 
-    elif pending_response.response_type == PendingResponse.ResponseType.ForceSubtaskResults.name:  # pylint: disable=no-member
-        ack_report_computed_task = deserialize_message(pending_response.subtask.ack_report_computed_task.data.tobytes())
-        response_to_client = message.concents.ForceSubtaskResults(
-            ack_report_computed_task = ack_report_computed_task
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
+    if len(failed_response_ids) > 0:
+        PendingResponse.objects.filter(
+            pk__in = failed_response_ids,
+        ).update(delivered = True, failed = True)
 
-    elif pending_response.response_type == PendingResponse.ResponseType.SubtaskResultsSettled.name:  # pylint: disable=no-member
-        task_to_compute = deserialize_message(pending_response.subtask.task_to_compute.data.tobytes())
-        response_to_client = message.concents.SubtaskResultsSettled(
-            task_to_compute = task_to_compute,
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
+    if len(delivered_responses) == 0:
+        return []
 
-    elif pending_response.response_type == PendingResponse.ResponseType.ForceSubtaskResultsResponse.name:  # pylint: disable=no-member
-        subtask_results_accepted = deserialize_message(pending_response.subtask.subtask_results_accepted.data.tobytes())
-        response_to_client = message.concents.ForceSubtaskResultsResponse(
-            subtask_results_accepted = subtask_results_accepted,
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
+    PendingResponse.objects.filter(
+        pk__in = [pending_response.pk for (pending_response, _response_to_client) in delivered_responses],
+    ).update(delivered = True)
 
-    elif pending_response.response_type == PendingResponse.ResponseType.SubtaskResultsRejected.name:  # pylint: disable=no-member
-        subtask_results_rejected = deserialize_message(pending_response.subtask.subtask_results_rejected.data.tobytes())
-        response_to_client = message.concents.ForceSubtaskResultsResponse(
-            subtask_results_rejected = subtask_results_rejected,
-        )
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
-
-    elif pending_response.response_type == PendingResponse.ResponseType.ForcePaymentCommitted.name:  # pylint: disable=no-member
-        payment_message = pending_response.payments.filter(
-            pending_response__pk = pending_response.pk
-        ).order_by('id').last()
-
-        response_to_client = message.concents.ForcePaymentCommitted(
-            payment_ts              = datetime.datetime.timestamp(payment_message.payment_ts),
-            task_owner_key          = payment_message.task_owner_key,
-            provider_eth_account    = payment_message.provider_eth_account,
-            amount_paid             = payment_message.amount_paid,
-            amount_pending          = payment_message.amount_pending,
+    for (pending_response, response_to_client) in delivered_responses:
+        logging.log_receive_message_from_database(
+            logger,
+            response_to_client,
+            pending_response.client.public_key_bytes,
+            pending_response.response_type,
+            pending_response.queue,
         )
-        if payment_message.recipient_type == PaymentInfo.RecipientType.Requestor.name:  # pylint: disable=no-member
-            response_to_client.recipient_type = message.concents.ForcePaymentCommitted.Actor.Requestor
-        elif payment_message.recipient_type == PaymentInfo.RecipientType.Provider.name:  # pylint: disable=no-member
-            response_to_client.recipient_type = message.concents.ForcePaymentCommitted.Actor.Provider
-        else:
-            return None
-        mark_message_as_delivered_and_log(pending_response, response_to_client)
-        return response_to_client
-
-    else:
-        return None
-
-
-def mark_message_as_delivered_and_log(undelivered_message, log_message):
-    undelivered_message.delivered = True
-    undelivered_message.full_clean()
-    undelivered_message.save()
-
-    logging.log_receive_message_from_database(
-        logger,
-        log_message,
-        undelivered_message.client.public_key_bytes,
-        undelivered_message.response_type,
-        undelivered_message.queue
-    )
+    return [response_to_client for (_pending_response, response_to_client) in delivered_responses]
 
 
 def update_subtask(
@@ -1104,7 +1023,7 @@ def update_subtask(
     )
 
     # Concent should send e-mail notification when the last active subtask switches to a passive state.
-    if config.SOFT_SHUTDOWN_MODE is True and not Subtask.objects.filter(state__in=Subtask.ACTIVE_STATES).exists():
+    if is_soft_shutdown_mode_enabled() and ActiveSubtaskCounter.get_active_subtask_count() == 0:
         mail_admins(
             subject = 'Concent soft shutdown complete',
             message = (
@@ -1147,7 +1066,7 @@ def set_subtask_messages(
         if (
             message_to_store is not None and
             (
-                getattr(subtask, message_name) is None or
+                getattr(subtask, f'{message_name}_id') is None or
                 message_to_store.__class__ in Subtask.MESSAGE_REPLACEMENT_FOR_STATE[subtask.state_enum]
             )
         ):
@@ -1158,6 +1077,7 @@ def set_subtask_messages(
                 subtask.subtask_id,
             )
             setattr(subtask, message_name, stored_message)
+            set_subtask_protocol_fields(subtask, message_to_store)
             logging.log_stored_message_added_to_subtask(
                 logger,
                 subtask.task_id,
@@ -1169,6 +1089,36 @@ def set_subtask_messages(
             )
 
 
+def set_subtask_protocol_fields(
+    subtask:        Subtask,
+    golem_message:  Union[message.TaskToCompute, message.ReportComputedTask, message.base.Message],
+):
+    """
+    Copies values needed to process the subtask from TaskToCompute or ReportComputedTask to subtask fields.
+    Does nothing for other message types.
+    """
+    if isinstance(golem_message, message.TaskToCompute):
+        subtask.computation_deadline        = parse_timestamp_to_utc_datetime(golem_message.compute_task_def['deadline'])
+        subtask.task_to_compute_timestamp   = parse_timestamp_to_utc_datetime(golem_message.timestamp)
+        subtask.price                       = golem_message.price
+        subtask.source_package_size         = golem_message.size
+        subtask.source_package_hash         = golem_message.package_hash
+        if golem_message.requestor_ethereum_public_key is not None:
+            subtask.requestor_ethereum_address = golem_message.requestor_ethereum_address
+        if golem_message.provider_ethereum_public_key is not None:
+            subtask.provider_ethereum_address = golem_message.provider_ethereum_address
+
+    elif isinstance(golem_message, message.ReportComputedTask):
+        subtask.result_package_size = golem_message.size
+        subtask.result_package_hash = golem_message.package_hash
+        if isinstance(golem_message.size, int) and golem_message.size > 0:
+            subtask.maximum_download_time       = calculate_maximum_download_time(
+                golem_message.size,
+                settings.MINIMUM_UPLOAD_RATE,
+            )
+            subtask.subtask_verification_time   = calculate_subtask_verification_time(golem_message)
+
+
 def store_or_update_subtask(
     task_id:                        str,
     subtask_id:                     str,
@@ -1185,18 +1135,17 @@ def store_or_update_subtask(
     subtask_results_rejected:       message.tasks.SubtaskResultsRejected = None,
 ):
     try:
-        subtask = Subtask.objects.get(
+        subtask = get_subtask_queryset(
+            messages_without_data   = ['task_to_compute'],
+        ).get(
             subtask_id = subtask_id,
         )
     except Subtask.DoesNotExist:
         subtask = None
 
     if subtask is not None:
-        if task_to_compute is not None and subtask.task_to_compute is not None:
-            validate_all_messages_identical([
-                task_to_compute,
-                deserialize_message(subtask.task_to_compute.data.tobytes()),
-            ])
+        if task_to_compute is not None and subtask.task_to_compute_id is not None:
+            validate_message_identical_to_stored(task_to_compute, subtask.task_to_compute)
         subtask = update_subtask(
             subtask                         = subtask,
             state                           = state,
@@ -1238,7 +1187,8 @@ def store_message(
     stored_message = StoredMessage(
         type        = golem_message.TYPE,
         timestamp   = message_timestamp,
-        data        = copy.copy(golem_message).serialize(),
+        payload     = MessagePayload.objects.get_or_create_for_message_bytes(copy.copy(golem_message).serialize()),
+        fingerprint = get_message_fingerprint(golem_message),
         task_id     = task_id,
         subtask_id  = subtask_id,
     )
@@ -1306,7 +1256,7 @@ def handle_send_subtask_results_verify(
             error_code=ErrorCode.QUEUE_SUBTASK_STATE_TRANSITION_NOT_ALLOWED,
         )
 
-    if not core.payments.base.is_account_status_positive(  # pylint: disable=no-value-for-parameter
+    if not core.payments.base.is_account_status_positive(
         client_eth_address=task_to_compute.requestor_ethereum_address,
         pending_value=task_to_compute.price,
     ):
@@ -1397,7 +1347,3 @@ def is_message_recieved_in_wrong_state(subtask_id, forbidden_states):
         subtask_id=subtask_id,
         state__in=forbidden_states
     ).exists()
-
-
-def are_items_unique(items: list):
-    return len(items) == len(set(items))
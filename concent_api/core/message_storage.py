@@ -0,0 +1,54 @@
+from django.db.models import Count
+from django.db.models import Sum
+from django.db.models.functions import Length
+
+from core.models import MessagePayload
+from core.models import StoredMessage
+
+
+def move_stored_messages_to_payloads(batch_size: int) -> int:
+    """
+    Moves serialized data of at most `batch_size` stored messages kept inline to deduplicated, compressed payloads.
+    Must be called in a transaction. Messages claimed by a concurrent call are skipped.
+    Returns the number of messages moved.
+    """
+    stored_messages = list(
+        StoredMessage.objects.select_for_update(skip_locked = True).filter(
+            payload = None,
+        ).order_by('id')[:batch_size]
+    )
+    for stored_message in stored_messages:
+        stored_message.payload = MessagePayload.objects.get_or_create_for_message_bytes(bytes(stored_message.data))
+        stored_message.data = None
+        stored_message.save(update_fields = ['payload', 'data'])
+    return len(stored_messages)
+
+
+def get_stored_message_space_report() -> dict:
+    """
+    Returns numbers of stored messages and payloads and compares the size serialized messages would take
+    if each of them was stored in full with the size they actually take.
+    """
+    inline_messages = StoredMessage.objects.filter(payload = None).aggregate(
+        count   = Count('id'),
+        size    = Sum(Length('data')),
+    )
+    messages_in_payloads = StoredMessage.objects.exclude(payload = None).aggregate(
+        count   = Count('id'),
+        size    = Sum('payload__size'),
+    )
+    payloads = MessagePayload.objects.aggregate(
+        count   = Count('digest'),
+        size    = Sum(Length('data')),
+    )
+
+    full_size   = (inline_messages['size'] or 0) + (messages_in_payloads['size'] or 0)
+    stored_size = (inline_messages['size'] or 0) + (payloads['size'] or 0)
+    return {
+        'inline_messages':          inline_messages['count'],
+        'messages_in_payloads':     messages_in_payloads['count'],
+        'payloads':                 payloads['count'],
+        'full_size':                full_size,
+        'stored_size':              stored_size,
+        'saved_size':               full_size - stored_size,
+    }
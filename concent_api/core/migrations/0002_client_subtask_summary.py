@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Min
+from django.db.models import Q
+
+
+ACTIVE_STATE_NAMES = [
+    'FORCING_REPORT',
+    'FORCING_RESULT_TRANSFER',
+    'FORCING_ACCEPTANCE',
+    'ADDITIONAL_VERIFICATION',
+    'VERIFICATION_FILE_TRANSFER',
+]
+
+
+def update_client_subtask_summaries(apps, schema_editor):
+    Client = apps.get_model('core', 'Client')
+    Subtask = apps.get_model('core', 'Subtask')
+    database_alias = schema_editor.connection.alias
+
+    for client in Client.objects.using(database_alias).all():
+        client_subtasks = Subtask.objects.using(database_alias).filter(Q(requestor = client) | Q(provider = client))
+        client.next_deadline = client_subtasks.filter(
+            state__in = ACTIVE_STATE_NAMES,
+        ).aggregate(Min('next_deadline'))['next_deadline__min']
+        client.forcing_result_transfer_subtask_count = client_subtasks.filter(
+            requestor = client,
+            state     = 'FORCING_RESULT_TRANSFER',
+        ).count()
+        client.save(update_fields = ['next_deadline', 'forcing_result_transfer_subtask_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='forcing_result_transfer_subtask_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='next_deadline',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(update_client_subtask_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import datetime
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+from golem_messages import message
+from golem_messages.helpers import maximum_download_time
+from golem_messages.helpers import subtask_verification_time
+
+
+# The functions below are frozen copies of the application code that fills these fields for new subtasks.
+# Migrations must not import application code because it changes together with the models.
+
+def deserialize(data):
+    return message.Message.deserialize(bytes(data), None, check_time=False)
+
+
+def to_utc_datetime(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def calculate_maximum_download_time(size, rate):
+    if settings.CUSTOM_PROTOCOL_TIMES:
+        return settings.DOWNLOAD_LEADIN_TIME + int(math.ceil(size / (rate << 10)))
+    return int(maximum_download_time(size, rate).total_seconds())
+
+
+def calculate_subtask_verification_time(report_computed_task):
+    if settings.CUSTOM_PROTOCOL_TIMES:
+        task_to_compute = report_computed_task.task_to_compute
+        subtask_timeout = task_to_compute.compute_task_def['deadline'] - task_to_compute.timestamp
+        return int(
+            (4 * settings.CONCENT_MESSAGING_TIME) +
+            (3 * maximum_download_time(size=report_computed_task.size).total_seconds()) +
+            (0.5 * subtask_timeout)
+        )
+    return int(subtask_verification_time(report_computed_task).total_seconds())
+
+
+def copy_protocol_fields_from_stored_messages(apps, schema_editor):
+    Subtask = apps.get_model('core', 'Subtask')
+    database_alias = schema_editor.connection.alias
+
+    subtasks = Subtask.objects.using(database_alias).select_related('task_to_compute', 'report_computed_task')
+    for subtask in subtasks.iterator():
+        task_to_compute         = deserialize(subtask.task_to_compute.data)
+        report_computed_task    = deserialize(subtask.report_computed_task.data)
+
+        subtask.computation_deadline        = to_utc_datetime(task_to_compute.compute_task_def['deadline'])
+        subtask.task_to_compute_timestamp   = to_utc_datetime(task_to_compute.timestamp)
+        subtask.price                       = task_to_compute.price
+        subtask.source_package_size         = task_to_compute.size
+        subtask.source_package_hash         = task_to_compute.package_hash
+        if task_to_compute.requestor_ethereum_public_key is not None:
+            subtask.requestor_ethereum_address = task_to_compute.requestor_ethereum_address
+        if task_to_compute.provider_ethereum_public_key is not None:
+            subtask.provider_ethereum_address = task_to_compute.provider_ethereum_address
+
+        subtask.result_package_size = report_computed_task.size
+        subtask.result_package_hash = report_computed_task.package_hash
+        if isinstance(report_computed_task.size, int) and report_computed_task.size > 0:
+            subtask.maximum_download_time       = calculate_maximum_download_time(
+                report_computed_task.size,
+                settings.MINIMUM_UPLOAD_RATE,
+            )
+            subtask.subtask_verification_time   = calculate_subtask_verification_time(report_computed_task)
+
+        subtask.save(update_fields = [
+            'computation_deadline',
+            'task_to_compute_timestamp',
+            'price',
+            'requestor_ethereum_address',
+            'provider_ethereum_address',
+            'source_package_size',
+            'source_package_hash',
+            'result_package_size',
+            'result_package_hash',
+            'maximum_download_time',
+            'subtask_verification_time',
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_pendingresponse_response_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subtask',
+            name='computation_deadline',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='task_to_compute_timestamp',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=0, max_digits=78, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='requestor_ethereum_address',
+            field=models.CharField(blank=True, max_length=42, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='provider_ethereum_address',
+            field=models.CharField(blank=True, max_length=42, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='source_package_size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='source_package_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='result_package_size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='result_package_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='maximum_download_time',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='subtask_verification_time',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(copy_protocol_fields_from_stored_messages, migrations.RunPython.noop),
+    ]
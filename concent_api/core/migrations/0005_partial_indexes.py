@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+ACTIVE_STATES_PREDICATE = (
+    "state IN ('FORCING_REPORT', 'FORCING_RESULT_TRANSFER', 'FORCING_ACCEPTANCE', "
+    "'ADDITIONAL_VERIFICATION', 'VERIFICATION_FILE_TRANSFER')"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_subtask_protocol_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='storedmessage',
+            name='subtask_id',
+            field=models.CharField(blank=True, db_index=True, max_length=128, null=True),
+        ),
+        migrations.AlterField(
+            model_name='storedmessage',
+            name='task_id',
+            field=models.CharField(blank=True, db_index=True, max_length=128, null=True),
+        ),
+        # Pending responses are read by client and queue in the order of creation. Delivered responses are never
+        # read again so leaving them out keeps the index small no matter how large the table grows.
+        migrations.RunSQL(
+            'CREATE INDEX core_pendingresponse_undelivered_idx '
+            'ON core_pendingresponse (client_id, queue, created_at) WHERE NOT delivered',
+            'DROP INDEX core_pendingresponse_undelivered_idx',
+        ),
+        # Timed out subtasks are looked for among active subtasks, either all of them or those of a single client.
+        migrations.RunSQL(
+            'CREATE INDEX core_subtask_active_next_deadline_idx '
+            'ON core_subtask (next_deadline) WHERE ' + ACTIVE_STATES_PREDICATE,
+            'DROP INDEX core_subtask_active_next_deadline_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX core_subtask_active_requestor_idx '
+            'ON core_subtask (requestor_id, next_deadline) WHERE ' + ACTIVE_STATES_PREDICATE,
+            'DROP INDEX core_subtask_active_requestor_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX core_subtask_active_provider_idx '
+            'ON core_subtask (provider_id, next_deadline) WHERE ' + ACTIVE_STATES_PREDICATE,
+            'DROP INDEX core_subtask_active_provider_idx',
+        ),
+        # Requestor's subtasks waiting for the result upload are checked on every request made by the requestor.
+        migrations.RunSQL(
+            'CREATE INDEX core_subtask_forcing_result_transfer_idx '
+            "ON core_subtask (requestor_id) WHERE state = 'FORCING_RESULT_TRANSFER'",
+            'DROP INDEX core_subtask_forcing_result_transfer_idx',
+        ),
+    ]
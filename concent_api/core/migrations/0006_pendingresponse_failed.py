@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingresponse',
+            name='failed',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_pendingresponse_failed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_type', models.CharField(choices=[('BATCH', 'batch'), ('FORCE', 'force')], max_length=32)),
+                ('payer_address', models.CharField(max_length=42)),
+                ('payee_address', models.CharField(max_length=42)),
+                ('amount', models.DecimalField(decimal_places=0, max_digits=78)),
+                ('closure_time', models.BigIntegerField()),
+                ('confirmed', models.BooleanField(default=True)),
+                ('block_number', models.BigIntegerField()),
+                ('block_timestamp', models.BigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PaymentEventIndexState',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_confirmed_block', models.BigIntegerField()),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='paymentevent',
+            index=models.Index(fields=['payer_address', 'payee_address', 'transaction_type', 'block_timestamp'], name='core_paymentevent_block_idx'),
+        ),
+    ]
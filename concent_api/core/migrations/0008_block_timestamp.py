@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_payment_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockTimestamp',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.BigIntegerField(unique=True)),
+                ('timestamp', models.BigIntegerField(db_index=True)),
+            ],
+        ),
+    ]
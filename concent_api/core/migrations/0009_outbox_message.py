@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_block_timestamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ForcePayment', 'force_payment'), ('CeleryTask', 'celery_task')], max_length=32)),
+                ('idempotency_key', models.CharField(max_length=255, unique=True)),
+                ('payload', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('payment_attempted_at', models.DateTimeField(blank=True, null=True)),
+                ('needs_manual_resolution', models.BooleanField(default=False)),
+            ],
+        ),
+        # The relay only ever looks for messages that have not been sent yet.
+        migrations.RunSQL(
+            'CREATE INDEX core_outboxmessage_unsent_idx '
+            'ON core_outboxmessage (next_attempt_at) WHERE sent_at IS NULL',
+            'DROP INDEX core_outboxmessage_unsent_idx',
+        ),
+    ]
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_outbox_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubtaskPayment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requestor_eth_address', models.CharField(max_length=42)),
+                ('provider_eth_address', models.CharField(max_length=42)),
+                ('value', models.DecimalField(decimal_places=0, max_digits=78)),
+                ('payment_ts', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('paid_value', models.DecimalField(blank=True, decimal_places=0, max_digits=78, null=True)),
+                ('outbox_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='subtask_payments', to='core.OutboxMessage')),
+                ('subtask', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='payment', to='core.Subtask')),
+            ],
+        ),
+        # Payments waiting for aggregation are looked up by requestor and provider. Aggregated ones are never
+        # aggregated again so leaving them out keeps the index small.
+        migrations.RunSQL(
+            'CREATE INDEX core_subtaskpayment_unaggregated_idx '
+            'ON core_subtaskpayment (requestor_eth_address, provider_eth_address, created_at) '
+            'WHERE outbox_message_id IS NULL',
+            'DROP INDEX core_subtaskpayment_unaggregated_idx',
+        ),
+    ]
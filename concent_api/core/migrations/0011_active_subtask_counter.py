@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import zlib
+
+from django.db import migrations, models
+
+
+# Must match ACTIVE_SUBTASK_COUNTER_SHARDS in core.constants at the time of the migration.
+ACTIVE_SUBTASK_COUNTER_SHARDS = 16
+
+ACTIVE_STATE_NAMES = [
+    'FORCING_REPORT',
+    'FORCING_RESULT_TRANSFER',
+    'FORCING_ACCEPTANCE',
+    'ADDITIONAL_VERIFICATION',
+    'VERIFICATION_FILE_TRANSFER',
+]
+
+
+def count_active_subtasks(apps, schema_editor):
+    ActiveSubtaskCounter = apps.get_model('core', 'ActiveSubtaskCounter')
+    Subtask = apps.get_model('core', 'Subtask')
+    database_alias = schema_editor.connection.alias
+
+    counts = [0] * ACTIVE_SUBTASK_COUNTER_SHARDS
+    for subtask_id in Subtask.objects.using(database_alias).filter(state__in = ACTIVE_STATE_NAMES).values_list('subtask_id', flat = True).iterator():
+        counts[zlib.crc32(subtask_id.encode()) % ACTIVE_SUBTASK_COUNTER_SHARDS] += 1
+    ActiveSubtaskCounter.objects.using(database_alias).bulk_create([
+        ActiveSubtaskCounter(shard = shard, count = count)
+        for shard, count in enumerate(counts)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_subtask_payment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActiveSubtaskCounter',
+            fields=[
+                ('shard', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_active_subtasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_active_subtask_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessagePayload',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('compression', models.CharField(choices=[('NONE', 'none'), ('ZLIB', 'zlib')], max_length=32)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='storedmessage',
+            name='data',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='storedmessage',
+            name='payload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='stored_messages', to='core.MessagePayload'),
+        ),
+        # Existing messages are moved to payloads in batches by the `move_stored_messages_to_payloads` command,
+        # which only ever looks for messages that have not been moved yet.
+        migrations.RunSQL(
+            'CREATE INDEX core_storedmessage_inline_idx '
+            'ON core_storedmessage (id) WHERE payload_id IS NULL',
+            'DROP INDEX core_storedmessage_inline_idx',
+        ),
+    ]
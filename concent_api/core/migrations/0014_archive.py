@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import utils.fields
+
+
+PASSIVE_STATES_PREDICATE = "state IN ('REPORTED', 'RESULT_UPLOADED', 'REJECTED', 'ACCEPTED', 'FAILED')"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_storedmessage_fingerprint'),
+    ]
+
+    operations = [
+        # Subtasks that already exist get the time of the migration, so the retention period starts from it.
+        migrations.AddField(
+            model_name='subtask',
+            name='state_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubtask',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archive_period', models.DateField(db_index=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('task_id', models.CharField(db_index=True, max_length=128)),
+                ('subtask_id', models.CharField(db_index=True, max_length=128)),
+                ('requestor_public_key', utils.fields.Base64Field(max_length=64)),
+                ('provider_public_key', utils.fields.Base64Field(max_length=64)),
+                ('state', models.CharField(choices=[('FORCING_REPORT', 'forcing_report'), ('REPORTED', 'reported'), ('FORCING_RESULT_TRANSFER', 'forcing_result_transfer'), ('RESULT_UPLOADED', 'result_uploaded'), ('FORCING_ACCEPTANCE', 'forcing_acceptance'), ('REJECTED', 'rejected'), ('VERIFICATION_FILE_TRANSFER', 'verification_file_transfer'), ('ADDITIONAL_VERIFICATION', 'additional_verification'), ('ACCEPTED', 'accepted'), ('FAILED', 'failed')], max_length=32)),
+                ('state_changed_at', models.DateTimeField()),
+                ('document', models.BinaryField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedPendingResponse',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archive_period', models.DateField(db_index=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('response_type', models.CharField(choices=[('ForceReportComputedTask', 'ForceReportComputedTask'), ('ForceReportComputedTaskResponse', 'ForceReportComputedTaskResponse'), ('VerdictReportComputedTask', 'VerdictReportComputedTask'), ('ForceGetTaskResultRejected', 'ForceGetTaskResultRejected'), ('ForceGetTaskResultFailed', 'ForceGetTaskResultFailed'), ('ForceGetTaskResultUpload', 'ForceGetTaskResultUpload'), ('ForceGetTaskResultDownload', 'ForceGetTaskResultDownload'), ('ForceSubtaskResults', 'ForceSubtaskResults'), ('SubtaskResultsSettled', 'SubtaskResultsSettled'), ('ForceSubtaskResultsResponse', 'ForceSubtaskResultsResponse'), ('SubtaskResultsRejected', 'SubtaskResultsRejected'), ('ForcePaymentCommitted', 'ForcePaymentCommitted')], max_length=32)),
+                ('queue', models.CharField(choices=[('Receive', 'receive'), ('ReceiveOutOfBand', 'receive_out_of_band')], max_length=32)),
+                ('client_public_key', utils.fields.Base64Field(max_length=64)),
+                ('created_at', models.DateTimeField()),
+                ('delivered', models.BooleanField()),
+                ('subtask_id', models.CharField(blank=True, db_index=True, max_length=128, null=True)),
+                ('document', models.BinaryField()),
+            ],
+        ),
+        # Subtasks due for archiving are looked for among passive subtasks, oldest first.
+        migrations.RunSQL(
+            'CREATE INDEX core_subtask_passive_state_changed_at_idx '
+            'ON core_subtask (state_changed_at) WHERE ' + PASSIVE_STATES_PREDICATE,
+            'DROP INDEX core_subtask_passive_state_changed_at_idx',
+        ),
+        # Stale pending responses are looked for among undelivered ones, oldest first.
+        migrations.RunSQL(
+            'CREATE INDEX core_pendingresponse_undelivered_created_at_idx '
+            'ON core_pendingresponse (created_at) WHERE NOT delivered',
+            'DROP INDEX core_pendingresponse_undelivered_created_at_idx',
+        ),
+    ]
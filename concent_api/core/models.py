@@ -1,42 +1,166 @@
+from typing import Iterable
+from typing import Optional
 import base64
 import datetime
+import hashlib
+import json
+import zlib
 
+from django.conf            import settings
 from django.core.validators import ValidationError
+from django.db              import IntegrityError
+from django.db              import router
+from django.db              import transaction
+from django.db.models       import BigIntegerField
 from django.db.models       import BinaryField
 from django.db.models       import BooleanField
 from django.db.models       import CharField
+from django.db.models       import DateField
 from django.db.models       import DateTimeField
+from django.db.models       import DecimalField
+from django.db.models       import F
 from django.db.models       import IntegerField
 from django.db.models       import ForeignKey
+from django.db.models       import Index
 from django.db.models       import Model
+from django.db.models       import PROTECT
 from django.db.models       import OneToOneField
 from django.db.models       import PositiveSmallIntegerField
 from django.db.models       import Manager
+from django.db.models       import Min
+from django.db.models       import PositiveIntegerField
+from django.db.models       import Q
+from django.db.models       import Sum
+from django.db.models       import TextField
+from django.db.models       import Value
+from django.db.models.functions import Least
 from django.utils           import timezone
 
-from constance              import config
 from golem_messages         import message
 
+from core.config_cache      import is_soft_shutdown_mode_enabled
 from core.exceptions        import ConcentInSoftShutdownMode
 from utils.fields           import Base64Field
 from utils.fields           import ChoiceEnum
 
+from .constants             import ACTIVE_SUBTASK_COUNTER_SHARDS
 from .constants             import TASK_OWNER_KEY_LENGTH
 from .constants             import ETHEREUM_ADDRESS_LENGTH
 from .constants             import GOLEM_PUBLIC_KEY_LENGTH
+from .constants             import MESSAGE_FINGERPRINT_LENGTH
 from .constants             import MESSAGE_TASK_ID_MAX_LENGTH
+from .constants             import PACKAGE_HASH_MAX_LENGTH
+from .constants             import PRICE_MAX_DIGITS
+
+
+class MessagePayloadManager(Manager):
+
+    def get_or_create_for_message_bytes(self, message_bytes: bytes) -> 'MessagePayload':
+        """
+        Returns the payload holding given serialized message. Creates it, compressed as set in
+        STORED_MESSAGE_COMPRESSION, only if the same bytes are not stored yet.
+        """
+        digest = hashlib.sha256(message_bytes).hexdigest()
+        # The caller already has the bytes so there's no need to load them again.
+        payload = self.defer('data').filter(digest = digest).first()
+        if payload is not None:
+            return payload
+
+        (compression, data) = MessagePayload.compress(
+            message_bytes,
+            MessagePayload.Compression[settings.STORED_MESSAGE_COMPRESSION],
+        )
+        payload = self.model(
+            digest      = digest,
+            compression = compression.name,
+            data        = data,
+            size        = len(message_bytes),
+        )
+        payload.full_clean(validate_unique = False)
+        try:
+            # Savepoint lets the current transaction go on if a concurrent one has stored the same bytes first.
+            with transaction.atomic(using = router.db_for_write(self.model)):
+                payload.save(force_insert = True)
+        except IntegrityError:
+            return self.defer('data').get(digest = digest)
+        return payload
+
+
+class MessagePayload(Model):
+    """
+    Serialized Golem message stored once no matter how many StoredMessages hold it. Identified by SHA-256 digest
+    of the serialized bytes and kept compressed if that makes it smaller.
+    """
+
+    objects = MessagePayloadManager()
+
+    class Compression(ChoiceEnum):
+        NONE = 'none'
+        ZLIB = 'zlib'
+
+    digest          = CharField(max_length = 64, primary_key = True)
+    compression     = CharField(max_length = 32, choices = Compression.choices())
+    data            = BinaryField()
+
+    # Size of the serialized message before compression.
+    size            = PositiveIntegerField()
+
+    @property
+    def compression_enum(self):
+        return MessagePayload.Compression[self.compression]
+
+    @property
+    def message_bytes(self) -> bytes:
+        if self.compression_enum == MessagePayload.Compression.ZLIB:
+            return zlib.decompress(self.data)
+        return bytes(self.data)
+
+    @staticmethod
+    def compress(message_bytes: bytes, compression: 'MessagePayload.Compression') -> tuple:
+        """
+        Returns compression actually used and compressed bytes. Falls back to no compression if compressed bytes
+        would not be smaller, which is the case for short messages.
+        """
+        if compression == MessagePayload.Compression.ZLIB:
+            compressed_bytes = zlib.compress(message_bytes)
+            if len(compressed_bytes) < len(message_bytes):
+                return (MessagePayload.Compression.ZLIB, compressed_bytes)
+        return (MessagePayload.Compression.NONE, message_bytes)
 
 
 class StoredMessage(Model):
     type        = PositiveSmallIntegerField()
     timestamp   = DateTimeField()
-    data        = BinaryField()
-    task_id     = CharField(max_length = MESSAGE_TASK_ID_MAX_LENGTH, null = True, blank = True)
-    subtask_id  = CharField(max_length = MESSAGE_TASK_ID_MAX_LENGTH, null = True, blank = True)
+
+    # Serialized message is kept either in `payload` or, for messages stored before payloads were introduced
+    # and not moved yet by the `move_stored_messages_to_payloads` command, in `data`. Messages not moved yet
+    # are found through a partial index (see 0012_message_payload).
+    data        = BinaryField(blank = True, null = True)
+    payload     = ForeignKey(MessagePayload, blank = True, null = True, on_delete = PROTECT, related_name = 'stored_messages')
+
+    # Fingerprint of the message (see `core.utils.get_message_fingerprint()`). Lets Concent check that a client
+    # sent the same message again without loading and deserializing the stored one. NULL for messages stored
+    # before fingerprints were introduced.
+    fingerprint = CharField(max_length = MESSAGE_FINGERPRINT_LENGTH, null = True, blank = True)
+
+    task_id     = CharField(max_length = MESSAGE_TASK_ID_MAX_LENGTH, null = True, blank = True, db_index = True)
+    subtask_id  = CharField(max_length = MESSAGE_TASK_ID_MAX_LENGTH, null = True, blank = True, db_index = True)
 
     def __str__(self):
         return 'StoredMessage #{}, type:{}, {}'.format(self.id, self.type, self.timestamp)
 
+    @property
+    def data_bytes(self) -> bytes:
+        if self.payload_id is not None:
+            return self.payload.message_bytes
+        return bytes(self.data)
+
+    def clean(self):
+        super().clean()
+
+        if (self.data is None) == (self.payload_id is None):
+            raise ValidationError('Exactly one of data and payload must be set.')
+
 
 class ClientManager(Manager):
 
@@ -65,6 +189,70 @@ class Client(Model):
 
     public_key = Base64Field(max_length = GOLEM_PUBLIC_KEY_LENGTH, unique = True)
 
+    # The earliest next_deadline among active subtasks in which the client is either the requestor or the provider.
+    # NULL if there are no such subtasks. Lets views skip looking for timed out subtasks if nothing could have timed out.
+    next_deadline = DateTimeField(blank = True, null = True)
+
+    # The number of subtasks in FORCING_RESULT_TRANSFER state in which the client is the requestor.
+    # Lets views skip checking the upload status of results if there is nothing to check.
+    forcing_result_transfer_subtask_count = PositiveIntegerField(default = 0)
+
+    def update_subtask_summary(self):
+        """
+        Recomputes next_deadline and forcing_result_transfer_subtask_count from the current state of client's subtasks.
+        The caller is responsible for holding a lock on the client row.
+        """
+        self.next_deadline = self.get_earliest_subtask_deadline()
+        self.forcing_result_transfer_subtask_count = Subtask.objects.filter(
+            requestor = self,
+            state     = Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name,  # pylint: disable=no-member
+        ).count()
+        self.save(update_fields = ['next_deadline', 'forcing_result_transfer_subtask_count'])
+
+    def get_earliest_subtask_deadline(self) -> Optional[datetime.datetime]:
+        return Subtask.objects.filter(
+            Q(requestor = self) | Q(provider = self),
+            state__in = [state.name for state in Subtask.ACTIVE_STATES],
+        ).aggregate(Min('next_deadline'))['next_deadline__min']
+
+
+def _get_related_message_ids_for_states(related_messages_in_states: dict, states: Iterable) -> dict:
+    """
+    Turns a mapping of related message names to sets of states into a mapping of each state to a tuple of
+    (message name, ID attribute name) pairs of messages whose sets contain it.
+    """
+    return {
+        state: tuple(
+            (message_name, f'{message_name}_id')
+            for message_name, message_states in related_messages_in_states.items()
+            if state in message_states
+        )
+        for state in states
+    }
+
+
+class ActiveSubtaskCounter(Model):
+    """
+    Number of subtasks in active states, maintained by Subtask.save(). Split into ACTIVE_SUBTASK_COUNTER_SHARDS rows,
+    each counting subtasks with IDs hashed to it, so that concurrent transactions rarely lock the same row.
+    Lets Concent tell whether any subtasks are still active without looking at the subtask table.
+    """
+
+    shard = PositiveSmallIntegerField(primary_key = True)
+    count = IntegerField(default = 0)
+
+    @classmethod
+    def get_active_subtask_count(cls) -> int:
+        return cls.objects.aggregate(Sum('count'))['count__sum'] or 0
+
+    @classmethod
+    def add_to_count(cls, subtask_id: str, difference: int):
+        shard = zlib.crc32(subtask_id.encode()) % ACTIVE_SUBTASK_COUNTER_SHARDS
+        if cls.objects.filter(shard = shard).update(count = F('count') + difference) == 0:
+            # Rows are created by migration 0011_active_subtask_counter but may be missing from a flushed database.
+            cls.objects.get_or_create(shard = shard)
+            cls.objects.filter(shard = shard).update(count = F('count') + difference)
+
 
 class Subtask(Model):
     """
@@ -234,6 +422,17 @@ class Subtask(Model):
         for state in states
     }.issubset(set(SubtaskState))
 
+    # Related messages to check in each state, as (field name, ID attribute name) pairs. clean() checks only
+    # ID attributes so that stored messages, which hold whole serialized data, are never loaded just for that.
+    REQUIRED_RELATED_MESSAGE_IDS_FOR_STATE = _get_related_message_ids_for_states(
+        REQUIRED_RELATED_MESSAGES_IN_STATES,
+        SubtaskState,
+    )
+    UNSET_RELATED_MESSAGE_IDS_FOR_STATE = _get_related_message_ids_for_states(
+        UNSET_RELATED_MESSAGES_IN_STATES,
+        SubtaskState,
+    )
+
     # Defines in which states exist possibility to replace message nested in Subtask.
     MESSAGE_REPLACEMENT_FOR_STATE = {
         SubtaskState.FORCING_REPORT: {
@@ -275,6 +474,9 @@ class Subtask(Model):
             ('requestor', 'task_id'),
             ('requestor', 'subtask_id'),
         )
+        # Queries for timed out subtasks and subtask summaries of clients are served by partial indexes
+        # covering only subtasks in active states. Django cannot declare them so they're created in migration
+        # 0005_partial_indexes. They must be updated if the set of active states changes.
 
     task_id                     = CharField(max_length = MESSAGE_TASK_ID_MAX_LENGTH)
 
@@ -295,6 +497,27 @@ class Subtask(Model):
     # not get the information it expects from the client (a timeout). Must be NULL in a passive state.
     next_deadline               = DateTimeField(blank = True, null = True)
 
+    # Time of the last state change. Subtasks that have been in a passive state for ARCHIVE_RETENTION_TIME
+    # are moved to the archive.
+    state_changed_at            = DateTimeField(default = timezone.now)
+
+    # Values copied from TaskToCompute and ReportComputedTask, so that the subtask can be processed without
+    # deserializing stored messages. NULL only if the message did not contain the value.
+    computation_deadline        = DateTimeField(blank = True, null = True)
+    task_to_compute_timestamp   = DateTimeField(blank = True, null = True)
+    price                       = DecimalField(max_digits = PRICE_MAX_DIGITS, decimal_places = 0, blank = True, null = True)
+    requestor_ethereum_address  = CharField(max_length = ETHEREUM_ADDRESS_LENGTH, blank = True, null = True)
+    provider_ethereum_address   = CharField(max_length = ETHEREUM_ADDRESS_LENGTH, blank = True, null = True)
+    source_package_size         = BigIntegerField(blank = True, null = True)
+    source_package_hash         = CharField(max_length = PACKAGE_HASH_MAX_LENGTH, blank = True, null = True)
+    result_package_size         = BigIntegerField(blank = True, null = True)
+    result_package_hash         = CharField(max_length = PACKAGE_HASH_MAX_LENGTH, blank = True, null = True)
+
+    # Time periods (in seconds) derived from the messages, from which the protocol deadlines are computed.
+    # Calculated with the protocol time settings in effect when ReportComputedTask was stored.
+    maximum_download_time       = IntegerField(blank = True, null = True)
+    subtask_verification_time   = IntegerField(blank = True, null = True)
+
     # Related messages
     task_to_compute = OneToOneField(StoredMessage, related_name='subtasks_for_task_to_compute')
     report_computed_task = OneToOneField(StoredMessage, related_name='subtasks_for_report_computed_task')
@@ -306,6 +529,10 @@ class Subtask(Model):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._current_state_name = None
+        # State currently stored in the database. Unlike _current_state_name it is not updated by clean().
+        self._saved_state_name = None
+        # next_deadline currently stored in the database.
+        self._saved_next_deadline = None
 
     def __repr__(self):
         return f"Subtask: task_id={self.task_id}, subtak_id={self.subtask_id}, state={self.state_enum}"
@@ -314,13 +541,15 @@ class Subtask(Model):
     def from_db(cls, db, field_names, values):
         new = super().from_db(db, field_names, values)
         new._current_state_name = new.state  # pylint: disable=no-member
+        new._saved_state_name = new.state  # pylint: disable=no-member
+        new._saved_next_deadline = new.next_deadline  # pylint: disable=no-member
         return new
 
     def clean(self):
         super().clean()
 
         # Concent should not accept anything that cause a transition to an active state in soft shutdown mode.
-        if config.SOFT_SHUTDOWN_MODE is True and self.state_enum in self.ACTIVE_STATES:
+        if self.state_enum in self.ACTIVE_STATES and is_soft_shutdown_mode_enabled():
             raise ConcentInSoftShutdownMode
 
         # next_deadline must be datetime only for active states
@@ -357,7 +586,7 @@ class Subtask(Model):
             self._current_state_name = self.state
 
         # Both ack_report_computed_task and reject_report_computed_task cannot set at the same time.
-        if self.ack_report_computed_task is not None and self.reject_report_computed_task is not None:
+        if self.ack_report_computed_task_id is not None and self.reject_report_computed_task_id is not None:
             raise ValidationError(
                 'Both ack_report_computed_task and reject_report_computed_task cannot be set at the same time.'
             )
@@ -367,8 +596,8 @@ class Subtask(Model):
             raise ValidationError('Requestor and provided are the same client.')
 
         # Check if all required related messages are not None in current state.
-        for stored_message_name, states in Subtask.REQUIRED_RELATED_MESSAGES_IN_STATES.items():
-            if self.state_enum in states and getattr(self, stored_message_name) is None:
+        for stored_message_name, stored_message_id_name in Subtask.REQUIRED_RELATED_MESSAGE_IDS_FOR_STATE[self.state_enum]:
+            if getattr(self, stored_message_id_name) is None:
                 raise ValidationError({
                     stored_message_name: '{} cannot be None in state {}.'.format(
                         stored_message_name,
@@ -377,8 +606,8 @@ class Subtask(Model):
                 })
 
         # Check if all related messages which must be None are None in current state.
-        for stored_message_name, states in Subtask.UNSET_RELATED_MESSAGES_IN_STATES.items():
-            if self.state_enum in states and getattr(self, stored_message_name) is not None:
+        for stored_message_name, stored_message_id_name in Subtask.UNSET_RELATED_MESSAGE_IDS_FOR_STATE[self.state_enum]:
+            if getattr(self, stored_message_id_name) is not None:
                 raise ValidationError({
                     stored_message_name: '{} must be None in state {}.'.format(
                         stored_message_name,
@@ -386,6 +615,76 @@ class Subtask(Model):
                     )
                 })
 
+    def save(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        saves_state = kwargs.get('update_fields') is None or 'state' in kwargs['update_fields']
+        saves_next_deadline = kwargs.get('update_fields') is None or 'next_deadline' in kwargs['update_fields']
+        if saves_state and self._saved_state_name is not None and self._saved_state_name != self.state:
+            self.state_changed_at = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = list(kwargs['update_fields']) + ['state_changed_at']
+
+        saved_state_name    = self._saved_state_name
+        saved_next_deadline = self._saved_next_deadline
+        with transaction.atomic(using = kwargs.get('using') or router.db_for_write(Subtask, instance = self), savepoint = False):
+            super().save(*args, **kwargs)
+
+            if saves_state:
+                self._update_active_subtask_count()
+            if saves_next_deadline:
+                self._saved_next_deadline = self.next_deadline
+
+            # Summaries of both parties must reflect the change before it becomes visible to other transactions.
+            self._update_client_subtask_summaries(
+                saved_state_name,
+                saved_next_deadline,
+                self._saved_state_name,
+                self._saved_next_deadline,
+            )
+
+    def _update_client_subtask_summaries(
+        self,
+        old_state_name:     Optional[str],
+        old_next_deadline:  Optional[datetime.datetime],
+        new_state_name:     str,
+        new_next_deadline:  Optional[datetime.datetime],
+    ):
+        """
+        Applies the change of this subtask to the summaries of its requestor and provider without recomputing them.
+        An earlier deadline is applied with a single UPDATE. The earliest deadline of a client is recomputed only
+        if it was the deadline this subtask no longer has.
+        """
+        was_active   = old_state_name is not None and Subtask.SubtaskState[old_state_name] in self.ACTIVE_STATES
+        is_active    = Subtask.SubtaskState[new_state_name] in self.ACTIVE_STATES
+        old_deadline = old_next_deadline if was_active else None
+        new_deadline = new_next_deadline if is_active else None
+        parties = Client.objects.filter(pk__in = [self.requestor_id, self.provider_id])
+
+        if new_deadline is not None and new_deadline != old_deadline:
+            # PostgreSQL's LEAST() ignores NULL so a client without active subtasks gets the new deadline.
+            parties.update(
+                next_deadline = Least('next_deadline', Value(new_deadline, output_field = DateTimeField())),
+            )
+
+        if old_deadline is not None and (new_deadline is None or new_deadline > old_deadline):
+            # The lock makes concurrent transactions that lower the deadline wait until the recomputed value is saved.
+            for client in parties.select_for_update().filter(next_deadline = old_deadline).order_by('pk'):
+                client.next_deadline = client.get_earliest_subtask_deadline()
+                client.save(update_fields = ['next_deadline'])
+
+        forcing_result_transfer = Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name  # pylint: disable=no-member
+        difference = int(new_state_name == forcing_result_transfer) - int(old_state_name == forcing_result_transfer)
+        if difference != 0:
+            Client.objects.filter(pk = self.requestor_id).update(
+                forcing_result_transfer_subtask_count = F('forcing_result_transfer_subtask_count') + difference,
+            )
+
+    def _update_active_subtask_count(self):
+        was_active = self._saved_state_name is not None and Subtask.SubtaskState[self._saved_state_name] in self.ACTIVE_STATES
+        is_active = self.state_enum in self.ACTIVE_STATES
+        if was_active != is_active:
+            ActiveSubtaskCounter.add_to_count(self.subtask_id, 1 if is_active else -1)
+        self._saved_state_name = self.state
+
     @property
     def state_enum(self):
         return Subtask.SubtaskState[self.state]
@@ -426,12 +725,20 @@ class PendingResponse(Model):
     client               = ForeignKey(Client)
     queue                = CharField(max_length = 32, choices = Queue.choices())
 
-    # TRUE if the client has already fetched the message.
+    # TRUE if the client has already fetched the message or if it could not be built (see `failed`).
+    # Queues are read through a partial index that covers only undelivered responses (see 0005_partial_indexes).
     delivered            = BooleanField(default = False)
 
+    # TRUE if the message could not be built from subtask data and was removed from the queue without being delivered.
+    failed               = BooleanField(default = False)
+
     subtask              = ForeignKey(Subtask, blank = True, null = True)
     created_at           = DateTimeField(default = timezone.now)
 
+    # Serialized message to be delivered to the client, built when the response was added to the queue.
+    # NULL if the message is to be built from subtask data at the time of delivery.
+    response_data        = BinaryField(blank = True, null = True)
+
     def clean(self):
         # payment_message can be included only if current state is ForcePaymentCommitted
         if self.response_type != PendingResponse.ResponseType.ForcePaymentCommitted.name and self.payments.filter(pending_response__pk = self.pk).exists():  # pylint: disable=no-member
@@ -493,3 +800,173 @@ class PaymentInfo(Model):
             raise ValidationError({
                 'pending_response': 'PaymentInfo should be related with Pending Response'
             })
+
+
+class PaymentEvent(Model):
+    """
+    ForcedPaymentEvent or BatchTransferEvent copied from the blockchain by the payment event indexer.
+    Events from the most recent blocks are not confirmed yet: they can disappear in a chain reorganization,
+    so they are replaced on every run of the indexer.
+    """
+
+    class TransactionType(ChoiceEnum):
+        BATCH = 'batch'
+        FORCE = 'force'
+
+    transaction_type    = CharField(max_length = 32, choices = TransactionType.choices())
+    payer_address       = CharField(max_length = ETHEREUM_ADDRESS_LENGTH)
+    payee_address       = CharField(max_length = ETHEREUM_ADDRESS_LENGTH)
+    amount              = DecimalField(max_digits = PRICE_MAX_DIGITS, decimal_places = 0)
+    closure_time        = BigIntegerField()
+    confirmed           = BooleanField(default = True)
+
+    # Block containing the event. Events are looked up by block timestamp, like on the blockchain,
+    # where the search starts at the first block mined after given time.
+    block_number        = BigIntegerField()
+    block_timestamp     = BigIntegerField()
+
+    class Meta:
+        indexes = [
+            Index(fields = ['payer_address', 'payee_address', 'transaction_type', 'block_timestamp'], name = 'core_paymentevent_block_idx'),
+        ]
+
+
+class PaymentEventIndexState(Model):
+    """
+    Progress of the payment event indexer. There is at most one instance, created on the first run of the indexer.
+    `updated_at` is the time the index last caught up with the head of the chain.
+    """
+
+    last_confirmed_block    = BigIntegerField()
+    updated_at              = DateTimeField(blank = True, null = True)
+
+
+class BlockTimestamp(Model):
+    """
+    Timestamp of a confirmed block, used to find the first block after a given time without searching the whole chain.
+    All recent confirmed blocks are stored periodically. Older ones only if they were fetched during a lookup
+    or by the payment event indexer.
+    Timestamps grow with block numbers so ordering by either gives the same result.
+    """
+
+    number      = BigIntegerField(unique = True)
+    timestamp   = BigIntegerField(db_index = True)
+
+
+class OutboxMessage(Model):
+    """
+    Side effect to be carried out by the `relay_outbox` task once the transaction that added it commits,
+    so that transactions do not hold locks while waiting for the Ethereum node or the message broker.
+    """
+
+    class Kind(ChoiceEnum):
+        ForcePayment    = 'force_payment'
+        CeleryTask      = 'celery_task'
+
+    kind                = CharField(max_length = 32, choices = Kind.choices())
+
+    # Adding a message with a key that is already in the outbox has no effect.
+    idempotency_key     = CharField(max_length = 255, unique = True)
+
+    # JSON-encoded arguments of the side effect.
+    payload             = TextField()
+
+    created_at          = DateTimeField(default = timezone.now)
+    next_attempt_at     = DateTimeField(default = timezone.now)
+    attempts            = PositiveIntegerField(default = 0)
+    last_error          = TextField(blank = True)
+
+    # NULL until the side effect has been carried out.
+    sent_at             = DateTimeField(blank = True, null = True)
+
+    # Time of the attempt to send the transaction of a forced payment, committed before the transaction is sent.
+    # Once set, the payment is looked for on the blockchain instead of being made again. NULL for other kinds
+    # and if the attempt certainly did not reach the Ethereum node.
+    payment_attempted_at = DateTimeField(blank = True, null = True)
+
+    # TRUE if an attempted forced payment has not shown up on the blockchain within
+    # OUTBOX_FORCE_PAYMENT_CONFIRMATION_TIMEOUT. The relay no longer retries it and it has to be resolved manually.
+    needs_manual_resolution = BooleanField(default = False)
+
+    @property
+    def kind_enum(self):
+        return OutboxMessage.Kind[self.kind]
+
+
+class SubtaskPayment(Model):
+    """
+    Payment from requestor's deposit Concent owes the provider for a subtask. Payments between the same requestor
+    and provider are collected for FORCE_PAYMENT_AGGREGATION_WINDOW seconds and then made in a single transaction,
+    represented by an OutboxMessage.
+    """
+
+    subtask                 = OneToOneField(Subtask, related_name = 'payment')
+    requestor_eth_address   = CharField(max_length = ETHEREUM_ADDRESS_LENGTH)
+    provider_eth_address    = CharField(max_length = ETHEREUM_ADDRESS_LENGTH)
+    value                   = DecimalField(max_digits = PRICE_MAX_DIGITS, decimal_places = 0)
+    payment_ts              = BigIntegerField()
+    created_at              = DateTimeField(default = timezone.now)
+
+    # NULL until the payment is aggregated. Unaggregated payments are read through a partial index
+    # (see 0010_subtask_payment).
+    outbox_message          = ForeignKey(OutboxMessage, blank = True, null = True, related_name = 'subtask_payments')
+
+    # Part of the transferred amount assigned to this subtask. Smaller than `value` if requestor's deposit
+    # did not cover the whole transaction. NULL until the transaction is made.
+    paid_value              = DecimalField(max_digits = PRICE_MAX_DIGITS, decimal_places = 0, blank = True, null = True)
+
+
+class ArchivedSubtask(Model):
+    """
+    Subtask moved out of the Subtask table by the `archive_finished_subtasks` task after being in a passive state
+    for ARCHIVE_RETENTION_TIME, together with its stored messages and payment. Columns needed to find it are copied,
+    everything else is kept in `document`. Rows are partitioned by the month in which they were archived so that
+    a whole month can be exported or removed with a single query on an indexed column.
+    """
+
+    # The first day of the month in which the subtask was archived.
+    archive_period          = DateField(db_index = True)
+    archived_at             = DateTimeField(default = timezone.now)
+
+    task_id                 = CharField(max_length = MESSAGE_TASK_ID_MAX_LENGTH, db_index = True)
+    subtask_id              = CharField(max_length = MESSAGE_TASK_ID_MAX_LENGTH, db_index = True)
+    requestor_public_key    = Base64Field(max_length = GOLEM_PUBLIC_KEY_LENGTH)
+    provider_public_key     = Base64Field(max_length = GOLEM_PUBLIC_KEY_LENGTH)
+    state                   = CharField(max_length = 32, choices = Subtask.SubtaskState.choices())
+    state_changed_at        = DateTimeField()
+
+    # zlib-compressed JSON object with all fields of the subtask, its stored messages, including serialized data,
+    # and its payment. Relations between them are kept as in the original tables.
+    document                = BinaryField()
+
+    @property
+    def document_dict(self) -> dict:
+        return json.loads(zlib.decompress(self.document).decode())
+
+
+class ArchivedPendingResponse(Model):
+    """
+    Pending response moved to the archive either together with its subtask or, if it has not been delivered,
+    after ARCHIVE_RETENTION_TIME, when it's too late for the client to act on it. Partitioned like ArchivedSubtask.
+    """
+
+    archive_period          = DateField(db_index = True)
+    archived_at             = DateTimeField(default = timezone.now)
+
+    response_type           = CharField(max_length = 32, choices = PendingResponse.ResponseType.choices())
+    queue                   = CharField(max_length = 32, choices = PendingResponse.Queue.choices())
+    client_public_key       = Base64Field(max_length = GOLEM_PUBLIC_KEY_LENGTH)
+    created_at              = DateTimeField()
+
+    # FALSE if the response expired before the client fetched it.
+    delivered               = BooleanField()
+
+    # ID of the subtask in its ArchivedSubtask or, if the subtask has not been archived yet, in Subtask table.
+    subtask_id              = CharField(max_length = MESSAGE_TASK_ID_MAX_LENGTH, blank = True, null = True, db_index = True)
+
+    # zlib-compressed JSON object with all fields of the response and its payment info.
+    document                = BinaryField()
+
+    @property
+    def document_dict(self) -> dict:
+        return json.loads(zlib.decompress(self.document).decode())
@@ -0,0 +1,296 @@
+import datetime
+import json
+from logging import getLogger
+from typing import Callable
+
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from core.exceptions import PaymentBackendUnavailable
+from core.exceptions import PaymentOutcomeUnknown
+from core.models import OutboxMessage
+from core.models import Subtask
+from core.models import SubtaskPayment
+from core.payments.base import TransactionType
+import core.payments.base
+from utils.helpers import get_current_utc_timestamp
+from utils.logging import log_outbox_message_failed
+from utils.logging import log_outbox_message_needs_manual_resolution
+
+logger = getLogger(__name__)
+
+
+def add_subtask_payment_to_outbox(subtask: Subtask, payment_ts: int):
+    """
+    Makes Concent pay the price of the subtask from requestor's deposit after the current transaction commits.
+    The payment is made together with other payments between the same requestor and provider collected
+    within FORCE_PAYMENT_AGGREGATION_WINDOW seconds. Each subtask is paid for this way at most once.
+    """
+    SubtaskPayment.objects.get_or_create(
+        subtask     = subtask,
+        defaults    = {
+            'requestor_eth_address':    subtask.requestor_ethereum_address,
+            'provider_eth_address':     subtask.provider_ethereum_address,
+            'value':                    subtask.price,
+            'payment_ts':               payment_ts,
+        },
+    )
+
+
+def add_force_payment_to_outbox(
+    idempotency_key:        str,
+    requestor_eth_address:  str,
+    provider_eth_address:   str,
+    value:                  int,
+    payment_ts:             int,
+) -> OutboxMessage:
+    """ Makes `make_force_payment_to_provider` be called with given arguments after the current transaction commits. """
+    return _add_to_outbox(
+        OutboxMessage.Kind.ForcePayment,
+        idempotency_key,
+        {
+            'requestor_eth_address':    requestor_eth_address,
+            'provider_eth_address':     provider_eth_address,
+            'value':                    value,
+            'payment_ts':               payment_ts,
+        },
+    )
+
+
+def add_celery_task_to_outbox(idempotency_key: str, task_name: str, **kwargs):
+    """ Makes a Celery task be sent to the work queue after the current transaction commits. """
+    _add_to_outbox(
+        OutboxMessage.Kind.CeleryTask,
+        idempotency_key,
+        {
+            'task_name':    task_name,
+            'kwargs':       kwargs,
+        },
+    )
+
+
+def aggregate_subtask_payments() -> int:
+    """
+    Turns subtask payments between each requestor and provider into a single forced payment once the oldest of them
+    has waited FORCE_PAYMENT_AGGREGATION_WINDOW seconds. Each pair is aggregated in its own transaction.
+    Payments claimed by a concurrent run are skipped. Returns the number of forced payments added to the outbox.
+    """
+    window_start = timezone.now() - datetime.timedelta(seconds = settings.FORCE_PAYMENT_AGGREGATION_WINDOW)
+    pairs = list(
+        SubtaskPayment.objects.filter(
+            outbox_message = None,
+        ).values(
+            'requestor_eth_address',
+            'provider_eth_address',
+        ).annotate(
+            oldest_created_at = Min('created_at'),
+        ).filter(
+            oldest_created_at__lte = window_start,
+        )
+    )
+
+    aggregated_count = 0
+    for pair in pairs:
+        with transaction.atomic(using='control'):
+            subtask_payments = list(
+                SubtaskPayment.objects.select_for_update(skip_locked = True).filter(
+                    outbox_message          = None,
+                    requestor_eth_address   = pair['requestor_eth_address'],
+                    provider_eth_address    = pair['provider_eth_address'],
+                ).order_by('created_at', 'id')
+            )
+            if len(subtask_payments) == 0:
+                continue
+
+            # A payment belongs to only one aggregate so the ID of its first payment identifies it.
+            outbox_message = add_force_payment_to_outbox(
+                idempotency_key         = f'subtask-payments-{subtask_payments[0].id}',
+                requestor_eth_address   = pair['requestor_eth_address'],
+                provider_eth_address    = pair['provider_eth_address'],
+                value                   = sum(int(subtask_payment.value) for subtask_payment in subtask_payments),
+                payment_ts              = max(subtask_payment.payment_ts for subtask_payment in subtask_payments),
+            )
+            SubtaskPayment.objects.filter(
+                id__in = [subtask_payment.id for subtask_payment in subtask_payments],
+            ).update(
+                outbox_message = outbox_message,
+            )
+            aggregated_count += 1
+    return aggregated_count
+
+
+def relay_outbox_messages(batch_size: int) -> int:
+    """
+    Carries out at most `batch_size` side effects whose time has come, each in its own transaction so that
+    a side effect is never repeated because another one failed. Failed ones are retried later with exponential
+    backoff. Concurrent relays skip messages claimed by each other. Returns the number of messages sent.
+
+    The attempt to make a forced payment is committed before the transaction is sent and the payment is made again
+    only if the payment backend reports that the transaction has certainly not been sent. Otherwise the relay
+    looks for the payment on the blockchain, so that the provider is never paid twice. If the payment does not show
+    up within OUTBOX_FORCE_PAYMENT_CONFIRMATION_TIMEOUT, the message is marked as needing manual resolution.
+    """
+    sent_count = 0
+    for _ in range(batch_size):
+        with transaction.atomic(using='control'):
+            outbox_message = OutboxMessage.objects.select_for_update(skip_locked = True).filter(
+                sent_at             = None,
+                needs_manual_resolution = False,
+                next_attempt_at__lte = timezone.now(),
+            ).order_by('next_attempt_at', 'id').first()
+            if outbox_message is None:
+                break
+
+            is_payment_to_make = (
+                outbox_message.kind_enum == OutboxMessage.Kind.ForcePayment and
+                outbox_message.payment_attempted_at is None
+            )
+            if is_payment_to_make:
+                outbox_message.payment_attempted_at = timezone.now()
+                # Keeps concurrent relays from looking for the payment on the blockchain while it is being made.
+                outbox_message.next_attempt_at = timezone.now() + datetime.timedelta(
+                    seconds = settings.OUTBOX_RELAY_MAX_RETRY_DELAY
+                )
+                outbox_message.save()
+            else:
+                is_sent = _carry_out_and_record_result(outbox_message, _carry_out)
+
+        if is_payment_to_make:
+            is_sent = _make_force_payment(outbox_message)
+        sent_count += int(is_sent)
+    return sent_count
+
+
+def _add_to_outbox(kind: OutboxMessage.Kind, idempotency_key: str, payload: dict) -> OutboxMessage:
+    (outbox_message, _created) = OutboxMessage.objects.get_or_create(
+        idempotency_key = idempotency_key,
+        defaults        = {
+            'kind':     kind.name,
+            'payload':  json.dumps(payload),
+        },
+    )
+    return outbox_message
+
+
+def _make_force_payment(outbox_message: OutboxMessage) -> bool:
+    """
+    Sends the transaction of a forced payment whose attempt has already been committed. Must be called outside
+    of a transaction. Returns True if the payment has been made and recorded.
+    """
+    error = None
+    try:
+        paid_value = core.payments.base.make_force_payment_to_provider(**json.loads(outbox_message.payload))
+    except Exception as exception:  # pylint: disable=broad-except
+        error = exception
+
+    with transaction.atomic(using='control'):
+        outbox_message = OutboxMessage.objects.select_for_update().get(pk = outbox_message.pk)
+        if outbox_message.sent_at is not None:
+            # A concurrent relay has already found the payment on the blockchain.
+            return False
+
+        if error is None:
+            return _carry_out_and_record_result(
+                outbox_message,
+                lambda locked_outbox_message: _split_paid_value(locked_outbox_message, paid_value),
+            )
+
+        if isinstance(error, PaymentBackendUnavailable):
+            # The transaction has certainly not been sent so the payment can be made again.
+            outbox_message.payment_attempted_at = None
+        _record_failure(outbox_message, error)
+        outbox_message.save()
+        return False
+
+
+def _carry_out_and_record_result(outbox_message: OutboxMessage, carry_out: Callable[[OutboxMessage], None]) -> bool:
+    """ Calls `carry_out` and records its result in the message, which must be locked. Returns True on success. """
+    try:
+        # The savepoint lets the failure be recorded even if the side effect has broken the transaction.
+        with transaction.atomic(using='control'):
+            carry_out(outbox_message)
+    except Exception as exception:  # pylint: disable=broad-except
+        _record_failure(outbox_message, exception)
+        is_sent = False
+    else:
+        outbox_message.sent_at = timezone.now()
+        is_sent = True
+    outbox_message.save()
+    return is_sent
+
+
+def _record_failure(outbox_message: OutboxMessage, exception: Exception):
+    outbox_message.attempts += 1
+    outbox_message.last_error = str(exception)
+    outbox_message.next_attempt_at = timezone.now() + datetime.timedelta(
+        seconds = min(2 ** (outbox_message.attempts - 1), settings.OUTBOX_RELAY_MAX_RETRY_DELAY)
+    )
+    log_outbox_message_failed(logger, outbox_message.idempotency_key, outbox_message.attempts, exception)
+
+    if (
+        isinstance(exception, PaymentOutcomeUnknown) and
+        outbox_message.payment_attempted_at is not None and
+        outbox_message.payment_attempted_at + datetime.timedelta(
+            seconds = settings.OUTBOX_FORCE_PAYMENT_CONFIRMATION_TIMEOUT
+        ) <= timezone.now()
+    ):
+        outbox_message.needs_manual_resolution = True
+        log_outbox_message_needs_manual_resolution(
+            logger,
+            outbox_message.idempotency_key,
+            outbox_message.payload,
+            outbox_message.payment_attempted_at,
+        )
+
+
+def _carry_out(outbox_message: OutboxMessage):
+    payload = json.loads(outbox_message.payload)
+    if outbox_message.kind_enum == OutboxMessage.Kind.ForcePayment:
+        # Payments are made by `_make_force_payment`. Here the payment has already been attempted.
+        _split_paid_value(outbox_message, _get_attempted_force_payment_value(payload))
+    elif outbox_message.kind_enum == OutboxMessage.Kind.CeleryTask:
+        # The idempotency key doubles as task ID so that a task sent twice can be recognized.
+        current_app.send_task(
+            payload['task_name'],
+            kwargs  = payload['kwargs'],
+            task_id = outbox_message.idempotency_key,
+        )
+
+
+def _get_attempted_force_payment_value(payload: dict) -> int:
+    """
+    Returns the amount transferred by an attempted forced payment, read from the blockchain. Forced payments between
+    the same requestor and provider are told apart by their closure time. Raises PaymentOutcomeUnknown if the payment
+    is not on the blockchain (yet).
+    """
+    forced_payments = [
+        forced_payment
+        for forced_payment in core.payments.base.get_list_of_payments(
+            requestor_eth_address   = payload['requestor_eth_address'],
+            provider_eth_address    = payload['provider_eth_address'],
+            payment_ts              = payload['payment_ts'],
+            current_time            = get_current_utc_timestamp(),
+            transaction_type        = TransactionType.FORCE,
+        )
+        if forced_payment.closure_time == payload['payment_ts'] and int(forced_payment.amount) <= payload['value']
+    ]
+    if len(forced_payments) == 0:
+        raise PaymentOutcomeUnknown(
+            'Forced payment has been attempted but it is not on the blockchain. It is not going to be made again.'
+        )
+    return int(forced_payments[0].amount)
+
+
+def _split_paid_value(outbox_message: OutboxMessage, paid_value: int):
+    """
+    Records which subtasks the forced payment has paid for. If requestor's deposit did not cover the whole payment,
+    the oldest subtasks are paid for first.
+    """
+    remaining_value = paid_value
+    for subtask_payment in outbox_message.subtask_payments.order_by('created_at', 'id'):
+        subtask_payment.paid_value = min(int(subtask_payment.value), remaining_value)
+        subtask_payment.save()
+        remaining_value -= subtask_payment.paid_value
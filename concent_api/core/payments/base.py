@@ -1,31 +1,130 @@
-import importlib
+from abc import ABC
+from abc import abstractmethod
+from enum import Enum
+from typing import List
+from typing import NamedTuple
+from typing import Optional
 
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
 
 
-def _add_backend(func):
+class TransactionType(Enum):
+    BATCH = 'batch'
+    FORCE = 'force'
+
+
+class PaymentQuery(NamedTuple):
+    payment_ts:         int
+    transaction_type:   TransactionType
+
+
+class PaymentBackend(ABC):
+    """
+    Interface of payment backends. PAYMENT_BACKEND contains the path of a subclass, which is instantiated once
+    when the core app is ready. The functions below pass calls to that instance.
+    """
+
+    @abstractmethod
+    def get_list_of_payments(
+        self,
+        requestor_eth_address:  str,
+        provider_eth_address:   str,
+        payment_ts:             int,
+        current_time:           int,
+        transaction_type:       TransactionType,
+    ) -> list:
+        """ Returns transactions of given type from requestor to provider made not earlier than `payment_ts`. """
+
+    @abstractmethod
+    def get_lists_of_payments(
+        self,
+        requestor_eth_address:  str,
+        provider_eth_address:   str,
+        current_time:           int,
+        queries:                List[PaymentQuery],
+    ) -> List[list]:
+        """ Does the same as get_list_of_payments() for many queries at once. Returns results in the same order. """
+
+    @abstractmethod
+    def make_force_payment_to_provider(
+        self,
+        requestor_eth_address:  str,
+        provider_eth_address:   str,
+        value:                  int,
+        payment_ts:             int,
+    ) -> int:
+        """ Returns the amount transferred, which is smaller than `value` if requestor's deposit does not cover it. """
+
+    @abstractmethod
+    def is_account_status_positive(
+        self,
+        client_eth_address:     str,
+        pending_value:          int = 0,
+    ) -> bool:
+        """ Returns True if client's deposit is greater than `pending_value`. """
+
+
+# Instance of the class set in PAYMENT_BACKEND. None if it could not be loaded.
+_backend = None  # type: Optional[PaymentBackend]
+
+
+def load_backend(backend_path: str) -> PaymentBackend:
+    """
+    Imports the payment backend class and returns its instance. Raises ImproperlyConfigured if the class cannot be
+    imported, is not a PaymentBackend or does not implement all its methods.
     """
-    Decorator which adds currently set payment backend to function call.
-    :param func: Function from this module, that as a first param takes in backend's name.
-    :return: decorated function
+    try:
+        backend_class = import_string(backend_path)
+    except ImportError as exception:
+        raise ImproperlyConfigured(f'Payment backend {backend_path} cannot be imported: {exception}')
+
+    if not isinstance(backend_class, type) or not issubclass(backend_class, PaymentBackend):
+        raise ImproperlyConfigured(f'Payment backend {backend_path} is not a subclass of {PaymentBackend.__qualname__}')
+
+    try:
+        return backend_class()
+    except TypeError as exception:
+        # Raised when abstract methods are not implemented.
+        raise ImproperlyConfigured(f'Payment backend {backend_path} cannot be instantiated: {exception}')
+
+
+def set_up_backend():
     """
-    def wrapper(*args, **kwargs):
-        backend = importlib.import_module(settings.PAYMENT_BACKEND)
-        assert hasattr(backend, func.__name__)
-        return func(backend, *args, **kwargs)
-    return wrapper
+    Instantiates the backend set in PAYMENT_BACKEND. Called when the core app is ready. A backend that cannot be loaded
+    does not prevent Django from starting. It is reported by the check_payment_backend system check instead.
+    """
+    global _backend  # pylint: disable=global-statement
+    try:
+        _backend = load_backend(settings.PAYMENT_BACKEND)
+    except ImproperlyConfigured:
+        _backend = None
+
+
+def get_backend() -> PaymentBackend:
+    if _backend is None:
+        raise ImproperlyConfigured(f'Payment backend {settings.PAYMENT_BACKEND} could not be loaded')
+    return _backend
+
+
+@receiver(setting_changed)
+def reload_backend(setting, **_kwargs):
+    """ Makes override_settings() in tests replace the backend instance. """
+    if setting == 'PAYMENT_BACKEND':
+        set_up_backend()
 
 
-@_add_backend
 def get_list_of_payments(
-    backend,
-    requestor_eth_address   = None,
-    provider_eth_address    = None,
-    payment_ts              = None,
-    current_time            = None,
-    transaction_type        = None,
-):
-    return backend.get_list_of_payments(
+    requestor_eth_address:  str,
+    provider_eth_address:   str,
+    payment_ts:             int,
+    current_time:           int,
+    transaction_type:       TransactionType,
+) -> list:
+    return get_backend().get_list_of_payments(
         requestor_eth_address   = requestor_eth_address,
         provider_eth_address    = provider_eth_address,
         payment_ts              = payment_ts,
@@ -34,15 +133,29 @@ def get_list_of_payments(
     )
 
 
-@_add_backend
+def get_lists_of_payments(
+    requestor_eth_address:  str,
+    provider_eth_address:   str,
+    current_time:           int,
+    queries:                List[PaymentQuery],
+) -> List[list]:
+    """ Sends many payment history queries in a single call. Returns a list of results in the same order. """
+    return get_backend().get_lists_of_payments(
+        requestor_eth_address   = requestor_eth_address,
+        provider_eth_address    = provider_eth_address,
+        current_time            = current_time,
+        queries                 = queries,
+    )
+
+
 def make_force_payment_to_provider(
-    backend,
-    requestor_eth_address   = None,
-    provider_eth_address    = None,
-    value                   = None,
-    payment_ts              = None,
-):
-    return backend.make_force_payment_to_provider(
+    requestor_eth_address:  str,
+    provider_eth_address:   str,
+    value:                  int,
+    payment_ts:             int,
+) -> int:
+    """ Returns the amount transferred, which is smaller than `value` if requestor's deposit does not cover it. """
+    return get_backend().make_force_payment_to_provider(
         requestor_eth_address   = requestor_eth_address,
         provider_eth_address    = provider_eth_address,
         value                   = value,
@@ -50,13 +163,11 @@ def make_force_payment_to_provider(
     )
 
 
-@_add_backend
 def is_account_status_positive(
-    backend,
-    client_eth_address      = None,
-    pending_value           = None,
-):
-    return backend.is_account_status_positive(
+    client_eth_address:     str,
+    pending_value:          int,
+) -> bool:
+    return get_backend().is_account_status_positive(
         client_eth_address      = client_eth_address,
         pending_value           = pending_value,
     )
@@ -0,0 +1,168 @@
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.models import BlockTimestamp
+from utils.helpers import get_current_utc_timestamp
+from utils.singleton import ConcentRPC
+
+
+BLOCK_NUMBER_CACHE_KEY = 'block-number'
+
+# Number of blocks fetched during a search that are chosen by interpolating timestamps of the blocks around them.
+# Interpolation finds the block in one or two steps if blocks are mined at a steady pace. Further blocks
+# are chosen by bisection so that the search does not take long when they are not.
+INTERPOLATED_PROBE_COUNT = 2
+
+
+def get_block_number(concent_rpc) -> int:
+    """
+    Returns the number of the most recent block, read from the blockchain at most once per BLOCK_NUMBER_CACHE_TIME
+    seconds. Block numbers are only used to limit searches so a value a few seconds old is good enough.
+    """
+    block_number = cache.get(BLOCK_NUMBER_CACHE_KEY)
+    if block_number is None:
+        block_number = concent_rpc.get_block_number()
+        if settings.BLOCK_NUMBER_CACHE_TIME > 0:
+            cache.set(BLOCK_NUMBER_CACHE_KEY, block_number, settings.BLOCK_NUMBER_CACHE_TIME)
+    return block_number
+
+
+def get_first_block_after(concent_rpc, timestamp: int) -> Optional[int]:
+    """
+    Returns the number of the first block with timestamp not older than `timestamp` or None if there is no such block yet.
+    Does the same as golem_sci's BlocksHelper.get_first_block_after() but reads stored BlockTimestamps first.
+    Timestamps of recent confirmed blocks are all stored by the `index_block_timestamps` task so for them the result
+    is found without any RPC calls. Otherwise only blocks between the nearest stored ones are searched, starting
+    with the ones where `timestamp` falls if blocks are evenly spaced. This usually takes one or two RPC calls.
+    Confirmed blocks fetched during the search are stored too.
+    """
+    lower = BlockTimestamp.objects.filter(
+        timestamp__lt = timestamp,
+    ).order_by('-timestamp').values_list('number', 'timestamp').first()
+    upper = BlockTimestamp.objects.filter(
+        timestamp__gte = timestamp,
+    ).order_by('timestamp').values_list('number', 'timestamp').first()
+
+    (lower_block, lower_timestamp) = lower if lower is not None else (-1, None)
+    fetched_timestamps = {}  # type: Dict[int, int]
+
+    if upper is None:
+        head = get_block_number(concent_rpc)
+        if head <= lower_block:
+            return None
+        # The block after the head does not exist yet. Assuming the head has just been mined is good enough
+        # to choose the first blocks to fetch.
+        (upper_block, upper_timestamp) = (head + 1, get_current_utc_timestamp())
+        last_confirmed_block = head - settings.PAYMENT_EVENT_INDEXER_CONFIRMATIONS
+    else:
+        (upper_block, upper_timestamp) = upper
+        # All blocks older than a stored block are confirmed.
+        last_confirmed_block = upper_block
+
+    probe_count = 0
+    while upper_block - lower_block > 1:
+        if probe_count < INTERPOLATED_PROBE_COUNT:
+            middle_block = _estimate_first_block_after(
+                lower_block,
+                lower_timestamp,
+                upper_block,
+                upper_timestamp,
+                timestamp,
+            )
+        else:
+            middle_block = (lower_block + upper_block) // 2
+        probe_count += 1
+
+        fetched_timestamps[middle_block] = _get_block_timestamp(concent_rpc, middle_block)
+        if fetched_timestamps[middle_block] < timestamp:
+            (lower_block, lower_timestamp) = (middle_block, fetched_timestamps[middle_block])
+        else:
+            (upper_block, upper_timestamp) = (middle_block, fetched_timestamps[middle_block])
+
+    _store_block_timestamps({
+        number: block_timestamp
+        for number, block_timestamp in fetched_timestamps.items()
+        if number <= last_confirmed_block
+    })
+    if upper is None and upper_block > head:
+        return None
+    return upper_block
+
+
+def get_block_timestamps(concent_rpc, numbers: Iterable[int], last_confirmed_block: int) -> Dict[int, int]:
+    """
+    Returns timestamps of given blocks. Blocks stored in BlockTimestamp are not fetched. Fetched blocks
+    not newer than `last_confirmed_block` are stored.
+    """
+    numbers = set(numbers)
+    block_timestamps = dict(
+        BlockTimestamp.objects.filter(number__in = numbers).values_list('number', 'timestamp')
+    )
+    fetched_timestamps = {
+        number: _get_block_timestamp(concent_rpc, number)
+        for number in numbers - set(block_timestamps)
+    }
+    _store_block_timestamps({
+        number: block_timestamp
+        for number, block_timestamp in fetched_timestamps.items()
+        if number <= last_confirmed_block
+    })
+    block_timestamps.update(fetched_timestamps)
+    return block_timestamps
+
+
+def index_block_timestamps(concent_rpc = None) -> Optional[int]:
+    """
+    Stores timestamps of the BLOCK_TIMESTAMP_INDEX_DEPTH most recent confirmed blocks, fetching only the ones not stored
+    yet, so that finding the first block after a recent timestamp does not need any RPC calls.
+    Returns the number of the most recent confirmed block.
+    """
+    concent_rpc = concent_rpc if concent_rpc is not None else ConcentRPC()
+
+    last_confirmed_block = get_block_number(concent_rpc) - settings.PAYMENT_EVENT_INDEXER_CONFIRMATIONS
+    if last_confirmed_block < 0:
+        return None
+
+    get_block_timestamps(
+        concent_rpc,
+        range(max(0, last_confirmed_block - settings.BLOCK_TIMESTAMP_INDEX_DEPTH + 1), last_confirmed_block + 1),
+        last_confirmed_block,
+    )
+    return last_confirmed_block
+
+
+def _estimate_first_block_after(
+    lower_block:        int,
+    lower_timestamp:    Optional[int],
+    upper_block:        int,
+    upper_timestamp:    int,
+    timestamp:          int,
+) -> int:
+    """
+    Returns the block between `lower_block` and `upper_block` (exclusive) that would be the first one with timestamp
+    not older than `timestamp` if blocks between them were evenly spaced in time.
+    """
+    if lower_timestamp is None or upper_timestamp <= lower_timestamp:
+        return (lower_block + upper_block) // 2
+    estimated_block = lower_block + math.ceil(
+        (timestamp - lower_timestamp) * (upper_block - lower_block) / (upper_timestamp - lower_timestamp)
+    )
+    return min(max(estimated_block, lower_block + 1), upper_block - 1)
+
+
+def _get_block_timestamp(concent_rpc, number: int) -> int:
+    return concent_rpc.get_block_by_number(number).timestamp
+
+
+def _store_block_timestamps(block_timestamps: Dict[int, int]):
+    # Concurrent lookups may store the same blocks.
+    for number, block_timestamp in block_timestamps.items():
+        BlockTimestamp.objects.get_or_create(
+            number      = number,
+            defaults    = {'timestamp': block_timestamp},
+        )
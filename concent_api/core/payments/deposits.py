@@ -0,0 +1,97 @@
+from logging import getLogger
+from typing import Any
+from typing import Dict
+from typing import List
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utils.logging import log_deposit_cache_stats
+
+logger = getLogger(__name__)
+
+DEPOSIT_VALUE_CACHE_KEY_PREFIX = 'deposit-value-'
+
+# How often (in seconds) the cache logs its counters.
+STATS_LOG_INTERVAL = 60
+
+_stats = {
+    'hits':             0,
+    'misses':           0,
+    'invalidations':    0,
+}
+_stats_lock = threading.Lock()
+_stats_logged_at = time.monotonic()
+
+
+def get_deposit_value(concent_rpc, client_eth_address: str) -> int:
+    """
+    Returns the deposit of the client, read from the blockchain at most once per DEPOSIT_VALUE_CACHE_TIME seconds.
+    The value may be out of date so it must not be used to decide how much can be transferred from the deposit.
+    Unless CACHES points at a shared backend, each process keeps its own copy.
+    """
+    deposit_values = get_cached_deposit_values([client_eth_address])
+    if client_eth_address not in deposit_values:
+        deposit_values[client_eth_address] = concent_rpc.get_deposit_value(client_eth_address)
+        cache_deposit_values(deposit_values)
+    return deposit_values[client_eth_address]
+
+
+def get_cached_deposit_values(client_eth_addresses: List[str]) -> Dict[str, int]:
+    """ Returns deposits of those clients that are in the cache. """
+    cached_values = cache.get_many([_get_cache_key(client_eth_address) for client_eth_address in client_eth_addresses])
+    deposit_values = {
+        client_eth_address: cached_values[_get_cache_key(client_eth_address)]
+        for client_eth_address in client_eth_addresses
+        if _get_cache_key(client_eth_address) in cached_values
+    }
+    _update_stats(
+        hits    = len(deposit_values),
+        misses  = len(client_eth_addresses) - len(deposit_values),
+    )
+    return deposit_values
+
+
+def cache_deposit_values(deposit_values: Dict[str, int]):
+    if settings.DEPOSIT_VALUE_CACHE_TIME > 0:
+        cache.set_many(
+            {_get_cache_key(client_eth_address): value for client_eth_address, value in deposit_values.items()},
+            settings.DEPOSIT_VALUE_CACHE_TIME,
+        )
+
+
+def invalidate_deposit_value(client_eth_address: str):
+    """
+    Removes the deposit of the client from the cache. Called whenever Concent transfers funds from it.
+    With a process-local cache backend only the copy kept by the calling process is removed. Other processes
+    keep using theirs until it expires after DEPOSIT_VALUE_CACHE_TIME seconds.
+    """
+    cache.delete(_get_cache_key(client_eth_address))
+    _update_stats(invalidations = 1)
+
+
+def get_deposit_cache_stats() -> Dict[str, Any]:
+    """ Returns counters of the cache in this process since it started, including the fraction of reads that hit it. """
+    with _stats_lock:
+        stats = dict(_stats)  # type: Dict[str, Any]
+    reads = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / reads if reads > 0 else 0.0
+    return stats
+
+
+def _get_cache_key(client_eth_address: str) -> str:
+    return DEPOSIT_VALUE_CACHE_KEY_PREFIX + client_eth_address.lower()
+
+
+def _update_stats(**counters):
+    global _stats_logged_at  # pylint: disable=global-statement
+    with _stats_lock:
+        for counter_name, value in counters.items():
+            _stats[counter_name] += value
+        should_log_stats = time.monotonic() - _stats_logged_at >= STATS_LOG_INTERVAL
+        if should_log_stats:
+            _stats_logged_at = time.monotonic()
+    if should_log_stats:
+        log_deposit_cache_stats(logger, get_deposit_cache_stats())
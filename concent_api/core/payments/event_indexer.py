@@ -0,0 +1,165 @@
+from logging import getLogger
+from typing import List
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import PaymentEvent
+from core.models import PaymentEventIndexState
+from core.payments.blocks import get_block_timestamps
+from utils.logging import log_payment_events_indexed
+from utils.singleton import ConcentRPC
+
+logger = getLogger(__name__)
+
+
+def index_payment_events(concent_rpc = None) -> int:
+    """
+    Copies ForcedPaymentEvent and BatchTransferEvent from blocks added to the chain since the last run to PaymentEvent.
+    Blocks older than PAYMENT_EVENT_INDEXER_CONFIRMATIONS are indexed only once. Events from more recent blocks
+    are fetched again on every run and replace those stored by the previous one, so that a chain reorganization
+    not deeper than PAYMENT_EVENT_INDEXER_CONFIRMATIONS blocks is reflected in the index.
+    An index that is far behind catches up in ranges of PAYMENT_EVENT_INDEXER_MAX_BLOCK_RANGE blocks,
+    each stored in its own transaction. Returns the number of the last confirmed block.
+    """
+    concent_rpc = concent_rpc if concent_rpc is not None else ConcentRPC()
+
+    head = concent_rpc.get_block_number()  # pylint: disable=no-member
+    last_confirmed_head = head - settings.PAYMENT_EVENT_INDEXER_CONFIRMATIONS
+    from_block = _get_last_confirmed_block() + 1
+
+    while last_confirmed_head - from_block + 1 > settings.PAYMENT_EVENT_INDEXER_MAX_BLOCK_RANGE:
+        to_block = from_block + settings.PAYMENT_EVENT_INDEXER_MAX_BLOCK_RANGE - 1
+        payment_events = _get_payment_events(concent_rpc, from_block, to_block, confirmed = True)
+        if not _store_payment_events(from_block, to_block, payment_events, is_up_to_date = False):
+            return _get_last_confirmed_block()
+        log_payment_events_indexed(logger, from_block, to_block, len(payment_events))
+        from_block = to_block + 1
+
+    to_block = max(from_block - 1, last_confirmed_head)
+    payment_events = []
+    if from_block <= to_block:
+        payment_events += _get_payment_events(concent_rpc, from_block, to_block, confirmed = True)
+    if to_block + 1 <= head:
+        payment_events += _get_payment_events(concent_rpc, to_block + 1, head, confirmed = False)
+    if not _store_payment_events(from_block, to_block, payment_events, is_up_to_date = True):
+        return _get_last_confirmed_block()
+    log_payment_events_indexed(logger, from_block, head, len(payment_events))
+    return to_block
+
+
+def get_payment_events_from_index(
+    payer_address:      str,
+    payee_address:      str,
+    payment_ts:         int,
+    transaction_type:   PaymentEvent.TransactionType,
+) -> List[PaymentEvent]:
+    """
+    Returns indexed events of given type between given addresses from blocks with timestamp not older than
+    `payment_ts`. These are the events the payment backend finds on the blockchain starting at
+    the first block after `payment_ts`, no matter what their closure time is.
+    """
+    payment_events = list(
+        PaymentEvent.objects.filter(
+            payer_address           = payer_address.lower(),
+            payee_address           = payee_address.lower(),
+            transaction_type        = transaction_type.name,
+            block_timestamp__gte    = payment_ts,
+        ).order_by('block_number', 'id')
+    )
+    for payment_event in payment_events:
+        payment_event.amount = int(payment_event.amount)
+    return payment_events
+
+
+def is_payment_event_index_up_to_date() -> bool:
+    """
+    Tells whether the index has been updated recently enough to be used instead of querying the blockchain,
+    according to PAYMENT_EVENT_INDEXER_MAX_AGE.
+    """
+    if not settings.PAYMENT_EVENT_INDEXER_ENABLED:
+        return False
+
+    updated_at = PaymentEventIndexState.objects.values_list('updated_at', flat = True).first()
+    return updated_at is not None and (timezone.now() - updated_at).total_seconds() <= settings.PAYMENT_EVENT_INDEXER_MAX_AGE
+
+
+def _get_last_confirmed_block() -> int:
+    last_confirmed_block = PaymentEventIndexState.objects.values_list('last_confirmed_block', flat = True).first()
+    if last_confirmed_block is None:
+        return settings.PAYMENT_EVENT_INDEXER_START_BLOCK - 1
+    return last_confirmed_block
+
+
+def _store_payment_events(
+    from_block:             int,
+    last_confirmed_block:   int,
+    payment_events:         List[PaymentEvent],
+    is_up_to_date:          bool,
+) -> bool:
+    """
+    Replaces unconfirmed events with `payment_events` fetched from blocks starting at `from_block`. Returns False,
+    without storing anything, if another run of the indexer has already indexed these blocks.
+    """
+    with transaction.atomic(using='control'):
+        (state, _created) = PaymentEventIndexState.objects.select_for_update().get_or_create(
+            pk = 1,
+            defaults = {'last_confirmed_block': settings.PAYMENT_EVENT_INDEXER_START_BLOCK - 1},
+        )
+        if state.last_confirmed_block != from_block - 1:
+            return False
+
+        PaymentEvent.objects.filter(confirmed = False).delete()
+        PaymentEvent.objects.bulk_create(payment_events)
+        state.last_confirmed_block = last_confirmed_block
+        if is_up_to_date:
+            state.updated_at = timezone.now()
+        state.save()
+    return True
+
+
+def _get_payment_events(concent_rpc, from_block: int, to_block: int, confirmed: bool) -> List[PaymentEvent]:
+    """ Fetches events of all payers and payees from given range of blocks. """
+    forced_payments = concent_rpc.get_forced_payments(  # pylint: disable=no-member
+        requestor_address   = None,
+        provider_address    = None,
+        from_block          = from_block,
+        to_block            = to_block,
+    )
+    batch_transfers = concent_rpc.get_batch_transfers(  # pylint: disable=no-member
+        payer_address   = None,
+        payee_address   = None,
+        from_block      = from_block,
+        to_block        = to_block,
+    )
+    block_timestamps = get_block_timestamps(
+        concent_rpc,
+        {event.block_number for event in forced_payments + batch_transfers},
+        last_confirmed_block = to_block if confirmed else from_block - 1,
+    )
+    return [
+        PaymentEvent(
+            transaction_type    = PaymentEvent.TransactionType.FORCE.name,  # pylint: disable=no-member
+            payer_address       = event.requestor.lower(),
+            payee_address       = event.provider.lower(),
+            amount              = event.amount,
+            closure_time        = event.closure_time,
+            confirmed           = confirmed,
+            block_number        = event.block_number,
+            block_timestamp     = block_timestamps[event.block_number],
+        )
+        for event in forced_payments
+    ] + [
+        PaymentEvent(
+            transaction_type    = PaymentEvent.TransactionType.BATCH.name,  # pylint: disable=no-member
+            payer_address       = event.sender.lower(),
+            payee_address       = event.receiver.lower(),
+            amount              = event.amount,
+            closure_time        = event.closure_time,
+            confirmed           = confirmed,
+            block_number        = event.block_number,
+            block_timestamp     = block_timestamps[event.block_number],
+        )
+        for event in batch_transfers
+    ]
@@ -1,88 +1,219 @@
+from concurrent.futures import FIRST_EXCEPTION
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from enum import Enum
+from functools import partial
+from typing import Any
+from typing import Callable
+from typing import List
+from typing import Optional
 
-from golem_sci.blockshelper import BlocksHelper
+from django.conf import settings
 from core.constants import ETHEREUM_ADDRESS_LENGTH
+from core.exceptions import PaymentBackendUnavailable
+from core.models import PaymentEvent
+from core.payments.base import PaymentBackend
+from core.payments.base import PaymentQuery
+from core.payments.base import TransactionType
+from core.payments import deposits
+from core.payments.blocks import get_block_number
+from core.payments.blocks import get_first_block_after
+from core.payments.event_indexer import get_payment_events_from_index
+from core.payments.event_indexer import is_payment_event_index_up_to_date
 from utils.singleton import ConcentRPC
 
 
-def get_list_of_payments(
-    requestor_eth_address:  str,
-    provider_eth_address:   str,
-    payment_ts:             int,
-    current_time:           int,
-    transaction_type:       str,
-):
+class SCIPaymentBackend(PaymentBackend):
+    """ Payment backend using the Ethereum node through ConcentRPC, or the local index of payment events. """
+
+    def get_list_of_payments(
+        self,
+        requestor_eth_address:  str,
+        provider_eth_address:   str,
+        payment_ts:             int,
+        current_time:           int,
+        transaction_type:       TransactionType,
+    ) -> list:
+        """
+        Function which return list of transactions from payment API
+        where timestamp >= T0. Uses the local index of payment events instead of the blockchain if it is up to date.
+        """
+        assert isinstance(requestor_eth_address,    str) and len(requestor_eth_address) == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(provider_eth_address,     str) and len(provider_eth_address)  == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(payment_ts,               int) and payment_ts     >= 0
+        assert isinstance(current_time,             int) and current_time   > 0
+        assert isinstance(transaction_type,         Enum) and transaction_type in TransactionType
+
+        if is_payment_event_index_up_to_date():
+            return _get_payments_from_index(requestor_eth_address, provider_eth_address, payment_ts, transaction_type)
+
+        concent_rpc = ConcentRPC()
+
+        return _get_payments_up_to_block(
+            concent_rpc,
+            requestor_eth_address,
+            provider_eth_address,
+            transaction_type,
+            get_first_block_after(concent_rpc, payment_ts),
+            get_block_number(concent_rpc),
+        )
+
+    def get_lists_of_payments(
+        self,
+        requestor_eth_address:  str,
+        provider_eth_address:   str,
+        current_time:           int,
+        queries:                List[PaymentQuery],
+    ) -> List[list]:
+        """
+        Does the same as get_list_of_payments for many queries at once and returns a list of results in the same order.
+        Queries are sent concurrently and all of them search blocks up to the same one, read once, so that their results
+        are consistent with each other. Raises PaymentBackendUnavailable if they do not finish
+        in PAYMENT_BACKEND_QUERY_TIMEOUT seconds.
+        """
+        assert isinstance(requestor_eth_address,    str) and len(requestor_eth_address) == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(provider_eth_address,     str) and len(provider_eth_address)  == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(current_time,             int) and current_time   > 0
+        assert isinstance(queries,                  list) and len(queries) > 0
+        for query in queries:
+            assert isinstance(query.payment_ts,         int) and query.payment_ts >= 0
+            assert isinstance(query.transaction_type,   Enum) and query.transaction_type in TransactionType
+
+        if is_payment_event_index_up_to_date():
+            return [
+                _get_payments_from_index(requestor_eth_address, provider_eth_address, query.payment_ts, query.transaction_type)
+                for query in queries
+            ]
+
+        concent_rpc = ConcentRPC()
+        to_block = get_block_number(concent_rpc)
+        # Blocks are looked up before starting threads because the lookup uses the database.
+        from_blocks = [get_first_block_after(concent_rpc, query.payment_ts) for query in queries]
+
+        return _call_concurrently([
+            partial(
+                _get_payments_up_to_block,
+                concent_rpc,
+                requestor_eth_address,
+                provider_eth_address,
+                query.transaction_type,
+                from_block,
+                to_block,
+            )
+            for query, from_block in zip(queries, from_blocks)
+        ])
+
+    def make_force_payment_to_provider(
+        self,
+        requestor_eth_address:  str,
+        provider_eth_address:   str,
+        value:                  int,
+        payment_ts:             int,
+    ) -> int:
+        """
+        Concent makes transaction from requestor's deposit to provider's account on amount 'value'.
+        If there is less then 'value' on requestor's deposit, Concent transfers as much as possible.
+        Returns the amount transferred.
+        """
+        assert isinstance(requestor_eth_address,    str) and len(requestor_eth_address) == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(provider_eth_address,     str) and len(provider_eth_address)  == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(payment_ts,               int) and payment_ts   >= 0
+        assert isinstance(value,                    int) and value        >= 0
+
+        # The deposit is always read from the blockchain, never from the cache, so that an outdated value
+        # cannot make Concent transfer more than there is.
+        requestor_account_balance = ConcentRPC().get_deposit_value(requestor_eth_address)  # type: ignore  # pylint: disable=no-member
+        if requestor_account_balance < value:
+            value = requestor_account_balance
+
+        try:
+            ConcentRPC().force_payment(  # type: ignore  # pylint: disable=no-member
+                requestor_address   = requestor_eth_address,
+                provider_address    = provider_eth_address,
+                value               = value,
+                closure_time        = payment_ts,
+            )
+        finally:
+            # The transaction may have been sent even if the call failed.
+            deposits.invalidate_deposit_value(requestor_eth_address)
+        return value
+
+    def is_account_status_positive(
+        self,
+        client_eth_address:     str,
+        pending_value:          int = 0,
+    ) -> bool:
+        assert isinstance(client_eth_address,       str) and len(client_eth_address) == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(pending_value,            int) and pending_value >= 0
+
+        client_acc_balance = deposits.get_deposit_value(ConcentRPC(), client_eth_address)
+
+        return client_acc_balance > pending_value
+
+
+def _call_concurrently(calls: List[Callable[[], Any]]) -> list:
     """
-    Function which return list of transactions from payment API
-    where timestamp >= T0
+    Calls all given functions at once in separate threads and returns their results in the same order.
+    Raises PaymentBackendUnavailable if they do not finish in PAYMENT_BACKEND_QUERY_TIMEOUT seconds.
     """
-    assert isinstance(requestor_eth_address,    str) and len(requestor_eth_address) == ETHEREUM_ADDRESS_LENGTH
-    assert isinstance(provider_eth_address,     str) and len(provider_eth_address)  == ETHEREUM_ADDRESS_LENGTH
-    assert isinstance(payment_ts,               int) and payment_ts     >= 0
-    assert isinstance(current_time,             int) and current_time   > 0
-    assert isinstance(transaction_type,         Enum) and transaction_type in TransactionType
-
-    concent_rpc = ConcentRPC()
-
-    last_block_before_payment = BlocksHelper(concent_rpc).get_first_block_after(payment_ts).number
+    executor = ThreadPoolExecutor(max_workers = len(calls))
+    try:
+        futures = [executor.submit(call) for call in calls]
+        (done, not_done) = wait(futures, timeout = settings.PAYMENT_BACKEND_QUERY_TIMEOUT, return_when = FIRST_EXCEPTION)
+        for future in not_done:
+            future.cancel()
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        if len(not_done) > 0:
+            raise PaymentBackendUnavailable(
+                f'Payment backend queries have not finished in {settings.PAYMENT_BACKEND_QUERY_TIMEOUT} seconds.'
+            )
+        return [future.result() for future in futures]
+    finally:
+        # Threads blocked on unresponsive RPC calls must not block the caller.
+        executor.shutdown(wait = False)
+
+
+def _get_payments_up_to_block(
+    concent_rpc:            ConcentRPC,
+    requestor_eth_address:  str,
+    provider_eth_address:   str,
+    transaction_type:       TransactionType,
+    from_block:             Optional[int],
+    to_block:               int,
+) -> list:
+    if from_block is None:
+        # No block has been mined since payment_ts so there cannot be any payments yet.
+        return []
 
     if transaction_type == TransactionType.FORCE:
         payments_list = concent_rpc.get_forced_payments(  # pylint: disable=no-member
             requestor_address   = requestor_eth_address,
             provider_address    = provider_eth_address,
-            from_block          = last_block_before_payment,
-            to_block            = concent_rpc.get_block_number(),  # pylint: disable=no-member
+            from_block          = from_block,
+            to_block            = to_block,
         )
     elif transaction_type == TransactionType.BATCH:
         payments_list = concent_rpc.get_batch_transfers(  # pylint: disable=no-member
             payer_address   = requestor_eth_address,
             payee_address   = provider_eth_address,
-            from_block      = last_block_before_payment,
-            to_block        = concent_rpc.get_block_number(),  # pylint: disable=no-member
+            from_block      = from_block,
+            to_block        = to_block,
         )
 
     return payments_list
 
 
-def make_force_payment_to_provider(
+def _get_payments_from_index(
     requestor_eth_address:  str,
     provider_eth_address:   str,
-    value:                  int,
     payment_ts:             int,
-):
-    """
-    Concent makes transaction from requestor's deposit to provider's account on amount 'value'.
-    If there is less then 'value' on requestor's deposit, Concent transfers as much as possible.
-    """
-    assert isinstance(requestor_eth_address,    str) and len(requestor_eth_address) == ETHEREUM_ADDRESS_LENGTH
-    assert isinstance(provider_eth_address,     str) and len(provider_eth_address)  == ETHEREUM_ADDRESS_LENGTH
-    assert isinstance(payment_ts,               int) and payment_ts   >= 0
-    assert isinstance(value,                    int) and value        >= 0
-
-    requestor_account_balance = ConcentRPC().get_deposit_value(requestor_eth_address)  # type: ignore  # pylint: disable=no-member
-    if requestor_account_balance < value:
-        value = requestor_account_balance
-
-    ConcentRPC().force_payment(  # type: ignore  # pylint: disable=no-member
-        requestor_address   = requestor_eth_address,
-        provider_address    = provider_eth_address,
-        value               = value,
-        closure_time        = payment_ts,
+    transaction_type:       TransactionType,
+) -> List[PaymentEvent]:
+    return get_payment_events_from_index(
+        payer_address       = requestor_eth_address,
+        payee_address       = provider_eth_address,
+        payment_ts          = payment_ts,
+        transaction_type    = PaymentEvent.TransactionType[transaction_type.name],
     )
-
-
-def is_account_status_positive(
-    client_eth_address:     str,
-    pending_value = 0,
-):
-    assert isinstance(client_eth_address,       str) and len(client_eth_address) == ETHEREUM_ADDRESS_LENGTH
-    assert isinstance(pending_value,            int) and pending_value >= 0
-
-    client_acc_balance = ConcentRPC().get_deposit_value(client_eth_address)  # type: ignore  # pylint: disable=no-member
-
-    return client_acc_balance > pending_value
-
-
-class TransactionType(Enum):
-    BATCH = 'batch'
-    FORCE = 'force'
@@ -0,0 +1,178 @@
+from collections import namedtuple
+from enum import Enum
+from typing import Dict
+from typing import List
+import threading
+import time
+
+from django.conf import settings
+
+from core.constants import ETHEREUM_ADDRESS_LENGTH
+from core.payments.base import PaymentBackend
+from core.payments.base import PaymentQuery
+from core.payments.base import TransactionType
+
+ForcedPaymentEvent = namedtuple('ForcedPaymentEvent', ['requestor', 'provider', 'amount', 'closure_time'])
+BatchTransferEvent = namedtuple('BatchTransferEvent', ['sender', 'receiver', 'amount', 'closure_time'])
+
+
+class SimulatedChain:
+    """
+    In-memory replacement for the blockchain keeping deposits and ForcedPayment and BatchTransfer events.
+    Clients start with a deposit of `initial_deposit_value`. Nothing is random so the same sequence of calls
+    always gives the same results.
+    """
+
+    def __init__(self, initial_deposit_value: int) -> None:
+        self.initial_deposit_value  = initial_deposit_value
+        self._deposit_values        = {}  # type: Dict[str, int]
+        self._forced_payments       = []  # type: List[ForcedPaymentEvent]
+        self._batch_transfers       = []  # type: List[BatchTransferEvent]
+        self._lock                  = threading.Lock()
+
+    def get_deposit_value(self, address: str) -> int:
+        with self._lock:
+            return self._deposit_values.get(address, self.initial_deposit_value)
+
+    def set_deposit_value(self, address: str, value: int):
+        with self._lock:
+            self._deposit_values[address] = value
+
+    def add_batch_transfer(self, sender: str, receiver: str, amount: int, closure_time: int):
+        with self._lock:
+            self._batch_transfers.append(BatchTransferEvent(sender, receiver, amount, closure_time))
+
+    def force_payment(self, requestor: str, provider: str, value: int, closure_time: int) -> int:
+        """ Transfers `value`, or as much as possible, from requestor's deposit. Returns the amount transferred. """
+        with self._lock:
+            deposit_value = self._deposit_values.get(requestor, self.initial_deposit_value)
+            value = min(value, deposit_value)
+            self._deposit_values[requestor] = deposit_value - value
+            self._forced_payments.append(ForcedPaymentEvent(requestor, provider, value, closure_time))
+        return value
+
+    def get_forced_payments(self, requestor: str, provider: str, closure_time: int) -> List[ForcedPaymentEvent]:
+        with self._lock:
+            return [
+                event
+                for event in self._forced_payments
+                if event.requestor == requestor and event.provider == provider and event.closure_time >= closure_time
+            ]
+
+    def get_batch_transfers(self, sender: str, receiver: str, closure_time: int) -> List[BatchTransferEvent]:
+        with self._lock:
+            return [
+                event
+                for event in self._batch_transfers
+                if event.sender == sender and event.receiver == receiver and event.closure_time >= closure_time
+            ]
+
+
+_simulated_chain = None
+_simulated_chain_lock = threading.Lock()
+
+
+def get_simulated_chain() -> SimulatedChain:
+    """ Returns the chain shared by all threads of the process. Load tests use it to set up deposits and transfers. """
+    global _simulated_chain  # pylint: disable=global-statement
+    with _simulated_chain_lock:
+        if _simulated_chain is None:
+            _simulated_chain = SimulatedChain(settings.SIMULATED_CHAIN_INITIAL_DEPOSIT_VALUE)
+        return _simulated_chain
+
+
+def reset_simulated_chain():
+    global _simulated_chain  # pylint: disable=global-statement
+    with _simulated_chain_lock:
+        _simulated_chain = None
+
+
+class SimulatedChainPaymentBackend(PaymentBackend):
+    """
+    Payment backend keeping the blockchain in memory, in the chain returned by get_simulated_chain(). Meant for load
+    tests: every call to the Ethereum node the SCI backend would make waits SIMULATED_CHAIN_LATENCY seconds.
+    """
+
+    def get_list_of_payments(
+        self,
+        requestor_eth_address:  str,
+        provider_eth_address:   str,
+        payment_ts:             int,
+        current_time:           int,
+        transaction_type:       TransactionType,
+    ) -> list:
+        assert isinstance(requestor_eth_address,    str) and len(requestor_eth_address) == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(provider_eth_address,     str) and len(provider_eth_address)  == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(payment_ts,               int) and payment_ts     >= 0
+        assert isinstance(current_time,             int) and current_time   > 0
+        assert isinstance(transaction_type,         Enum) and transaction_type in TransactionType
+
+        _simulate_latency()
+        return _get_payments(requestor_eth_address, provider_eth_address, payment_ts, transaction_type)
+
+    def get_lists_of_payments(
+        self,
+        requestor_eth_address:  str,
+        provider_eth_address:   str,
+        current_time:           int,
+        queries:                List[PaymentQuery],
+    ) -> List[list]:
+        """ Like in the SCI backend, queries are sent concurrently so all of them take as long as a single one. """
+        assert isinstance(requestor_eth_address,    str) and len(requestor_eth_address) == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(provider_eth_address,     str) and len(provider_eth_address)  == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(current_time,             int) and current_time   > 0
+        assert isinstance(queries,                  list) and len(queries) > 0
+        for query in queries:
+            assert isinstance(query.payment_ts,         int) and query.payment_ts >= 0
+            assert isinstance(query.transaction_type,   Enum) and query.transaction_type in TransactionType
+
+        _simulate_latency()
+        return [
+            _get_payments(requestor_eth_address, provider_eth_address, query.payment_ts, query.transaction_type)
+            for query in queries
+        ]
+
+    def make_force_payment_to_provider(
+        self,
+        requestor_eth_address:  str,
+        provider_eth_address:   str,
+        value:                  int,
+        payment_ts:             int,
+    ) -> int:
+        assert isinstance(requestor_eth_address,    str) and len(requestor_eth_address) == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(provider_eth_address,     str) and len(provider_eth_address)  == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(payment_ts,               int) and payment_ts   >= 0
+        assert isinstance(value,                    int) and value        >= 0
+
+        # Reading the deposit and sending the transaction are two calls to the node.
+        _simulate_latency()
+        _simulate_latency()
+        return get_simulated_chain().force_payment(requestor_eth_address, provider_eth_address, value, payment_ts)
+
+    def is_account_status_positive(
+        self,
+        client_eth_address:     str,
+        pending_value:          int = 0,
+    ) -> bool:
+        assert isinstance(client_eth_address,       str) and len(client_eth_address) == ETHEREUM_ADDRESS_LENGTH
+        assert isinstance(pending_value,            int) and pending_value >= 0
+
+        _simulate_latency()
+        return get_simulated_chain().get_deposit_value(client_eth_address) > pending_value
+
+
+def _get_payments(
+    requestor_eth_address:  str,
+    provider_eth_address:   str,
+    payment_ts:             int,
+    transaction_type:       TransactionType,
+) -> list:
+    if transaction_type == TransactionType.FORCE:
+        return get_simulated_chain().get_forced_payments(requestor_eth_address, provider_eth_address, payment_ts)
+    return get_simulated_chain().get_batch_transfers(requestor_eth_address, provider_eth_address, payment_ts)
+
+
+def _simulate_latency():
+    """ Waits as long as a single call to the Ethereum node takes, according to SIMULATED_CHAIN_LATENCY. """
+    if settings.SIMULATED_CHAIN_LATENCY > 0:
+        time.sleep(settings.SIMULATED_CHAIN_LATENCY)
@@ -1,16 +1,21 @@
 from base64                     import b64encode
 from logging import getLogger
+from typing import Collection
+from typing import Dict
 from typing import Optional
 
+from django.conf                import settings
 from django.db.models           import Q
 from django.utils               import timezone
 
+from core.models                import Client
 from core.models                import PendingResponse
 from core.models                import Subtask
-import core.payments.base
+from core.outbox                import add_subtask_payment_to_outbox
 from core.transfer_operations   import store_pending_message
+from core.transfer_operations   import get_upload_statuses
+from core.transfer_operations   import update_subtask_to_result_uploaded
 from core.transfer_operations   import verify_file_status
-from utils.helpers              import deserialize_message
 from utils.helpers              import get_current_utc_timestamp
 from utils.helpers import parse_timestamp_to_utc_datetime
 from utils                      import logging
@@ -21,94 +26,181 @@ logger = getLogger(__name__)
 def update_timed_out_subtasks(
     client_public_key: bytes,
 ):
-    verify_file_status(client_public_key)
+    # Client's subtask summary tells whether there is anything to check at all. In most requests there is not.
+    client = Client.objects.filter(public_key = b64encode(client_public_key)).first()
 
-    clients_subtask_list = Subtask.objects.filter(
-        Q(requestor__public_key = b64encode(client_public_key)) | Q(provider__public_key = b64encode(client_public_key)),
-        state__in               = [state.name for state in Subtask.ACTIVE_STATES],
-        next_deadline__lte      = timezone.now()
-    )
+    # When disabled, uploads of results are reported to `result_upload_finished` task by the conductor
+    # and checked by the `sweep_timed_out_subtasks` periodic task before timing the subtask out.
+    if (
+        settings.CHECK_RESULT_UPLOAD_STATUS_IN_REQUESTS and
+        client is not None and
+        client.forcing_result_transfer_subtask_count > 0
+    ):
+        verify_file_status(client_public_key)
 
-    for subtask in clients_subtask_list:
-        if subtask.state == Subtask.SubtaskState.FORCING_REPORT.name:  # pylint: disable=no-member
-            update_subtask_state(
-                subtask                 = subtask,
-                state                   = Subtask.SubtaskState.REPORTED.name,  # pylint: disable=no-member
-            )
-            store_pending_message(
-                response_type       = PendingResponse.ResponseType.ForceReportComputedTaskResponse,
-                client_public_key   = subtask.provider.public_key_bytes,
-                queue               = PendingResponse.Queue.Receive,
-                subtask             = subtask,
-            )
-            store_pending_message(
-                response_type       = PendingResponse.ResponseType.VerdictReportComputedTask,
-                client_public_key   = subtask.requestor.public_key_bytes,
-                queue               = PendingResponse.Queue.ReceiveOutOfBand,
-                subtask             = subtask,
-            )
-        elif subtask.state == Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name:  # pylint: disable=no-member
-            update_subtask_state(
-                subtask                 = subtask,
-                state                   = Subtask.SubtaskState.FAILED.name,  # pylint: disable=no-member
-            )
-            store_pending_message(
-                response_type       = PendingResponse.ResponseType.ForceGetTaskResultFailed,
-                client_public_key   = subtask.requestor.public_key_bytes,
-                queue               = PendingResponse.Queue.Receive,
-                subtask             = subtask,
-            )
-        elif subtask.state == Subtask.SubtaskState.FORCING_ACCEPTANCE.name:  # pylint: disable=no-member
-            update_subtask_state(
-                subtask                 = subtask,
-                state                   = Subtask.SubtaskState.ACCEPTED.name,  # pylint: disable=no-member
-            )
-            store_pending_message(
-                response_type       = PendingResponse.ResponseType.SubtaskResultsSettled,
-                client_public_key   = subtask.provider.public_key_bytes,
-                queue               = PendingResponse.Queue.Receive,
-                subtask             = subtask,
-            )
-            store_pending_message(
-                response_type       = PendingResponse.ResponseType.SubtaskResultsSettled,
-                client_public_key   = subtask.requestor.public_key_bytes,
-                queue               = PendingResponse.Queue.ReceiveOutOfBand,
-                subtask             = subtask,
-            )
-        elif subtask.state == Subtask.SubtaskState.ADDITIONAL_VERIFICATION.name:  # pylint: disable=no-member
-            locked_subtask = Subtask.objects.select_for_update().get(pk=subtask.pk)
-            task_to_compute = deserialize_message(locked_subtask.task_to_compute.data.tobytes())
-
-            # Worker makes a payment from requestor's deposit just like in the forced acceptance use case.
-            core.payments.base.make_force_payment_to_provider(  # pylint: disable=no-value-for-parameter
-                requestor_eth_address=task_to_compute.requestor_ethereum_address,
-                provider_eth_address=task_to_compute.provider_ethereum_address,
-                value=task_to_compute.price,
-                payment_ts=get_current_utc_timestamp(),
-            )
+    # When disabled, timeouts are processed only by the `sweep_timed_out_subtasks` periodic task.
+    if not settings.UPDATE_TIMED_OUT_SUBTASKS_IN_REQUESTS:
+        return
 
-            update_subtask_state(
-                subtask                 = locked_subtask,
-                state                   = Subtask.SubtaskState.ACCEPTED.name,  # pylint: disable=no-member
-            )
-            store_pending_message(
-                response_type       = PendingResponse.ResponseType.SubtaskResultsSettled,
-                client_public_key   = locked_subtask.provider.public_key_bytes,
-                queue               = PendingResponse.Queue.ReceiveOutOfBand,
-                subtask             = locked_subtask,
-            )
-            store_pending_message(
-                response_type       = PendingResponse.ResponseType.SubtaskResultsSettled,
-                client_public_key   = locked_subtask.requestor.public_key_bytes,
-                queue               = PendingResponse.Queue.ReceiveOutOfBand,
-                subtask             = locked_subtask,
+    count = 0
+    if client is not None and client.next_deadline is not None and client.next_deadline <= timezone.now():
+        # Rows already claimed by the background sweeper (or another request) are skipped here.
+        # The client is resolved first so that only subtask rows end up being locked.
+        clients_subtask_list = Subtask.objects.select_for_update(skip_locked = True).filter(
+            Q(requestor = client) | Q(provider = client),
+            state__in               = [state.name for state in Subtask.ACTIVE_STATES],
+            next_deadline__lte      = timezone.now()
+        )
+        # Without the upload status check a result uploaded in time would be reported as a failure.
+        # Such subtasks are left to the `sweep_timed_out_subtasks` periodic task, which checks it first.
+        if not settings.CHECK_RESULT_UPLOAD_STATUS_IN_REQUESTS:
+            clients_subtask_list = clients_subtask_list.exclude(
+                state = Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name,  # pylint: disable=no-member
             )
 
+        for subtask in clients_subtask_list:
+            update_timed_out_subtask(subtask)
+            count += 1
+
     logging.log_changes_in_subtask_states(
         logger,
         client_public_key,
-        clients_subtask_list.count(),
+        count,
+    )
+
+
+def get_upload_statuses_of_timed_out_subtasks(
+    batch_size:             int,
+    excluded_subtask_ids:   Collection[int],
+) -> Dict[int, Optional[bool]]:
+    """
+    Asks the storage cluster whether results of at most `batch_size` subtasks in FORCING_RESULT_TRANSFER state
+    past their deadline have been uploaded. The requestor may not be around to trigger the check so it has to be done
+    before the subtasks time out. Otherwise a result that has been uploaded in time would be reported as a failure.
+    Must be called outside of a transaction so that no rows are locked while waiting for the storage cluster.
+    Returns upload statuses keyed by subtask ids, None if the storage cluster could not be reached.
+    """
+    assert isinstance(batch_size, int) and batch_size > 0
+
+    subtasks = list(
+        Subtask.objects.filter(
+            state                   = Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name,  # pylint: disable=no-member
+            next_deadline__lte      = timezone.now(),
+        ).exclude(
+            pk__in                  = excluded_subtask_ids,
+        ).order_by('next_deadline')[:batch_size]
     )
+    return dict(zip([subtask.pk for subtask in subtasks], get_upload_statuses(subtasks)))
+
+
+def update_timed_out_subtasks_in_batch(batch_size: int, upload_statuses: Dict[int, Optional[bool]]) -> int:
+    """
+    Claims at most `batch_size` active subtasks past their deadline, starting from the ones that timed out first,
+    and processes their timeouts. Rows locked by other transactions are skipped rather than waited for so that
+    concurrent sweepers and requests never block each other. Subtasks in FORCING_RESULT_TRANSFER state are claimed
+    only if `upload_statuses` from get_upload_statuses_of_timed_out_subtasks() tells whether their result is uploaded.
+    Must be called inside a transaction on the control database. Returns the number of processed subtasks.
+    """
+    assert isinstance(batch_size, int) and batch_size > 0
+
+    forcing_result_transfer = Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name  # pylint: disable=no-member
+    checked_subtask_ids = [
+        subtask_id
+        for subtask_id, upload_status in upload_statuses.items()
+        if upload_status is not None
+    ]
+    timed_out_subtasks = Subtask.objects.select_for_update(skip_locked = True).filter(
+        ~Q(state = forcing_result_transfer) | Q(pk__in = checked_subtask_ids),
+        state__in               = [state.name for state in Subtask.ACTIVE_STATES],
+        next_deadline__lte      = timezone.now(),
+    ).order_by('next_deadline')[:batch_size]
+
+    count = 0
+    for subtask in timed_out_subtasks:
+        if (
+            subtask.state == forcing_result_transfer and
+            upload_statuses[subtask.pk]
+        ):
+            update_subtask_to_result_uploaded(subtask)
+        else:
+            update_timed_out_subtask(subtask)
+        count += 1
+    return count
+
+
+def update_timed_out_subtask(subtask: Subtask):
+    """
+    Performs the state transition that the protocol prescribes for an active subtask whose deadline has passed.
+    The caller is responsible for holding a lock on the subtask row.
+    """
+    if subtask.state == Subtask.SubtaskState.FORCING_REPORT.name:  # pylint: disable=no-member
+        update_subtask_state(
+            subtask                 = subtask,
+            state                   = Subtask.SubtaskState.REPORTED.name,  # pylint: disable=no-member
+        )
+        store_pending_message(
+            response_type       = PendingResponse.ResponseType.ForceReportComputedTaskResponse,
+            client_public_key   = subtask.provider.public_key_bytes,
+            queue               = PendingResponse.Queue.Receive,
+            subtask             = subtask,
+        )
+        store_pending_message(
+            response_type       = PendingResponse.ResponseType.VerdictReportComputedTask,
+            client_public_key   = subtask.requestor.public_key_bytes,
+            queue               = PendingResponse.Queue.ReceiveOutOfBand,
+            subtask             = subtask,
+        )
+    elif subtask.state == Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name:  # pylint: disable=no-member
+        update_subtask_state(
+            subtask                 = subtask,
+            state                   = Subtask.SubtaskState.FAILED.name,  # pylint: disable=no-member
+        )
+        store_pending_message(
+            response_type       = PendingResponse.ResponseType.ForceGetTaskResultFailed,
+            client_public_key   = subtask.requestor.public_key_bytes,
+            queue               = PendingResponse.Queue.Receive,
+            subtask             = subtask,
+        )
+    elif subtask.state == Subtask.SubtaskState.FORCING_ACCEPTANCE.name:  # pylint: disable=no-member
+        update_subtask_state(
+            subtask                 = subtask,
+            state                   = Subtask.SubtaskState.ACCEPTED.name,  # pylint: disable=no-member
+        )
+        store_pending_message(
+            response_type       = PendingResponse.ResponseType.SubtaskResultsSettled,
+            client_public_key   = subtask.provider.public_key_bytes,
+            queue               = PendingResponse.Queue.Receive,
+            subtask             = subtask,
+        )
+        store_pending_message(
+            response_type       = PendingResponse.ResponseType.SubtaskResultsSettled,
+            client_public_key   = subtask.requestor.public_key_bytes,
+            queue               = PendingResponse.Queue.ReceiveOutOfBand,
+            subtask             = subtask,
+        )
+    elif subtask.state == Subtask.SubtaskState.ADDITIONAL_VERIFICATION.name:  # pylint: disable=no-member
+        # Worker makes a payment from requestor's deposit just like in the forced acceptance use case.
+        add_subtask_payment_to_outbox(
+            subtask=subtask,
+            payment_ts=get_current_utc_timestamp(),
+        )
+
+        update_subtask_state(
+            subtask                 = subtask,
+            state                   = Subtask.SubtaskState.ACCEPTED.name,  # pylint: disable=no-member
+        )
+        store_pending_message(
+            response_type       = PendingResponse.ResponseType.SubtaskResultsSettled,
+            client_public_key   = subtask.provider.public_key_bytes,
+            queue               = PendingResponse.Queue.ReceiveOutOfBand,
+            subtask             = subtask,
+        )
+        store_pending_message(
+            response_type       = PendingResponse.ResponseType.SubtaskResultsSettled,
+            client_public_key   = subtask.requestor.public_key_bytes,
+            queue               = PendingResponse.Queue.ReceiveOutOfBand,
+            subtask             = subtask,
+        )
 
 
 def update_subtask_state(
@@ -125,13 +217,3 @@ def update_subtask_state(
     subtask.next_deadline = None if next_deadline is None else parse_timestamp_to_utc_datetime(next_deadline)
     subtask.full_clean()
     subtask.save()
-
-
-def verify_message_subtask_results_accepted(subtask_results_accepted_list: dict) -> bool:
-    """
-    function verify if all requestor public key and ethereum public key
-    in subtask_reesults_accepted_list are the same
-    """
-    verify_public_key           = len(set(subtask_results_accepted.task_to_compute.requestor_public_key             for subtask_results_accepted in subtask_results_accepted_list)) == 1
-    verify_ethereum_public_key  = len(set(subtask_results_accepted.task_to_compute.requestor_ethereum_public_key    for subtask_results_accepted in subtask_results_accepted_list)) == 1
-    return bool(verify_public_key is True and verify_ethereum_public_key is True)
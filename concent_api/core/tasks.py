@@ -1,4 +1,6 @@
 import logging
+import time
+from typing import Dict
 
 from celery import shared_task
 from mypy.types import Optional
@@ -7,17 +9,23 @@ from django.conf import settings
 from django.db import DatabaseError
 from django.db import transaction
 
-from conductor import tasks
 from core.constants import VerificationResult
 from core.models import PendingResponse
 from core.models import Subtask
-from core.payments import base
+from core import archive
+from core import outbox
+from core.payments import blocks
+from core.payments import event_indexer
 from core.subtask_helpers import update_subtask_state
+from core.subtask_helpers import get_upload_statuses_of_timed_out_subtasks
+from core.subtask_helpers import update_timed_out_subtasks_in_batch
 from core.transfer_operations import store_pending_message
+from core.transfer_operations import update_subtask_to_result_uploaded
 from utils.decorators import provides_concent_feature
-from utils.helpers import deserialize_message
 from utils.helpers import get_current_utc_timestamp
 from utils.helpers import parse_timestamp_to_utc_datetime
+from utils.logging import log_archive_batch_processed
+from utils.logging import log_timed_out_subtasks_batch_processed
 from .constants import CELERY_LOCKED_SUBTASK_DELAY
 from .constants import MAXIMUM_VERIFICATION_RESULT_TASK_RETRIES
 from .constants import VERIFICATION_RESULT_SUBTASK_STATE_ACCEPTED_LOG_MESSAGE
@@ -36,18 +44,14 @@ def upload_finished(subtask_id: str):
         logging.error(f'Task `upload_finished` tried to get Subtask object with ID {subtask_id} but it does not exist.')
         return
 
-    report_computed_task = deserialize_message(subtask.report_computed_task.data.tobytes())
-
     # Check subtask state, if it's VERIFICATION FILE TRANSFER, proceed with the task.
     if subtask.state_enum == Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER:
 
         # If subtask is past the deadline, processes the timeout.
         if subtask.next_deadline.timestamp() < get_current_utc_timestamp():
             # Worker makes a payment from requestor's deposit just like in the forced acceptance use case.
-            base.make_force_payment_to_provider(  # pylint: disable=no-value-for-parameter
-                requestor_eth_address=report_computed_task.task_to_compute.requestor_ethereum_address,
-                provider_eth_address=report_computed_task.task_to_compute.provider_ethereum_address,
-                value=report_computed_task.task_to_compute.price,
+            outbox.add_subtask_payment_to_outbox(
+                subtask=subtask,
                 payment_ts=get_current_utc_timestamp(),
             )
 
@@ -75,12 +79,14 @@ def upload_finished(subtask_id: str):
         )
 
         # Add upload_acknowledged task to the work queue.
-        tasks.upload_acknowledged.delay(
+        outbox.add_celery_task_to_outbox(
+            f'upload-acknowledged-{subtask_id}',
+            'conductor.tasks.upload_acknowledged',
             subtask_id=subtask_id,
-            source_file_size=report_computed_task.task_to_compute.size,
-            source_package_hash=report_computed_task.task_to_compute.package_hash,
-            result_file_size=report_computed_task.size,
-            result_package_hash=report_computed_task.package_hash,
+            source_file_size=subtask.source_package_size,
+            source_package_hash=subtask.source_package_hash,
+            result_file_size=subtask.result_package_size,
+            result_package_hash=subtask.result_package_hash,
         )
 
     # If it's ADDITIONAL VERIFICATION, ACCEPTED or FAILED, log a warning and ignore the notification.
@@ -101,6 +107,30 @@ def upload_finished(subtask_id: str):
         )
 
 
+@shared_task
+@provides_concent_feature('concent-worker')
+@transaction.atomic(using='control')
+def result_upload_finished(subtask_id: str):
+    """
+    Sent by the conductor when a result package has been uploaded to the storage cluster.
+    If the requestor is waiting for the result, makes it available for download right away.
+    """
+    try:
+        subtask = Subtask.objects.select_for_update().get(subtask_id=subtask_id)
+    except Subtask.DoesNotExist:
+        logger.info(f'Task `result_upload_finished` ignored upload of result for unknown subtask with ID {subtask_id}.')
+        return
+
+    # Results are uploaded in the additional verification use case too. Such uploads are handled by `upload_finished`.
+    if subtask.state_enum != Subtask.SubtaskState.FORCING_RESULT_TRANSFER:
+        logger.info(
+            f'Task `result_upload_finished` ignored upload of result for subtask with ID {subtask_id} in {subtask.state} state.'
+        )
+        return
+
+    update_subtask_to_result_uploaded(subtask)
+
+
 @shared_task(bind=True)
 @provides_concent_feature('concent-worker')
 @transaction.atomic(using='control')
@@ -154,12 +184,9 @@ def verification_result(
     # If the time is already past next_deadline for the subtask (SubtaskResultsRejected.timestamp + AVCT)
     # worker ignores worker's message and processes the timeout.
     if subtask.next_deadline < parse_timestamp_to_utc_datetime(get_current_utc_timestamp()):
-        task_to_compute = deserialize_message(subtask.task_to_compute.data.tobytes())
         # Worker makes a payment from requestor's deposit just like in the forced acceptance use case.
-        base.make_force_payment_to_provider(  # pylint: disable=no-value-for-parameter
-            requestor_eth_address=task_to_compute.requestor_ethereum_address,
-            provider_eth_address=task_to_compute.provider_ethereum_address,
-            value=task_to_compute.price,
+        outbox.add_subtask_payment_to_outbox(
+            subtask=subtask,
             payment_ts=get_current_utc_timestamp(),
         )
 
@@ -200,13 +227,9 @@ def verification_result(
                 f'SUBTASK_ID {subtask_id} -- RESULT {result_enum.name} -- ERROR MESSAGE {error_message} -- ERROR CODE {error_code}'
             )
 
-        task_to_compute = deserialize_message(subtask.task_to_compute.data.tobytes())
-
         # Worker makes a payment from requestor's deposit just like in the forced acceptance use case.
-        base.make_force_payment_to_provider(  # pylint: disable=no-value-for-parameter
-            requestor_eth_address=task_to_compute.requestor_ethereum_address,
-            provider_eth_address=task_to_compute.provider_ethereum_address,
-            value=task_to_compute.price,
+        outbox.add_subtask_payment_to_outbox(
+            subtask=subtask,
             payment_ts=get_current_utc_timestamp(),
         )
 
@@ -226,3 +249,74 @@ def verification_result(
         )
 
     logger.info(f'verification_result_task ends with: SUBTASK_ID {subtask_id} -- RESULT {result_enum.name}')
+
+
+@shared_task
+@provides_concent_feature('concent-worker')
+def sweep_timed_out_subtasks():
+    """
+    Periodic task processing timeouts of all active subtasks, independently of whether their clients ever contact
+    Concent again. Each batch is claimed and processed in its own transaction so that locks are held only briefly.
+    Upload statuses are checked before each transaction starts so that no locks are held during storage cluster
+    requests.
+    """
+    batch_size = settings.TIMED_OUT_SUBTASKS_SWEEP_BATCH_SIZE
+    upload_statuses = {}  # type: Dict[int, Optional[bool]]
+
+    while True:
+        start_time = time.monotonic()
+        upload_statuses.update(get_upload_statuses_of_timed_out_subtasks(batch_size, list(upload_statuses)))
+        with transaction.atomic(using='control'):
+            count = update_timed_out_subtasks_in_batch(batch_size, upload_statuses)
+        log_timed_out_subtasks_batch_processed(logger, count, time.monotonic() - start_time)
+
+        # A batch that is not full means that there are no more timed out subtasks that could be claimed right now.
+        if count < batch_size:
+            break
+
+
+@shared_task
+@provides_concent_feature('concent-worker')
+def index_payment_events():
+    """
+    Periodic task copying new payment events from the blockchain to the database.
+    Runs of the indexer never store the same blocks twice so overlapping runs are harmless.
+    """
+    event_indexer.index_payment_events()
+
+
+@shared_task
+@provides_concent_feature('concent-worker')
+def index_block_timestamps():
+    """ Periodic task storing timestamps of the most recent confirmed blocks. """
+    blocks.index_block_timestamps()
+
+
+@shared_task
+@provides_concent_feature('concent-worker')
+def relay_outbox():
+    """
+    Periodic task carrying out side effects added to the outbox by committed transactions.
+    Subtask payments whose aggregation window has passed are added to the outbox first.
+    """
+    outbox.aggregate_subtask_payments()
+    outbox.relay_outbox_messages(settings.OUTBOX_RELAY_BATCH_SIZE)
+
+
+@shared_task
+@provides_concent_feature('concent-worker')
+def archive_finished_subtasks():
+    """
+    Periodic task moving subtasks that have been in a passive state for ARCHIVE_RETENTION_TIME, and pending responses
+    that have not been delivered for that long, to the archive. Each batch is moved in its own transaction.
+    """
+    batch_size = settings.ARCHIVE_BATCH_SIZE
+
+    while True:
+        with transaction.atomic(using='control'):
+            archived_subtask_count = archive.archive_finished_subtasks(batch_size)
+            archived_pending_response_count = archive.archive_stale_pending_responses(batch_size)
+        log_archive_batch_processed(logger, archived_subtask_count, archived_pending_response_count)
+
+        if archived_subtask_count < batch_size and archived_pending_response_count < batch_size:
+            break
@@ -1,15 +1,11 @@
 from django import template
 from constance import config
+from core.models import ActiveSubtaskCounter
 from core.models import Subtask
 
 register = template.Library()
 
 
-def get_active_subtasks():
-    active_state_names = [state.name for state in Subtask.ACTIVE_STATES]
-    return Subtask.objects.filter(state__in=active_state_names)
-
-
 def get_result_uploaded_subtasks():
     return Subtask.objects.filter(state=Subtask.SubtaskState.RESULT_UPLOADED.name)  # pylint: disable=no-member
 
@@ -21,7 +17,7 @@ def get_shutdown_mode_state():
 
 @register.assignment_tag
 def get_active_subtasks_amount():
-    return get_active_subtasks().count()
+    return ActiveSubtaskCounter.get_active_subtask_count()
 
 
 @register.assignment_tag
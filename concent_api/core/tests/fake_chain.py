@@ -0,0 +1,85 @@
+from collections import namedtuple
+from typing import List
+from typing import Optional
+
+Block = namedtuple('Block', ['number', 'timestamp'])
+
+# Like in golem_sci, events know the number of the block they come from. It is set when the block is mined.
+ForcedPaymentEvent = namedtuple('ForcedPaymentEvent', ['requestor', 'provider', 'amount', 'closure_time', 'block_number'])
+BatchTransferEvent = namedtuple('BatchTransferEvent', ['sender', 'receiver', 'amount', 'closure_time', 'block_number'])
+ForcedPaymentEvent.__new__.__defaults__ = (None,)  # type: ignore
+BatchTransferEvent.__new__.__defaults__ = (None,)  # type: ignore
+
+
+class FakeChain:
+    """
+    In-process replacement for ConcentRPC keeping ForcedPayment and BatchTransfer events in a list of blocks.
+    Starts with an empty genesis block with timestamp 0. Unless given, timestamp of every next block is
+    BLOCK_TIME seconds later. Like in golem_sci, `None` instead of an address matches any address.
+    """
+
+    BLOCK_TIME = 15
+
+    def __init__(self) -> None:
+        self.blocks = [[]]  # type: List[list]
+        self.timestamps = [0]  # type: List[int]
+
+    def get_block_number(self) -> int:
+        return len(self.blocks) - 1
+
+    def get_block_by_number(self, number: int) -> Block:
+        assert 0 <= number < len(self.blocks)
+        return Block(number, self.timestamps[number])
+
+    def mine_block(self, *events, timestamp: Optional[int] = None) -> int:
+        assert timestamp is None or timestamp > self.timestamps[-1]
+        self.blocks.append([event._replace(block_number = len(self.blocks)) for event in events])
+        self.timestamps.append(timestamp if timestamp is not None else self.timestamps[-1] + self.BLOCK_TIME)
+        return self.get_block_number()
+
+    def mine_empty_blocks(self, count: int) -> int:
+        for _ in range(count):
+            self.mine_block()
+        return self.get_block_number()
+
+    def reorganize(self, depth: int, *blocks: list) -> None:
+        """ Replaces `depth` most recent blocks with `blocks`, each given as a list of events. """
+        assert 0 < depth < len(self.blocks)
+        del self.blocks[-depth:]
+        del self.timestamps[-depth:]
+        for events in blocks:
+            self.mine_block(*events)
+
+    def get_forced_payments(
+        self,
+        requestor_address:  Optional[str],
+        provider_address:   Optional[str],
+        from_block:         int,
+        to_block:           int,
+    ) -> List[ForcedPaymentEvent]:
+        return [
+            event
+            for event in self._get_events(ForcedPaymentEvent, from_block, to_block)
+            if requestor_address in (None, event.requestor) and provider_address in (None, event.provider)
+        ]
+
+    def get_batch_transfers(
+        self,
+        payer_address:  Optional[str],
+        payee_address:  Optional[str],
+        from_block:     int,
+        to_block:       int,
+    ) -> List[BatchTransferEvent]:
+        return [
+            event
+            for event in self._get_events(BatchTransferEvent, from_block, to_block)
+            if payer_address in (None, event.sender) and payee_address in (None, event.receiver)
+        ]
+
+    def _get_events(self, event_type: type, from_block: int, to_block: int) -> list:
+        return [
+            event
+            for events in self.blocks[from_block:to_block + 1]
+            for event in events
+            if isinstance(event, event_type)
+        ]
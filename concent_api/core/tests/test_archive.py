@@ -0,0 +1,162 @@
+import base64
+import datetime
+
+import mock
+
+from django.conf import settings
+from django.test import override_settings
+from django.utils import timezone
+from freezegun import freeze_time
+
+from core.message_handlers import store_subtask
+from core.models import ArchivedPendingResponse
+from core.models import ArchivedSubtask
+from core.models import MessagePayload
+from core.models import PendingResponse
+from core.models import StoredMessage
+from core.models import Subtask
+from core.models import SubtaskPayment
+from core.outbox import add_subtask_payment_to_outbox
+from core.tasks import archive_finished_subtasks
+from core.tests.utils import ConcentIntegrationTestCase
+from core.transfer_operations import store_pending_message
+from utils.helpers import get_current_utc_timestamp
+
+
+@override_settings(
+    ARCHIVE_RETENTION_TIME=1000,
+    ARCHIVE_BATCH_SIZE=2,
+)
+class ArchiveTest(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.archived_at = timezone.now() + datetime.timedelta(seconds=settings.ARCHIVE_RETENTION_TIME + 1)
+
+    def _store_subtask(self, subtask_id, state):
+        task_to_compute = self._get_deserialized_task_to_compute(task_id='1', subtask_id=subtask_id)
+        return store_subtask(
+            task_id='1',
+            subtask_id=subtask_id,
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=state,
+            next_deadline=(
+                get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME
+                if state in Subtask.ACTIVE_STATES else
+                None
+            ),
+            task_to_compute=task_to_compute,
+            report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+        )
+
+    def _store_pending_response(self, subtask, delivered=False):
+        store_pending_message(
+            response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+            client_public_key=self.REQUESTOR_PUBLIC_KEY,
+            queue=PendingResponse.Queue.Receive,
+            subtask=subtask,
+        )
+        PendingResponse.objects.filter(subtask=subtask).update(delivered=delivered)
+
+    def _archive(self):
+        with freeze_time(self.archived_at):
+            archive_finished_subtasks()  # pylint: disable=no-value-for-parameter
+
+    def test_that_old_passive_subtask_is_archived_with_its_messages_and_responses(self):
+        subtask = self._store_subtask('1', Subtask.SubtaskState.ACCEPTED)
+        self._store_pending_response(subtask, delivered=True)
+        task_to_compute_bytes = subtask.task_to_compute.data_bytes
+
+        self._archive()
+
+        self.assertFalse(Subtask.objects.exists())
+        self.assertFalse(StoredMessage.objects.exists())
+        self.assertFalse(MessagePayload.objects.exists())
+        self.assertFalse(PendingResponse.objects.exists())
+
+        archived_subtask = ArchivedSubtask.objects.get()
+        self.assertEqual(archived_subtask.subtask_id, '1')
+        self.assertEqual(archived_subtask.state, Subtask.SubtaskState.ACCEPTED.name)  # pylint: disable=no-member
+        self.assertEqual(archived_subtask.archive_period, self.archived_at.date().replace(day=1))
+        document = archived_subtask.document_dict
+        self.assertEqual(document['subtask']['id'], subtask.id)
+        self.assertEqual(document['subtask']['task_to_compute_id'], document['stored_messages']['task_to_compute']['id'])
+        self.assertEqual(
+            base64.b64decode(document['stored_messages']['task_to_compute']['data']),
+            task_to_compute_bytes,
+        )
+        self.assertIsNone(document['payment'])
+
+        archived_pending_response = ArchivedPendingResponse.objects.get()
+        self.assertEqual(archived_pending_response.subtask_id, '1')
+        self.assertTrue(archived_pending_response.delivered)
+        self.assertEqual(archived_pending_response.document_dict['pending_response']['subtask_id'], subtask.id)
+
+    def test_that_recent_and_active_subtasks_are_not_archived(self):
+        self._store_subtask('1', Subtask.SubtaskState.FORCING_REPORT)
+        with freeze_time(self.archived_at - datetime.timedelta(seconds=2)):
+            self._store_subtask('2', Subtask.SubtaskState.FAILED)
+
+        self._archive()
+
+        self.assertEqual(Subtask.objects.count(), 2)
+        self.assertFalse(ArchivedSubtask.objects.exists())
+
+    def test_that_subtask_is_not_archived_until_its_payment_is_made(self):
+        subtask = self._store_subtask('1', Subtask.SubtaskState.ACCEPTED)
+        add_subtask_payment_to_outbox(subtask, 1000)
+
+        self._archive()
+        self.assertTrue(Subtask.objects.exists())
+
+        SubtaskPayment.objects.update(paid_value=10)
+        self._archive()
+
+        self.assertFalse(Subtask.objects.exists())
+        self.assertFalse(SubtaskPayment.objects.exists())
+        self.assertEqual(ArchivedSubtask.objects.get().document_dict['payment']['paid_value'], '10')
+
+    def test_that_subtasks_are_archived_in_batches(self):
+        for subtask_id in ['1', '2', '3']:
+            self._store_subtask(subtask_id, Subtask.SubtaskState.FAILED)
+
+        with mock.patch('core.tasks.log_archive_batch_processed') as log_mock:
+            self._archive()
+
+        self.assertEqual(
+            [call[0][1] for call in log_mock.call_args_list],
+            [2, 1],
+        )
+        self.assertEqual(ArchivedSubtask.objects.count(), 3)
+
+    def test_that_stale_undelivered_response_of_active_subtask_is_expired(self):
+        subtask = self._store_subtask('1', Subtask.SubtaskState.FORCING_REPORT)
+        self._store_pending_response(subtask, delivered=False)
+
+        self._archive()
+
+        self.assertTrue(Subtask.objects.exists())
+        self.assertFalse(PendingResponse.objects.exists())
+        archived_pending_response = ArchivedPendingResponse.objects.get()
+        self.assertFalse(archived_pending_response.delivered)
+        self.assertEqual(archived_pending_response.subtask_id, '1')
+
+    def test_that_state_changed_at_is_updated_only_on_state_change(self):
+        with freeze_time("2018-01-01 10:00:00"):
+            subtask = self._store_subtask('1', Subtask.SubtaskState.FORCING_REPORT)
+
+        with freeze_time("2018-01-01 10:00:05"):
+            subtask.next_deadline = subtask.next_deadline + datetime.timedelta(seconds=1)
+            subtask.save()
+        subtask.refresh_from_db()
+        self.assertEqual(subtask.state_changed_at, datetime.datetime(2018, 1, 1, 10, 0, 0, tzinfo=timezone.utc))
+
+        with freeze_time("2018-01-01 10:00:10"):
+            subtask.state = Subtask.SubtaskState.REPORTED.name  # pylint: disable=no-member
+            subtask.next_deadline = None
+            subtask.save(update_fields=['state', 'next_deadline'])
+        subtask.refresh_from_db()
+        self.assertEqual(subtask.state_changed_at, datetime.datetime(2018, 1, 1, 10, 0, 10, tzinfo=timezone.utc))
@@ -66,9 +66,9 @@ class AuthForcePaymentIntegrationTest(ConcentIntegrationTestCase):
                     self._get_list_of_force_transactions(),
                 ]
                 with mock.patch(
-                    'core.message_handlers.core.payments.base.get_list_of_payments',
-                    side_effect=fake_responses
-                ) as get_list_of_payments_mock:
+                    'core.message_handlers.core.payments.base.get_lists_of_payments',
+                    return_value=fake_responses
+                ) as get_lists_of_payments_mock:
                     response_1 = self.client.post(
                         reverse('core:send'),
                         data                                = serialized_force_payment,
@@ -76,7 +76,7 @@ class AuthForcePaymentIntegrationTest(ConcentIntegrationTestCase):
                     )
 
         make_force_payment_to_provider_mock.assert_called_once()
-        self.assertEqual(get_list_of_payments_mock.call_count, 2)
+        get_lists_of_payments_mock.assert_called_once()
 
         self._test_response(
             response_1,
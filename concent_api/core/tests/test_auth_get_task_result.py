@@ -17,11 +17,11 @@ from utils.testing_helpers  import generate_ecc_key_pair
 (CONCENT_PRIVATE_KEY, CONCENT_PUBLIC_KEY)                         = generate_ecc_key_pair()
 
 
-def request_upload_status_true_mock( _report_computed_task):
+def request_upload_status_true_mock(_subtask):
     return True
 
 
-def request_upload_status_false_mock(_report_computed_task):
+def request_upload_status_false_mock(_subtask):
     return False
 
 
@@ -145,7 +145,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_original_serialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_original_serialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self._test_400_response(
@@ -187,7 +187,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_original_serialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_original_serialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,  200)
@@ -212,7 +212,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_original_serialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_original_serialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,  200)
@@ -332,7 +332,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,        204)
@@ -435,7 +435,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,        200)
@@ -572,7 +572,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,        204)
@@ -680,7 +680,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,      200)
@@ -817,7 +817,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,        204)
@@ -1051,7 +1051,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,        204)
@@ -1150,7 +1150,7 @@ class AuthGetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_true_mock_function.assert_called_with(
-            deserialized_force_get_task_result.report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_force_get_task_result.report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,      200)
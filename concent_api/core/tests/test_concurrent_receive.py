@@ -0,0 +1,144 @@
+import threading
+
+from django.conf import settings
+from django.db import connections
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from golem_messages.factories.tasks import ReportComputedTaskFactory
+from golem_messages.factories.tasks import TaskToComputeFactory
+
+from core.message_handlers import handle_messages_from_database_in_batch
+from core.message_handlers import store_subtask
+from core.models import PendingResponse
+from core.models import Subtask
+from core.transfer_operations import store_pending_message
+from utils.helpers import get_current_utc_timestamp
+from utils.testing_helpers import generate_ecc_key_pair
+
+
+class ConcurrentReceiveTest(TransactionTestCase):
+    """
+    Runs many receivers against a single queue, each in its own thread, database connection and transaction,
+    like concurrent requests handled by different processes.
+    """
+
+    multi_db = True
+
+    NUMBER_OF_PENDING_RESPONSES = 30
+    NUMBER_OF_RECEIVERS = 8
+    BATCH_SIZE = 2
+
+    def setUp(self):
+        super().setUp()
+
+        (self.PROVIDER_PRIVATE_KEY, self.PROVIDER_PUBLIC_KEY) = generate_ecc_key_pair()
+        (self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY) = generate_ecc_key_pair()
+
+        for subtask_number in range(self.NUMBER_OF_PENDING_RESPONSES):
+            subtask = store_subtask(
+                task_id=str(subtask_number),
+                subtask_id=str(subtask_number),
+                provider_public_key=self.PROVIDER_PUBLIC_KEY,
+                requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+                state=Subtask.SubtaskState.FORCING_REPORT,
+                next_deadline=get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME,
+                task_to_compute=TaskToComputeFactory(
+                    task_id=str(subtask_number),
+                    subtask_id=str(subtask_number),
+                ),
+                report_computed_task=ReportComputedTaskFactory(
+                    subtask_id=str(subtask_number),
+                ),
+            )
+            store_pending_message(
+                response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+                client_public_key=self.REQUESTOR_PUBLIC_KEY,
+                queue=PendingResponse.Queue.Receive,
+                subtask=subtask,
+            )
+
+    def _receive_batch(self):
+        with transaction.atomic(using='control'):
+            return handle_messages_from_database_in_batch(
+                client_public_key=self.REQUESTOR_PUBLIC_KEY,
+                response_type=PendingResponse.Queue.Receive,
+                batch_size=self.BATCH_SIZE,
+            )
+
+    def _run_in_threads(self, targets):
+        errors = []
+
+        def run(target):
+            try:
+                target()
+            except Exception as exception:  # pylint: disable=broad-except
+                errors.append(exception)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_that_concurrent_receivers_get_every_pending_response_exactly_once(self):
+        received_subtask_ids = []
+        start = threading.Barrier(self.NUMBER_OF_RECEIVERS)
+
+        def receive_until_queue_is_empty():
+            start.wait()
+            while True:
+                responses = self._receive_batch()
+                if len(responses) == 0:
+                    return
+                received_subtask_ids.extend(
+                    response.report_computed_task.subtask_id
+                    for response in responses
+                )
+
+        self._run_in_threads([receive_until_queue_is_empty] * self.NUMBER_OF_RECEIVERS)
+
+        self.assertEqual(len(received_subtask_ids), self.NUMBER_OF_PENDING_RESPONSES)
+        self.assertEqual(len(set(received_subtask_ids)), self.NUMBER_OF_PENDING_RESPONSES)
+        self.assertFalse(PendingResponse.objects.filter(delivered=False).exists())
+
+    def test_that_receiver_does_not_wait_for_responses_claimed_by_transaction_in_progress(self):
+        first_batch = []
+        second_batch = []
+        first_batch_claimed = threading.Event()
+        second_batch_claimed = threading.Event()
+        first_transaction_finished = threading.Event()
+        second_batch_claimed_before_first_transaction_finished = []
+
+        def receive_and_keep_transaction_open():
+            with transaction.atomic(using='control'):
+                first_batch.extend(
+                    handle_messages_from_database_in_batch(
+                        client_public_key=self.REQUESTOR_PUBLIC_KEY,
+                        response_type=PendingResponse.Queue.Receive,
+                        batch_size=self.BATCH_SIZE,
+                    )
+                )
+                first_batch_claimed.set()
+                second_batch_claimed.wait(timeout=10)
+            first_transaction_finished.set()
+
+        def receive_while_first_transaction_is_open():
+            first_batch_claimed.wait(timeout=10)
+            second_batch.extend(self._receive_batch())
+            second_batch_claimed_before_first_transaction_finished.append(not first_transaction_finished.is_set())
+            second_batch_claimed.set()
+
+        self._run_in_threads([receive_and_keep_transaction_open, receive_while_first_transaction_is_open])
+
+        self.assertEqual(second_batch_claimed_before_first_transaction_finished, [True])
+        self.assertEqual(len(first_batch), self.BATCH_SIZE)
+        self.assertEqual(len(second_batch), self.BATCH_SIZE)
+        self.assertEqual(
+            {response.report_computed_task.subtask_id for response in first_batch} &
+            {response.report_computed_task.subtask_id for response in second_batch},
+            set(),
+        )
@@ -0,0 +1,51 @@
+import mock
+
+from constance import config
+from constance.test import override_config
+from django.test import override_settings
+from django.test import TestCase
+
+from core.config_cache import _config_values
+from core.config_cache import get_config_value
+from core.config_cache import is_soft_shutdown_mode_enabled
+
+
+@override_settings(
+    CONSTANCE_LOCAL_CACHE_TIME=60,
+)
+class ConfigCacheTest(TestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        _config_values.clear()
+
+    def tearDown(self):
+        _config_values.clear()
+        super().tearDown()
+
+    @override_config(SOFT_SHUTDOWN_MODE=False)
+    def test_that_value_is_read_from_database_once(self):
+        self.assertFalse(is_soft_shutdown_mode_enabled())
+
+        with mock.patch('core.config_cache.config') as constance_config:
+            constance_config.SOFT_SHUTDOWN_MODE = True
+            self.assertFalse(is_soft_shutdown_mode_enabled())
+
+    @override_config(SOFT_SHUTDOWN_MODE=False)
+    def test_that_value_changed_by_this_process_is_read_again(self):
+        self.assertFalse(get_config_value('SOFT_SHUTDOWN_MODE'))
+
+        config.SOFT_SHUTDOWN_MODE = True
+
+        self.assertTrue(is_soft_shutdown_mode_enabled())
+
+    @override_config(SOFT_SHUTDOWN_MODE=True)
+    @override_settings(CONSTANCE_LOCAL_CACHE_TIME=0)
+    def test_that_value_is_not_cached_if_cache_is_disabled(self):
+        self.assertTrue(is_soft_shutdown_mode_enabled())
+
+        with mock.patch('core.config_cache.config') as constance_config:
+            constance_config.SOFT_SHUTDOWN_MODE = False
+            self.assertFalse(is_soft_shutdown_mode_enabled())
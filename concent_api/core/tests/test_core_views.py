@@ -1,6 +1,7 @@
 import datetime
 
 from freezegun                      import freeze_time
+import mock
 import dateutil.parser
 from django.test                    import override_settings
 from django.urls                    import reverse
@@ -14,13 +15,18 @@ from golem_messages.factories       import tasks
 from golem_messages.shortcuts       import dump
 from golem_messages.shortcuts       import load
 
+from core.constants                 import MAX_RETRY_AFTER
+from core.message_handlers          import store_subtask
 from core.models                    import Client
+from core.transfer_operations       import create_response_to_client
+from core.transfer_operations       import store_pending_message
 from core.models                    import StoredMessage
 from core.models                    import PendingResponse
 from core.tests.utils               import ConcentIntegrationTestCase
 from core.models                    import Subtask
 from utils.constants                import ErrorCode
 from utils.helpers                  import get_current_utc_timestamp
+from utils.shortcuts                import load_bundle
 from utils.testing_helpers          import generate_ecc_key_pair
 
 
@@ -677,6 +683,289 @@ class CoreViewReceiveTest(ConcentIntegrationTestCase):
 
         self.assertEqual(response.status_code, 204)
         self.assertEqual(response.content.decode(), '')
+        self.assertFalse(response.has_header('Retry-After'))
+
+    def test_receive_should_return_retry_after_header_with_time_left_to_next_deadline_up_to_limit_if_no_messages_in_database(self):
+        with freeze_time("2017-11-17 10:00:00"):
+            task_to_compute = self._get_deserialized_task_to_compute(task_id='1', subtask_id='1')
+            store_subtask(
+                task_id='1',
+                subtask_id='1',
+                provider_public_key=self.PROVIDER_PUBLIC_KEY,
+                requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+                state=Subtask.SubtaskState.FORCING_REPORT,
+                next_deadline=get_current_utc_timestamp() + 100,
+                task_to_compute=task_to_compute,
+                report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+            )
+
+        with freeze_time("2017-11-17 10:01:35"):
+            response = self.client.post(
+                reverse('core:receive'),
+                data=self._create_client_auth_message(self.PROVIDER_PRIVATE_KEY, self.PROVIDER_PUBLIC_KEY),
+                content_type='application/octet-stream',
+            )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response['Retry-After'], '5')
+        self.assertEqual(Client.objects.get(pk=Subtask.objects.get(subtask_id='1').provider_id).next_deadline, dateutil.parser.parse("2017-11-17 10:01:40+00:00"))
+
+        with freeze_time("2017-11-17 10:00:30"):
+            response = self.client.post(
+                reverse('core:receive'),
+                data=self._create_client_auth_message(self.PROVIDER_PRIVATE_KEY, self.PROVIDER_PUBLIC_KEY),
+                content_type='application/octet-stream',
+            )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response['Retry-After'], str(MAX_RETRY_AFTER))
+
+    @override_settings(
+        BUILD_RESPONSES_WHEN_ENQUEUED=True,
+    )
+    def test_receive_should_return_message_built_when_response_was_added_to_queue(self):
+        with freeze_time("2017-11-17 10:00:00"):
+            task_to_compute = self._get_deserialized_task_to_compute(task_id='1', subtask_id='1')
+            report_computed_task = self._get_deserialized_report_computed_task(task_to_compute=task_to_compute)
+            subtask = store_subtask(
+                task_id='1',
+                subtask_id='1',
+                provider_public_key=self.PROVIDER_PUBLIC_KEY,
+                requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+                state=Subtask.SubtaskState.FORCING_REPORT,
+                next_deadline=get_current_utc_timestamp() + 100,
+                task_to_compute=task_to_compute,
+                report_computed_task=report_computed_task,
+            )
+            store_pending_message(
+                response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+                client_public_key=self.REQUESTOR_PUBLIC_KEY,
+                queue=PendingResponse.Queue.Receive,
+                subtask=subtask,
+            )
+
+        self.assertIsNotNone(PendingResponse.objects.get().response_data)
+
+        with freeze_time("2017-11-17 10:00:30"):
+            response = self.client.post(
+                reverse('core:receive'),
+                data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+                content_type='application/octet-stream',
+            )
+
+        self._test_response(
+            response,
+            status=200,
+            key=self.REQUESTOR_PRIVATE_KEY,
+            message_type=message.concents.ForceReportComputedTask,
+            fields={
+                'timestamp': dateutil.parser.parse("2017-11-17 10:00:30").timestamp(),
+                'report_computed_task': report_computed_task,
+            }
+        )
+        self.assertTrue(PendingResponse.objects.get().delivered)
+
+    @override_settings(
+        LONG_POLL_MAX_TIMEOUT=10,
+    )
+    def test_receive_should_wait_for_message_if_client_asked_for_long_polling(self):
+        with freeze_time("2017-11-17 10:00:00"):
+            task_to_compute = self._get_deserialized_task_to_compute(task_id='1', subtask_id='1')
+            report_computed_task = self._get_deserialized_report_computed_task(task_to_compute=task_to_compute)
+            subtask = store_subtask(
+                task_id='1',
+                subtask_id='1',
+                provider_public_key=self.PROVIDER_PUBLIC_KEY,
+                requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+                state=Subtask.SubtaskState.FORCING_REPORT,
+                next_deadline=get_current_utc_timestamp() + 100,
+                task_to_compute=task_to_compute,
+                report_computed_task=report_computed_task,
+            )
+
+        def enqueue_message_and_check_queue(_client_public_key, _timeout, check_queue):
+            self.assertIsNone(check_queue())
+            store_pending_message(
+                response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+                client_public_key=self.REQUESTOR_PUBLIC_KEY,
+                queue=PendingResponse.Queue.Receive,
+                subtask=subtask,
+            )
+            return check_queue()
+
+        with freeze_time("2017-11-17 10:00:30"):
+            with mock.patch(
+                'core.views.wait_for_pending_response',
+                side_effect=enqueue_message_and_check_queue,
+            ) as wait_for_pending_response_mock:
+                response = self.client.post(
+                    reverse('core:receive'),
+                    data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+                    content_type='application/octet-stream',
+                    HTTP_CONCENT_LONG_POLL_TIMEOUT='60',
+                )
+
+        self.assertEqual(wait_for_pending_response_mock.call_args[0][:2], (self.REQUESTOR_PUBLIC_KEY, 10))
+        self._test_response(
+            response,
+            status=200,
+            key=self.REQUESTOR_PRIVATE_KEY,
+            message_type=message.concents.ForceReportComputedTask,
+            fields={
+                'report_computed_task': report_computed_task,
+            }
+        )
+        self.assertTrue(PendingResponse.objects.get().delivered)
+
+    @freeze_time("2017-11-17 10:00:00")
+    def test_receive_should_not_wait_for_message_if_long_polling_is_disabled(self):
+        with mock.patch('core.views.wait_for_pending_response') as wait_for_pending_response_mock:
+            response = self.client.post(
+                reverse('core:receive'),
+                data=self._create_client_auth_message(REQUESTOR_PRIVATE_KEY, REQUESTOR_PUBLIC_KEY),
+                content_type='application/octet-stream',
+                HTTP_CONCENT_LONG_POLL_TIMEOUT='60',
+            )
+
+        self.assertEqual(response.status_code, 204)
+        wait_for_pending_response_mock.assert_not_called()
+
+    @freeze_time("2017-11-17 10:00:00")
+    def test_receive_should_return_http_400_if_long_poll_timeout_is_not_a_number(self):
+        response = self.client.post(
+            reverse('core:receive'),
+            data=self._create_client_auth_message(REQUESTOR_PRIVATE_KEY, REQUESTOR_PUBLIC_KEY),
+            content_type='application/octet-stream',
+            HTTP_CONCENT_LONG_POLL_TIMEOUT='-1',
+        )
+
+        self._test_400_response(
+            response,
+            error_code=ErrorCode.HEADER_LONG_POLL_TIMEOUT_INVALID
+        )
+
+    def _store_subtasks_with_pending_force_report_computed_task(self, number_of_subtasks):
+        report_computed_tasks = []
+        for subtask_number in range(number_of_subtasks):
+            task_to_compute = self._get_deserialized_task_to_compute(
+                task_id=str(subtask_number),
+                subtask_id=str(subtask_number),
+            )
+            report_computed_task = self._get_deserialized_report_computed_task(task_to_compute=task_to_compute)
+            subtask = store_subtask(
+                task_id=str(subtask_number),
+                subtask_id=str(subtask_number),
+                provider_public_key=self.PROVIDER_PUBLIC_KEY,
+                requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+                state=Subtask.SubtaskState.FORCING_REPORT,
+                next_deadline=get_current_utc_timestamp() + 100,
+                task_to_compute=task_to_compute,
+                report_computed_task=report_computed_task,
+            )
+            store_pending_message(
+                response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+                client_public_key=self.REQUESTOR_PUBLIC_KEY,
+                queue=PendingResponse.Queue.Receive,
+                subtask=subtask,
+            )
+            report_computed_tasks.append(report_computed_task)
+        return report_computed_tasks
+
+    @freeze_time("2017-11-17 10:00:00")
+    def test_receive_batch_should_return_all_messages_in_order_they_were_added_to_queue(self):
+        report_computed_tasks = self._store_subtasks_with_pending_force_report_computed_task(3)
+
+        response = self.client.post(
+            reverse('core:receive_batch'),
+            data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+            content_type='application/octet-stream',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        received_messages = load_bundle(response.content, self.REQUESTOR_PRIVATE_KEY, CONCENT_PUBLIC_KEY)
+        self.assertEqual(len(received_messages), 3)
+        for (received_message, report_computed_task) in zip(received_messages, report_computed_tasks):
+            self.assertIsInstance(received_message, message.concents.ForceReportComputedTask)
+            self.assertEqual(received_message.report_computed_task, report_computed_task)
+        self.assertFalse(PendingResponse.objects.filter(delivered=False).exists())
+
+    @freeze_time("2017-11-17 10:00:00")
+    def test_receive_batch_should_return_at_most_as_many_messages_as_client_asked_for(self):
+        report_computed_tasks = self._store_subtasks_with_pending_force_report_computed_task(3)
+
+        response = self.client.post(
+            reverse('core:receive_batch'),
+            data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+            content_type='application/octet-stream',
+            HTTP_CONCENT_BATCH_SIZE='2',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        received_messages = load_bundle(response.content, self.REQUESTOR_PRIVATE_KEY, CONCENT_PUBLIC_KEY)
+        self.assertEqual(
+            [received_message.report_computed_task for received_message in received_messages],
+            report_computed_tasks[:2],
+        )
+        self.assertEqual(PendingResponse.objects.filter(delivered=False).count(), 1)
+
+    @freeze_time("2017-11-17 10:00:00")
+    def test_receive_batch_should_skip_and_mark_as_failed_response_that_cannot_be_built(self):
+        report_computed_tasks = self._store_subtasks_with_pending_force_report_computed_task(3)
+
+        def create_response_to_client_except_for_subtask_1(subtask, **kwargs):
+            if subtask.subtask_id == '1':
+                return None
+            return create_response_to_client(subtask=subtask, **kwargs)
+
+        with mock.patch(
+            'core.message_handlers.create_response_to_client',
+            side_effect=create_response_to_client_except_for_subtask_1,
+        ):
+            with mock.patch('core.message_handlers.logging.log_pending_response_not_built') as log_mock:
+                response = self.client.post(
+                    reverse('core:receive_batch'),
+                    data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+                    content_type='application/octet-stream',
+                )
+
+        self.assertEqual(response.status_code, 200)
+        received_messages = load_bundle(response.content, self.REQUESTOR_PRIVATE_KEY, CONCENT_PUBLIC_KEY)
+        self.assertEqual(
+            [received_message.report_computed_task for received_message in received_messages],
+            [report_computed_tasks[0], report_computed_tasks[2]],
+        )
+        log_mock.assert_called_once()
+        failed_response = PendingResponse.objects.get(subtask__subtask_id='1')
+        self.assertTrue(failed_response.delivered)
+        self.assertTrue(failed_response.failed)
+        self.assertFalse(PendingResponse.objects.filter(delivered=False).exists())
+        self.assertEqual(PendingResponse.objects.filter(failed=True).count(), 1)
+
+    @freeze_time("2017-11-17 10:00:00")
+    def test_receive_batch_return_http_204_if_no_messages_in_database(self):
+        response = self.client.post(
+            reverse('core:receive_batch'),
+            data=self._create_client_auth_message(REQUESTOR_PRIVATE_KEY, REQUESTOR_PUBLIC_KEY),
+            content_type='application/octet-stream',
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.content.decode(), '')
+
+    @freeze_time("2017-11-17 10:00:00")
+    def test_receive_batch_should_return_http_400_if_batch_size_is_not_a_positive_number(self):
+        for batch_size in ['0', '-1', 'all']:
+            response = self.client.post(
+                reverse('core:receive_batch'),
+                data=self._create_client_auth_message(REQUESTOR_PRIVATE_KEY, REQUESTOR_PUBLIC_KEY),
+                content_type='application/octet-stream',
+                HTTP_CONCENT_BATCH_SIZE=batch_size,
+            )
+
+            self._test_400_response(
+                response,
+                error_code=ErrorCode.HEADER_BATCH_SIZE_INVALID
+            )
 
     def test_receive_should_return_ack_if_the_receive_queue_contains_only_force_report_and_its_past_deadline(self):
 
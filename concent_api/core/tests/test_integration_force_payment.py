@@ -6,7 +6,8 @@ from golem_messages         import message
 
 from core.constants         import ETHEREUM_ADDRESS_LENGTH
 from core.models            import PendingResponse
-from core.payments.sci_backend import TransactionType
+from core.payments.base     import PaymentQuery
+from core.payments.base     import TransactionType
 from core.tests.utils       import ConcentIntegrationTestCase
 from utils.testing_helpers  import generate_ecc_key_pair
 
@@ -155,9 +156,12 @@ class ForcePaymentIntegrationTest(ConcentIntegrationTestCase):
         )
 
         with mock.patch(
-            'core.message_handlers.core.payments.base.get_list_of_payments',
-            side_effect=self._get_list_of_force_transactions
-        ) as get_list_of_payments_mock_function:
+            'core.message_handlers.core.payments.base.get_lists_of_payments',
+            side_effect=self._get_lists_of_payments_function(
+                self._get_list_of_force_transactions,
+                self._get_list_of_force_transactions,
+            )
+        ) as get_lists_of_payments_mock_function:
             with freeze_time("2018-02-05 12:00:09"):
                 response = self.client.post(
                     reverse('core:send'),
@@ -165,12 +169,20 @@ class ForcePaymentIntegrationTest(ConcentIntegrationTestCase):
                     content_type                        = 'application/octet-stream',
                 )
 
-        get_list_of_payments_mock_function.assert_called_with(
+        get_lists_of_payments_mock_function.assert_called_once_with(
             requestor_eth_address=task_to_compute.requestor_ethereum_address,
             provider_eth_address=task_to_compute.provider_ethereum_address,
-            payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:00:00"),
             current_time=self._parse_iso_date_to_timestamp("2018-02-05 12:00:09"),
-            transaction_type=TransactionType.BATCH,
+            queries=[
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:00:00"),
+                    transaction_type=TransactionType.BATCH,
+                ),
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:00:10"),
+                    transaction_type=TransactionType.FORCE,
+                ),
+            ],
         )
 
         self._test_response(
@@ -221,9 +233,12 @@ class ForcePaymentIntegrationTest(ConcentIntegrationTestCase):
         )
 
         with mock.patch(
-            'core.message_handlers.core.payments.base.get_list_of_payments',
-            side_effect=self._get_list_of_force_transactions
-        ) as get_list_of_payments_mock_function:
+            'core.message_handlers.core.payments.base.get_lists_of_payments',
+            side_effect=self._get_lists_of_payments_function(
+                self._get_list_of_force_transactions,
+                self._get_list_of_force_transactions,
+            )
+        ) as get_lists_of_payments_mock_function:
             with freeze_time("2018-02-05 12:00:20"):
                 response = self.client.post(
                     reverse('core:send'),
@@ -231,12 +246,20 @@ class ForcePaymentIntegrationTest(ConcentIntegrationTestCase):
                     content_type                        = 'application/octet-stream',
                 )
 
-        get_list_of_payments_mock_function.assert_called_with(
+        get_lists_of_payments_mock_function.assert_called_once_with(
             requestor_eth_address=task_to_compute.requestor_ethereum_address,
             provider_eth_address=task_to_compute.provider_ethereum_address,
-            payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:00:00"),
             current_time=self._parse_iso_date_to_timestamp("2018-02-05 12:00:20"),
-            transaction_type=TransactionType.BATCH,
+            queries=[
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:00:00"),
+                    transaction_type=TransactionType.BATCH,
+                ),
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:00:10"),
+                    transaction_type=TransactionType.FORCE,
+                ),
+            ],
         )
 
         self._test_response(
@@ -291,19 +314,27 @@ class ForcePaymentIntegrationTest(ConcentIntegrationTestCase):
                 self._get_list_of_batch_transactions(),
                 self._get_list_of_force_transactions()
             ]
-            with mock.patch('core.message_handlers.core.payments.base.get_list_of_payments', side_effect=fake_responses) as get_list_of_payments_mock_function:
+            with mock.patch('core.message_handlers.core.payments.base.get_lists_of_payments', return_value=fake_responses) as get_lists_of_payments_mock_function:
                 response = self.client.post(
                     reverse('core:send'),
                     data                                = serialized_force_payment,
                     content_type                        = 'application/octet-stream',
                 )
 
-        get_list_of_payments_mock_function.assert_called_with(
+        get_lists_of_payments_mock_function.assert_called_once_with(
             requestor_eth_address=task_to_compute.requestor_ethereum_address,
             provider_eth_address=task_to_compute.provider_ethereum_address,
-            payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:55:10"),
             current_time=self._parse_iso_date_to_timestamp("2018-02-05 12:00:20"),
-            transaction_type=TransactionType.FORCE,
+            queries=[
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:55:00"),
+                    transaction_type=TransactionType.BATCH,
+                ),
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:55:10"),
+                    transaction_type=TransactionType.FORCE,
+                ),
+            ],
         )
 
         self._test_response(
@@ -365,9 +396,9 @@ class ForcePaymentIntegrationTest(ConcentIntegrationTestCase):
                 side_effect=self._make_force_payment_to_provider
             ) as make_force_payment_to_provider_mock_function,\
                 mock.patch(
-                'core.message_handlers.core.payments.base.get_list_of_payments',
-                side_effect=fake_responses
-            ) as get_list_of_payments_mock_function:
+                'core.message_handlers.core.payments.base.get_lists_of_payments',
+                return_value=fake_responses
+            ) as get_lists_of_payments_mock_function:
                 response_1 = self.client.post(
                     reverse('core:send'),
                     data                                = serialized_force_payment,
@@ -381,12 +412,20 @@ class ForcePaymentIntegrationTest(ConcentIntegrationTestCase):
             payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 12:00:20"),
         )
 
-        get_list_of_payments_mock_function.assert_called_with(
+        get_lists_of_payments_mock_function.assert_called_once_with(
             requestor_eth_address=task_to_compute.requestor_ethereum_address,
             provider_eth_address=task_to_compute.provider_ethereum_address,
-            payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:55:10"),
             current_time=self._parse_iso_date_to_timestamp("2018-02-05 12:00:20"),
-            transaction_type=TransactionType.FORCE,
+            queries=[
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:55:00"),
+                    transaction_type=TransactionType.BATCH,
+                ),
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:55:10"),
+                    transaction_type=TransactionType.FORCE,
+                ),
+            ],
         )
 
         # Sum of prices from force and batch lists of transactions which have been paid
@@ -633,9 +672,12 @@ class ForcePaymentIntegrationTest(ConcentIntegrationTestCase):
 
         with freeze_time("2018-02-05 12:00:20"):
             with mock.patch(
-                'core.message_handlers.core.payments.base.get_list_of_payments',
-                side_effect=self._get_empty_list_of_transactions
-            ) as get_list_of_payments_mock_function,\
+                'core.message_handlers.core.payments.base.get_lists_of_payments',
+                side_effect=self._get_lists_of_payments_function(
+                    self._get_empty_list_of_transactions,
+                    self._get_empty_list_of_transactions,
+                )
+            ) as get_lists_of_payments_mock_function,\
                 mock.patch(
                 'core.message_handlers.core.payments.base.make_force_payment_to_provider',
                 side_effect=self._make_force_payment_to_provider
@@ -653,12 +695,20 @@ class ForcePaymentIntegrationTest(ConcentIntegrationTestCase):
             payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 12:00:20"),
         )
 
-        get_list_of_payments_mock_function.assert_called_with(
+        get_lists_of_payments_mock_function.assert_called_once_with(
             requestor_eth_address=task_to_compute.requestor_ethereum_address,
             provider_eth_address=task_to_compute.provider_ethereum_address,
-            payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:00:10"),
             current_time=self._parse_iso_date_to_timestamp("2018-02-05 12:00:20"),
-            transaction_type=TransactionType.FORCE,
+            queries=[
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:00:00"),
+                    transaction_type=TransactionType.BATCH,
+                ),
+                PaymentQuery(
+                    payment_ts=self._parse_iso_date_to_timestamp("2018-02-05 11:00:10"),
+                    transaction_type=TransactionType.FORCE,
+                ),
+            ],
         )
 
         self._test_response(
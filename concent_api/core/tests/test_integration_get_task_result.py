@@ -16,11 +16,11 @@ from utils.testing_helpers  import generate_ecc_key_pair
 (CONCENT_PRIVATE_KEY, CONCENT_PUBLIC_KEY) = generate_ecc_key_pair()
 
 
-def request_upload_status_true_mock(_request_upload_status_false_mock):
+def request_upload_status_true_mock(_subtask):
     return True
 
 
-def request_upload_status_false_mock(_request_upload_status_false_mock):
+def request_upload_status_false_mock(_subtask):
     return False
 
 
@@ -201,7 +201,7 @@ class GetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_report_computed_task.subtask_id)
         )
 
         self.assertEqual(response.status_code,  200)
@@ -422,7 +422,7 @@ class GetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_report_computed_task.subtask_id)
         )
 
         self.assertEqual(response_3.status_code, 200)
@@ -538,7 +538,7 @@ class GetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_false_mock_function.assert_called_with(
-            deserialized_report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_report_computed_task.subtask_id)
         )
 
         self.assertEqual(response_3.status_code, 200)
@@ -686,7 +686,7 @@ class GetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_true_mock_function.assert_called_with(
-            deserialized_report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_report_computed_task.subtask_id)
         )
 
         self.assertEqual(response_3.status_code, 200)
@@ -839,7 +839,7 @@ class GetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_true_mock_function.assert_called_with(
-            deserialized_report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_report_computed_task.subtask_id)
         )
 
         self.assertEqual(response_3.status_code, 200)
@@ -994,7 +994,7 @@ class GetTaskResultIntegrationTest(ConcentIntegrationTestCase):
                 )
 
         request_upload_status_true_mock_function.assert_called_with(
-            deserialized_report_computed_task
+            Subtask.objects.get(subtask_id=deserialized_report_computed_task.subtask_id)
         )
 
         self.assertEqual(response_3.status_code,  200)
@@ -0,0 +1,97 @@
+from io import StringIO
+import os
+
+from django.core.management import call_command
+from django.test import override_settings
+from golem_messages import message
+
+from core.message_handlers import store_message
+from core.message_storage import get_stored_message_space_report
+from core.models import MessagePayload
+from core.models import StoredMessage
+from core.tests.utils import ConcentIntegrationTestCase
+
+
+class MessageStorageTest(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.task_to_compute = self._get_deserialized_task_to_compute()
+
+    def _store_inline_task_to_compute(self):
+        return self._store_golem_messages_in_database(
+            message.TaskToCompute.TYPE,
+            None,
+            self.task_to_compute,
+            self.task_to_compute.task_id,
+        )
+
+    def test_that_identical_messages_are_stored_in_single_payload(self):
+        first_stored_message = store_message(self.task_to_compute, '1', '1')
+        second_stored_message = store_message(self.task_to_compute, '1', '2')
+
+        self.assertEqual(StoredMessage.objects.count(), 2)
+        payload = MessagePayload.objects.get()
+        self.assertEqual(first_stored_message.payload_id, payload.digest)
+        self.assertEqual(second_stored_message.payload_id, payload.digest)
+        self.assertEqual(payload.size, len(payload.message_bytes))
+        self.assertIsNone(StoredMessage.objects.get(pk=first_stored_message.pk).data)
+
+    def test_that_stored_message_is_read_back_from_payload(self):
+        stored_message = store_message(self.task_to_compute, '1', '1')
+
+        self.assertEqual(
+            StoredMessage.objects.get(pk=stored_message.pk).data_bytes,
+            self.task_to_compute.serialize(),
+        )
+
+    @override_settings(STORED_MESSAGE_COMPRESSION='NONE')
+    def test_that_payload_is_not_compressed_if_compression_is_disabled(self):
+        store_message(self.task_to_compute, '1', '1')
+
+        payload = MessagePayload.objects.get()
+        self.assertEqual(payload.compression_enum, MessagePayload.Compression.NONE)
+        self.assertEqual(bytes(payload.data), payload.message_bytes)
+
+    def test_that_data_is_compressed_only_if_that_makes_it_smaller(self):
+        repetitive_bytes = b'concent' * 100
+        random_bytes = os.urandom(100)
+
+        (compression, compressed_bytes) = MessagePayload.compress(repetitive_bytes, MessagePayload.Compression.ZLIB)
+        self.assertEqual(compression, MessagePayload.Compression.ZLIB)
+        self.assertLess(len(compressed_bytes), len(repetitive_bytes))
+
+        self.assertEqual(
+            MessagePayload.compress(random_bytes, MessagePayload.Compression.ZLIB),
+            (MessagePayload.Compression.NONE, random_bytes),
+        )
+
+    def test_that_command_moves_inline_messages_to_payloads(self):
+        inline_messages = [self._store_inline_task_to_compute() for _ in range(3)]
+        inline_bytes = self.task_to_compute.serialize()
+        self.assertEqual(get_stored_message_space_report()['saved_size'], 0)
+
+        call_command('move_stored_messages_to_payloads', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(MessagePayload.objects.count(), 1)
+        for inline_message in inline_messages:
+            stored_message = StoredMessage.objects.get(pk=inline_message.pk)
+            self.assertIsNone(stored_message.data)
+            self.assertEqual(stored_message.data_bytes, inline_bytes)
+
+        report = get_stored_message_space_report()
+        self.assertEqual(report['inline_messages'], 0)
+        self.assertEqual(report['messages_in_payloads'], 3)
+        self.assertEqual(report['payloads'], 1)
+        self.assertEqual(report['full_size'], 3 * len(inline_bytes))
+        self.assertEqual(report['saved_size'], report['full_size'] - len(MessagePayload.objects.get().data))
+
+    def test_that_command_with_report_only_does_not_move_messages(self):
+        self._store_inline_task_to_compute()
+
+        call_command('move_stored_messages_to_payloads', report_only=True, stdout=StringIO())
+
+        self.assertIsNone(StoredMessage.objects.get().payload_id)
+        self.assertFalse(MessagePayload.objects.exists())
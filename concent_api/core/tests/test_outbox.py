@@ -0,0 +1,270 @@
+import datetime
+import json
+
+import mock
+
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+
+from core.exceptions import PaymentBackendUnavailable
+from core.exceptions import PaymentOutcomeUnknown
+from core.message_handlers import store_subtask
+from core.models import OutboxMessage
+from core.models import Subtask
+from core.models import SubtaskPayment
+from core.outbox import add_celery_task_to_outbox
+from core.outbox import add_force_payment_to_outbox
+from core.outbox import add_subtask_payment_to_outbox
+from core.outbox import aggregate_subtask_payments
+from core.outbox import relay_outbox_messages
+from core.payments.simulated_chain import ForcedPaymentEvent
+from core.tests.utils import ConcentIntegrationTestCase
+from utils.helpers import get_current_utc_timestamp
+
+
+REQUESTOR_ETH_ADDRESS = '0x' + 'a' * 40
+PROVIDER_ETH_ADDRESS = '0x' + 'b' * 40
+
+
+@override_settings(
+    OUTBOX_RELAY_MAX_RETRY_DELAY=3,
+)
+class OutboxTest(TestCase):
+
+    multi_db = True
+
+    def _add_force_payment(self, idempotency_key='payment', value=10):
+        add_force_payment_to_outbox(
+            idempotency_key=idempotency_key,
+            requestor_eth_address=REQUESTOR_ETH_ADDRESS,
+            provider_eth_address=PROVIDER_ETH_ADDRESS,
+            value=value,
+            payment_ts=1000,
+        )
+
+    def test_that_message_with_key_already_in_outbox_is_ignored(self):
+        self._add_force_payment(value=10)
+        self._add_force_payment(value=20)
+
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        self.assertEqual(json.loads(OutboxMessage.objects.get().payload)['value'], 10)
+
+    def test_that_relay_carries_out_side_effects_once(self):
+        self._add_force_payment()
+        add_celery_task_to_outbox('task', 'conductor.tasks.upload_acknowledged', subtask_id='1')
+
+        with mock.patch('core.outbox.core.payments.base.make_force_payment_to_provider') as make_force_payment_to_provider:
+            with mock.patch('core.outbox.current_app.send_task') as send_task:
+                self.assertEqual(relay_outbox_messages(batch_size=10), 2)
+                self.assertEqual(relay_outbox_messages(batch_size=10), 0)
+
+        make_force_payment_to_provider.assert_called_once_with(
+            requestor_eth_address=REQUESTOR_ETH_ADDRESS,
+            provider_eth_address=PROVIDER_ETH_ADDRESS,
+            value=10,
+            payment_ts=1000,
+        )
+        send_task.assert_called_once_with(
+            'conductor.tasks.upload_acknowledged',
+            kwargs={'subtask_id': '1'},
+            task_id='task',
+        )
+        self.assertFalse(OutboxMessage.objects.filter(sent_at=None).exists())
+
+    def test_that_relay_sends_at_most_batch_size_messages(self):
+        for number in range(3):
+            self._add_force_payment(idempotency_key=str(number))
+
+        with mock.patch('core.outbox.core.payments.base.make_force_payment_to_provider'):
+            self.assertEqual(relay_outbox_messages(batch_size=2), 2)
+
+        self.assertEqual(OutboxMessage.objects.filter(sent_at=None).count(), 1)
+
+    def test_that_failed_side_effect_is_retried_with_backoff(self):
+        self._add_force_payment()
+        now = timezone.now()
+
+        with mock.patch(
+            'core.outbox.core.payments.base.make_force_payment_to_provider',
+            side_effect=PaymentBackendUnavailable('geth is down'),
+        ):
+            for (attempts, retry_delay) in [(1, 1), (2, 2), (3, 3), (4, 3)]:
+                with freeze_time(now):
+                    self.assertEqual(relay_outbox_messages(batch_size=10), 0)
+                    # Not retried before its time.
+                    self.assertEqual(relay_outbox_messages(batch_size=10), 0)
+
+                outbox_message = OutboxMessage.objects.get()
+                self.assertEqual(outbox_message.attempts, attempts)
+                self.assertEqual(outbox_message.last_error, 'geth is down')
+                self.assertEqual(outbox_message.next_attempt_at, now + datetime.timedelta(seconds=retry_delay))
+                now = outbox_message.next_attempt_at
+
+        with mock.patch('core.outbox.core.payments.base.make_force_payment_to_provider'):
+            with freeze_time(now):
+                self.assertEqual(relay_outbox_messages(batch_size=10), 1)
+
+        self.assertIsNotNone(OutboxMessage.objects.get().sent_at)
+
+    def test_that_payment_with_unknown_outcome_is_looked_for_on_blockchain_instead_of_being_made_again(self):
+        self._add_force_payment()
+        now = timezone.now()
+
+        with mock.patch(
+            'core.outbox.core.payments.base.make_force_payment_to_provider',
+            side_effect=PaymentOutcomeUnknown('timeout'),
+        ) as make_force_payment_to_provider:
+            with mock.patch('core.outbox.core.payments.base.get_list_of_payments', return_value=[]) as get_list_of_payments:
+                with freeze_time(now):
+                    self.assertEqual(relay_outbox_messages(batch_size=10), 0)
+                with freeze_time(now + datetime.timedelta(seconds=1)):
+                    self.assertEqual(relay_outbox_messages(batch_size=10), 0)
+
+            get_list_of_payments.assert_called_once()
+            with mock.patch(
+                'core.outbox.core.payments.base.get_list_of_payments',
+                return_value=[ForcedPaymentEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 10, 1000)],
+            ):
+                with freeze_time(now + datetime.timedelta(seconds=3)):
+                    self.assertEqual(relay_outbox_messages(batch_size=10), 1)
+
+        make_force_payment_to_provider.assert_called_once()
+        outbox_message = OutboxMessage.objects.get()
+        self.assertIsNotNone(outbox_message.sent_at)
+        self.assertEqual(outbox_message.attempts, 2)
+
+    @override_settings(
+        OUTBOX_FORCE_PAYMENT_CONFIRMATION_TIMEOUT=5,
+    )
+    def test_that_attempted_payment_not_found_on_blockchain_in_time_needs_manual_resolution(self):
+        self._add_force_payment()
+        now = timezone.now()
+
+        with mock.patch(
+            'core.outbox.core.payments.base.make_force_payment_to_provider',
+            side_effect=PaymentOutcomeUnknown('timeout'),
+        ):
+            with mock.patch('core.outbox.core.payments.base.get_list_of_payments', return_value=[]) as get_list_of_payments:
+                with mock.patch('core.outbox.log_outbox_message_needs_manual_resolution') as log_mock:
+                    with freeze_time(now):
+                        relay_outbox_messages(batch_size=10)
+                    with freeze_time(now + datetime.timedelta(seconds=1)):
+                        relay_outbox_messages(batch_size=10)
+                    self.assertFalse(OutboxMessage.objects.get().needs_manual_resolution)
+
+                    with freeze_time(now + datetime.timedelta(seconds=6)):
+                        relay_outbox_messages(batch_size=10)
+                    with freeze_time(now + datetime.timedelta(seconds=60)):
+                        self.assertEqual(relay_outbox_messages(batch_size=10), 0)
+
+        self.assertEqual(get_list_of_payments.call_count, 2)
+        log_mock.assert_called_once()
+        outbox_message = OutboxMessage.objects.get()
+        self.assertTrue(outbox_message.needs_manual_resolution)
+        self.assertIsNone(outbox_message.sent_at)
+
+    def test_that_failure_after_payment_is_recorded_and_payment_is_not_made_again(self):
+        self._add_force_payment()
+        now = timezone.now()
+
+        def break_transaction(_outbox_message, _paid_value):
+            with connections['control'].cursor() as cursor:
+                cursor.execute('SELECT * FROM nonexistent_table')
+
+        with mock.patch('core.outbox.core.payments.base.make_force_payment_to_provider', return_value=10) as make_force_payment_to_provider:
+            with mock.patch('core.outbox._split_paid_value', side_effect=break_transaction):
+                with freeze_time(now):
+                    self.assertEqual(relay_outbox_messages(batch_size=10), 0)
+
+            outbox_message = OutboxMessage.objects.get()
+            self.assertEqual(outbox_message.attempts, 1)
+            self.assertIsNotNone(outbox_message.payment_attempted_at)
+
+            with mock.patch(
+                'core.outbox.core.payments.base.get_list_of_payments',
+                return_value=[ForcedPaymentEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 10, 1000)],
+            ):
+                with freeze_time(now + datetime.timedelta(seconds=1)):
+                    self.assertEqual(relay_outbox_messages(batch_size=10), 1)
+
+        make_force_payment_to_provider.assert_called_once()
+
+
+@override_settings(
+    FORCE_PAYMENT_AGGREGATION_WINDOW=60,
+)
+class SubtaskPaymentAggregationTest(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def _store_subtask(self, subtask_id, price):
+        task_to_compute = self._get_deserialized_task_to_compute(subtask_id=subtask_id, price=price)
+        return store_subtask(
+            task_id=task_to_compute.task_id,
+            subtask_id=subtask_id,
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER,
+            next_deadline=get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME,
+            task_to_compute=task_to_compute,
+            report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+        )
+
+    def _add_subtask_payments(self, prices, payment_ts=1000):
+        subtasks = [self._store_subtask(str(number), price) for number, price in enumerate(prices)]
+        for subtask in subtasks:
+            add_subtask_payment_to_outbox(subtask, payment_ts)
+        return subtasks
+
+    def test_that_subtask_is_paid_for_at_most_once(self):
+        [subtask] = self._add_subtask_payments([10])
+        add_subtask_payment_to_outbox(subtask, 2000)
+
+        self.assertEqual(SubtaskPayment.objects.get().payment_ts, 1000)
+
+    def test_that_payments_are_not_aggregated_before_aggregation_window_passes(self):
+        now = timezone.now()
+        with freeze_time(now):
+            self._add_subtask_payments([10, 20])
+
+        with freeze_time(now + datetime.timedelta(seconds=59)):
+            self.assertEqual(aggregate_subtask_payments(), 0)
+
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_that_payments_between_the_same_requestor_and_provider_are_made_in_single_transaction(self):
+        now = timezone.now()
+        with freeze_time(now):
+            self._add_subtask_payments([10, 20, 30])
+
+        with freeze_time(now + datetime.timedelta(seconds=60)):
+            self.assertEqual(aggregate_subtask_payments(), 1)
+            self.assertEqual(aggregate_subtask_payments(), 0)
+
+        outbox_message = OutboxMessage.objects.get()
+        self.assertEqual(outbox_message.kind_enum, OutboxMessage.Kind.ForcePayment)
+        self.assertEqual(json.loads(outbox_message.payload)['value'], 60)
+        self.assertEqual(outbox_message.subtask_payments.count(), 3)
+
+    def test_that_payment_capped_by_deposit_is_split_between_oldest_subtasks_first(self):
+        now = timezone.now()
+        with freeze_time(now):
+            subtasks = self._add_subtask_payments([10, 20, 30])
+
+        with freeze_time(now + datetime.timedelta(seconds=60)):
+            aggregate_subtask_payments()
+            with mock.patch(
+                'core.outbox.core.payments.base.make_force_payment_to_provider',
+                return_value=25,
+            ) as make_force_payment_to_provider:
+                self.assertEqual(relay_outbox_messages(batch_size=10), 1)
+
+        make_force_payment_to_provider.assert_called_once()
+        self.assertEqual(
+            [SubtaskPayment.objects.get(subtask=subtask).paid_value for subtask in subtasks],
+            [10, 15, 0],
+        )
@@ -0,0 +1,188 @@
+import datetime
+
+import mock
+
+from django.test import override_settings
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import PaymentEvent
+from core.models import PaymentEventIndexState
+from core.payments.event_indexer import get_payment_events_from_index
+from core.payments.event_indexer import index_payment_events
+from core.payments.event_indexer import is_payment_event_index_up_to_date
+from core.payments.base import PaymentQuery
+from core.payments.base import TransactionType
+from core.payments.sci_backend import SCIPaymentBackend
+from core.tests.fake_chain import BatchTransferEvent
+from core.tests.fake_chain import FakeChain
+from core.tests.fake_chain import ForcedPaymentEvent
+
+
+REQUESTOR_ETH_ADDRESS = '0x' + 'a' * 40
+PROVIDER_ETH_ADDRESS = '0x' + 'b' * 40
+OTHER_ETH_ADDRESS = '0x' + 'c' * 40
+
+
+@override_settings(
+    PAYMENT_EVENT_INDEXER_ENABLED=True,
+    PAYMENT_EVENT_INDEXER_START_BLOCK=0,
+    PAYMENT_EVENT_INDEXER_CONFIRMATIONS=2,
+    PAYMENT_EVENT_INDEXER_MAX_BLOCK_RANGE=3,
+    PAYMENT_EVENT_INDEXER_MAX_AGE=60,
+)
+class PaymentEventIndexerTest(TestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.chain = FakeChain()
+
+    def _get_indexed_events(self, transaction_type, payment_ts=0):
+        return [
+            (event.amount, event.closure_time)
+            for event in get_payment_events_from_index(
+                payer_address=REQUESTOR_ETH_ADDRESS,
+                payee_address=PROVIDER_ETH_ADDRESS,
+                payment_ts=payment_ts,
+                transaction_type=transaction_type,
+            )
+        ]
+
+    def test_that_initial_sync_indexes_all_blocks_in_ranges(self):
+        self.chain.mine_block(BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 10, 100))
+        self.chain.mine_empty_blocks(4)
+        self.chain.mine_block(ForcedPaymentEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 20, 200))
+        self.chain.mine_block(BatchTransferEvent(REQUESTOR_ETH_ADDRESS, OTHER_ETH_ADDRESS, 30, 300))
+        self.chain.mine_empty_blocks(4)
+
+        with mock.patch.object(self.chain, 'get_forced_payments', wraps=self.chain.get_forced_payments) as get_forced_payments:
+            last_confirmed_block = index_payment_events(self.chain)
+
+        self.assertEqual(last_confirmed_block, self.chain.get_block_number() - 2)
+        self.assertTrue(
+            all(call[1]['to_block'] - call[1]['from_block'] < 3 for call in get_forced_payments.call_args_list)
+        )
+        self.assertEqual(self._get_indexed_events(PaymentEvent.TransactionType.BATCH), [(10, 100)])
+        self.assertEqual(self._get_indexed_events(PaymentEvent.TransactionType.FORCE), [(20, 200)])
+        self.assertEqual(PaymentEvent.objects.count(), 3)
+        self.assertTrue(is_payment_event_index_up_to_date())
+
+    def test_that_incremental_sync_indexes_only_new_blocks(self):
+        self.chain.mine_block(BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 10, 100))
+        self.chain.mine_empty_blocks(2)
+        index_payment_events(self.chain)
+
+        self.chain.mine_block(BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 20, 200))
+        self.chain.mine_empty_blocks(2)
+        with mock.patch.object(self.chain, 'get_batch_transfers', wraps=self.chain.get_batch_transfers) as get_batch_transfers:
+            index_payment_events(self.chain)
+
+        self.assertEqual(min(call[1]['from_block'] for call in get_batch_transfers.call_args_list), 2)
+        self.assertEqual(self._get_indexed_events(PaymentEvent.TransactionType.BATCH), [(10, 100), (20, 200)])
+        self.assertEqual(self._get_indexed_events(PaymentEvent.TransactionType.BATCH, payment_ts=30), [(20, 200)])
+        self.assertEqual(PaymentEvent.objects.filter(confirmed=False).count(), 0)
+
+    def test_that_events_from_blocks_removed_in_reorganization_are_replaced(self):
+        self.chain.mine_empty_blocks(3)
+        self.chain.mine_block(BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 10, 100))
+        index_payment_events(self.chain)
+        self.assertEqual(
+            list(PaymentEvent.objects.values_list('amount', 'confirmed')),
+            [(10, False)],
+        )
+
+        self.chain.reorganize(1, [BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 15, 150)], [])
+        index_payment_events(self.chain)
+
+        self.assertEqual(self._get_indexed_events(PaymentEvent.TransactionType.BATCH), [(15, 150)])
+        self.assertEqual(
+            list(PaymentEvent.objects.values_list('amount', 'confirmed')),
+            [(15, False)],
+        )
+
+        self.chain.mine_empty_blocks(2)
+        index_payment_events(self.chain)
+
+        self.assertEqual(
+            list(PaymentEvent.objects.values_list('amount', 'confirmed')),
+            [(15, True)],
+        )
+
+    def test_that_indexer_does_not_store_blocks_already_indexed_by_another_run(self):
+        self.chain.mine_block(BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 10, 100))
+        self.chain.mine_empty_blocks(2)
+        PaymentEventIndexState.objects.create(pk=1, last_confirmed_block=1)
+
+        with mock.patch('core.payments.event_indexer._get_last_confirmed_block', side_effect=[-1, 1]):
+            last_confirmed_block = index_payment_events(self.chain)
+
+        self.assertEqual(last_confirmed_block, 1)
+        self.assertEqual(PaymentEvent.objects.count(), 0)
+        self.assertEqual(PaymentEventIndexState.objects.get().last_confirmed_block, 1)
+
+    def test_that_index_is_not_used_when_it_is_stale_or_disabled(self):
+        self.assertFalse(is_payment_event_index_up_to_date())
+
+        index_payment_events(self.chain)
+        self.assertTrue(is_payment_event_index_up_to_date())
+
+        with override_settings(PAYMENT_EVENT_INDEXER_ENABLED=False):
+            self.assertFalse(is_payment_event_index_up_to_date())
+
+        PaymentEventIndexState.objects.update(updated_at=timezone.now() - datetime.timedelta(seconds=61))
+        self.assertFalse(is_payment_event_index_up_to_date())
+
+    def test_that_sci_backend_looks_payments_up_in_index_when_it_is_up_to_date(self):
+        self.chain.mine_block(
+            BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 10, 100),
+            ForcedPaymentEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 20, 200),
+        )
+        index_payment_events(self.chain)
+
+        with mock.patch('core.payments.sci_backend.ConcentRPC') as concent_rpc:
+            lists_of_payments = SCIPaymentBackend().get_lists_of_payments(
+                requestor_eth_address=REQUESTOR_ETH_ADDRESS,
+                provider_eth_address=PROVIDER_ETH_ADDRESS,
+                current_time=1000,
+                queries=[
+                    PaymentQuery(payment_ts=10, transaction_type=TransactionType.BATCH),
+                    PaymentQuery(payment_ts=10, transaction_type=TransactionType.FORCE),
+                ],
+            )
+
+        concent_rpc.assert_not_called()
+        self.assertEqual(
+            [[(payment.amount, payment.closure_time) for payment in payments] for payments in lists_of_payments],
+            [[(10, 100)], [(20, 200)]],
+        )
+
+    def test_that_index_and_blockchain_return_the_same_payments_made_before_and_mined_after_payment_ts(self):
+        self.chain.mine_block(BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 10, 250), timestamp=150)
+        self.chain.mine_block(BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 20, 100), timestamp=300)
+        self.chain.mine_empty_blocks(2)
+        index_payment_events(self.chain)
+
+        def get_batch_transfers():
+            return [
+                (payment.amount, payment.closure_time)
+                for payment in SCIPaymentBackend().get_list_of_payments(
+                    requestor_eth_address=REQUESTOR_ETH_ADDRESS,
+                    provider_eth_address=PROVIDER_ETH_ADDRESS,
+                    payment_ts=200,
+                    current_time=1000,
+                    transaction_type=TransactionType.BATCH,
+                )
+            ]
+
+        with mock.patch('core.payments.sci_backend.ConcentRPC') as concent_rpc:
+            payments_from_index = get_batch_transfers()
+        concent_rpc.assert_not_called()
+
+        with override_settings(PAYMENT_EVENT_INDEXER_ENABLED=False):
+            with mock.patch('core.payments.sci_backend.ConcentRPC', return_value=self.chain):
+                payments_from_blockchain = get_batch_transfers()
+
+        self.assertEqual(payments_from_index, [(20, 100)])
+        self.assertEqual(payments_from_blockchain, payments_from_index)
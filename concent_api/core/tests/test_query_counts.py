@@ -0,0 +1,134 @@
+import mock
+
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
+from golem_messages import message
+
+from core.message_handlers import handle_send_ack_report_computed_task
+from core.message_handlers import handle_send_reject_report_computed_task
+from core.message_handlers import store_or_update_subtask
+from core.message_handlers import store_subtask
+from core.models import Subtask
+from core.tests.utils import ConcentIntegrationTestCase
+from utils.helpers import get_current_utc_timestamp
+from utils.testing_helpers import generate_ecc_key_pair
+
+
+(CONCENT_PRIVATE_KEY, CONCENT_PUBLIC_KEY) = generate_ecc_key_pair()
+
+
+@override_settings(
+    CONCENT_PRIVATE_KEY     = CONCENT_PRIVATE_KEY,
+    CONCENT_PUBLIC_KEY      = CONCENT_PUBLIC_KEY,
+    CONCENT_MESSAGING_TIME  = 10,  # seconds
+)
+class QueryCountsTest(ConcentIntegrationTestCase):
+    """
+    Counts queries executed by message handlers to check that a subtask is read in a single query together with
+    its clients and the messages the handler needs, and that stored messages and their payloads are never loaded
+    one by one.
+    """
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        compute_task_def = self._get_deserialized_compute_task_def(
+            task_id     = '1',
+            subtask_id  = '8',
+            deadline    = "2017-12-01 11:00:00"
+        )
+        self.task_to_compute = self._get_deserialized_task_to_compute(
+            timestamp           = "2017-12-01 10:00:00",
+            compute_task_def    = compute_task_def,
+        )
+        self.report_computed_task = self._get_deserialized_report_computed_task(
+            timestamp       = "2017-12-01 10:59:00",
+            task_to_compute = self.task_to_compute,
+        )
+
+        with freeze_time("2017-12-01 11:00:00"):
+            store_subtask(
+                task_id                 = '1',
+                subtask_id              = '8',
+                provider_public_key     = self.PROVIDER_PUBLIC_KEY,
+                requestor_public_key    = self.REQUESTOR_PUBLIC_KEY,
+                state                   = Subtask.SubtaskState.FORCING_REPORT,
+                next_deadline           = get_current_utc_timestamp() + 10,
+                task_to_compute         = self.task_to_compute,
+                report_computed_task    = self.report_computed_task,
+            )
+
+    def _get_subtask_queries(self, captured_queries):
+        return [query['sql'] for query in captured_queries if query['sql'].startswith('SELECT "core_subtask"."id"')]
+
+    def _get_stored_message_data_queries(self, captured_queries):
+        return [
+            query['sql']
+            for query in captured_queries
+            if (
+                query['sql'].startswith('SELECT') and
+                ('FROM "core_storedmessage"' in query['sql'] or 'FROM "core_messagepayload"' in query['sql']) and
+                '"data"' in query['sql']
+            )
+        ]
+
+    def test_that_ack_report_computed_task_handler_reads_subtask_with_its_messages_in_single_query(self):
+        ack_report_computed_task = self._get_deserialized_ack_report_computed_task(
+            timestamp               = "2017-12-01 11:00:05",
+            subtask_id              = '8',
+            report_computed_task    = self.report_computed_task,
+        )
+
+        with freeze_time("2017-12-01 11:00:05"):
+            with CaptureQueriesContext(connections['control']) as context:
+                handle_send_ack_report_computed_task(ack_report_computed_task)
+
+        subtask_queries = self._get_subtask_queries(context.captured_queries)
+        self.assertEqual(len(subtask_queries), 1)
+        # TaskToCompute and ReportComputedTask are compared with messages attached to the received one by fingerprints.
+        self.assertEqual(subtask_queries[0].count('"data"'), 0)
+        self.assertEqual(self._get_stored_message_data_queries(context.captured_queries), [])
+        self.assertEqual(Subtask.objects.get(subtask_id='8').state_enum, Subtask.SubtaskState.REPORTED)
+
+    def test_that_reject_report_computed_task_handler_does_not_load_message_data(self):
+        reject_report_computed_task = self._get_deserialized_reject_report_computed_task(
+            timestamp       = "2017-12-01 11:00:05",
+            task_to_compute = self.task_to_compute,
+            reason          = message.RejectReportComputedTask.REASON.SubtaskTimeLimitExceeded,
+        )
+
+        with freeze_time("2017-12-01 11:00:05"):
+            with CaptureQueriesContext(connections['control']) as context:
+                handle_send_reject_report_computed_task(reject_report_computed_task)
+
+        subtask_queries = self._get_subtask_queries(context.captured_queries)
+        self.assertEqual(len(subtask_queries), 1)
+        # TaskToCompute is compared by fingerprint and ReportComputedTask is needed just for its subtask_id.
+        self.assertEqual(subtask_queries[0].count('"data"'), 0)
+        self.assertEqual(self._get_stored_message_data_queries(context.captured_queries), [])
+
+    def test_that_updating_subtask_does_not_load_stored_messages(self):
+        with freeze_time("2017-12-01 11:00:05"):
+            with CaptureQueriesContext(connections['control']) as context:
+                store_or_update_subtask(
+                    task_id                 = '1',
+                    subtask_id              = '8',
+                    provider_public_key     = self.PROVIDER_PUBLIC_KEY,
+                    requestor_public_key    = self.REQUESTOR_PUBLIC_KEY,
+                    state                   = Subtask.SubtaskState.FAILED,
+                    set_next_deadline       = True,
+                    task_to_compute         = self.task_to_compute,
+                )
+
+        self.assertEqual(len(self._get_subtask_queries(context.captured_queries)), 1)
+        self.assertEqual(self._get_stored_message_data_queries(context.captured_queries), [])
+
+    def test_that_subtask_validation_does_not_execute_queries(self):
+        subtask = Subtask.objects.get(subtask_id='8')
+
+        with mock.patch('core.models.is_soft_shutdown_mode_enabled', return_value=False):
+            with self.assertNumQueries(0, using='control'):
+                subtask.clean()
@@ -0,0 +1,127 @@
+import mock
+
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
+
+from core.message_handlers import handle_messages_from_database
+from core.message_handlers import is_message_recieved_in_wrong_state
+from core.message_handlers import store_subtask
+from core.models import PendingResponse
+from core.models import Subtask
+from core.subtask_helpers import update_timed_out_subtasks
+from core.subtask_helpers import get_upload_statuses_of_timed_out_subtasks
+from core.subtask_helpers import update_timed_out_subtasks_in_batch
+from core.tests.utils import ConcentIntegrationTestCase
+from utils.helpers import get_current_utc_timestamp
+from utils.helpers import parse_timestamp_to_utc_datetime
+
+
+@override_settings(
+    UPDATE_TIMED_OUT_SUBTASKS_IN_REQUESTS=True,
+)
+class QueryPlansTest(ConcentIntegrationTestCase):
+    """
+    Runs EXPLAIN on queries executed by functions reading subtasks and pending responses and checks that none of them
+    needs a sequential scan. Sequential scans are disabled for the planner so a plan containing one means that
+    no index can serve the query.
+    """
+
+    multi_db = True
+
+    NUMBER_OF_DELIVERED_RESPONSES = 1000
+
+    def setUp(self):
+        super().setUp()
+        self.deadline = get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME
+
+        self._store_subtask('1', Subtask.SubtaskState.FORCING_REPORT, self.deadline)
+        self._store_subtask('2', Subtask.SubtaskState.FORCING_RESULT_TRANSFER, self.deadline + 10)
+        self._store_subtask('3', Subtask.SubtaskState.ACCEPTED, None)
+
+        subtask = Subtask.objects.get(subtask_id='3')
+        requestor = subtask.requestor
+        PendingResponse.objects.bulk_create([
+            PendingResponse(
+                response_type=PendingResponse.ResponseType.SubtaskResultsSettled.name,  # pylint: disable=no-member
+                client=requestor,
+                queue=PendingResponse.Queue.ReceiveOutOfBand.name,  # pylint: disable=no-member
+                subtask=subtask,
+                delivered=True,
+            )
+            for _ in range(self.NUMBER_OF_DELIVERED_RESPONSES)
+        ])
+        PendingResponse.objects.create(
+            response_type=PendingResponse.ResponseType.SubtaskResultsSettled.name,  # pylint: disable=no-member
+            client=requestor,
+            queue=PendingResponse.Queue.ReceiveOutOfBand.name,  # pylint: disable=no-member
+            subtask=subtask,
+        )
+
+        with connections['control'].cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def _store_subtask(self, subtask_id, state, next_deadline):
+        task_to_compute = self._get_deserialized_task_to_compute(task_id=subtask_id, subtask_id=subtask_id)
+        return store_subtask(
+            task_id=subtask_id,
+            subtask_id=subtask_id,
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=state,
+            next_deadline=next_deadline,
+            task_to_compute=task_to_compute,
+            report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+        )
+
+    def _assert_no_sequential_scans(self, captured_queries):
+        selects = [query['sql'] for query in captured_queries if query['sql'].startswith('SELECT')]
+        self.assertNotEqual(selects, [])
+
+        with connections['control'].cursor() as cursor:
+            for sql in selects:
+                cursor.execute('EXPLAIN ' + sql)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+                self.assertNotIn('Seq Scan', plan, f'Query uses a sequential scan:\n{sql}\n{plan}')
+
+    def test_that_reading_pending_responses_does_not_use_sequential_scans(self):
+        with CaptureQueriesContext(connections['control']) as context:
+            handle_messages_from_database(
+                client_public_key=self.REQUESTOR_PUBLIC_KEY,
+                response_type=PendingResponse.Queue.ReceiveOutOfBand,
+            )
+
+        self._assert_no_sequential_scans(context.captured_queries)
+
+    def test_that_processing_timeouts_of_a_client_does_not_use_sequential_scans(self):
+        with freeze_time(parse_timestamp_to_utc_datetime(self.deadline + 1)):
+            with mock.patch('core.transfer_operations.request_upload_status', return_value=False):
+                with CaptureQueriesContext(connections['control']) as context:
+                    update_timed_out_subtasks(self.REQUESTOR_PUBLIC_KEY)
+
+        self._assert_no_sequential_scans(context.captured_queries)
+
+    def test_that_sweeping_timed_out_subtasks_does_not_use_sequential_scans(self):
+        with freeze_time(parse_timestamp_to_utc_datetime(self.deadline + 1)):
+            with mock.patch('core.transfer_operations.request_upload_status', return_value=False):
+                with CaptureQueriesContext(connections['control']) as context:
+                    update_timed_out_subtasks_in_batch(10, get_upload_statuses_of_timed_out_subtasks(10, []))
+
+        self._assert_no_sequential_scans(context.captured_queries)
+
+    def test_that_updating_client_subtask_summary_does_not_use_sequential_scans(self):
+        requestor = Subtask.objects.get(subtask_id='1').requestor
+
+        with CaptureQueriesContext(connections['control']) as context:
+            requestor.update_subtask_summary()
+
+        self._assert_no_sequential_scans(context.captured_queries)
+
+    def test_that_checking_subtask_state_does_not_use_sequential_scans(self):
+        with CaptureQueriesContext(connections['control']) as context:
+            is_message_recieved_in_wrong_state('1', [Subtask.SubtaskState.ACCEPTED.name])  # pylint: disable=no-member
+
+        self._assert_no_sequential_scans(context.captured_queries)
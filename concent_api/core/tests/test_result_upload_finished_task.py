@@ -0,0 +1,77 @@
+import mock
+
+from django.conf import settings
+from django.test import override_settings
+from freezegun import freeze_time
+
+from core.message_handlers import store_subtask
+from core.models import PendingResponse
+from core.models import Subtask
+from core.subtask_helpers import update_timed_out_subtasks
+from core.tasks import result_upload_finished
+from core.tests.utils import ConcentIntegrationTestCase
+from utils.helpers import get_current_utc_timestamp
+from utils.helpers import parse_timestamp_to_utc_datetime
+
+
+class ResultUploadFinishedTaskTest(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def _store_subtask(self, state, next_deadline):
+        task_to_compute = self._get_deserialized_task_to_compute(task_id='1', subtask_id='8')
+        return store_subtask(
+            task_id='1',
+            subtask_id='8',
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=state,
+            next_deadline=next_deadline,
+            task_to_compute=task_to_compute,
+            report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+        )
+
+    def test_that_task_should_change_state_of_subtask_in_forcing_result_transfer_state_and_notify_requestor(self):
+        self._store_subtask(
+            Subtask.SubtaskState.FORCING_RESULT_TRANSFER,
+            get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME + 10,
+        )
+
+        result_upload_finished('8')  # pylint: disable=no-value-for-parameter
+
+        subtask = Subtask.objects.get(subtask_id='8')
+        self.assertEqual(subtask.state_enum, Subtask.SubtaskState.RESULT_UPLOADED)
+        self.assertIsNone(subtask.next_deadline)
+        self.assertEqual(PendingResponse.objects.count(), 1)
+        pending_response = PendingResponse.objects.first()
+        self.assertEqual(pending_response.response_type_enum, PendingResponse.ResponseType.ForceGetTaskResultDownload)
+        self.assertEqual(pending_response.client.public_key_bytes, self.REQUESTOR_PUBLIC_KEY)
+
+    def test_that_task_should_ignore_subtask_in_other_state(self):
+        self._store_subtask(Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER, get_current_utc_timestamp() + 10)
+
+        result_upload_finished('8')  # pylint: disable=no-value-for-parameter
+
+        self.assertEqual(Subtask.objects.get(subtask_id='8').state_enum, Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER)
+        self.assertEqual(PendingResponse.objects.count(), 0)
+
+    def test_that_task_should_ignore_unknown_subtask(self):
+        result_upload_finished('8')  # pylint: disable=no-value-for-parameter
+
+        self.assertEqual(PendingResponse.objects.count(), 0)
+
+    @override_settings(
+        CHECK_RESULT_UPLOAD_STATUS_IN_REQUESTS=False,
+        UPDATE_TIMED_OUT_SUBTASKS_IN_REQUESTS=True,
+    )
+    def test_that_timeouts_processed_in_requests_should_not_fail_subtask_whose_upload_status_is_not_checked(self):
+        deadline = get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME
+        self._store_subtask(Subtask.SubtaskState.FORCING_RESULT_TRANSFER, deadline)
+
+        with freeze_time(parse_timestamp_to_utc_datetime(deadline + 1)):
+            with mock.patch('core.transfer_operations.request_upload_status') as request_upload_status_mock:
+                update_timed_out_subtasks(self.REQUESTOR_PUBLIC_KEY)
+
+        request_upload_status_mock.assert_not_called()
+        self.assertEqual(Subtask.objects.get(subtask_id='8').state_enum, Subtask.SubtaskState.FORCING_RESULT_TRANSFER)
+        self.assertEqual(PendingResponse.objects.count(), 0)
@@ -0,0 +1,140 @@
+import mock
+import requests
+
+from django.conf import settings
+from django.test import override_settings
+from freezegun import freeze_time
+
+from core.message_handlers import store_subtask
+from core.models import PendingResponse
+from core.models import Subtask
+from core.subtask_helpers import update_timed_out_subtasks_in_batch
+from core.tasks import sweep_timed_out_subtasks
+from core.tests.utils import ConcentIntegrationTestCase
+from utils.helpers import get_current_utc_timestamp
+from utils.helpers import parse_timestamp_to_utc_datetime
+
+
+@override_settings(
+    TIMED_OUT_SUBTASKS_SWEEP_BATCH_SIZE=2,
+)
+class SweepTimedOutSubtasksTaskTest(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.deadline = get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME
+
+    def _store_subtask(self, subtask_id, state, next_deadline):
+        task_to_compute = self._get_deserialized_task_to_compute(task_id='1', subtask_id=subtask_id)
+        return store_subtask(
+            task_id='1',
+            subtask_id=subtask_id,
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=state,
+            next_deadline=next_deadline,
+            task_to_compute=task_to_compute,
+            report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+        )
+
+    def test_that_sweep_should_process_all_timed_out_subtasks_in_batches(self):
+        for subtask_id in ['1', '2', '3']:
+            self._store_subtask(subtask_id, Subtask.SubtaskState.FORCING_REPORT, self.deadline)
+        self._store_subtask('4', Subtask.SubtaskState.FORCING_REPORT, self.deadline + 10)
+
+        with freeze_time(parse_timestamp_to_utc_datetime(self.deadline + 1)):
+            with mock.patch('core.tasks.log_timed_out_subtasks_batch_processed') as log_mock:
+                sweep_timed_out_subtasks()  # pylint: disable=no-value-for-parameter
+
+        self.assertEqual(
+            [call[0][1] for call in log_mock.call_args_list],
+            [2, 1],
+        )
+        for subtask_id in ['1', '2', '3']:
+            self.assertEqual(Subtask.objects.get(subtask_id=subtask_id).state_enum, Subtask.SubtaskState.REPORTED)
+        self.assertEqual(Subtask.objects.get(subtask_id='4').state_enum, Subtask.SubtaskState.FORCING_REPORT)
+        self.assertEqual(PendingResponse.objects.count(), 6)
+
+    def test_that_sweep_should_not_fail_subtask_if_result_was_uploaded_before_deadline(self):
+        subtask = self._store_subtask('1', Subtask.SubtaskState.FORCING_RESULT_TRANSFER, self.deadline)
+
+        with freeze_time(parse_timestamp_to_utc_datetime(self.deadline + 1)):
+            with mock.patch('core.transfer_operations.request_upload_status', return_value=True) as request_upload_status_mock:
+                sweep_timed_out_subtasks()  # pylint: disable=no-value-for-parameter
+
+        subtask.refresh_from_db()
+        request_upload_status_mock.assert_called_once()
+        self.assertEqual(subtask.state_enum, Subtask.SubtaskState.RESULT_UPLOADED)
+        self.assertTrue(
+            PendingResponse.objects.filter(
+                client=subtask.requestor,
+                response_type=PendingResponse.ResponseType.ForceGetTaskResultDownload.name,  # pylint: disable=no-member
+            ).exists()
+        )
+
+    def test_that_sweep_should_fail_subtask_if_result_was_not_uploaded_before_deadline(self):
+        subtask = self._store_subtask('1', Subtask.SubtaskState.FORCING_RESULT_TRANSFER, self.deadline)
+
+        with freeze_time(parse_timestamp_to_utc_datetime(self.deadline + 1)):
+            with mock.patch('core.transfer_operations.request_upload_status', return_value=False):
+                sweep_timed_out_subtasks()  # pylint: disable=no-value-for-parameter
+
+        subtask.refresh_from_db()
+        self.assertEqual(subtask.state_enum, Subtask.SubtaskState.FAILED)
+        self.assertTrue(
+            PendingResponse.objects.filter(
+                client=subtask.requestor,
+                response_type=PendingResponse.ResponseType.ForceGetTaskResultFailed.name,  # pylint: disable=no-member
+            ).exists()
+        )
+
+    def test_that_sweep_should_check_upload_status_before_locking_subtasks(self):
+        self._store_subtask('1', Subtask.SubtaskState.FORCING_RESULT_TRANSFER, self.deadline)
+        calls = mock.Mock()
+
+        with freeze_time(parse_timestamp_to_utc_datetime(self.deadline + 1)):
+            with mock.patch('core.transfer_operations.request_upload_status', return_value=True) as request_upload_status_mock:
+                with mock.patch(
+                    'core.tasks.update_timed_out_subtasks_in_batch',
+                    wraps=update_timed_out_subtasks_in_batch,
+                ) as update_timed_out_subtasks_in_batch_mock:
+                    calls.attach_mock(request_upload_status_mock, 'request_upload_status')
+                    calls.attach_mock(update_timed_out_subtasks_in_batch_mock, 'update_timed_out_subtasks_in_batch')
+                    sweep_timed_out_subtasks()  # pylint: disable=no-value-for-parameter
+
+        self.assertEqual(
+            [name for (name, _args, _kwargs) in calls.mock_calls],
+            ['request_upload_status', 'update_timed_out_subtasks_in_batch'],
+        )
+
+    def test_that_sweep_should_leave_subtask_in_forcing_result_transfer_if_storage_cluster_cannot_be_reached(self):
+        subtask = self._store_subtask('1', Subtask.SubtaskState.FORCING_RESULT_TRANSFER, self.deadline)
+        self._store_subtask('2', Subtask.SubtaskState.FORCING_REPORT, self.deadline)
+
+        with freeze_time(parse_timestamp_to_utc_datetime(self.deadline + 1)):
+            with mock.patch(
+                'core.transfer_operations.request_upload_status',
+                side_effect=requests.exceptions.ConnectionError,
+            ):
+                sweep_timed_out_subtasks()  # pylint: disable=no-value-for-parameter
+
+        subtask.refresh_from_db()
+        self.assertEqual(subtask.state_enum, Subtask.SubtaskState.FORCING_RESULT_TRANSFER)
+        self.assertEqual(Subtask.objects.get(subtask_id='2').state_enum, Subtask.SubtaskState.REPORTED)
+
+    def test_that_sweep_should_leave_subtask_in_forcing_result_transfer_if_storage_cluster_returns_error(self):
+        subtask = self._store_subtask('1', Subtask.SubtaskState.FORCING_RESULT_TRANSFER, self.deadline)
+        self._store_subtask('2', Subtask.SubtaskState.FORCING_REPORT, self.deadline)
+
+        with freeze_time(parse_timestamp_to_utc_datetime(self.deadline + 1)):
+            with mock.patch(
+                'core.transfer_operations.send_request_to_storage_cluster',
+                return_value=mock.Mock(status_code=500),
+            ):
+                sweep_timed_out_subtasks()  # pylint: disable=no-value-for-parameter
+
+        subtask.refresh_from_db()
+        self.assertEqual(subtask.state_enum, Subtask.SubtaskState.FORCING_RESULT_TRANSFER)
+        self.assertEqual(Subtask.objects.get(subtask_id='2').state_enum, Subtask.SubtaskState.REPORTED)
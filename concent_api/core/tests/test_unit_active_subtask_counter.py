@@ -0,0 +1,54 @@
+from django.conf import settings
+
+from core.message_handlers import store_subtask
+from core.models import ActiveSubtaskCounter
+from core.models import Subtask
+from core.subtask_helpers import update_subtask_state
+from core.tests.utils import ConcentIntegrationTestCase
+from utils.helpers import get_current_utc_timestamp
+
+
+class ActiveSubtaskCounterTest(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def _store_subtask(self, subtask_id, state, next_deadline):
+        task_to_compute = self._get_deserialized_task_to_compute(subtask_id=subtask_id)
+        return store_subtask(
+            task_id=task_to_compute.task_id,
+            subtask_id=subtask_id,
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=state,
+            next_deadline=next_deadline,
+            task_to_compute=task_to_compute,
+            report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+        )
+
+    def _store_active_subtask(self, subtask_id):
+        return self._store_subtask(
+            subtask_id,
+            Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER,
+            get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME,
+        )
+
+    def test_that_subtasks_stored_in_active_states_are_counted(self):
+        for subtask_id in ['1', '2', '3']:
+            self._store_active_subtask(subtask_id)
+
+        self.assertEqual(ActiveSubtaskCounter.get_active_subtask_count(), 3)
+
+    def test_that_subtasks_stored_in_passive_states_are_not_counted(self):
+        self._store_subtask('1', Subtask.SubtaskState.REPORTED, None)
+
+        self.assertEqual(ActiveSubtaskCounter.get_active_subtask_count(), 0)
+
+    def test_that_subtask_is_no_longer_counted_after_transition_to_passive_state(self):
+        subtask = self._store_active_subtask('1')
+        self._store_active_subtask('2')
+
+        update_subtask_state(subtask, Subtask.SubtaskState.FAILED.name)  # pylint: disable=no-member
+        # Saving a subtask without changing its state does not change the count.
+        Subtask.objects.get(subtask_id='1').save()
+
+        self.assertEqual(ActiveSubtaskCounter.get_active_subtask_count(), 1)
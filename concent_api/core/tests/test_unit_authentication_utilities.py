@@ -1,3 +1,5 @@
+import mock
+
 from django.test                    import override_settings
 from django.test                    import TestCase
 
@@ -9,6 +11,7 @@ from golem_messages.shortcuts       import load
 from core.exceptions                import Http400
 from core.validation                import validate_all_messages_identical
 from core.validation                import validate_golem_message_client_authorization
+from core.validation                import get_verified_messages_cache
 from core.validation                import validate_golem_message_signed_with_key
 from utils.shortcuts                import load_without_public_key
 from utils.testing_helpers          import generate_ecc_key_pair
@@ -138,6 +141,44 @@ class ValidateGolemMessageSignedWithKeyUnitTest(TestCase):
             )
 
 
+class VerifiedMessagesCacheUnitTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        get_verified_messages_cache().clear()
+        task_to_compute = tasks.TaskToComputeFactory()
+        dumped_task_to_compute = dump(task_to_compute, CONCENT_PRIVATE_KEY, CONCENT_PUBLIC_KEY)
+        self.task_to_compute = load(dumped_task_to_compute, CONCENT_PRIVATE_KEY, CONCENT_PUBLIC_KEY)
+
+    def test_that_signature_verified_once_is_not_verified_again(self):
+        with mock.patch.object(
+            message.TaskToCompute,
+            'verify_signature',
+            autospec=True,
+            return_value=True,
+        ) as verify_signature_mock:
+            validate_golem_message_signed_with_key(self.task_to_compute, CONCENT_PUBLIC_KEY)
+            validate_golem_message_signed_with_key(self.task_to_compute, CONCENT_PUBLIC_KEY)
+
+        verify_signature_mock.assert_called_once_with(self.task_to_compute, CONCENT_PUBLIC_KEY)
+        self.assertEqual(get_verified_messages_cache().info().hits, 1)
+        self.assertEqual(get_verified_messages_cache().info().misses, 1)
+
+    def test_that_invalid_signature_is_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(Http400):
+                validate_golem_message_signed_with_key(self.task_to_compute, REQUESTOR_PUBLIC_KEY)
+
+        self.assertEqual(get_verified_messages_cache().info().currsize, 0)
+
+    def test_that_message_modified_after_verification_is_verified_again(self):
+        validate_golem_message_signed_with_key(self.task_to_compute, CONCENT_PUBLIC_KEY)
+        self.task_to_compute.price += 1
+
+        with self.assertRaises(Http400):
+            validate_golem_message_signed_with_key(self.task_to_compute, CONCENT_PUBLIC_KEY)
+
+
 class ValidateListOfIdenticalTaskToComputeUnitTest(TestCase):
 
     def test_that_validate_all_messages_identical_should_raise_error_when_not_list_is_used(self):
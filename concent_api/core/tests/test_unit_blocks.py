@@ -0,0 +1,134 @@
+import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.test import TestCase
+from freezegun import freeze_time
+
+from core.models import BlockTimestamp
+from core.payments.blocks import get_block_number
+from core.payments.blocks import get_first_block_after
+from core.payments.blocks import index_block_timestamps
+from core.tests.fake_chain import FakeChain
+from utils.helpers import parse_timestamp_to_utc_datetime
+
+
+@override_settings(
+    PAYMENT_EVENT_INDEXER_CONFIRMATIONS=2,
+    BLOCK_TIMESTAMP_INDEX_DEPTH=10,
+)
+class BlockLookupTest(TestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.chain = FakeChain()
+        self.chain.mine_empty_blocks(100)
+        self.get_block_by_number = mock.patch.object(
+            self.chain,
+            'get_block_by_number',
+            wraps=self.chain.get_block_by_number,
+        ).start()
+        self.get_block_number = mock.patch.object(
+            self.chain,
+            'get_block_number',
+            wraps=self.chain.get_block_number,
+        ).start()
+
+    def tearDown(self):
+        mock.patch.stopall()
+        cache.clear()
+        super().tearDown()
+
+    def test_that_first_block_after_timestamp_is_found(self):
+        for (timestamp, expected_block) in [
+            (0, 0),
+            (1, 1),
+            (15, 1),
+            (16, 2),
+            (1000, 67),
+            (1500, 100),
+        ]:
+            self.assertEqual(get_first_block_after(self.chain, timestamp), expected_block)
+
+    def test_that_none_is_returned_if_there_is_no_block_after_timestamp(self):
+        self.assertIsNone(get_first_block_after(self.chain, 1501))
+
+    def test_that_repeated_lookup_uses_stored_blocks_instead_of_rpc_calls(self):
+        self.assertEqual(get_first_block_after(self.chain, 1000), 67)
+        self.get_block_by_number.reset_mock()
+        self.get_block_number.reset_mock()
+
+        self.assertEqual(get_first_block_after(self.chain, 1000), 67)
+        self.assertEqual(get_first_block_after(self.chain, 991), 67)
+
+        self.get_block_by_number.assert_not_called()
+        self.get_block_number.assert_not_called()
+
+    def test_that_unconfirmed_blocks_are_not_stored(self):
+        get_first_block_after(self.chain, 1500)
+
+        self.assertFalse(BlockTimestamp.objects.filter(number__gt=98).exists())
+        self.assertTrue(BlockTimestamp.objects.filter(number__lte=98).exists())
+
+    def test_that_search_is_limited_to_blocks_between_stored_ones(self):
+        BlockTimestamp.objects.create(number=60, timestamp=900)
+        BlockTimestamp.objects.create(number=68, timestamp=1020)
+
+        self.assertEqual(get_first_block_after(self.chain, 1000), 67)
+
+        self.get_block_number.assert_not_called()
+        self.assertTrue(
+            all(60 < call[0][0] < 68 for call in self.get_block_by_number.call_args_list)
+        )
+        self.assertEqual(self.get_block_by_number.call_count, 2)
+
+    def test_that_timestamps_of_most_recent_confirmed_blocks_are_indexed_without_fetching_stored_ones(self):
+        self.assertEqual(index_block_timestamps(self.chain), 98)
+        self.chain.mine_empty_blocks(5)
+        self.get_block_by_number.reset_mock()
+
+        self.assertEqual(index_block_timestamps(self.chain), 103)
+
+        self.assertEqual(
+            sorted(call[0][0] for call in self.get_block_by_number.call_args_list),
+            [99, 100, 101, 102, 103],
+        )
+        self.assertEqual(
+            list(BlockTimestamp.objects.order_by('number').values_list('number', flat=True)),
+            list(range(89, 104)),
+        )
+
+    @override_settings(
+        BLOCK_NUMBER_CACHE_TIME=60,
+    )
+    def test_that_lookup_of_recent_timestamp_needs_at_most_one_rpc_call(self):
+        index_block_timestamps(self.chain)
+        self.get_block_by_number.reset_mock()
+        self.get_block_number.reset_mock()
+
+        # Blocks 89-98 are indexed so no RPC calls are needed.
+        self.assertEqual(get_first_block_after(self.chain, 1400), 94)
+        self.assertEqual(get_first_block_after(self.chain, 1470), 98)
+        self.get_block_by_number.assert_not_called()
+
+        # Block 99 is not confirmed yet. It is found with a single call.
+        with freeze_time(parse_timestamp_to_utc_datetime(1500)):
+            self.assertEqual(get_first_block_after(self.chain, 1471), 99)
+        self.assertEqual(self.get_block_by_number.call_count, 1)
+        self.get_block_number.assert_not_called()
+
+    @override_settings(
+        BLOCK_NUMBER_CACHE_TIME=60,
+    )
+    def test_that_block_number_is_cached(self):
+        self.assertEqual(get_block_number(self.chain), 100)
+        self.chain.mine_empty_blocks(1)
+        self.get_block_number.reset_mock()
+        self.assertEqual(get_block_number(self.chain), 100)
+
+        self.get_block_number.assert_not_called()
+
+        cache.clear()
+        self.assertEqual(get_block_number(self.chain), 101)
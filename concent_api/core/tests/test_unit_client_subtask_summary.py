@@ -0,0 +1,78 @@
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from core.message_handlers import store_subtask
+from core.models import Client
+from core.models import Subtask
+from core.subtask_helpers import update_subtask_state
+from core.tests.utils import ConcentIntegrationTestCase
+from utils.helpers import get_current_utc_timestamp
+from utils.helpers import parse_timestamp_to_utc_datetime
+
+
+class ClientSubtaskSummaryTest(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.deadline = get_current_utc_timestamp() + 100
+
+    def _store_subtask(self, subtask_id, state, next_deadline):
+        task_to_compute = self._get_deserialized_task_to_compute(subtask_id=subtask_id)
+        return store_subtask(
+            task_id=task_to_compute.task_id,
+            subtask_id=subtask_id,
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=state,
+            next_deadline=next_deadline,
+            task_to_compute=task_to_compute,
+            report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+        )
+
+    def _assert_next_deadline_of_both_parties(self, subtask, next_deadline):
+        expected_next_deadline = None if next_deadline is None else parse_timestamp_to_utc_datetime(next_deadline)
+        self.assertEqual(Client.objects.get(pk=subtask.requestor_id).next_deadline, expected_next_deadline)
+        self.assertEqual(Client.objects.get(pk=subtask.provider_id).next_deadline, expected_next_deadline)
+
+    def test_that_earlier_deadline_of_stored_subtask_replaces_next_deadline(self):
+        self._store_subtask('1', Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER, self.deadline)
+        subtask = self._store_subtask('2', Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER, self.deadline - 10)
+        self._store_subtask('3', Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER, self.deadline + 10)
+
+        self._assert_next_deadline_of_both_parties(subtask, self.deadline - 10)
+
+    def test_that_next_deadline_is_recomputed_when_subtask_with_earliest_deadline_becomes_passive(self):
+        subtask = self._store_subtask('1', Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER, self.deadline)
+        self._store_subtask('2', Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER, self.deadline + 10)
+        self._store_subtask('3', Subtask.SubtaskState.REPORTED, None)
+
+        update_subtask_state(subtask, Subtask.SubtaskState.FAILED.name)  # pylint: disable=no-member
+        self._assert_next_deadline_of_both_parties(subtask, self.deadline + 10)
+
+        update_subtask_state(Subtask.objects.get(subtask_id='2'), Subtask.SubtaskState.FAILED.name)  # pylint: disable=no-member
+        self._assert_next_deadline_of_both_parties(subtask, None)
+
+    def test_that_forcing_result_transfer_subtasks_are_counted_for_requestor(self):
+        subtask = self._store_subtask('1', Subtask.SubtaskState.FORCING_RESULT_TRANSFER, self.deadline)
+        self._store_subtask('2', Subtask.SubtaskState.FORCING_RESULT_TRANSFER, self.deadline)
+
+        self.assertEqual(Client.objects.get(pk=subtask.requestor_id).forcing_result_transfer_subtask_count, 2)
+        self.assertEqual(Client.objects.get(pk=subtask.provider_id).forcing_result_transfer_subtask_count, 0)
+
+        update_subtask_state(subtask, Subtask.SubtaskState.RESULT_UPLOADED.name)  # pylint: disable=no-member
+
+        self.assertEqual(Client.objects.get(pk=subtask.requestor_id).forcing_result_transfer_subtask_count, 1)
+
+    def test_that_saving_subtask_without_changing_state_or_deadline_does_not_touch_clients(self):
+        self._store_subtask('1', Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER, self.deadline)
+        subtask = Subtask.objects.get(subtask_id='1')
+
+        with CaptureQueriesContext(connections['control']) as context:
+            subtask.save()
+
+        self.assertEqual(
+            [query['sql'] for query in context.captured_queries if '"core_client"' in query['sql']],
+            [],
+        )
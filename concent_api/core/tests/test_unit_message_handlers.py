@@ -1,13 +1,44 @@
-from unittest import TestCase
+from django.conf import settings
 
-from core.message_handlers import are_items_unique
+from core.message_handlers import store_subtask
+from core.models import Subtask
+from core.tests.utils import ConcentIntegrationTestCase
+from core.utils import calculate_maximum_download_time
+from core.utils import calculate_subtask_verification_time
+from utils.helpers import parse_timestamp_to_utc_datetime
 
 
-class TestMessageHandlers(TestCase):
-    def test_that_function_returns_true_when_ids_are_diffrent(self):
-        response = are_items_unique([1, 2, 3, 4, 5])
-        self.assertTrue(response)
+class TestSubtaskProtocolFields(ConcentIntegrationTestCase):
 
-    def test_that_function_returns_false_when_ids_are_the_same(self):
-        response = are_items_unique([1, 2, 3, 2, 5])
-        self.assertFalse(response)
+    multi_db = True
+
+    def test_that_store_subtask_copies_values_from_task_to_compute_and_report_computed_task(self):
+        task_to_compute = self._get_deserialized_task_to_compute(task_id='1', subtask_id='8')
+        report_computed_task = self._get_deserialized_report_computed_task(task_to_compute=task_to_compute)
+
+        store_subtask(
+            task_id='1',
+            subtask_id='8',
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=Subtask.SubtaskState.REPORTED,
+            next_deadline=None,
+            task_to_compute=task_to_compute,
+            report_computed_task=report_computed_task,
+        )
+
+        subtask = Subtask.objects.get(subtask_id='8')
+        self.assertEqual(subtask.computation_deadline, parse_timestamp_to_utc_datetime(task_to_compute.compute_task_def['deadline']))
+        self.assertEqual(subtask.task_to_compute_timestamp, parse_timestamp_to_utc_datetime(task_to_compute.timestamp))
+        self.assertEqual(int(subtask.price), task_to_compute.price)
+        self.assertEqual(subtask.requestor_ethereum_address, task_to_compute.requestor_ethereum_address)
+        self.assertEqual(subtask.provider_ethereum_address, task_to_compute.provider_ethereum_address)
+        self.assertEqual(subtask.source_package_size, task_to_compute.size)
+        self.assertEqual(subtask.source_package_hash, task_to_compute.package_hash)
+        self.assertEqual(subtask.result_package_size, report_computed_task.size)
+        self.assertEqual(subtask.result_package_hash, report_computed_task.package_hash)
+        self.assertEqual(
+            subtask.maximum_download_time,
+            calculate_maximum_download_time(report_computed_task.size, settings.MINIMUM_UPLOAD_RATE),
+        )
+        self.assertEqual(subtask.subtask_verification_time, calculate_subtask_verification_time(report_computed_task))
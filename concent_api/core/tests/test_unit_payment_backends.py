@@ -0,0 +1,127 @@
+import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.test import TestCase
+
+from core.payments import base
+from core.payments.base import PaymentBackend
+from core.payments.base import PaymentQuery
+from core.payments.base import TransactionType
+from core.payments.simulated_chain import BatchTransferEvent
+from core.payments.simulated_chain import ForcedPaymentEvent
+from core.payments.simulated_chain import get_simulated_chain
+from core.payments.simulated_chain import reset_simulated_chain
+from core.payments.simulated_chain import SimulatedChainPaymentBackend
+
+
+REQUESTOR_ETH_ADDRESS = '0x' + 'a' * 40
+PROVIDER_ETH_ADDRESS = '0x' + 'b' * 40
+
+
+class PaymentBackendLoadingTest(TestCase):
+
+    @override_settings(PAYMENT_BACKEND='core.payments.simulated_chain.SimulatedChainPaymentBackend')
+    def test_that_backend_is_instantiated_once_and_reused(self):
+        with mock.patch('core.payments.base.import_string', return_value=SimulatedChainPaymentBackend) as import_string:
+            base.set_up_backend()
+            backend = base.get_backend()
+
+            self.assertIsInstance(backend, SimulatedChainPaymentBackend)
+            self.assertIs(base.get_backend(), backend)
+
+        import_string.assert_called_once_with('core.payments.simulated_chain.SimulatedChainPaymentBackend')
+
+    def test_that_class_not_subclassing_payment_backend_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            base.load_backend('core.payments.simulated_chain.SimulatedChain')
+
+    def test_that_backend_not_implementing_all_methods_is_rejected(self):
+        class IncompletePaymentBackend(PaymentBackend):  # pylint: disable=abstract-method
+            def get_list_of_payments(self, *args, **kwargs):
+                return []
+
+        with mock.patch('core.payments.base.import_string', return_value=IncompletePaymentBackend):
+            with self.assertRaises(ImproperlyConfigured):
+                base.load_backend('core.payments.IncompletePaymentBackend')
+
+    @override_settings(PAYMENT_BACKEND='core.payments.mock.NonExistentPaymentBackend')
+    def test_that_using_backend_that_could_not_be_loaded_raises_improperly_configured(self):
+        with self.assertRaises(ImproperlyConfigured):
+            base.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 0)
+
+    @override_settings(PAYMENT_BACKEND='core.payments.simulated_chain.SimulatedChainPaymentBackend')
+    def test_that_calls_are_passed_to_backend_set_in_settings(self):
+        with mock.patch.object(
+            SimulatedChainPaymentBackend,
+            'is_account_status_positive',
+            return_value=True,
+        ) as is_account_status_positive:
+            self.assertTrue(base.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 10))
+
+        is_account_status_positive.assert_called_once_with(client_eth_address=REQUESTOR_ETH_ADDRESS, pending_value=10)
+
+
+@override_settings(
+    SIMULATED_CHAIN_LATENCY=0.5,
+    SIMULATED_CHAIN_INITIAL_DEPOSIT_VALUE=100,
+)
+class SimulatedChainBackendTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        reset_simulated_chain()
+        self.sleep_patcher = mock.patch('core.payments.simulated_chain.time.sleep')
+        self.sleep = self.sleep_patcher.start()
+        self.backend = SimulatedChainPaymentBackend()
+
+    def tearDown(self):
+        self.sleep_patcher.stop()
+        reset_simulated_chain()
+        super().tearDown()
+
+    def test_that_force_payment_is_capped_at_deposit_and_recorded(self):
+        get_simulated_chain().set_deposit_value(REQUESTOR_ETH_ADDRESS, 30)
+
+        paid_value = self.backend.make_force_payment_to_provider(
+            requestor_eth_address=REQUESTOR_ETH_ADDRESS,
+            provider_eth_address=PROVIDER_ETH_ADDRESS,
+            value=50,
+            payment_ts=1000,
+        )
+
+        self.assertEqual(paid_value, 30)
+        self.assertEqual(get_simulated_chain().get_deposit_value(REQUESTOR_ETH_ADDRESS), 0)
+        self.assertEqual(get_simulated_chain().get_deposit_value(PROVIDER_ETH_ADDRESS), 100)
+        self.assertEqual(
+            self.backend.get_list_of_payments(
+                requestor_eth_address=REQUESTOR_ETH_ADDRESS,
+                provider_eth_address=PROVIDER_ETH_ADDRESS,
+                payment_ts=1000,
+                current_time=2000,
+                transaction_type=TransactionType.FORCE,
+            ),
+            [ForcedPaymentEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 30, 1000)],
+        )
+
+    def test_that_queries_sent_at_once_return_payments_not_older_than_payment_ts_and_wait_once(self):
+        get_simulated_chain().add_batch_transfer(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 10, 900)
+        get_simulated_chain().add_batch_transfer(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 20, 1100)
+
+        (batch_transfers, forced_payments) = self.backend.get_lists_of_payments(
+            requestor_eth_address=REQUESTOR_ETH_ADDRESS,
+            provider_eth_address=PROVIDER_ETH_ADDRESS,
+            current_time=2000,
+            queries=[
+                PaymentQuery(payment_ts=1000, transaction_type=TransactionType.BATCH),
+                PaymentQuery(payment_ts=1000, transaction_type=TransactionType.FORCE),
+            ],
+        )
+
+        self.assertEqual(batch_transfers, [BatchTransferEvent(REQUESTOR_ETH_ADDRESS, PROVIDER_ETH_ADDRESS, 20, 1100)])
+        self.assertEqual(forced_payments, [])
+        self.sleep.assert_called_once_with(0.5)
+
+    def test_that_account_status_is_positive_only_if_deposit_covers_pending_value(self):
+        self.assertTrue(self.backend.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 99))
+        self.assertFalse(self.backend.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 100))
@@ -0,0 +1,167 @@
+import threading
+
+import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.test import TestCase
+
+from core.payments.deposits import get_deposit_cache_stats
+from core.exceptions import PaymentBackendUnavailable
+from core.payments.base import PaymentQuery
+from core.payments.base import TransactionType
+from core.payments.sci_backend import SCIPaymentBackend
+
+
+REQUESTOR_ETH_ADDRESS = '0x' + 'a' * 40
+PROVIDER_ETH_ADDRESS = '0x' + 'b' * 40
+
+
+class GetListsOfPaymentsTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.concent_rpc = mock.Mock()
+        self.concent_rpc.get_block_number.return_value = 100
+        self.concent_rpc.get_batch_transfers.return_value = ['batch']
+        self.concent_rpc.get_forced_payments.return_value = ['force']
+
+        self.patchers = [
+            mock.patch('core.payments.sci_backend.ConcentRPC', return_value=self.concent_rpc),
+            mock.patch(
+                'core.payments.sci_backend.get_first_block_after',
+                side_effect=lambda _concent_rpc, payment_ts: payment_ts // 10,
+            ),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        super().tearDown()
+
+    def _get_lists_of_payments(self):
+        return SCIPaymentBackend().get_lists_of_payments(
+            requestor_eth_address=REQUESTOR_ETH_ADDRESS,
+            provider_eth_address=PROVIDER_ETH_ADDRESS,
+            current_time=1000,
+            queries=[
+                PaymentQuery(payment_ts=500, transaction_type=TransactionType.BATCH),
+                PaymentQuery(payment_ts=600, transaction_type=TransactionType.FORCE),
+            ],
+        )
+
+    def test_that_results_are_returned_in_order_of_queries_and_searched_up_to_the_same_block(self):
+        lists_of_payments = self._get_lists_of_payments()
+
+        self.assertEqual(lists_of_payments, [['batch'], ['force']])
+        self.concent_rpc.get_block_number.assert_called_once_with()
+        self.concent_rpc.get_batch_transfers.assert_called_once_with(
+            payer_address=REQUESTOR_ETH_ADDRESS,
+            payee_address=PROVIDER_ETH_ADDRESS,
+            from_block=50,
+            to_block=100,
+        )
+        self.concent_rpc.get_forced_payments.assert_called_once_with(
+            requestor_address=REQUESTOR_ETH_ADDRESS,
+            provider_address=PROVIDER_ETH_ADDRESS,
+            from_block=60,
+            to_block=100,
+        )
+
+    def test_that_queries_are_sent_concurrently(self):
+        both_queries_started = threading.Barrier(2, timeout=5)
+        self.concent_rpc.get_batch_transfers.side_effect = lambda **_kwargs: [both_queries_started.wait()]
+        self.concent_rpc.get_forced_payments.side_effect = lambda **_kwargs: [both_queries_started.wait()]
+
+        self.assertEqual(len(self._get_lists_of_payments()), 2)
+
+    @override_settings(
+        PAYMENT_BACKEND_QUERY_TIMEOUT=0.1,
+    )
+    def test_that_payment_backend_unavailable_is_raised_if_any_query_does_not_finish_in_time(self):
+        query_released = threading.Event()
+        self.concent_rpc.get_forced_payments.side_effect = lambda **_kwargs: query_released.wait(5)
+
+        try:
+            with self.assertRaises(PaymentBackendUnavailable):
+                self._get_lists_of_payments()
+        finally:
+            query_released.set()
+
+    def test_that_error_of_any_query_is_raised(self):
+        self.concent_rpc.get_batch_transfers.side_effect = ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            self._get_lists_of_payments()
+
+
+@override_settings(
+    DEPOSIT_VALUE_CACHE_TIME=60,
+)
+class DepositCacheTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.concent_rpc = mock.Mock()
+        self.concent_rpc.get_deposit_value.return_value = 100
+        self.patcher = mock.patch('core.payments.sci_backend.ConcentRPC', return_value=self.concent_rpc)
+        self.patcher.start()
+        self.backend = SCIPaymentBackend()
+
+    def tearDown(self):
+        self.patcher.stop()
+        cache.clear()
+        super().tearDown()
+
+    def _make_force_payment(self, value):
+        return self.backend.make_force_payment_to_provider(
+            requestor_eth_address=REQUESTOR_ETH_ADDRESS,
+            provider_eth_address=PROVIDER_ETH_ADDRESS,
+            value=value,
+            payment_ts=1000,
+        )
+
+    def test_that_deposit_is_read_from_blockchain_once_when_checking_account_status(self):
+        stats_before = get_deposit_cache_stats()
+
+        self.assertTrue(self.backend.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 50))
+        self.assertTrue(self.backend.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 50))
+
+        self.concent_rpc.get_deposit_value.assert_called_once_with(REQUESTOR_ETH_ADDRESS)
+        stats = get_deposit_cache_stats()
+        self.assertEqual(stats['hits'] - stats_before['hits'], 1)
+        self.assertEqual(stats['misses'] - stats_before['misses'], 1)
+
+    def test_that_payment_reads_deposit_from_blockchain_even_if_it_is_cached(self):
+        self.backend.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 50)
+        self.concent_rpc.get_deposit_value.return_value = 30
+
+        self.assertEqual(self._make_force_payment(50), 30)
+
+        self.assertEqual(self.concent_rpc.get_deposit_value.call_count, 2)
+        self.concent_rpc.force_payment.assert_called_once_with(
+            requestor_address=REQUESTOR_ETH_ADDRESS,
+            provider_address=PROVIDER_ETH_ADDRESS,
+            value=30,
+            closure_time=1000,
+        )
+
+    def test_that_payment_invalidates_cached_deposit_of_requestor(self):
+        self.backend.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 50)
+        self._make_force_payment(100)
+        self.concent_rpc.get_deposit_value.return_value = 0
+
+        self.assertFalse(self.backend.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 50))
+
+    def test_that_payment_invalidates_cached_deposit_of_requestor_even_if_sending_transaction_fails(self):
+        self.backend.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 50)
+        self.concent_rpc.force_payment.side_effect = ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            self._make_force_payment(100)
+
+        self.concent_rpc.get_deposit_value.return_value = 0
+        self.assertFalse(self.backend.is_account_status_positive(REQUESTOR_ETH_ADDRESS, 50))
@@ -1,19 +1,29 @@
 import datetime
 from django.conf import settings
+from django.core.cache import cache
 from django.test import override_settings
 from django.test import TestCase
 import mock
+import requests
 from freezegun import freeze_time
 
 from golem_messages.factories.tasks import ReportComputedTaskFactory
+from golem_messages import message
 from golem_messages.message import FileTransferToken
 
+from core.message_handlers import store_subtask
+from core.models import PendingResponse
+from core.models import Subtask
 from core.tests.utils import ConcentIntegrationTestCase
 from core.exceptions import UnexpectedResponse
+from core.transfer_operations import calculate_token_expiration_deadline
 from core.transfer_operations import create_file_transfer_token_for_concent
 from core.transfer_operations import create_file_transfer_token_for_golem_client
+from core.transfer_operations import create_response_to_client
 from core.transfer_operations import request_upload_status
+from core.transfer_operations import verify_file_status
 from core.utils import calculate_maximum_download_time
+from utils.helpers import get_current_utc_timestamp
 from utils.helpers import get_storage_source_file_path
 from utils.helpers import get_storage_result_file_path
 from utils.helpers import parse_datetime_to_timestamp
@@ -46,31 +56,47 @@ def mock_send_incorrect_request_to_cluster_unexpected_response(_headers, _reques
     CONCENT_PUBLIC_KEY        = CONCENT_PUBLIC_KEY,
 )
 class RequestUploadStatusTest(ConcentIntegrationTestCase):
-    def test_properly_work_of_request_upload_status_function(self):
 
-        report_computed_task=self._get_deserialized_report_computed_task(
+    multi_db = True
+
+    def test_properly_work_of_request_upload_status_function(self):
+        task_to_compute = self._get_deserialized_task_to_compute(
+            task_id='1/1',
             subtask_id='1',
-            task_to_compute=self._get_deserialized_task_to_compute(
-                task_id='1/1',
+        )
+        subtask = store_subtask(
+            task_id='1/1',
+            subtask_id='1',
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=Subtask.SubtaskState.FORCING_RESULT_TRANSFER,
+            next_deadline=get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME + 10,
+            task_to_compute=task_to_compute,
+            report_computed_task=self._get_deserialized_report_computed_task(
                 subtask_id='1',
-            )
+                task_to_compute=task_to_compute,
+            ),
         )
 
         with mock.patch(
             'core.transfer_operations.send_request_to_storage_cluster',
             side_effect=mock_send_request_to_cluster_correct_response
         ) as mock_send_request_to_cluster_correct_response_function:
-            cluster_response = request_upload_status(report_computed_task)
+            cluster_response = request_upload_status(subtask)
 
         self.assertEqual(cluster_response, True)
         mock_send_request_to_cluster_correct_response_function.assert_called()
+        self.assertTrue(
+            mock_send_request_to_cluster_correct_response_function.call_args[0][1].endswith(
+                get_storage_result_file_path(subtask_id='1', task_id='1/1')
+            )
+        )
 
         with mock.patch(
             'core.transfer_operations.send_request_to_storage_cluster',
             side_effect=mock_send_incorrect_request_to_cluster_incorrect_response
         ) as mock_send_incorrect_request_to_cluster_incorrect_response_function:
-            cluster_response_2 = request_upload_status(
-                report_computed_task)
+            cluster_response_2 = request_upload_status(subtask)
 
         self.assertEqual(cluster_response_2, False)
         mock_send_incorrect_request_to_cluster_incorrect_response_function.assert_called()
@@ -80,11 +106,129 @@ class RequestUploadStatusTest(ConcentIntegrationTestCase):
                 'core.transfer_operations.send_request_to_storage_cluster',
                 side_effect=mock_send_incorrect_request_to_cluster_unexpected_response
             ) as mock_send_incorrect_request_to_cluster_unexpected_response_function:
-                request_upload_status(report_computed_task)
+                request_upload_status(subtask)
 
         mock_send_incorrect_request_to_cluster_unexpected_response_function.assert_called()
 
 
+def mock_request_upload_status_depending_on_subtask_id(subtask):
+    if subtask.subtask_id == '1':
+        return True
+    elif subtask.subtask_id == '2':
+        return False
+    raise requests.exceptions.ConnectTimeout()
+
+
+@override_settings(
+    UPLOAD_STATUS_NEGATIVE_CACHE_TIME=60,
+)
+class VerifyFileStatusTest(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        for subtask_id in ['1', '2', '3']:
+            task_to_compute = self._get_deserialized_task_to_compute(task_id=subtask_id, subtask_id=subtask_id)
+            store_subtask(
+                task_id=subtask_id,
+                subtask_id=subtask_id,
+                provider_public_key=self.PROVIDER_PUBLIC_KEY,
+                requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+                state=Subtask.SubtaskState.FORCING_RESULT_TRANSFER,
+                next_deadline=get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME + 10,
+                task_to_compute=task_to_compute,
+                report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+            )
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def test_that_verify_file_status_should_update_only_subtasks_with_uploaded_results_and_skip_recently_missing_ones(self):
+        with mock.patch(
+            'core.transfer_operations.request_upload_status',
+            side_effect=mock_request_upload_status_depending_on_subtask_id,
+        ) as request_upload_status_mock:
+            verify_file_status(self.REQUESTOR_PUBLIC_KEY)
+
+        self.assertEqual(request_upload_status_mock.call_count, 3)
+        self.assertEqual(Subtask.objects.get(subtask_id='1').state_enum, Subtask.SubtaskState.RESULT_UPLOADED)
+        self.assertEqual(Subtask.objects.get(subtask_id='2').state_enum, Subtask.SubtaskState.FORCING_RESULT_TRANSFER)
+        self.assertEqual(Subtask.objects.get(subtask_id='3').state_enum, Subtask.SubtaskState.FORCING_RESULT_TRANSFER)
+        self.assertEqual(
+            PendingResponse.objects.filter(response_type=PendingResponse.ResponseType.ForceGetTaskResultDownload.name).count(),  # pylint: disable=no-member
+            1,
+        )
+
+        # Subtask 2 is in the negative cache. Subtask 3 failed with a timeout and has to be checked again.
+        with mock.patch(
+            'core.transfer_operations.request_upload_status',
+            side_effect=mock_request_upload_status_depending_on_subtask_id,
+        ) as request_upload_status_mock:
+            verify_file_status(self.REQUESTOR_PUBLIC_KEY)
+
+        self.assertEqual(
+            [call[0][0].subtask_id for call in request_upload_status_mock.call_args_list],
+            ['3'],
+        )
+
+
+@override_settings(
+    CONCENT_PRIVATE_KEY=CONCENT_PRIVATE_KEY,
+    CONCENT_PUBLIC_KEY=CONCENT_PUBLIC_KEY,
+)
+class CreateResponseToClientTest(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.task_to_compute = self._get_deserialized_task_to_compute(task_id='1', subtask_id='1')
+        self.report_computed_task = self._get_deserialized_report_computed_task(task_to_compute=self.task_to_compute)
+        self.subtask = store_subtask(
+            task_id='1',
+            subtask_id='1',
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=Subtask.SubtaskState.FORCING_RESULT_TRANSFER,
+            next_deadline=get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME,
+            task_to_compute=self.task_to_compute,
+            report_computed_task=self.report_computed_task,
+        )
+
+    def test_that_force_get_task_result_upload_is_built_with_upload_token(self):
+        response_to_client = create_response_to_client(
+            PendingResponse.ResponseType.ForceGetTaskResultUpload,
+            self.subtask,
+            self.PROVIDER_PUBLIC_KEY,
+        )
+
+        self.assertIsInstance(response_to_client, message.concents.ForceGetTaskResultUpload)
+        self.assertEqual(response_to_client.file_transfer_token.operation, FileTransferToken.Operation.upload)
+        self.assertEqual(
+            response_to_client.file_transfer_token.token_expiration_deadline,
+            calculate_token_expiration_deadline(FileTransferToken.Operation.upload, self.report_computed_task),
+        )
+        self.assertEqual(response_to_client.force_get_task_result.report_computed_task, self.report_computed_task)
+
+    def test_that_force_get_task_result_download_is_built_with_download_token(self):
+        response_to_client = create_response_to_client(
+            PendingResponse.ResponseType.ForceGetTaskResultDownload,
+            self.subtask,
+            self.REQUESTOR_PUBLIC_KEY,
+        )
+
+        self.assertIsInstance(response_to_client, message.concents.ForceGetTaskResultDownload)
+        self.assertEqual(response_to_client.file_transfer_token.operation, FileTransferToken.Operation.download)
+        self.assertEqual(
+            response_to_client.file_transfer_token.token_expiration_deadline,
+            calculate_token_expiration_deadline(FileTransferToken.Operation.download, self.report_computed_task),
+        )
+        self.assertEqual(response_to_client.force_get_task_result.report_computed_task, self.report_computed_task)
+
+
 @override_settings(
     CONCENT_PRIVATE_KEY=CONCENT_PRIVATE_KEY,
     CONCENT_PUBLIC_KEY=CONCENT_PUBLIC_KEY,
@@ -2,6 +2,8 @@ from unittest import TestCase
 
 import mock
 
+from django.test import override_settings
+from golem_messages.message.concents import ServiceRefused
 from golem_messages.message.tasks import ReportComputedTask
 from golem_messages.message.tasks import SubtaskResultsRejected
 from golem_messages.message.tasks import TaskToCompute
@@ -11,12 +13,18 @@ from core.constants import MESSAGE_TASK_ID_MAX_LENGTH
 from core.tests.utils import ConcentIntegrationTestCase
 from core.exceptions import HashingAlgorithmError
 from core.exceptions import Http400
+from core.message_handlers import store_message
+from core.validation import get_verified_messages_cache
+from core.validation import get_verified_messages_cache_stats
 from core.validation import validate_all_messages_identical
 from core.validation import validate_ethereum_addresses
 from core.validation import validate_golem_message_subtask_results_rejected
 from core.validation import validate_id_value
+from core.validation import validate_message_identical_to_stored
 from core.validation import validate_secure_hash_algorithm
 from core.validation import validate_subtask_price_task_to_compute
+from core.validation import validate_subtask_results_accepted_list
+from core.validation import validate_task_to_compute
 from utils.constants import ErrorCode
 
 
@@ -96,6 +104,44 @@ class TestValidateAllMessagesIdentical(ConcentIntegrationTestCase):
             validate_all_messages_identical([self.report_computed_task, different_report_computed_task])
 
 
+class TestValidateMessageIdenticalToStored(ConcentIntegrationTestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.report_computed_task = self._get_deserialized_report_computed_task()
+
+    def test_that_function_does_not_deserialize_stored_message_with_matching_fingerprint(self):
+        stored_message = store_message(self.report_computed_task, '1', '1')
+
+        with mock.patch('core.validation.deserialize_message') as deserialize_message:
+            validate_message_identical_to_stored(self.report_computed_task, stored_message)
+
+        deserialize_message.assert_not_called()
+
+    def test_that_function_raise_http400_when_stored_message_is_different(self):
+        stored_message = store_message(self.report_computed_task, '1', '1')
+        different_report_computed_task = self._get_deserialized_report_computed_task(size = 10)
+
+        with self.assertRaises(Http400):
+            validate_message_identical_to_stored(different_report_computed_task, stored_message)
+
+    def test_that_function_compares_fields_of_stored_message_without_fingerprint(self):
+        stored_message = self._store_golem_messages_in_database(
+            ReportComputedTask.TYPE,
+            None,
+            self.report_computed_task,
+            '1',
+        )
+        self.assertIsNone(stored_message.fingerprint)
+
+        validate_message_identical_to_stored(self.report_computed_task, stored_message)
+
+        with self.assertRaises(Http400):
+            validate_message_identical_to_stored(self._get_deserialized_report_computed_task(size = 10), stored_message)
+
+
 class TestValidateIdValue(TestCase):
 
     def test_that_function_should_pass_when_value_is_allowed(self):
@@ -168,3 +214,112 @@ class TestInvalidHashAlgorithms(TestCase):
             with self.assertRaises(HashingAlgorithmError) as context:
                 validate_secure_hash_algorithm(invalid_value)
             self.assertEqual(context.exception.error_code, error_code)
+
+
+class TestValidateSubtaskResultsAcceptedList(ConcentIntegrationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        get_verified_messages_cache().clear()
+
+    def _get_subtask_results_accepted_list(self, subtask_ids, **kwargs):
+        return [
+            self._get_deserialized_subtask_results_accepted(
+                task_to_compute=self._get_deserialized_task_to_compute(
+                    task_id='1',
+                    subtask_id=subtask_id,
+                    **kwargs
+                )
+            )
+            for subtask_id in subtask_ids
+        ]
+
+    def test_that_function_returns_none_when_ids_are_different(self):
+        subtask_results_accepted_list = self._get_subtask_results_accepted_list(['1', '2', '3', '4', '5'])
+
+        self.assertIsNone(validate_subtask_results_accepted_list(subtask_results_accepted_list))
+
+    def test_that_function_returns_duplicate_request_when_ids_are_the_same(self):
+        subtask_results_accepted_list = self._get_subtask_results_accepted_list(['1', '2', '3', '2', '5'])
+
+        self.assertEqual(
+            validate_subtask_results_accepted_list(subtask_results_accepted_list),
+            ServiceRefused.REASON.DuplicateRequest,
+        )
+
+    def test_that_function_returns_invalid_request_when_requestors_are_different(self):
+        subtask_results_accepted_list = (
+            self._get_subtask_results_accepted_list(['1', '2']) +
+            self._get_subtask_results_accepted_list(
+                ['3'],
+                requestor_public_key=self._get_diffrent_requestor_hex_public_key(),
+                sign_with_private_key=self.DIFFERENT_REQUESTOR_PRIVATE_KEY,
+            )
+        )
+
+        self.assertEqual(
+            validate_subtask_results_accepted_list(subtask_results_accepted_list),
+            ServiceRefused.REASON.InvalidRequest,
+        )
+
+    def test_that_function_raises_http400_when_any_task_to_compute_is_not_signed_by_requestor(self):
+        subtask_results_accepted_list = (
+            self._get_subtask_results_accepted_list(['1', '2', '3']) +
+            self._get_subtask_results_accepted_list(['4'], sign_with_private_key=self.DIFFERENT_REQUESTOR_PRIVATE_KEY)
+        )
+
+        for (processes, min_batch) in [(0, 1), (2, 10), (2, 1)]:
+            with override_settings(
+                SIGNATURE_VERIFICATION_PROCESSES=processes,
+                SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH=min_batch,
+            ):
+                with self.assertRaises(Http400) as context:
+                    validate_subtask_results_accepted_list(subtask_results_accepted_list)
+
+            self.assertEqual(context.exception.error_code, ErrorCode.MESSAGE_SIGNATURE_WRONG)
+
+    @override_settings(
+        SIGNATURE_VERIFICATION_PROCESSES=2,
+        SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH=1,
+    )
+    def test_that_signatures_verified_in_worker_processes_are_cached(self):
+        subtask_results_accepted_list = self._get_subtask_results_accepted_list(['1', '2', '3', '4', '5'])
+
+        self.assertIsNone(validate_subtask_results_accepted_list(subtask_results_accepted_list))
+
+        self.assertEqual(get_verified_messages_cache().info().currsize, 5)
+
+
+class TestVerifiedMessagesCacheStats(ConcentIntegrationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        get_verified_messages_cache().clear()
+        self.task_to_compute = self._get_deserialized_task_to_compute()
+
+    def test_that_repeated_task_to_compute_counts_as_cache_hit(self):
+        validate_task_to_compute(self.task_to_compute)
+        validate_task_to_compute(self.task_to_compute)
+
+        stats = get_verified_messages_cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['currsize'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_that_cache_stats_are_logged_once_log_interval_passes(self):
+        with mock.patch('core.validation.STATS_LOG_INTERVAL', 0):
+            with mock.patch('core.validation.log_verified_messages_cache_stats') as log_verified_messages_cache_stats:
+                validate_task_to_compute(self.task_to_compute)
+
+        log_verified_messages_cache_stats.assert_called_once()
+        (_logger, stats) = log_verified_messages_cache_stats.call_args[0]
+        self.assertEqual(stats['misses'], 1)
+
+    def test_that_cache_stats_are_not_logged_before_log_interval_passes(self):
+        with mock.patch('core.validation.STATS_LOG_INTERVAL', 3600):
+            with mock.patch('core.validation.log_verified_messages_cache_stats') as log_verified_messages_cache_stats:
+                validate_task_to_compute(self.task_to_compute)
+                validate_task_to_compute(self.task_to_compute)
+
+        log_verified_messages_cache_stats.assert_not_called()
@@ -1,11 +1,15 @@
+import json
+
 import mock
 
 from django.conf import settings
 from freezegun import freeze_time
 
 from core.message_handlers import store_subtask
+from core.models import OutboxMessage
 from core.models import PendingResponse
 from core.models import Subtask
+from core.models import SubtaskPayment
 from core.tasks import upload_finished
 from core.tests.utils import ConcentIntegrationTestCase
 from utils.helpers import get_current_utc_timestamp
@@ -63,24 +67,30 @@ class UploadFinishedTaskTest(ConcentIntegrationTestCase):
 
     def test_that_scheduling_task_for_subtask_before_deadline_should_change_subtask_state_and_schedule_upload_acknowledged_task(self):
         with freeze_time(parse_timestamp_to_utc_datetime(self.subtask.next_deadline.timestamp() - 1)):
-            with mock.patch('core.tasks.tasks.upload_acknowledged.delay') as upload_acknowledged_delay_mock:
-                upload_finished(self.subtask.subtask_id)  # pylint: disable=no-value-for-parameter
+            upload_finished(self.subtask.subtask_id)  # pylint: disable=no-value-for-parameter
 
         self.subtask.refresh_from_db()
         self.assertEqual(self.subtask.state_enum, Subtask.SubtaskState.ADDITIONAL_VERIFICATION)
-        upload_acknowledged_delay_mock.assert_called_once_with(
-            subtask_id=self.subtask.subtask_id,
-            source_file_size=self.report_computed_task.task_to_compute.size,
-            source_package_hash=self.report_computed_task.task_to_compute.package_hash,
-            result_file_size=self.report_computed_task.size,
-            result_package_hash=self.report_computed_task.package_hash,
+        outbox_message = OutboxMessage.objects.get()
+        self.assertEqual(outbox_message.kind_enum, OutboxMessage.Kind.CeleryTask)
+        self.assertEqual(
+            json.loads(outbox_message.payload),
+            {
+                'task_name': 'conductor.tasks.upload_acknowledged',
+                'kwargs': {
+                    'subtask_id': self.subtask.subtask_id,
+                    'source_file_size': self.report_computed_task.task_to_compute.size,
+                    'source_package_hash': self.report_computed_task.task_to_compute.package_hash,
+                    'result_file_size': self.report_computed_task.size,
+                    'result_package_hash': self.report_computed_task.package_hash,
+                },
+            },
         )
 
     def test_that_scheduling_task_for_subtask_after_deadline_should_process_timeout(self):
         datetime = parse_timestamp_to_utc_datetime(get_current_utc_timestamp() + settings.CONCENT_MESSAGING_TIME + 1)
         with freeze_time(datetime):
-            with mock.patch('core.tasks.base.make_force_payment_to_provider', autospec=True) as payment_function_mock:
-                upload_finished(self.subtask.subtask_id)  # pylint: disable=no-value-for-parameter
+            upload_finished(self.subtask.subtask_id)  # pylint: disable=no-value-for-parameter
 
         self.subtask.refresh_from_db()
         self.assertEqual(self.subtask.state_enum, Subtask.SubtaskState.FAILED)
@@ -88,9 +98,9 @@ class UploadFinishedTaskTest(ConcentIntegrationTestCase):
         self.assertEqual(PendingResponse.objects.count(), 2)
         self.assertTrue(PendingResponse.objects.filter(client=self.subtask.provider).exists())
         self.assertTrue(PendingResponse.objects.filter(client=self.subtask.requestor).exists())
-        payment_function_mock.assert_called_once_with(
-            requestor_eth_address=self.task_to_compute.requestor_ethereum_address,
-            provider_eth_address=self.task_to_compute.provider_ethereum_address,
-            value=self.task_to_compute.price,
-            payment_ts=parse_datetime_to_timestamp(datetime),
-        )
+        subtask_payment = SubtaskPayment.objects.get(subtask=self.subtask)
+        self.assertEqual(subtask_payment.requestor_eth_address, self.task_to_compute.requestor_ethereum_address)
+        self.assertEqual(subtask_payment.provider_eth_address, self.task_to_compute.provider_ethereum_address)
+        self.assertEqual(subtask_payment.value, self.task_to_compute.price)
+        self.assertEqual(subtask_payment.payment_ts, parse_datetime_to_timestamp(datetime))
+        self.assertIsNone(subtask_payment.outbox_message)
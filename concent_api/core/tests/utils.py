@@ -849,6 +849,14 @@ class ConcentIntegrationTestCase(TestCase):
     def _get_empty_list_of_transactions(self, requestor_eth_address = None, provider_eth_address = None, payment_ts = None, current_time = None, transaction_type = None):  # pylint: disable=no-self-use, unused-argument
         return []
 
+    @staticmethod
+    def _get_lists_of_payments_function(*list_of_payments_functions):
+        """ Returns a replacement for get_lists_of_payments which calls given functions, one for each query. """
+        def get_lists_of_payments(requestor_eth_address = None, provider_eth_address = None, current_time = None, queries = None):  # pylint: disable=unused-argument
+            assert len(queries) == len(list_of_payments_functions)
+            return [list_of_payments_function() for list_of_payments_function in list_of_payments_functions]
+        return get_lists_of_payments
+
     def _make_force_payment_to_provider(self, requestor_eth_address, provider_eth_address, value, payment_ts):  # pylint: disable=no-self-use, unused-argument
         return None
 
@@ -863,5 +871,5 @@ class ConcentIntegrationTestCase(TestCase):
 
     def _test_report_computed_task_in_database(self, report_computed_task):
         subtask = Subtask.objects.get(subtask_id = report_computed_task.subtask_id)
-        stored_report_computed_task = message.Message.deserialize(subtask.report_computed_task.data.tobytes(), decrypt_func = None, check_time = False)
+        stored_report_computed_task = message.Message.deserialize(subtask.report_computed_task.data_bytes, decrypt_func = None, check_time = False)
         self.assertEqual(stored_report_computed_task, report_computed_task)
@@ -1,18 +1,23 @@
 import datetime
+import threading
 
 from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
+from typing import List
 from typing import Optional
 
 import requests
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 from golem_messages import message
 from golem_messages import shortcuts
 from golem_messages.message import FileTransferToken
 
 from core import exceptions
+from core.long_polling import notify_about_pending_response
 from core.models import Client
 from core.models import PaymentInfo
 from core.models import PendingResponse
@@ -30,44 +35,104 @@ from utils.helpers import sign_message
 
 logger = getLogger(__name__)
 
+_storage_cluster_session = None
+_storage_cluster_session_lock = threading.Lock()
+
 
 def verify_file_status(
     client_public_key: bytes,
 ):
     """
-    Function to verify existence of a file on cluster storage
+    Function to verify existence of a file on cluster storage.
+    Storage cluster is queried concurrently for all subtasks but the database is updated only from the calling thread.
+    Subtasks whose result was recently reported as missing are not checked again until the negative result expires.
     """
 
     encoded_client_public_key = b64encode(client_public_key)
-    force_get_task_result_list = Subtask.objects.filter(
-        requestor__public_key  =encoded_client_public_key,
-        state                  = Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name,  # pylint: disable=no-member
-    )
-
-    for get_task_result in force_get_task_result_list:
-        report_computed_task    = deserialize_message(get_task_result.report_computed_task.data.tobytes())
-        if request_upload_status(report_computed_task):
-            subtask               = get_task_result
-            subtask.state         = Subtask.SubtaskState.RESULT_UPLOADED.name  # pylint: disable=no-member
-            subtask.next_deadline = None
-            subtask.full_clean()
-            subtask.save()
-
-            store_pending_message(
-                response_type       = PendingResponse.ResponseType.ForceGetTaskResultDownload,
-                client_public_key   = subtask.requestor.public_key_bytes,
-                queue               = PendingResponse.Queue.Receive,
-                subtask             = subtask,
-            )
-            logging.log_file_status(
-                logger,
-                subtask.task_id,
-                subtask.subtask_id,
-                subtask.requestor.public_key_bytes,
-                subtask.provider.public_key_bytes,
+    force_get_task_result_list = [
+        subtask
+        for subtask in Subtask.objects.filter(
+            requestor__public_key  =encoded_client_public_key,
+            state                  = Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name,  # pylint: disable=no-member
+        )
+        if cache.get(get_upload_status_cache_key(subtask.subtask_id)) is None
+    ]
+
+    upload_statuses = get_upload_statuses(force_get_task_result_list)
+
+    for get_task_result, upload_status in zip(force_get_task_result_list, upload_statuses):
+        if upload_status is True:
+            update_subtask_to_result_uploaded(get_task_result)
+        elif upload_status is False:
+            cache.set(
+                get_upload_status_cache_key(get_task_result.subtask_id),
+                False,
+                settings.UPLOAD_STATUS_NEGATIVE_CACHE_TIME,
             )
 
 
+def get_upload_statuses(subtasks: List[Subtask]) -> List[Optional[bool]]:
+    """
+    Calls `get_upload_status` for many subtasks concurrently, with at most STORAGE_CLUSTER_MAX_CONCURRENT_REQUESTS
+    requests at a time. Returns the results in the same order.
+    """
+    if len(subtasks) == 0:
+        return []
+
+    with ThreadPoolExecutor(
+        max_workers=min(settings.STORAGE_CLUSTER_MAX_CONCURRENT_REQUESTS, len(subtasks))
+    ) as executor:
+        return list(executor.map(get_upload_status, subtasks))
+
+
+def get_upload_status_cache_key(subtask_id: str) -> str:
+    return f'upload-status-{subtask_id}'
+
+
+def get_upload_status(subtask: Subtask) -> Optional[bool]:
+    """
+    Calls `request_upload_status` and returns None instead of raising an exception if storage cluster could not be
+    reached in time or returned an unexpected response. Subtask is then checked again on a subsequent request
+    or by the timeout sweeper.
+    """
+    try:
+        return request_upload_status(subtask)
+    except (requests.exceptions.RequestException, exceptions.UnexpectedResponse) as exception:
+        logging.log_storage_cluster_request_failed(
+            logger,
+            subtask.subtask_id,
+            exception,
+        )
+        return None
+
+
+def update_subtask_to_result_uploaded(subtask: Subtask):
+    """
+    Moves a subtask in FORCING_RESULT_TRANSFER state whose result is known to be on the storage cluster
+    to RESULT_UPLOADED and notifies the requestor.
+    """
+    assert subtask.state == Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name  # pylint: disable=no-member
+
+    subtask.state         = Subtask.SubtaskState.RESULT_UPLOADED.name  # pylint: disable=no-member
+    subtask.next_deadline = None
+    subtask.full_clean()
+    subtask.save()
+
+    store_pending_message(
+        response_type       = PendingResponse.ResponseType.ForceGetTaskResultDownload,
+        client_public_key   = subtask.requestor.public_key_bytes,
+        queue               = PendingResponse.Queue.Receive,
+        subtask             = subtask,
+    )
+    logging.log_file_status(
+        logger,
+        subtask.task_id,
+        subtask.subtask_id,
+        subtask.requestor.public_key_bytes,
+        subtask.provider.public_key_bytes,
+    )
+
+
 def store_pending_message(
     response_type       = None,
     client_public_key   = None,
@@ -82,8 +147,7 @@ def store_pending_message(
         queue           = queue.name,
         subtask         = subtask,
     )
-    receive_queue.full_clean()
-    receive_queue.save()
+    payment_committed_message = None
     if payment_message is not None:
         payment_committed_message = PaymentInfo(
             payment_ts                  = datetime.datetime.fromtimestamp(payment_message.payment_ts, timezone.utc),
@@ -92,10 +156,28 @@ def store_pending_message(
             amount_paid                 = payment_message.amount_paid,
             recipient_type              = payment_message.recipient_type.name,  # pylint: disable=no-member
             amount_pending              = payment_message.amount_pending,
-            pending_response            = receive_queue
         )
+
+    # The message is built and serialized once so that `receive` only has to load it and sign the outer envelope.
+    # It does not depend on the time of delivery: file transfer token expiration deadlines are derived from
+    # the subtask, not from the current time, and the outer message gets a new header when it's loaded.
+    if settings.BUILD_RESPONSES_WHEN_ENQUEUED:
+        response_to_client = create_response_to_client(
+            response_type       = response_type,
+            subtask             = subtask,
+            client_public_key   = client_public_key,
+            payment_info        = payment_committed_message,
+        )
+        if response_to_client is not None:
+            receive_queue.response_data = response_to_client.serialize()
+
+    receive_queue.full_clean()
+    receive_queue.save()
+    if payment_committed_message is not None:
+        payment_committed_message.pending_response = receive_queue
         payment_committed_message.full_clean()
         payment_committed_message.save()
+    notify_about_pending_response(client_public_key)
 
     logging.log_new_pending_response(
         logger,
@@ -105,6 +187,169 @@ def store_pending_message(
     )
 
 
+def create_response_to_client(
+    response_type:      PendingResponse.ResponseType,
+    subtask:            Optional[Subtask],
+    client_public_key:  bytes,
+    payment_info:       Optional[PaymentInfo] = None,
+) -> Optional[message.Message]:
+    """
+    Builds the message delivered to the client for a pending response of given type.
+    Returns None if the message cannot be built.
+    """
+    if response_type == PendingResponse.ResponseType.ForceReportComputedTask:
+        report_computed_task = deserialize_message(subtask.report_computed_task.data_bytes)
+        response_to_client = message.concents.ForceReportComputedTask(
+            report_computed_task = report_computed_task
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.ForceReportComputedTaskResponse:
+        if subtask.ack_report_computed_task is not None:
+            ack_report_computed_task = deserialize_message(subtask.ack_report_computed_task.data_bytes)
+            response_to_client = message.concents.ForceReportComputedTaskResponse(
+                ack_report_computed_task=ack_report_computed_task,
+                reason=message.concents.ForceReportComputedTaskResponse.REASON.AckFromRequestor,
+            )
+            return response_to_client
+
+        elif subtask.reject_report_computed_task is not None:
+            reject_report_computed_task = deserialize_message(subtask.reject_report_computed_task.data_bytes)
+            response_to_client = message.concents.ForceReportComputedTaskResponse(
+                reject_report_computed_task=reject_report_computed_task,
+                reason=message.concents.ForceReportComputedTaskResponse.REASON.RejectFromRequestor,
+            )
+            if reject_report_computed_task.reason == message.RejectReportComputedTask.REASON.SubtaskTimeLimitExceeded:
+                ack_report_computed_task = message.AckReportComputedTask(
+                    report_computed_task=deserialize_message(subtask.report_computed_task.data_bytes),
+                )
+                sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
+                response_to_client = message.concents.ForceReportComputedTaskResponse(
+                    ack_report_computed_task=ack_report_computed_task,
+                    reason=message.concents.ForceReportComputedTaskResponse.REASON.ConcentAck,
+                )
+            return response_to_client
+        else:
+            ack_report_computed_task = message.AckReportComputedTask(
+                report_computed_task=deserialize_message(subtask.report_computed_task.data_bytes),
+            )
+            sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
+            response_to_client = message.concents.ForceReportComputedTaskResponse(
+                ack_report_computed_task=ack_report_computed_task,
+                reason=message.concents.ForceReportComputedTaskResponse.REASON.ConcentAck,
+            )
+            return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.VerdictReportComputedTask:
+        ack_report_computed_task = message.AckReportComputedTask(
+            report_computed_task=deserialize_message(subtask.report_computed_task.data_bytes),
+        )
+        sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
+        report_computed_task     = deserialize_message(subtask.report_computed_task.data_bytes)
+        response_to_client = message.concents.VerdictReportComputedTask(
+            ack_report_computed_task    = ack_report_computed_task,
+            force_report_computed_task  = message.concents.ForceReportComputedTask(
+                report_computed_task = report_computed_task,
+            ),
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.ForceGetTaskResultRejected:
+        report_computed_task = deserialize_message(subtask.report_computed_task.data_bytes)
+        response_to_client = message.concents.ForceGetTaskResultRejected(
+            force_get_task_result = message.concents.ForceGetTaskResult(
+                report_computed_task = report_computed_task,
+            )
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.ForceGetTaskResultFailed:
+        task_to_compute = deserialize_message(subtask.task_to_compute.data_bytes)
+        response_to_client = message.concents.ForceGetTaskResultFailed(
+            task_to_compute = task_to_compute,
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.ForceGetTaskResultUpload:
+        report_computed_task    = deserialize_message(subtask.report_computed_task.data_bytes)
+        file_transfer_token     = create_file_transfer_token_for_golem_client(
+            report_computed_task,
+            client_public_key,
+            FileTransferToken.Operation.upload,
+        )
+
+        response_to_client = message.concents.ForceGetTaskResultUpload(
+            file_transfer_token     = file_transfer_token,
+            force_get_task_result   = message.concents.ForceGetTaskResult(
+                report_computed_task = report_computed_task,
+            )
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.ForceGetTaskResultDownload:
+        report_computed_task    = deserialize_message(subtask.report_computed_task.data_bytes)
+        file_transfer_token     = create_file_transfer_token_for_golem_client(
+            report_computed_task,
+            client_public_key,
+            FileTransferToken.Operation.download,
+        )
+
+        response_to_client = message.concents.ForceGetTaskResultDownload(
+            file_transfer_token     = file_transfer_token,
+            force_get_task_result   = message.concents.ForceGetTaskResult(
+                report_computed_task = report_computed_task,
+            )
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.ForceSubtaskResults:
+        ack_report_computed_task = deserialize_message(subtask.ack_report_computed_task.data_bytes)
+        response_to_client = message.concents.ForceSubtaskResults(
+            ack_report_computed_task = ack_report_computed_task
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.SubtaskResultsSettled:
+        task_to_compute = deserialize_message(subtask.task_to_compute.data_bytes)
+        response_to_client = message.concents.SubtaskResultsSettled(
+            task_to_compute = task_to_compute,
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.ForceSubtaskResultsResponse:
+        subtask_results_accepted = deserialize_message(subtask.subtask_results_accepted.data_bytes)
+        response_to_client = message.concents.ForceSubtaskResultsResponse(
+            subtask_results_accepted = subtask_results_accepted,
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.SubtaskResultsRejected:
+        subtask_results_rejected = deserialize_message(subtask.subtask_results_rejected.data_bytes)
+        response_to_client = message.concents.ForceSubtaskResultsResponse(
+            subtask_results_rejected = subtask_results_rejected,
+        )
+        return response_to_client
+
+    elif response_type == PendingResponse.ResponseType.ForcePaymentCommitted:
+        response_to_client = message.concents.ForcePaymentCommitted(
+            payment_ts              = datetime.datetime.timestamp(payment_info.payment_ts),
+            task_owner_key          = payment_info.task_owner_key,
+            provider_eth_account    = payment_info.provider_eth_account,
+            amount_paid             = payment_info.amount_paid,
+            amount_pending          = payment_info.amount_pending,
+        )
+        if payment_info.recipient_type == PaymentInfo.RecipientType.Requestor.name:  # pylint: disable=no-member
+            response_to_client.recipient_type = message.concents.ForcePaymentCommitted.Actor.Requestor
+        elif payment_info.recipient_type == PaymentInfo.RecipientType.Provider.name:  # pylint: disable=no-member
+            response_to_client.recipient_type = message.concents.ForcePaymentCommitted.Actor.Provider
+        else:
+            return None
+        return response_to_client
+
+    else:
+        return None
+
+
 def create_file_transfer_token_for_concent(
     subtask_id: str,
     result_package_path: str,
@@ -225,18 +470,22 @@ def create_file_info(
     )
 
 
-def request_upload_status(report_computed_task: message.ReportComputedTask) -> bool:
+def request_upload_status(subtask: Subtask) -> bool:
+    """
+    Asks the storage cluster whether the result package of the subtask has been uploaded. The token is built
+    from the columns of the subtask so that the stored ReportComputedTask does not have to be deserialized.
+    """
     slash = '/'
     assert settings.STORAGE_CLUSTER_ADDRESS.endswith(slash)
 
     file_transfer_token = create_file_transfer_token_for_concent(
-        subtask_id=report_computed_task.subtask_id,
+        subtask_id=subtask.subtask_id,
         result_package_path=get_storage_result_file_path(
-            subtask_id=report_computed_task.subtask_id,
-            task_id=report_computed_task.task_id,
+            subtask_id=subtask.subtask_id,
+            task_id=subtask.task_id,
         ),
-        result_size=report_computed_task.size,
-        result_package_hash=report_computed_task.package_hash,
+        result_size=subtask.result_package_size,
+        result_package_hash=subtask.result_package_hash,
         operation=FileTransferToken.Operation.download
     )
 
@@ -269,23 +518,45 @@ def request_upload_status(report_computed_task: message.ReportComputedTask) -> b
         raise exceptions.UnexpectedResponse(f'Cluster storage returned HTTP {storage_cluster_response.status_code}')
 
 
+def get_storage_cluster_session() -> requests.Session:
+    """
+    Returns the session shared by all requests sent to the storage cluster from this process. Connections are kept
+    alive and reused and the pool is large enough for the maximum number of concurrent requests.
+    """
+    global _storage_cluster_session  # pylint: disable=global-statement
+    with _storage_cluster_session_lock:
+        if _storage_cluster_session is None:
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections = 1,
+                pool_maxsize     = settings.STORAGE_CLUSTER_MAX_CONCURRENT_REQUESTS,
+            )
+            session = requests.Session()
+            session.mount('http://',  adapter)
+            session.mount('https://', adapter)
+            _storage_cluster_session = session
+    return _storage_cluster_session
+
+
 def send_request_to_storage_cluster(headers, request_http_address, method='head'):
     assert method in ['get', 'head']
 
     stream = True if method == 'get' else False
+    session = get_storage_cluster_session()
 
     if settings.STORAGE_CLUSTER_SSL_CERTIFICATE_PATH != '':
-        return getattr(requests, method)(
+        return getattr(session, method)(
             request_http_address,
             headers=headers,
             verify=settings.STORAGE_CLUSTER_SSL_CERTIFICATE_PATH,
             stream=stream,
+            timeout=settings.STORAGE_CLUSTER_REQUEST_TIMEOUT,
         )
 
-    return getattr(requests, method)(
+    return getattr(session, method)(
         request_http_address,
         headers=headers,
         stream=stream,
+        timeout=settings.STORAGE_CLUSTER_REQUEST_TIMEOUT,
     )
 
 
@@ -1,10 +1,12 @@
 from django.conf.urls import url
 
-from .views import send, receive, receive_out_of_band, protocol_constants
+from .views import send, receive, receive_out_of_band, receive_batch, receive_out_of_band_batch, protocol_constants
 
 urlpatterns = [
-    url(r'^send/$',                 send,                name = 'send'),
-    url(r'^receive/$',              receive,             name = 'receive'),
-    url(r'^receive-out-of-band/$',  receive_out_of_band, name = 'receive_out_of_band'),
-    url(r'^protocol-constants/$',   protocol_constants,  name = 'protocol_constants'),
+    url(r'^send/$',                         send,                       name = 'send'),
+    url(r'^receive/$',                      receive,                    name = 'receive'),
+    url(r'^receive-out-of-band/$',          receive_out_of_band,        name = 'receive_out_of_band'),
+    url(r'^receive-batch/$',                receive_batch,              name = 'receive_batch'),
+    url(r'^receive-out-of-band-batch/$',    receive_out_of_band_batch,  name = 'receive_out_of_band_batch'),
+    url(r'^protocol-constants/$',           protocol_constants,         name = 'protocol_constants'),
 ]
@@ -70,6 +70,14 @@ def calculate_subtask_verification_time(report_computed_task: message.ReportComp
         return int(subtask_verification_time(report_computed_task).total_seconds())
 
 
+def get_message_fingerprint(golem_message: message.Message) -> str:
+    """
+    Returns a fingerprint identifying the signed content of the message. Messages with the same fingerprint
+    have identical fields.
+    """
+    return golem_message.get_short_hash().hex()
+
+
 def hex_to_bytes_convert(client_public_key: str):
     if not isinstance(client_public_key, str):
         raise Http400(
@@ -1,10 +1,23 @@
+from concurrent.futures import as_completed
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+from typing import Any
+from typing import Dict
+from typing import Hashable
 from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
 from typing import Union
+import threading
+import time
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
 
 from golem_messages                 import message
+from golem_messages.cryptography    import ecdsa_verify
 from golem_messages.exceptions      import MessageError
 from golem_messages.message import FileTransferToken
 
@@ -19,9 +32,26 @@ from core.exceptions import FileTransferTokenError
 from core.exceptions import GolemMessageValidationError
 from core.exceptions import HashingAlgorithmError
 from core.exceptions import Http400
+from core.models import StoredMessage
+from core.utils import get_message_fingerprint
 from core.utils import hex_to_bytes_convert
+from utils.caches import LRUCache
+from utils.helpers import deserialize_message
 from utils.helpers import join_messages
 from utils.constants                import ErrorCode
+from utils.logging import log_verified_messages_cache_stats
+
+logger = getLogger(__name__)
+
+# How often (in seconds) the verified messages cache logs its counters.
+STATS_LOG_INTERVAL = 60
+
+_verified_messages_cache = None
+_verified_messages_cache_lock = threading.Lock()
+_stats_logged_at = time.monotonic()
+
+_signature_verification_pool = None
+_signature_verification_pool_lock = threading.Lock()
 
 
 def validate_int_value(value):
@@ -99,6 +129,39 @@ def validate_key_with_desired_parameters(
         )
 
 
+def get_verified_messages_cache() -> LRUCache:
+    """
+    Returns the cache of messages that passed validation in this process. Keys contain digests of the messages
+    so a message modified after validation has to be validated again. Only successful validations are cached.
+    """
+    global _verified_messages_cache  # pylint: disable=global-statement
+    with _verified_messages_cache_lock:
+        if _verified_messages_cache is None:
+            _verified_messages_cache = LRUCache(settings.VERIFIED_MESSAGES_CACHE_SIZE)
+    return _verified_messages_cache
+
+
+def get_verified_messages_cache_stats() -> Dict[str, Any]:
+    """ Returns counters of the verified messages cache in this process and the fraction of lookups that hit it. """
+    stats = dict(get_verified_messages_cache().info()._asdict())  # type: Dict[str, Any]
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups > 0 else 0.0
+    return stats
+
+
+def _is_message_verified(cache_key: Hashable) -> bool:
+    """ Checks the verified messages cache and logs its counters at most once every STATS_LOG_INTERVAL seconds. """
+    global _stats_logged_at  # pylint: disable=global-statement
+    is_verified = cache_key in get_verified_messages_cache()
+    with _verified_messages_cache_lock:
+        should_log_stats = time.monotonic() - _stats_logged_at >= STATS_LOG_INTERVAL
+        if should_log_stats:
+            _stats_logged_at = time.monotonic()
+    if should_log_stats:
+        log_verified_messages_cache_stats(logger, get_verified_messages_cache_stats())
+    return is_verified
+
+
 def validate_task_to_compute(task_to_compute: message.TaskToCompute):
     if not isinstance(task_to_compute, message.TaskToCompute):
         raise Http400(
@@ -106,6 +169,10 @@ def validate_task_to_compute(task_to_compute: message.TaskToCompute):
             error_code=ErrorCode.MESSAGE_INVALID,
         )
 
+    cache_key = ('task_to_compute', task_to_compute.get_short_hash())
+    if _is_message_verified(cache_key):
+        return
+
     if any(map(lambda x: x is None, [getattr(task_to_compute, attribute) for attribute in [
         'compute_task_def',
         'provider_public_key',
@@ -126,6 +193,8 @@ def validate_task_to_compute(task_to_compute: message.TaskToCompute):
     validate_secure_hash_algorithm(task_to_compute.package_hash)
     validate_subtask_price_task_to_compute(task_to_compute)
 
+    get_verified_messages_cache().set(cache_key)
+
 
 def validate_report_computed_task_time_window(report_computed_task):
     assert isinstance(report_computed_task, message.ReportComputedTask)
@@ -172,6 +241,24 @@ def validate_all_messages_identical(golem_messages_list: List[message.Message]):
                 )
 
 
+def validate_message_identical_to_stored(golem_message: message.Message, stored_message: StoredMessage):
+    """
+    Checks that the message is identical to the stored one. Fingerprints are compared first. The stored message
+    is loaded and compared field by field only if they differ or it has no fingerprint. That describes
+    the difference in the error and still accepts messages that differ only in headers, which fields do not include.
+    """
+    assert isinstance(golem_message, message.Message)
+    assert isinstance(stored_message, StoredMessage)
+
+    if stored_message.fingerprint is not None and stored_message.fingerprint == get_message_fingerprint(golem_message):
+        return
+
+    validate_all_messages_identical([
+        golem_message,
+        deserialize_message(stored_message.data_bytes),
+    ])
+
+
 def validate_golem_message_signed_with_key(
     golem_message: message.base.Message,
     public_key: bytes,
@@ -180,6 +267,12 @@ def validate_golem_message_signed_with_key(
 
     validate_bytes_public_key(public_key, 'public_key')
 
+    # Signature verification (ECDSA recovery) is the most expensive part of handling a message and the same
+    # TaskToCompute gets verified again with every message of its subtask.
+    cache_key = ('signature', golem_message.get_short_hash(), golem_message.sig, public_key)
+    if _is_message_verified(cache_key):
+        return
+
     try:
         golem_message.verify_signature(public_key)
     except MessageError as exception:
@@ -195,6 +288,113 @@ def validate_golem_message_signed_with_key(
             error_code=ErrorCode.MESSAGE_SIGNATURE_WRONG,
         )
 
+    get_verified_messages_cache().set(cache_key)
+
+
+def get_signature_verification_pool() -> ProcessPoolExecutor:
+    """
+    Returns the pool of processes verifying signatures of long lists of messages. Created on first use
+    so that web server workers forked after loading the application do not share it.
+    """
+    global _signature_verification_pool  # pylint: disable=global-statement
+    with _signature_verification_pool_lock:
+        if _signature_verification_pool is None:
+            _signature_verification_pool = ProcessPoolExecutor(max_workers = settings.SIGNATURE_VERIFICATION_PROCESSES)
+    return _signature_verification_pool
+
+
+def _find_first_invalid_signature(signatures: Sequence[Tuple[bytes, bytes, bytes]]) -> Optional[int]:
+    """
+    Verifies (message digest, signature, public key) triples one by one, in a worker process.
+    Returns the index of the first invalid one or None if all of them are valid.
+    """
+    for (i, (message_hash, signature, public_key)) in enumerate(signatures):
+        try:
+            if not ecdsa_verify(public_key, signature, message_hash):
+                return i
+        except MessageError:
+            return i
+    return None
+
+
+def validate_golem_messages_signed_with_keys(messages_and_keys: Sequence[Tuple[message.base.Message, bytes]]):
+    """
+    Does the same as `validate_golem_message_signed_with_key` for many messages and raises Http400 for
+    the first one with an invalid signature. Signatures that are not in the verified messages cache are checked
+    in a pool of processes if there are at least SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH of them.
+    Once any process finds an invalid signature, parts of the list that were not started yet are cancelled.
+    """
+    unverified = []
+    for (golem_message, public_key) in messages_and_keys:
+        assert isinstance(golem_message, message.base.Message)
+        validate_bytes_public_key(public_key, 'public_key')
+        cache_key = ('signature', golem_message.get_short_hash(), golem_message.sig, public_key)
+        if not _is_message_verified(cache_key):
+            unverified.append((golem_message, public_key, cache_key))
+
+    if settings.SIGNATURE_VERIFICATION_PROCESSES == 0 or len(unverified) < settings.SIGNATURE_VERIFICATION_PROCESS_POOL_MIN_BATCH:
+        for (golem_message, public_key, _cache_key) in unverified:
+            validate_golem_message_signed_with_key(golem_message, public_key)
+        return
+
+    chunk_size = -(-len(unverified) // settings.SIGNATURE_VERIFICATION_PROCESSES)
+    chunks = [unverified[start:start + chunk_size] for start in range(0, len(unverified), chunk_size)]
+    futures = {
+        get_signature_verification_pool().submit(
+            _find_first_invalid_signature,
+            [(cache_key[1], golem_message.sig, public_key) for (golem_message, public_key, cache_key) in chunk],
+        ): chunk
+        for chunk in chunks
+    }
+    for future in as_completed(futures):
+        invalid_index = future.result()
+        if invalid_index is not None:
+            for other_future in futures:
+                other_future.cancel()
+            (golem_message, public_key, _cache_key) = futures[future][invalid_index]
+            # Verifying again to raise the same error as for a single message.
+            validate_golem_message_signed_with_key(golem_message, public_key)
+            assert False, 'Signature found invalid in a worker process has been accepted.'
+
+    for (_golem_message, _public_key, cache_key) in unverified:
+        get_verified_messages_cache().set(cache_key)
+
+
+def validate_subtask_results_accepted_list(
+    subtask_results_accepted_list: List[message.tasks.SubtaskResultsAccepted],
+) -> Optional[message.concents.ServiceRefused.REASON]:
+    """
+    Checks, in a single pass, that all TaskToCompute messages in the list come from the same requestor and
+    that no subtask appears twice. Returns the reason for refusing the request if any of that is not the case.
+    Otherwise verifies that each TaskToCompute is signed by its requestor and raises Http400 if it is not.
+    """
+    if len(subtask_results_accepted_list) == 0:
+        return message.concents.ServiceRefused.REASON.InvalidRequest
+
+    requestor_public_key            = subtask_results_accepted_list[0].task_to_compute.requestor_public_key
+    requestor_ethereum_public_key   = subtask_results_accepted_list[0].task_to_compute.requestor_ethereum_public_key
+    subtask_ids = set()
+    has_duplicates = False
+    for subtask_results_accepted in subtask_results_accepted_list:
+        task_to_compute = subtask_results_accepted.task_to_compute
+        if (
+            task_to_compute.requestor_public_key != requestor_public_key or
+            task_to_compute.requestor_ethereum_public_key != requestor_ethereum_public_key
+        ):
+            return message.concents.ServiceRefused.REASON.InvalidRequest
+
+        has_duplicates = has_duplicates or subtask_results_accepted.subtask_id in subtask_ids
+        subtask_ids.add(subtask_results_accepted.subtask_id)
+
+    if has_duplicates:
+        return message.concents.ServiceRefused.REASON.DuplicateRequest
+
+    validate_golem_messages_signed_with_keys([
+        (subtask_results_accepted.task_to_compute, hex_to_bytes_convert(requestor_public_key))
+        for subtask_results_accepted in subtask_results_accepted_list
+    ])
+    return None
+
 
 def validate_golem_message_subtask_results_rejected(subtask_results_rejected: message.tasks.SubtaskResultsRejected):
     if not isinstance(subtask_results_rejected,  message.tasks.SubtaskResultsRejected):
@@ -1,18 +1,32 @@
+from base64                         import b64encode
 from logging import getLogger
+import math
+from typing import Optional
+
 from django.conf                    import settings
+from django.db                      import transaction
+from django.http                    import HttpResponse
 from django.http                    import JsonResponse
+from django.utils                   import timezone
 from django.views.decorators.csrf   import csrf_exempt
 from django.views.decorators.http   import require_POST
 from django.views.decorators.http   import require_GET
 
+from core.constants                 import MAX_RETRY_AFTER
 from core.message_handlers          import handle_message
+from core.long_polling              import get_long_poll_timeout
+from core.long_polling              import wait_for_pending_response
+from core.exceptions                import Http400
 from core.message_handlers          import handle_messages_from_database
+from core.message_handlers          import handle_messages_from_database_in_batch
 from core.subtask_helpers           import update_timed_out_subtasks
 from utils                          import logging
+from utils.constants                import ErrorCode
 from utils.decorators import handle_errors_and_responses
 from utils.decorators import provides_concent_feature
 from utils.decorators               import require_golem_auth_message
 from utils.decorators               import require_golem_message
+from .models                        import Client
 from .models                        import PendingResponse
 
 logger = getLogger(__name__)
@@ -39,38 +53,137 @@ def send(_request, client_message, client_public_key):
     return handle_message(client_message)
 
 
+@transaction.non_atomic_requests(using='control')
 @provides_concent_feature('concent-api')
 @csrf_exempt
 @require_POST
 @require_golem_auth_message
 @handle_errors_and_responses(database_name='control')
-def receive(_request, message, _client_public_key):
-    assert isinstance(message.client_public_key, bytes)
-    update_timed_out_subtasks(
-        client_public_key = message.client_public_key,
-    )
-    return handle_messages_from_database(
-        client_public_key  = message.client_public_key,
-        response_type      = PendingResponse.Queue.Receive,
-    )
+def receive(request, message, _client_public_key):
+    return receive_pending_response(request, message.client_public_key, PendingResponse.Queue.Receive)
+
+
+@transaction.non_atomic_requests(using='control')
+@provides_concent_feature('concent-api')
+@csrf_exempt
+@require_POST
+@require_golem_auth_message
+@handle_errors_and_responses(database_name='control')
+def receive_out_of_band(request, message, _client_public_key):
+    return receive_pending_response(request, message.client_public_key, PendingResponse.Queue.ReceiveOutOfBand)
 
 
+@transaction.non_atomic_requests(using='control')
 @provides_concent_feature('concent-api')
 @csrf_exempt
 @require_POST
 @require_golem_auth_message
 @handle_errors_and_responses(database_name='control')
-def receive_out_of_band(_request, message, _client_public_key):
-    assert isinstance(message.client_public_key, bytes)
-    update_timed_out_subtasks(
-        client_public_key = message.client_public_key,
+def receive_batch(request, message, _client_public_key):
+    return receive_pending_response(
+        request,
+        message.client_public_key,
+        PendingResponse.Queue.Receive,
+        get_receive_batch_size(request),
     )
-    return handle_messages_from_database(
-        client_public_key  = message.client_public_key,
-        response_type      = PendingResponse.Queue.ReceiveOutOfBand,
+
+
+@transaction.non_atomic_requests(using='control')
+@provides_concent_feature('concent-api')
+@csrf_exempt
+@require_POST
+@require_golem_auth_message
+@handle_errors_and_responses(database_name='control')
+def receive_out_of_band_batch(request, message, _client_public_key):
+    return receive_pending_response(
+        request,
+        message.client_public_key,
+        PendingResponse.Queue.ReceiveOutOfBand,
+        get_receive_batch_size(request),
     )
 
 
+def receive_pending_response(
+    request,
+    client_public_key:  bytes,
+    queue:              PendingResponse.Queue,
+    batch_size:         Optional[int] = None,
+):
+    """
+    Returns the oldest pending response from client's queue or, if `batch_size` is given, a list of at most
+    that many oldest responses. If the queue is empty and the client asked for it in the Concent-Long-Poll-Timeout
+    header, waits for a response to be enqueued before giving up. Transactions are committed before waiting
+    so that no database locks are held while the request is idle.
+    """
+    assert isinstance(client_public_key, bytes)
+    long_poll_timeout = get_long_poll_timeout(request)
+
+    def get_responses():
+        if batch_size is None:
+            return handle_messages_from_database(
+                client_public_key  = client_public_key,
+                response_type      = queue,
+            )
+        responses = handle_messages_from_database_in_batch(
+            client_public_key  = client_public_key,
+            response_type      = queue,
+            batch_size         = batch_size,
+        )
+        return responses if len(responses) > 0 else None
+
+    with transaction.atomic(using='control'):
+        update_timed_out_subtasks(
+            client_public_key = client_public_key,
+        )
+        response = get_responses()
+
+    if response is None and long_poll_timeout > 0:
+        def check_queue():
+            with transaction.atomic(using='control'):
+                return get_responses()
+
+        response = wait_for_pending_response(client_public_key, long_poll_timeout, check_queue)
+
+    if response is None:
+        return create_empty_queue_response(client_public_key)
+    return response
+
+
+def get_receive_batch_size(request) -> int:
+    """
+    Returns the maximum number of messages the client wants to receive at once, as requested in the
+    Concent-Batch-Size header and limited by RECEIVE_BATCH_MAX_SIZE. RECEIVE_BATCH_MAX_SIZE if the header is missing.
+    """
+    batch_size = request.META.get('HTTP_CONCENT_BATCH_SIZE')
+    if batch_size is None:
+        return settings.RECEIVE_BATCH_MAX_SIZE
+
+    if not batch_size.isdigit() or int(batch_size) == 0:
+        raise Http400(
+            'Concent-Batch-Size header must be a positive integer.',
+            error_code=ErrorCode.HEADER_BATCH_SIZE_INVALID,
+        )
+    return min(int(batch_size), settings.RECEIVE_BATCH_MAX_SIZE)
+
+
+def create_empty_queue_response(client_public_key: bytes) -> HttpResponse:
+    """
+    Returns HTTP 204 response. If any of client's subtasks is in an active state, the response contains
+    the Retry-After header telling the client how many seconds remain until the earliest of their deadlines,
+    but no more than MAX_RETRY_AFTER.
+    """
+    response = HttpResponse("", status = 204)
+    next_deadline = Client.objects.filter(
+        public_key = b64encode(client_public_key),
+    ).values_list('next_deadline', flat = True).first()
+    if next_deadline is not None:
+        response['Retry-After'] = min(
+            max(1, math.ceil((next_deadline - timezone.now()).total_seconds())),
+            MAX_RETRY_AFTER,
+        )
+    return response
+
+
 @require_GET
 def protocol_constants(_request):
     """ Endpoint which returns Concent time settings. """
@@ -0,0 +1,104 @@
+from collections import namedtuple
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import Tuple
+import threading
+import time
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """
+    Thread-safe dictionary holding at most `maxsize` items. When full, the least recently used item is evicted.
+    Counts hits and misses so that the size can be tuned. A cache with `maxsize` equal to 0 stores nothing.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        assert isinstance(maxsize, int) and maxsize >= 0
+        self.maxsize    = maxsize
+        self.hits       = 0
+        self.misses     = 0
+        self._items     = OrderedDict()  # type: OrderedDict
+        self._lock      = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any = None) -> None:
+        if self.maxsize == 0:
+            return
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last = False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits   = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._items))
+
+
+class TTLCache:
+    """
+    Thread-safe dictionary whose items expire `ttl` seconds after being set. Items set with `ttl` equal to 0
+    are not stored. Counts hits and misses like LRUCache.
+    """
+
+    def __init__(self) -> None:
+        self.hits       = 0
+        self.misses     = 0
+        self._items     = {}  # type: Dict[Hashable, Tuple[Any, float]]
+        self._lock      = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._items:
+                (value, expires_at) = self._items[key]
+                if time.monotonic() < expires_at:
+                    self.hits += 1
+                    return value
+                del self._items[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits   = 0
+            self.misses = 0
@@ -18,6 +18,8 @@ from golem_messages.exceptions      import TimestampError
 from core.validation                import validate_golem_message_signed_with_key
 from core.validation import get_validated_client_public_key_from_client_message
 from core.exceptions                import ConcentInSoftShutdownMode
+from core.exceptions                import PaymentBackendUnavailable
+from core.exceptions                import PaymentOutcomeUnknown
 from core.exceptions import ConcentFeatureIsNotAvailable
 from core.exceptions import FileTransferTokenError
 from core.exceptions import GolemMessageValidationError
@@ -25,6 +27,7 @@ from core.exceptions import HashingAlgorithmError
 from core.exceptions import Http400
 
 from utils.helpers import join_messages
+from utils.shortcuts                import dump_bundle
 from utils.shortcuts                import load_without_public_key
 
 from utils                          import logging
@@ -148,6 +151,23 @@ def handle_errors_and_responses(database_name):
             except ConcentInSoftShutdownMode:
                 transaction.savepoint_rollback(sid, using=database_name)
                 return JsonResponse({'error': 'Concent is in soft shutdown mode.'}, status=503)
+            except PaymentBackendUnavailable:
+                if database_name is not None:
+                    transaction.savepoint_rollback(sid, using=database_name)
+                return JsonResponse({'error': 'Payment backend is temporarily unavailable.'}, status=503)
+            except PaymentOutcomeUnknown as exception:
+                # The transaction may have been sent. The client has to check the blockchain before sending
+                # the message again so no Retry-After header is set.
+                logging.log_payment_outcome_unknown(
+                    logger,
+                    view.__name__,
+                    client_public_key,
+                    client_message,
+                    exception,
+                )
+                if database_name is not None:
+                    transaction.savepoint_rollback(sid, using=database_name)
+                return JsonResponse({'error': 'Outcome of the payment is unknown.'}, status=503)
             if isinstance(response_from_view, message.Message):
                 assert response_from_view.sig is None
                 logging.log_message_returned(
@@ -161,6 +181,21 @@ def handle_errors_and_responses(database_name):
                     client_public_key,
                 )
                 return HttpResponse(serialized_message, content_type = 'application/octet-stream')
+            elif isinstance(response_from_view, list):
+                for golem_message in response_from_view:
+                    assert isinstance(golem_message, message.Message)
+                    assert golem_message.sig is None
+                    logging.log_message_returned(
+                        logger,
+                        golem_message,
+                        client_public_key,
+                    )
+                serialized_bundle = dump_bundle(
+                    response_from_view,
+                    settings.CONCENT_PRIVATE_KEY,
+                    client_public_key,
+                )
+                return HttpResponse(serialized_bundle, content_type = 'application/octet-stream')
             elif isinstance(response_from_view, dict):
                 return JsonResponse(response_from_view, safe = False)
             elif isinstance(response_from_view, HttpResponseNotAllowed):
@@ -171,6 +206,13 @@ def handle_errors_and_responses(database_name):
                     request.method,
                 )
                 return response_from_view
+            elif isinstance(response_from_view, HttpResponse) and response_from_view.status_code == 204:
+                logging.log_empty_queue(
+                    logger,
+                    view.__name__,
+                    client_public_key,
+                )
+                return response_from_view
             elif isinstance(response_from_view, HttpResponse):
                 logging.log_message_accepted(
                     logger,
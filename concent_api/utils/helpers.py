@@ -102,6 +102,19 @@ def deserialize_message(raw_message_data):
         )
 
 
+def deserialize_message_with_new_header(raw_message_data):
+    """
+    Deserializes a message and creates a new, unsigned copy of it with the same payload.
+    The copy gets a new timestamp and can be signed again. Nested messages keep their own headers and signatures.
+    """
+    golem_message = deserialize_message(raw_message_data)
+    return type(golem_message)(**{
+        slot: getattr(golem_message, slot)
+        for slot in golem_message.__slots__
+        if slot not in message.Message.__slots__
+    })
+
+
 def sign_message(golem_message, priv_key):
     assert isinstance(golem_message, message.Message)
     assert isinstance(priv_key, bytes) and len(priv_key) == 32
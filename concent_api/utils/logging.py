@@ -1,3 +1,4 @@
+import datetime
 from logging import Logger
 from typing import Optional
 
@@ -127,6 +128,26 @@ def log_400_error(
     )
 
 
+@replace_element_to_unavailable_instead_of_none
+def log_payment_outcome_unknown(
+    logger: Logger,
+    endpoint: str,
+    client_public_key: bytes,
+    message: Message,
+    exception: Exception,
+):
+    task_id = _get_field_value_from_messages_for_logging(MessageIdField.TASK_ID, message)
+    subtask_id = _get_field_value_from_messages_for_logging(MessageIdField.SUBTASK_ID, message)
+    logger.error(
+        f"Outcome of a payment made in `{endpoint}()` is unknown -- "
+        f"MESSAGE_TYPE: {_get_message_type(message)} -- "
+        f"TASK_ID: '{task_id}' -- "
+        f"SUBTASK_ID: '{subtask_id}' -- "
+        f"CLIENT PUBLIC KEY: {client_public_key} -- "
+        f"ERROR: {exception}"
+    )
+
+
 @replace_element_to_unavailable_instead_of_none
 def log_message_not_allowed(
     logger: Logger,
@@ -209,6 +230,127 @@ def log_changes_in_subtask_states(
     )
 
 
+def log_timed_out_subtasks_batch_processed(
+    logger: Logger,
+    count: int,
+    duration: float,
+):
+    assert isinstance(count, int)
+    logger.info(
+        f'Timed out subtasks sweep processed a batch -- '
+        f'COUNT: {count} -- '
+        f'DURATION: {duration:.3f} s'
+    )
+
+
+def log_payment_events_indexed(
+    logger: Logger,
+    from_block: int,
+    to_block: int,
+    count: int,
+):
+    assert isinstance(count, int)
+    logger.info(
+        f'Payment events indexed -- '
+        f'BLOCKS: {from_block}-{to_block} -- '
+        f'COUNT: {count}'
+    )
+
+
+def log_rpc_circuit_breaker_state_changed(
+    logger: Logger,
+    old_state: str,
+    new_state: str,
+    failures: int,
+):
+    logger.warning(
+        f'Ethereum RPC circuit breaker changed its state -- '
+        f'OLD STATE: {old_state} -- '
+        f'NEW STATE: {new_state} -- '
+        f'CONSECUTIVE FAILURES: {failures}'
+    )
+
+
+def log_rpc_client_stats(
+    logger: Logger,
+    stats: dict,
+):
+    for method_name, method_stats in sorted(stats.items()):
+        logger.info(
+            f'Ethereum RPC client stats -- '
+            f'METHOD: {method_name} -- ' +
+            ' -- '.join(f'{name.upper()}: {value}' for name, value in sorted(method_stats.items()))
+        )
+
+
+def log_outbox_message_failed(
+    logger: Logger,
+    idempotency_key: str,
+    attempts: int,
+    exception: Exception,
+):
+    logger.warning(
+        f'Outbox message could not be sent -- '
+        f'KEY: {idempotency_key} -- '
+        f'ATTEMPTS: {attempts} -- '
+        f'ERROR: {exception}'
+    )
+
+
+def log_outbox_message_needs_manual_resolution(
+    logger: Logger,
+    idempotency_key: str,
+    payload: str,
+    payment_attempted_at: datetime.datetime,
+):
+    logger.error(
+        f'Attempted forced payment has not shown up on the blockchain and needs manual resolution -- '
+        f'KEY: {idempotency_key} -- '
+        f'PAYMENT ATTEMPTED AT: {payment_attempted_at} -- '
+        f'PAYLOAD: {payload}'
+    )
+
+
+def log_deposit_cache_stats(
+    logger: Logger,
+    stats: dict,
+):
+    logger.info('Deposit cache stats -- ' + _format_cache_stats(stats))
+
+
+def log_verified_messages_cache_stats(
+    logger: Logger,
+    stats: dict,
+):
+    logger.info('Verified messages cache stats -- ' + _format_cache_stats(stats))
+
+
+def log_archive_batch_processed(
+    logger: Logger,
+    archived_subtask_count: int,
+    archived_pending_response_count: int,
+):
+    assert isinstance(archived_subtask_count, int)
+    assert isinstance(archived_pending_response_count, int)
+    logger.info(
+        f'Archive processed a batch -- '
+        f'SUBTASKS: {archived_subtask_count} -- '
+        f'STALE PENDING RESPONSES: {archived_pending_response_count}'
+    )
+
+
+def log_storage_cluster_request_failed(
+    logger: Logger,
+    subtask_id: str,
+    exception: Exception,
+):
+    logger.warning(
+        f'Request to the storage cluster failed -- '
+        f'SUBTASK_ID: {subtask_id} -- '
+        f'ERROR: {exception}'
+    )
+
+
 def log_change_subtask_state_name(
     logger: Logger,
     old_state: str,
@@ -236,6 +378,25 @@ def log_new_pending_response(
     )
 
 
+@replace_element_to_unavailable_instead_of_none
+def log_pending_response_not_built(
+    logger: Logger,
+    pending_response_id: int,
+    response_type: str,
+    queue_name: str,
+    subtask_id: Optional[str],
+    client_public_key: bytes,
+):
+    logger.error(
+        f'Message for pending response could not be built and will not be delivered -- '
+        f'PENDING_RESPONSE_ID: {pending_response_id} -- '
+        f'RESPONSE_TYPE: {response_type} -- '
+        f'QUEUE: {queue_name} -- '
+        f'SUBTASK_ID: {subtask_id} -- '
+        f'CLIENT PUBLIC KEY: {client_public_key}'
+    )
+
+
 @replace_element_to_unavailable_instead_of_none
 def log_receive_message_from_database(
     logger: Logger,
@@ -337,3 +498,7 @@ def _get_message_type(
     message: Message
 ) -> str:
     return type(message).__name__ if isinstance(message, Message) else '-not available- '
+
+
+def _format_cache_stats(stats: dict) -> str:
+    return ' -- '.join(f'{name.upper()}: {value}' for name, value in sorted(stats.items()))
@@ -0,0 +1,222 @@
+from concurrent.futures import CancelledError
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError
+from logging import getLogger
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+import threading
+import time
+
+from core.exceptions import PaymentBackendUnavailable
+from core.exceptions import PaymentOutcomeUnknown
+from utils.logging import log_rpc_circuit_breaker_state_changed
+from utils.logging import log_rpc_client_stats
+
+logger = getLogger(__name__)
+
+# Calls which only read from the blockchain. They are spread across the pool and identical calls in progress
+# at the same time are sent to the node only once, with all callers getting the same result. Other calls,
+# e.g. sending transactions, go through a single client so that they never compete for the same nonce.
+READ_METHODS = frozenset([
+    'get_batch_transfers',
+    'get_block_by_number',
+    'get_block_number',
+    'get_deposit_value',
+    'get_forced_payments',
+])
+
+# How often (in seconds) the client logs its counters.
+STATS_LOG_INTERVAL = 60
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an unhealthy service. Opens after `failure_threshold` consecutive failures and rejects all calls
+    for `reset_timeout` seconds. Then lets a single call through: if it succeeds the breaker closes again,
+    otherwise it stays open for another `reset_timeout` seconds.
+    """
+
+    CLOSED      = 'closed'
+    OPEN        = 'open'
+    HALF_OPEN   = 'half-open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold  = failure_threshold
+        self.reset_timeout      = reset_timeout
+        self.state              = self.CLOSED
+        self._failures          = 0
+        self._opened_at         = 0.0
+        self._lock              = threading.Lock()
+
+    def allow_call(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            # A trial call is let through once per `reset_timeout` in case the previous one never reported its result.
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._opened_at = time.monotonic()
+                if self.state == self.OPEN:
+                    self._change_state(self.HALF_OPEN)
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self.state != self.CLOSED:
+                self._change_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._change_state(self.OPEN)
+
+    def _change_state(self, state: str):
+        log_rpc_circuit_breaker_state_changed(logger, self.state, state, self._failures)
+        self.state = state
+
+
+class MethodStats:
+
+    def __init__(self) -> None:
+        self.calls              = 0
+        self.merged_calls       = 0
+        self.rejected_calls     = 0
+        self.timeouts           = 0
+        self.connection_errors  = 0
+        self.errors             = 0
+        self.total_latency      = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+class RPCClient:
+    """
+    Thread-safe proxy sending calls of blockchain client methods to a pool of `pool_size` threads,
+    each with its own client created by `client_factory`, so that requests handled by different threads
+    do not share a single connection. Methods not listed in READ_METHODS are called in a separate thread.
+
+    Calls that do not finish in `call_timeout` seconds, calls rejected because the node is unhealthy and calls
+    that failed to reach it raise PaymentBackendUnavailable. A call that timed out keeps its thread busy until
+    the node responds. Calls sending transactions raise PaymentBackendUnavailable only if they have certainly not
+    reached the node. If they timed out or lost the connection after they started, the transaction may still be
+    sent and PaymentOutcomeUnknown is raised instead.
+    """
+
+    def __init__(
+        self,
+        client_factory:     Callable[[], Any],
+        pool_size:          int,
+        call_timeout:       float,
+        circuit_breaker:    CircuitBreaker,
+    ) -> None:
+        self.client_factory     = client_factory
+        self.call_timeout       = call_timeout
+        self.circuit_breaker    = circuit_breaker
+        self._executor          = ThreadPoolExecutor(max_workers = pool_size)
+        self._write_executor    = ThreadPoolExecutor(max_workers = 1)
+        self._thread_local      = threading.local()
+        self._calls_in_progress = {}  # type: Dict[Hashable, Any]
+        self._stats             = {}  # type: Dict[str, MethodStats]
+        self._lock              = threading.Lock()
+        self._stats_logged_at   = time.monotonic()
+
+    def __getattr__(self, method_name: str) -> Callable:
+        if method_name.startswith('_'):
+            raise AttributeError(method_name)
+
+        def call(*args, **kwargs):
+            return self.call(method_name, *args, **kwargs)
+        return call
+
+    def call(self, method_name: str, *args, **kwargs) -> Any:
+        if not self.circuit_breaker.allow_call():
+            self._update_stats(method_name, rejected_calls = 1)
+            raise PaymentBackendUnavailable('Ethereum node is unavailable.')
+
+        is_write = method_name not in READ_METHODS
+        (future, is_merged) = self._submit(method_name, args, kwargs)
+        start_time = time.monotonic()
+        try:
+            result = future.result(timeout = self.call_timeout)
+        except (TimeoutError, CancelledError):
+            # A call that has not started yet is dropped. A merged call must not cancel the call it joined.
+            is_dropped = not is_merged and future.cancel()
+            self._record_result(method_name, is_merged, start_time, is_failure = True, timeouts = 1)
+            if is_write and not is_dropped:
+                raise PaymentOutcomeUnknown(
+                    f'Ethereum node has not responded in {self.call_timeout} seconds to {method_name} call '
+                    f'which may still be carried out.'
+                )
+            raise PaymentBackendUnavailable(f'Ethereum node has not responded in {self.call_timeout} seconds.')
+        except OSError as exception:
+            self._record_result(method_name, is_merged, start_time, is_failure = True, connection_errors = 1)
+            if is_write:
+                # The connection may have failed after the transaction had been sent.
+                raise PaymentOutcomeUnknown(f'Connection to Ethereum node failed during {method_name} call: {exception}')
+            raise PaymentBackendUnavailable(f'Ethereum node is unavailable: {exception}')
+        except Exception:
+            # Errors reported by the node itself mean that it is healthy.
+            self._record_result(method_name, is_merged, start_time, is_failure = False, errors = 1)
+            raise
+
+        self._record_result(method_name, is_merged, start_time, is_failure = False)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {method_name: method_stats.as_dict() for method_name, method_stats in self._stats.items()}
+
+    def _submit(self, method_name: str, args: tuple, kwargs: dict):
+        if method_name not in READ_METHODS:
+            return (self._write_executor.submit(self._call_in_pool, method_name, args, kwargs), False)
+
+        key = (method_name, args, tuple(sorted(kwargs.items())))
+        with self._lock:
+            if key in self._calls_in_progress:
+                return (self._calls_in_progress[key], True)
+            future = self._executor.submit(self._call_in_pool, method_name, args, kwargs)
+            self._calls_in_progress[key] = future
+        future.add_done_callback(lambda _future: self._forget_call_in_progress(key))
+        return (future, False)
+
+    def _forget_call_in_progress(self, key: Hashable):
+        with self._lock:
+            self._calls_in_progress.pop(key, None)
+
+    def _call_in_pool(self, method_name: str, args: tuple, kwargs: dict) -> Any:
+        client = getattr(self._thread_local, 'client', None)
+        if client is None:
+            client = self._thread_local.client = self.client_factory()
+        return getattr(client, method_name)(*args, **kwargs)
+
+    def _record_result(self, method_name: str, is_merged: bool, start_time: float, is_failure: bool, **counters):
+        # A merged call shares the result of the call it joined, which is recorded by the caller of that call.
+        if not is_merged:
+            if is_failure:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+        self._update_stats(
+            method_name,
+            merged_calls    = int(is_merged),
+            total_latency   = time.monotonic() - start_time,
+            **counters
+        )
+
+    def _update_stats(self, method_name: str, **counters):
+        with self._lock:
+            method_stats = self._stats.setdefault(method_name, MethodStats())
+            method_stats.calls += 1
+            for counter_name, value in counters.items():
+                setattr(method_stats, counter_name, getattr(method_stats, counter_name) + value)
+            should_log_stats = time.monotonic() - self._stats_logged_at >= STATS_LOG_INTERVAL
+            if should_log_stats:
+                self._stats_logged_at = time.monotonic()
+        if should_log_stats:
+            log_rpc_client_stats(logger, self.stats())
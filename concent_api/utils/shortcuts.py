@@ -1,3 +1,7 @@
+import struct
+
+from typing import List
+
 from django.conf    import settings
 
 from golem_messages import message
@@ -5,6 +9,9 @@ from golem_messages import cryptography
 
 ecies = cryptography.ECIES()
 
+# Every message in a bundle is preceded by its length, as a 4-byte big-endian unsigned integer.
+BUNDLE_LENGTH_PREFIX = struct.Struct('!I')
+
 
 def load_without_public_key(data, client_public_key = None, check_time = True):
     """ Does the same `load` from golem_messages.shortcuts, but doesn't require public key. """
@@ -15,3 +22,30 @@ def load_without_public_key(data, client_public_key = None, check_time = True):
         return ecies.decrypt(payload, settings.CONCENT_PRIVATE_KEY)
 
     return message.base.Message.deserialize(data, decrypt, check_time, client_public_key)
+
+
+def dump_bundle(golem_messages: List[message.Message], private_key: bytes, public_key: bytes) -> bytes:
+    """
+    Serializes messages into a single envelope. Each message is signed with `private_key` separately,
+    so that it can be verified and stored on its own, but the whole bundle is encrypted for `public_key` only once.
+    """
+    payload = b''
+    for golem_message in golem_messages:
+        serialized_message = golem_message.serialize(sign_as = private_key)
+        payload += BUNDLE_LENGTH_PREFIX.pack(len(serialized_message)) + serialized_message
+    return ecies.encrypt(payload, public_key)
+
+
+def load_bundle(data: bytes, private_key: bytes, public_key: bytes, check_time = True) -> List[message.Message]:
+    """ Reverses `dump_bundle`. Every message must be signed with the private part of `public_key`. """
+    payload = ecies.decrypt(data, private_key)
+    golem_messages = []
+    offset = 0
+    while offset < len(payload):
+        (length,) = BUNDLE_LENGTH_PREFIX.unpack_from(payload, offset)
+        offset += BUNDLE_LENGTH_PREFIX.size
+        golem_messages.append(
+            message.base.Message.deserialize(payload[offset:offset + length], None, check_time, public_key)
+        )
+        offset += length
+    return golem_messages
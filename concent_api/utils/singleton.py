@@ -1,15 +1,34 @@
+import threading
+
 from django.conf        import settings
 from golem_sci.factory  import new_sci_rpc
 
+from utils.rpc_client   import CircuitBreaker
+from utils.rpc_client   import RPCClient
+
 
 class ConcentRPC:
+    """
+    Returns the RPC client shared by all threads of the process. Every thread of its pool connects to
+    the Ethereum node with its own SCI instance.
+    """
     __instance = None
+    __lock = threading.Lock()
 
     def __new__(cls, *args, **kwargs):  # pylint: disable=unused-argument
-        if cls.__instance is None:
-            cls.__instance = new_sci_rpc(
-                settings.GETH_ADDRESS,
-                settings.CONCENT_ETHEREUM_ADDRESS,
-                lambda tx: tx.sign(settings.CONCENT_ETHEREUM_PRIVATE_KEY)
-            )
+        with cls.__lock:
+            if cls.__instance is None:
+                cls.__instance = RPCClient(
+                    client_factory = lambda: new_sci_rpc(
+                        settings.GETH_ADDRESS,
+                        settings.CONCENT_ETHEREUM_ADDRESS,
+                        lambda tx: tx.sign(settings.CONCENT_ETHEREUM_PRIVATE_KEY)
+                    ),
+                    pool_size       = settings.CONCENT_RPC_POOL_SIZE,
+                    call_timeout    = settings.CONCENT_RPC_CALL_TIMEOUT,
+                    circuit_breaker = CircuitBreaker(
+                        failure_threshold   = settings.CONCENT_RPC_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                        reset_timeout       = settings.CONCENT_RPC_CIRCUIT_BREAKER_RESET_TIMEOUT,
+                    ),
+                )
         return cls.__instance
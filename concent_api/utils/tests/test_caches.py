@@ -0,0 +1,77 @@
+import mock
+
+from django.test import TestCase
+
+from utils.caches import CacheInfo
+from utils.caches import LRUCache
+from utils.caches import TTLCache
+
+
+class LRUCacheTestCase(TestCase):
+
+    def test_that_least_recently_used_item_is_evicted_when_cache_is_full(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_that_hits_and_misses_are_counted(self):
+        cache = LRUCache(2)
+        cache.set('a')
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.get('c', 'default'), 'default')
+
+        self.assertEqual(cache.info(), CacheInfo(hits=1, misses=2, maxsize=2, currsize=1))
+
+    def test_that_cache_with_zero_size_stores_nothing(self):
+        cache = LRUCache(0)
+        cache.set('a', 1)
+
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.info().currsize, 0)
+
+    def test_that_clear_removes_items_and_resets_counters(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.get('a')
+
+        cache.clear()
+
+        self.assertEqual(cache.info(), CacheInfo(hits=0, misses=0, maxsize=2, currsize=0))
+
+
+class TTLCacheTestCase(TestCase):
+
+    def test_that_item_expires_after_ttl(self):
+        cache = TTLCache()
+        with mock.patch('utils.caches.time.monotonic', return_value=100):
+            cache.set('a', 1, ttl=5)
+
+        with mock.patch('utils.caches.time.monotonic', return_value=104):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('utils.caches.time.monotonic', return_value=105):
+            self.assertIsNone(cache.get('a'))
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_that_item_with_zero_ttl_is_not_stored(self):
+        cache = TTLCache()
+        cache.set('a', 1, ttl=0)
+
+        self.assertEqual(cache.get('a', 'default'), 'default')
+
+    def test_that_deleted_item_is_not_returned(self):
+        cache = TTLCache()
+        cache.set('a', 1, ttl=5)
+        cache.delete('a')
+        cache.delete('b')
+
+        self.assertIsNone(cache.get('a'))
@@ -11,6 +11,8 @@ from golem_messages                 import load
 from golem_messages                 import message
 
 from core.exceptions                import Http400
+from core.exceptions                import PaymentBackendUnavailable
+from core.exceptions                import PaymentOutcomeUnknown
 from core.tests.utils               import ConcentIntegrationTestCase
 from utils.constants                import ErrorCode
 from utils.decorators               import handle_errors_and_responses
@@ -217,6 +219,35 @@ class DecoratorsTestCase(ConcentIntegrationTestCase):
         self.assertEqual(response.status_code, 400)  # pylint: disable=no-member
         self.assertIn('error', json.loads(response.content))  # pylint: disable=no-member
 
+    def test_handle_errors_and_responses_should_return_http_503_if_view_raised_payment_backend_unavailable(self):
+
+        request = self.request_factory.post("/dummy-url/", content_type = 'application/octet-stream')
+
+        @handle_errors_and_responses(database_name='default')
+        def dummy_view_handle_payment_backend_unavailable(_request, _message, _client_public_key):
+            raise PaymentBackendUnavailable('dummy')
+
+        response = dummy_view_handle_payment_backend_unavailable(request, self.client_auth, self.PROVIDER_PUBLIC_KEY)  # pylint: disable=assignment-from-no-return
+
+        self.assertEqual(response.status_code, 503)  # pylint: disable=no-member
+        self.assertIn('error', json.loads(response.content))  # pylint: disable=no-member
+
+    def test_handle_errors_and_responses_should_return_http_503_without_retry_after_if_view_raised_payment_outcome_unknown(self):
+
+        request = self.request_factory.post("/dummy-url/", content_type = 'application/octet-stream')
+
+        @handle_errors_and_responses(database_name='default')
+        def dummy_view_handle_payment_outcome_unknown(_request, _message, _client_public_key):
+            raise PaymentOutcomeUnknown('dummy')
+
+        with mock.patch('utils.decorators.logging.log_payment_outcome_unknown') as log_payment_outcome_unknown_mock:
+            response = dummy_view_handle_payment_outcome_unknown(request, self.client_auth, self.PROVIDER_PUBLIC_KEY)  # pylint: disable=assignment-from-no-return
+
+        self.assertEqual(response.status_code, 503)  # pylint: disable=no-member
+        self.assertFalse(response.has_header('Retry-After'))
+        self.assertIn('error', json.loads(response.content))  # pylint: disable=no-member
+        log_payment_outcome_unknown_mock.assert_called_once()
+
     def test_handle_errors_and_responses_should_return_http_response_not_allowed_if_view_passed_it(self):
 
         request = self.request_factory.post("/dummy-url/", content_type = 'application/octet-stream')
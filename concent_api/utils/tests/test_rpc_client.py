@@ -0,0 +1,189 @@
+import threading
+
+import mock
+
+from django.test import TestCase
+
+from core.exceptions import PaymentBackendUnavailable
+from core.exceptions import PaymentOutcomeUnknown
+from utils.rpc_client import CircuitBreaker
+from utils.rpc_client import RPCClient
+
+
+class FakeNodeClient:
+
+    def __init__(self, node):
+        self.node = node
+
+    def get_deposit_value(self, address):
+        return self.node.get_deposit_value(address)
+
+    def force_payment(self, **kwargs):
+        return self.node.force_payment(**kwargs)
+
+
+class RPCClientTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.node = mock.Mock()
+        self.node.get_deposit_value.return_value = 100
+        self.clients_created = []
+
+        def client_factory():
+            self.clients_created.append(threading.current_thread())
+            return FakeNodeClient(self.node)
+
+        self.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self.rpc_client = RPCClient(
+            client_factory=client_factory,
+            pool_size=2,
+            call_timeout=0.5,
+            circuit_breaker=self.circuit_breaker,
+        )
+        self.node_released = threading.Event()
+
+    def tearDown(self):
+        self.node_released.set()
+        super().tearDown()
+
+    def test_that_call_returns_result_of_client_method(self):
+        self.assertEqual(self.rpc_client.get_deposit_value('0x1'), 100)
+
+        self.node.get_deposit_value.assert_called_once_with('0x1')
+        self.assertEqual(self.rpc_client.stats()['get_deposit_value']['calls'], 1)
+
+    def test_that_call_not_finished_before_deadline_raises_payment_backend_unavailable(self):
+        self.node.get_deposit_value.side_effect = lambda _address: self.node_released.wait(5)
+
+        with self.assertRaises(PaymentBackendUnavailable):
+            self.rpc_client.get_deposit_value('0x1')
+
+        self.assertEqual(self.rpc_client.stats()['get_deposit_value']['timeouts'], 1)
+
+    def test_that_circuit_breaker_opens_after_consecutive_failures_and_rejects_calls(self):
+        self.node.get_deposit_value.side_effect = ConnectionError
+
+        for _ in range(2):
+            with self.assertRaises(PaymentBackendUnavailable):
+                self.rpc_client.get_deposit_value('0x1')
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.OPEN)
+
+        self.node.get_deposit_value.reset_mock()
+        with self.assertRaises(PaymentBackendUnavailable):
+            self.rpc_client.get_deposit_value('0x1')
+
+        self.node.get_deposit_value.assert_not_called()
+        stats = self.rpc_client.stats()['get_deposit_value']
+        self.assertEqual(stats['connection_errors'], 2)
+        self.assertEqual(stats['rejected_calls'], 1)
+
+    def test_that_circuit_breaker_closes_after_successful_trial_call(self):
+        self.node.get_deposit_value.side_effect = ConnectionError
+        for _ in range(2):
+            with self.assertRaises(PaymentBackendUnavailable):
+                self.rpc_client.get_deposit_value('0x1')
+
+        self.node.get_deposit_value.side_effect = None
+        with mock.patch('utils.rpc_client.time.monotonic', side_effect=lambda: self.circuit_breaker._opened_at + 60):  # pylint: disable=protected-access
+            self.assertEqual(self.rpc_client.get_deposit_value('0x1'), 100)
+
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.CLOSED)
+
+    def test_that_errors_reported_by_node_do_not_open_circuit_breaker(self):
+        self.node.get_deposit_value.side_effect = ValueError
+
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.rpc_client.get_deposit_value('0x1')
+
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.rpc_client.stats()['get_deposit_value']['errors'], 3)
+
+    def test_that_identical_read_calls_in_progress_are_sent_to_node_once(self):
+        call_started = threading.Event()
+
+        def get_deposit_value(_address):
+            call_started.set()
+            self.node_released.wait(5)
+            return 100
+
+        self.node.get_deposit_value.side_effect = get_deposit_value
+        results = []
+
+        def call():
+            results.append(self.rpc_client.get_deposit_value('0x1'))
+
+        first_caller = threading.Thread(target=call)
+        first_caller.start()
+        call_started.wait(5)
+        second_caller = threading.Thread(target=call)
+        second_caller.start()
+        # Gives the second caller time to join the call in progress.
+        second_caller.join(0.1)
+        self.node_released.set()
+        first_caller.join()
+        second_caller.join()
+
+        self.assertEqual(results, [100, 100])
+        self.node.get_deposit_value.assert_called_once_with('0x1')
+        self.assertEqual(self.rpc_client.stats()['get_deposit_value']['merged_calls'], 1)
+
+    def test_that_transactions_are_sent_from_a_single_client(self):
+        for _ in range(3):
+            self.rpc_client.force_payment(value=1)
+        self.rpc_client.get_deposit_value('0x1')
+
+        self.assertEqual(self.node.force_payment.call_count, 3)
+        self.assertEqual(len(self.clients_created), 2)
+
+    def test_that_transaction_not_finished_before_deadline_raises_payment_outcome_unknown(self):
+        call_started = threading.Event()
+
+        def force_payment(**_kwargs):
+            call_started.set()
+            self.node_released.wait(5)
+
+        self.node.force_payment.side_effect = force_payment
+
+        with self.assertRaises(PaymentOutcomeUnknown):
+            self.rpc_client.force_payment(value=1)
+
+        self.assertTrue(call_started.is_set())
+        self.assertEqual(self.rpc_client.stats()['force_payment']['timeouts'], 1)
+
+    def test_that_transaction_dropped_before_it_started_raises_payment_backend_unavailable(self):
+        call_started = threading.Event()
+
+        def force_payment(**_kwargs):
+            call_started.set()
+            self.node_released.wait(5)
+
+        self.node.force_payment.side_effect = force_payment
+        errors = []
+
+        def call():
+            try:
+                self.rpc_client.force_payment(value=1)
+            except Exception as exception:  # pylint: disable=broad-except
+                errors.append(exception)
+
+        first_caller = threading.Thread(target=call)
+        first_caller.start()
+        call_started.wait(5)
+
+        # The first transaction keeps the only thread sending transactions busy so the second one never starts.
+        with self.assertRaises(PaymentBackendUnavailable):
+            self.rpc_client.force_payment(value=2)
+        first_caller.join()
+
+        self.assertIsInstance(errors[0], PaymentOutcomeUnknown)
+        self.node.force_payment.assert_called_once_with(value=1)
+
+    def test_that_connection_error_while_sending_transaction_raises_payment_outcome_unknown(self):
+        self.node.force_payment.side_effect = ConnectionError
+
+        with self.assertRaises(PaymentOutcomeUnknown):
+            self.rpc_client.force_payment(value=1)
+
+        self.assertEqual(self.rpc_client.stats()['force_payment']['connection_errors'], 1)